@@ -5,6 +5,12 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+This is the production entry point (`gunicorn backend.asgi`, with the
+uvicorn workers configured in gunicorn.conf.py). The Server-Sent Events
+stream (/api/eventos/) and the async login need it: under WSGI the stream
+answers 503. For local development with the stream, run
+`uvicorn backend.asgi:application --reload`.
 """
 
 import os
@@ -0,0 +1,19 @@
+"""
+Aplicación Celery del proyecto.
+
+Lee la configuración `CELERY_*` de settings y descubre las tareas de las
+aplicaciones (core.tasks). Sin broker configurado las tareas se ejecutan en
+el propio proceso (modo eager), que es lo que usan desarrollo y pruebas.
+
+Worker (con -B lanza también las tareas periódicas de CELERY_BEAT_SCHEDULE):
+    cd backend && celery -A backend worker -B -l info
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+app = Celery('backend')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
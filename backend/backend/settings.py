@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 import os
 import environ
@@ -59,12 +60,16 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     # Third-party
     'rest_framework',
+    'django_filters',
     'corsheaders',
     # Local apps
     'core',
 ]
 
 MIDDLEWARE = [
+    # Primero, para que el total cubra al resto de middleware (core.middleware)
+    'core.middleware.TiemposServidorMiddleware',
+    'core.middleware.MetricasMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Para servir archivos estáticos
@@ -190,11 +195,122 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # JWT sin estado primero: identifica al usuario con los claims del token,
+    # sin leer la sesión. La sesión queda para la API navegable y el admin.
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'core.autenticacion.AutenticacionJWT',
         'rest_framework.authentication.SessionAuthentication',
     ],
+    # Filtros declarativos (core.filters) aplicados a listados y acciones
+    'DEFAULT_FILTER_BACKENDS': [
+        'django_filters.rest_framework.DjangoFilterBackend',
+    ],
+    # Paginación por cursor opcional: solo se activa con ?page_size= o ?cursor=
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.CursorPaginacionOpcional',
+}
+
+# Tokens JWT (core.autenticacion). La revocación se guarda en CACHES, así que
+# con varios workers necesita Redis (REDIS_URL).
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=env.int('JWT_ACCESO_MINUTOS', default=15)),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=env.int('JWT_REFRESCO_DIAS', default=1)),
+    'ROTATE_REFRESH_TOKENS': True,
+    'UPDATE_LAST_LOGIN': False,
+    'SIGNING_KEY': SECRET_KEY,
+    'AUTH_HEADER_TYPES': ('Bearer',),
+    'USER_ID_FIELD': 'id',
+    'USER_ID_CLAIM': 'user_id',
+    'TOKEN_USER_CLASS': 'core.autenticacion.UsuarioToken',
 }
 
+# Login (core.acceso): hilos del pool de hash, verificaciones en curso antes
+# de responder 503 y límites de intentos fallidos por email e IP (en CACHES)
+LOGIN_HILOS_HASH = env.int('LOGIN_HILOS_HASH', default=0) or None
+LOGIN_MAX_PENDIENTES = env.int('LOGIN_MAX_PENDIENTES', default=64)
+LOGIN_MAX_FALLOS_EMAIL = env.int('LOGIN_MAX_FALLOS_EMAIL', default=5)
+LOGIN_MAX_FALLOS_IP = env.int('LOGIN_MAX_FALLOS_IP', default=50)
+LOGIN_VENTANA_FALLOS = env.int('LOGIN_VENTANA_FALLOS', default=900)
+# Proxies (IPs o redes CIDR) cuyo X-Forwarded-For identifica al cliente del
+# login. Sin ellos, detrás de un proxy (Render, Railway) solo se limita por email.
+PROXIES_CONFIABLES = env.list('PROXIES_CONFIABLES', default=[])
+
+# Redis compartido entre workers (caché y eventos). Sin REDIS_URL se usa
+# memoria local, suficiente para un único proceso.
+REDIS_URL = env('REDIS_URL', default=None)
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'enapu',
+        }
+    }
+
+# Segundos que se conserva una respuesta pre-renderizada de catálogo (core.catalogos);
+# la invalidación real la da la versión de la tabla incluida en la clave.
+CATALOGOS_CACHE_TIMEOUT = env.int('CATALOGOS_CACHE_TIMEOUT', default=3600)
+
+# Broker de eventos en tiempo real (core.eventos): 'memoria' para un solo
+# proceso ASGI, 'redis' para repartir entre los workers de gunicorn, el worker
+# de Celery y los comandos de gestión. Con REDIS_URL se usa 'redis' por defecto.
+EVENTOS_BROKER = env('EVENTOS_BROKER', default='redis' if REDIS_URL else 'memoria')
+EVENTOS_REDIS_URL = REDIS_URL or 'redis://localhost:6379/0'
+
+# Tareas en segundo plano (backend/celery.py). Sin broker se ejecutan en el
+# propio proceso (eager), como en desarrollo y en las pruebas.
+CELERY_BROKER_URL = env('CELERY_BROKER_URL', default=REDIS_URL or 'memory://')
+CELERY_TASK_ALWAYS_EAGER = env.bool(
+    'CELERY_TASK_ALWAYS_EAGER', default=CELERY_BROKER_URL == 'memory://'
+)
+# Los resultados se guardan en la fila de Reporte, no en un backend de Celery
+CELERY_TASK_IGNORE_RESULT = True
+# Tareas periódicas (celery beat; el worker del Procfile lo lanza con -B)
+CELERY_BEAT_SCHEDULE = {
+    'purgar-tickets-eliminados': {
+        'task': 'core.tasks.purgar_tickets_eliminados',
+        'schedule': 24 * 60 * 60,
+    },
+}
+
+# Días que se conservan las lápidas de tickets eliminados (TicketEliminado).
+# Un cursor `?since=` más antiguo recibe 410 y el cliente debe resincronizar.
+SINCRONIZACION_RETENCION_DIAS = env.int('SINCRONIZACION_RETENCION_DIAS', default=30)
+
+# Procesos para calcular en paralelo los reportes por zona (core.reportes);
+# 0 o 1 calcula las zonas secuencialmente.
+REPORTES_PROCESOS = env.int('REPORTES_PROCESOS', default=0)
+
+# Segundos que se reutiliza el resultado de un reporte abierto: el del estado
+# actual (ocupacion_zonas) o uno cuyo rango llegaba a la fecha en que se calculó.
+# Pasado ese tiempo la siguiente petición lo recalcula. Los rangos ya cerrados
+# no caducan.
+REPORTES_VIGENCIA_ABIERTOS = env.int('REPORTES_VIGENCIA_ABIERTOS', default=60)
+
+# Cabeceras Server-Timing y X-Query-Count en cada respuesta (core.middleware).
+# Por encima del presupuesto de consultas se añade X-Query-Budget-Exceeded y se
+# registra un aviso en el logger 'core.tiempos'; 0 desactiva el aviso.
+TIEMPOS_SERVIDOR = env.bool('TIEMPOS_SERVIDOR', default=True)
+TIEMPOS_SERVIDOR_PRESUPUESTO_CONSULTAS = env.int(
+    'TIEMPOS_SERVIDOR_PRESUPUESTO_CONSULTAS', default=30
+)
+
+# Métricas de Prometheus en /metrics (core.metricas). La petición debe llevar
+# 'Authorization: Bearer <METRICAS_TOKEN>'; sin token definido /metrics solo
+# responde con DEBUG activo (en producción queda cerrado). Los indicadores de
+# negocio (tickets activos, slots libres) se recalculan como mucho cada
+# METRICAS_NEGOCIO_TTL segundos. Con varios workers, gunicorn.conf.py fija
+# PROMETHEUS_MULTIPROC_DIR para agregarlos.
+METRICAS = env.bool('METRICAS', default=True)
+METRICAS_TOKEN = env('METRICAS_TOKEN', default='')
+METRICAS_NEGOCIO_TTL = env.int('METRICAS_NEGOCIO_TTL', default=15)
+
 # CORS - allow frontend (Vite default port) or configure via CORS_ALLOWED_ORIGINS in .env
 CORS_ALLOWED_ORIGINS = env.list('CORS_ALLOWED_ORIGINS', default=[
     'http://localhost:5173',
@@ -204,6 +320,9 @@ CORS_ALLOWED_ORIGINS = env.list('CORS_ALLOWED_ORIGINS', default=[
     'http://127.0.0.1:8081',
 ])
 
+# El frontend puede leer las cabeceras de medición de core.middleware
+CORS_EXPOSE_HEADERS = ['Server-Timing', 'X-Query-Count', 'X-Query-Budget-Exceeded']
+
 # CSRF Trusted Origins para producción (necesario para Vercel/Render)
 CSRF_TRUSTED_ORIGINS = env.list('CORS_ALLOWED_ORIGINS', default=[
     'http://localhost:5173',
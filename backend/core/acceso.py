@@ -0,0 +1,156 @@
+"""
+Verificación de credenciales del login fuera del hilo que atiende la petición.
+
+El hash de contraseñas (PBKDF2 con cientos de miles de iteraciones) es la
+operación más cara del sistema. La vista asíncrona de login delega aquí:
+- el hash se calcula en un pool de hilos acotado (`LOGIN_HILOS_HASH`);
+  hashlib libera el GIL durante PBKDF2, así que los hilos hashean en paralelo
+  y el bucle de eventos sigue atendiendo otras peticiones;
+- si hay más de `LOGIN_MAX_PENDIENTES` verificaciones en curso el login se
+  rechaza con 503 en lugar de encolar sin límite;
+- los intentos fallidos se cuentan en caché por email y por IP; superado el
+  límite, el login responde 429 sin llegar a la base de datos ni al hasher.
+  La IP del cliente sale de X-Forwarded-For cuando la petición llega desde
+  uno de los `PROXIES_CONFIABLES` (`ip_cliente`); detrás de un proxy no
+  configurado no se limita por IP, ya que todos los clientes compartirían la
+  dirección del proxy;
+- si el hash guardado usa parámetros antiguos (iteraciones, algoritmo), se
+  recalcula tras un login correcto, también en el pool.
+"""
+import hashlib
+import ipaddress
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+
+PREFIJO_FALLOS = 'login:fallos:'
+
+
+def _ajuste(nombre, defecto):
+    return getattr(settings, nombre, defecto)
+
+
+class PoolHash:
+    """Pool de hilos acotado para verificar contraseñas, con límite de pendientes."""
+
+    def __init__(self, hilos=None, max_pendientes=None):
+        self._hilos = hilos
+        self._max_pendientes = max_pendientes
+        self._pool = None
+        self._cupos = None
+        self._lock = threading.Lock()
+
+    def _iniciar(self):
+        with self._lock:
+            if self._pool is None:
+                hilos = (self._hilos or _ajuste('LOGIN_HILOS_HASH', None)
+                         or min(4, os.cpu_count() or 1))
+                self._cupos = threading.BoundedSemaphore(
+                    self._max_pendientes or _ajuste('LOGIN_MAX_PENDIENTES', 64)
+                )
+                self._pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='login-hash')
+        return self._pool
+
+    def enviar(self, funcion, *args):
+        """
+        Encola `funcion(*args)` y devuelve su Future, o None si el pool está saturado.
+        """
+        pool = self._iniciar()
+        if not self._cupos.acquire(blocking=False):  # pylint: disable=consider-using-with
+            return None
+        return pool.submit(self._ejecutar, funcion, args)
+
+    def _ejecutar(self, funcion, args):
+        try:
+            return funcion(*args)
+        finally:
+            # Antes de publicar el resultado: quien lo espera ya encuentra el cupo libre
+            self._cupos.release()
+
+
+pool_hash = PoolHash()
+
+
+def verificar_password(password, codificado):
+    """
+    Comprueba `password` contra el hash guardado (se ejecuta en el pool).
+
+    Devuelve (valido, hash_nuevo); hash_nuevo no es None cuando el hash
+    guardado usa parámetros del hasher que ya no son los vigentes.
+    """
+    nuevos = []
+    valido = check_password(
+        password, codificado, setter=lambda raw: nuevos.append(make_password(raw))
+    )
+    return valido, (nuevos[0] if nuevos else None)
+
+
+def _confiable(direccion, redes):
+    try:
+        ip = ipaddress.ip_address(direccion.strip())
+    except ValueError:
+        return False
+    return any(ip in red for red in redes)
+
+
+def ip_cliente(request):
+    """
+    IP del cliente para el límite de intentos, o None si no se puede saber.
+
+    Si REMOTE_ADDR es uno de los `PROXIES_CONFIABLES` (IPs o redes CIDR), se
+    recorre X-Forwarded-For de derecha a izquierda saltando los proxies
+    confiables. Sin proxies configurados, una petición con X-Forwarded-For
+    viene de un proxy desconocido y devuelve None.
+    """
+    remota = request.META.get('REMOTE_ADDR', '')
+    reenviada = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    redes = [ipaddress.ip_network(red, strict=False)
+             for red in _ajuste('PROXIES_CONFIABLES', [])]
+    if not redes:
+        return None if reenviada else remota
+    if not _confiable(remota, redes):
+        return remota
+    saltos = [salto.strip() for salto in reenviada.split(',') if salto.strip()]
+    for salto in reversed(saltos):
+        if not _confiable(salto, redes):
+            return salto
+    return saltos[0] if saltos else remota
+
+
+def _claves_fallos(email, ip):
+    resumen = hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+    claves = [f'{PREFIJO_FALLOS}email:{resumen}']
+    if ip:
+        claves.append(f'{PREFIJO_FALLOS}ip:{ip}')
+    return claves
+
+
+async def login_bloqueado(email, ip):
+    """Indica si el email o la IP (si se conoce) superaron su límite de intentos fallidos."""
+    clave_email, *clave_ip = _claves_fallos(email, ip)
+    fallos = await cache.aget_many([clave_email, *clave_ip])
+    return (fallos.get(clave_email, 0) >= _ajuste('LOGIN_MAX_FALLOS_EMAIL', 5)
+            or any(fallos.get(clave, 0) >= _ajuste('LOGIN_MAX_FALLOS_IP', 50)
+                   for clave in clave_ip))
+
+
+async def registrar_fallo(email, ip):
+    """Cuenta un intento fallido para el email y, si se conoce, para la IP."""
+    ventana = _ajuste('LOGIN_VENTANA_FALLOS', 900)
+    for clave in _claves_fallos(email, ip):
+        # add() fija la ventana con el primer fallo; incr() es atómico en Redis
+        await cache.aadd(clave, 0, ventana)
+        try:
+            await cache.aincr(clave)
+        except ValueError:
+            # La clave expiró entre add() e incr()
+            await cache.aset(clave, 1, ventana)
+
+
+async def limpiar_fallos(email):
+    """Un login correcto reinicia el contador del email (no el de la IP)."""
+    await cache.adelete(_claves_fallos(email, None)[0])
@@ -7,11 +7,11 @@ para permitir la gestión CRUD (Crear, Leer, Actualizar, Borrar) a través de la
 from django.contrib import admin
 from .models import (
     Rol, NivelAcceso, Usuario, Zona, UbicacionSlot, Buque,
-    CitaRecojo, Contenedor, Ticket, Factura, Pago, Reporte
+    CitaRecojo, Contenedor, Ticket, TicketEliminado, Factura, Pago, Reporte
 )
 
 models = [Rol, NivelAcceso, Usuario, Zona, UbicacionSlot, Buque,
-          CitaRecojo, Contenedor, Ticket, Factura, Pago, Reporte]
+          CitaRecojo, Contenedor, Ticket, TicketEliminado, Factura, Pago, Reporte]
 
 for m in models:
     admin.site.register(m)
@@ -14,3 +14,7 @@ class CoreConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        """Conecta los receptores de señales de la aplicación."""
+        from . import signals  # noqa: F401  pylint: disable=import-outside-toplevel,unused-import
@@ -0,0 +1,228 @@
+"""
+Asignación atómica de slots libres por zona.
+
+`asignar_slot` elige y ocupa un slot libre de una zona dentro de una
+transacción. En PostgreSQL la fila se bloquea con
+`SELECT ... FOR UPDATE SKIP LOCKED`, de modo que varios operadores de
+puerta asignando a la vez nunca reciben el mismo slot ni se esperan entre
+sí. En motores sin SKIP LOCKED (SQLite en desarrollo) las asignaciones de
+cada proceso se serializan con un cerrojo por zona.
+
+Para no recorrer la tabla en cada asignación, cada proceso mantiene en
+`slots_libres` un mapa de bits por zona indexado por (fila, columna, nivel)
+que sirve de prefiltro: solo se consulta a la base de datos un lote pequeño
+de candidatos. El mapa es orientativo —la base de datos decide— y se
+corrige con las señales de core.signals, con un TTL y, si se agota, con una
+búsqueda directa en la zona.
+"""
+import threading
+import time
+from array import array
+from contextlib import nullcontext
+
+from django.db import connection, transaction
+
+from .models import ESTADO_SLOT_OCUPADO, ESTADOS_SLOT_LIBRE, UbicacionSlot
+
+# Candidatos del mapa que se verifican en cada consulta de bloqueo
+TAMANO_CANDIDATOS = 16
+
+
+class MapaSlotsLibres:
+    """
+    Mapa de bits de los slots libres de una zona.
+
+    Cada posición (fila, columna, nivel) de la rejilla ocupa un bit y guarda
+    el id del slot que la ocupa. Los slots cuya posición coincide con otra
+    ya registrada se guardan aparte en `_sueltos`.
+    """
+
+    def __init__(self, slots):
+        """`slots` es una lista de tuplas (id, fila, columna, nivel, libre)."""
+        slots = list(slots)
+        self.creado = time.monotonic()
+        if slots:
+            self._origen = tuple(min(s[d] for s in slots) for d in (1, 2, 3))
+            self._dimensiones = tuple(
+                max(s[d] for s in slots) - self._origen[d - 1] + 1 for d in (1, 2, 3)
+            )
+        else:
+            self._origen, self._dimensiones = (0, 0, 0), (0, 0, 0)
+        tamano = self._dimensiones[0] * self._dimensiones[1] * self._dimensiones[2]
+        self._ids = array('q', bytes(8 * tamano))
+        self._bits = bytearray((tamano + 7) // 8)
+        self._sueltos = {}
+        self._primer_byte = 0
+        self._lock = threading.Lock()
+        for slot_id, fila, columna, nivel, libre in slots:
+            self.marcar(slot_id, fila, columna, nivel, libre)
+
+    def _posicion(self, fila, columna, nivel):
+        """Índice lineal de la posición o None si cae fuera de la rejilla."""
+        relativa = (fila - self._origen[0], columna - self._origen[1], nivel - self._origen[2])
+        if any(v < 0 or v >= d for v, d in zip(relativa, self._dimensiones)):
+            return None
+        _, columnas, niveles = self._dimensiones
+        return (relativa[0] * columnas + relativa[1]) * niveles + relativa[2]
+
+    def marcar(self, slot_id, fila, columna, nivel, libre):
+        """
+        Registra el estado de un slot. Devuelve False si su posición cae fuera
+        de la rejilla y el mapa debe reconstruirse.
+        """
+        posicion = self._posicion(fila, columna, nivel)
+        if posicion is None:
+            return False
+        with self._lock:
+            self._marcar(posicion, slot_id, libre)
+        return True
+
+    def _marcar(self, posicion, slot_id, libre):
+        if self._ids[posicion] not in (0, slot_id):
+            # Posición compartida con otro slot: se lleva fuera del mapa de bits
+            if libre:
+                self._sueltos[slot_id] = True
+            else:
+                self._sueltos.pop(slot_id, None)
+            return
+        self._ids[posicion] = slot_id
+        byte, bit = divmod(posicion, 8)
+        if libre:
+            self._bits[byte] |= 1 << bit
+            self._primer_byte = min(self._primer_byte, byte)
+        else:
+            self._bits[byte] &= ~(1 << bit) & 0xFF
+
+    def candidatos(self, limite, excluir=()):
+        """Ids de hasta `limite` slots libres, en orden de fila, columna y nivel."""
+        with self._lock:
+            return self._candidatos(limite, excluir)
+
+    def _candidatos(self, limite, excluir):
+        encontrados = []
+        bits = self._bits
+        byte = self._primer_byte
+        # Avanza el inicio de la búsqueda sobre el prefijo ya ocupado
+        while byte < len(bits) and not bits[byte]:
+            byte += 1
+        self._primer_byte = byte
+        while byte < len(bits) and len(encontrados) < limite:
+            valor = bits[byte]
+            while valor and len(encontrados) < limite:
+                bit = (valor & -valor).bit_length() - 1
+                valor &= valor - 1
+                slot_id = self._ids[byte * 8 + bit]
+                if slot_id not in excluir:
+                    encontrados.append(slot_id)
+            byte += 1
+        for slot_id in self._sueltos:
+            if len(encontrados) >= limite:
+                break
+            if slot_id not in excluir:
+                encontrados.append(slot_id)
+        return encontrados
+
+    @property
+    def libres(self):
+        """Número de slots marcados como libres."""
+        return sum(bin(b).count('1') for b in self._bits) + len(self._sueltos)
+
+
+class IndiceSlotsLibres:
+    """Mapas de slots libres de todas las zonas del proceso, construidos a demanda."""
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._mapas = {}
+        self._cerrojos = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, zona_id):
+        """Devuelve el mapa de la zona, construyéndolo si falta o ha caducado."""
+        with self._lock:
+            mapa = self._mapas.get(zona_id)
+        if mapa is None or time.monotonic() - mapa.creado > self.ttl:
+            mapa = self._construir(zona_id)
+        return mapa
+
+    def _construir(self, zona_id):
+        filas = UbicacionSlot.objects.filter(id_zona=zona_id).values_list(
+            'id', 'fila', 'columna', 'nivel', 'estado'
+        )
+        mapa = MapaSlotsLibres(
+            (i, f, c, n, estado in ESTADOS_SLOT_LIBRE) for i, f, c, n, estado in filas
+        )
+        with self._lock:
+            self._mapas[zona_id] = mapa
+        return mapa
+
+    def actualizar(self, slot):
+        """Refleja en el mapa (si existe) el estado guardado de un slot."""
+        with self._lock:
+            mapa = self._mapas.get(slot.id_zona_id)
+            if mapa is None:
+                return
+            libre = slot.estado in ESTADOS_SLOT_LIBRE
+            if not mapa.marcar(slot.pk, slot.fila, slot.columna, slot.nivel, libre):
+                del self._mapas[slot.id_zona_id]
+
+    def descartar(self, zona_id=None):
+        """Olvida el mapa de una zona (o todos) para reconstruirlo en el próximo uso."""
+        with self._lock:
+            if zona_id is None:
+                self._mapas.clear()
+            else:
+                self._mapas.pop(zona_id, None)
+
+    def cerrojo(self, zona_id):
+        """Cerrojo de proceso que serializa las asignaciones de una zona."""
+        with self._lock:
+            return self._cerrojos.setdefault(zona_id, threading.Lock())
+
+
+slots_libres = IndiceSlotsLibres()
+
+
+def _primer_libre(queryset, bloquear):
+    """Primer slot libre del queryset, bloqueado si el motor admite SKIP LOCKED."""
+    queryset = queryset.filter(estado__in=ESTADOS_SLOT_LIBRE).select_related('id_zona')
+    if bloquear:
+        # Solo se bloquea el slot: bloquear también la zona serializaría a los asignadores
+        queryset = queryset.select_for_update(skip_locked=True, of=('self',))
+    return queryset.order_by('fila', 'columna', 'nivel', 'id').first()
+
+
+def asignar_slot(zona_id, estado=ESTADO_SLOT_OCUPADO, usar_mapa=True):
+    """
+    Ocupa un slot libre de la zona y lo devuelve, o None si no queda ninguno.
+
+    Si se llama dentro de una transacción, el bloqueo de la fila dura hasta
+    que esta se confirma. `usar_mapa=False` omite el prefiltro en memoria.
+    """
+    bloquear = connection.features.has_select_for_update_skip_locked
+    cerrojo = nullcontext() if bloquear else slots_libres.cerrojo(zona_id)
+    zona = UbicacionSlot.objects.filter(id_zona=zona_id)
+
+    with cerrojo, transaction.atomic():
+        slot = None
+        if usar_mapa:
+            mapa = slots_libres.obtener(zona_id)
+            descartados = set()
+            while slot is None:
+                candidatos = mapa.candidatos(TAMANO_CANDIDATOS, excluir=descartados)
+                if not candidatos:
+                    break
+                slot = _primer_libre(zona.filter(id__in=candidatos), bloquear)
+                descartados.update(candidatos)
+        if slot is None:
+            # Mapa agotado o desactualizado: búsqueda directa en toda la zona
+            slot = _primer_libre(zona, bloquear)
+            if slot is None:
+                return None
+            if usar_mapa:
+                slots_libres.descartar(zona_id)
+        slot.estado = estado
+        slot.save(update_fields=['estado'])
+    # Se retira ya del mapa para que otros hilos no lo propongan antes del commit
+    slots_libres.actualizar(slot)
+    return slot
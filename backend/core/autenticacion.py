@@ -0,0 +1,147 @@
+"""
+Autenticación sin estado con JWT (djangorestframework-simplejwt) para Usuario.
+
+El login emite un par de tokens (acceso y refresco) cuyos claims llevan la
+identidad del Usuario: id, email, nombre, rol y nivel de acceso. Las
+peticiones autenticadas construyen `UsuarioToken` a partir de esos claims,
+sin leer la sesión ni la tabla Usuario.
+
+La revocación vive en la caché (compartida entre workers con Redis):
+- `revocar_token` marca el `jti` de un token hasta que expira (logout y
+  rotación del token de refresco);
+- `revocar_tokens_usuario` invalida todos los tokens emitidos antes de ese
+  instante (usuario desactivado, eliminado o con contraseña nueva).
+Comprobar ambas marcas cuesta una única lectura `get_many` de la caché.
+
+El refresco sí lee el Usuario (una consulta por clave primaria): rechaza a
+los usuarios inactivos y vuelve a emitir los claims con su rol actual.
+"""
+import time
+
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Usuario
+
+PREFIJO_REVOCADO = 'jwt:revocado:'
+PREFIJO_USUARIO = 'jwt:usuario:'
+
+
+class TokenRevocado(Exception):
+    """El token de refresco no es válido, está revocado o su usuario ya no está activo."""
+
+
+class UsuarioToken(TokenUser):
+    """Usuario autenticado construido solo con los claims del token."""
+
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def email(self):
+        """Email del usuario."""
+        return self.token.get('email', '')
+
+    @cached_property
+    def nombre(self):
+        """Nombre del usuario."""
+        return self.token.get('nombre', '')
+
+    @cached_property
+    def rol(self):
+        """Nombre del rol (p. ej. 'Operario')."""
+        return self.token.get('rol')
+
+    @cached_property
+    def nivel_acceso(self):
+        """Nombre del nivel de acceso."""
+        return self.token.get('nivel_acceso')
+
+    def __str__(self):
+        return f"{self.nombre} ({self.rol})"
+
+
+def emitir_tokens(usuario):
+    """
+    Emite el par de tokens de `usuario`.
+
+    El usuario debe traer cargados `id_rol` e `id_nivel_acceso` (select_related).
+    """
+    refresco = RefreshToken.for_user(usuario)
+    refresco['email'] = usuario.email
+    refresco['nombre'] = usuario.nombre
+    refresco['rol'] = usuario.id_rol.rol
+    refresco['nivel_acceso'] = usuario.id_nivel_acceso.nivel
+    # El token de acceso copia los claims del de refresco
+    return {'access': str(refresco.access_token), 'refresh': str(refresco)}
+
+
+def _restante(token):
+    """Segundos que le quedan al token antes de expirar (mínimo 1)."""
+    return max(int(token['exp'] - time.time()), 1)
+
+
+def revocar_token(token):
+    """Revoca un token (acceso o refresco) hasta su expiración."""
+    cache.set(PREFIJO_REVOCADO + token[api_settings.JTI_CLAIM], True, _restante(token))
+
+
+def revocar_tokens_usuario(usuario_id):
+    """Revoca todos los tokens emitidos hasta ahora para el usuario."""
+    cache.set(
+        f'{PREFIJO_USUARIO}{usuario_id}', time.time(),
+        int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+    )
+
+
+def token_revocado(token):
+    """Indica si el token está revocado, individualmente o por su usuario."""
+    clave_token = PREFIJO_REVOCADO + token[api_settings.JTI_CLAIM]
+    clave_usuario = f'{PREFIJO_USUARIO}{token[api_settings.USER_ID_CLAIM]}'
+    marcas = cache.get_many([clave_token, clave_usuario])
+    if marcas.get(clave_token):
+        return True
+    revocado_desde = marcas.get(clave_usuario)
+    return revocado_desde is not None and token['iat'] <= revocado_desde
+
+
+def refrescar_tokens(refresco_crudo):
+    """
+    Canjea un token de refresco por un par nuevo y revoca el usado (rotación).
+
+    Lanza TokenRevocado si el token no es válido o ya no puede usarse.
+    """
+    try:
+        refresco = RefreshToken(refresco_crudo)
+    except TokenError as error:
+        raise TokenRevocado(str(error)) from error
+    if token_revocado(refresco):
+        raise TokenRevocado('El token ha sido revocado')
+    usuario = Usuario.objects.select_related('id_rol', 'id_nivel_acceso').filter(
+        pk=refresco[api_settings.USER_ID_CLAIM], activo=True
+    ).first()
+    if usuario is None:
+        raise TokenRevocado('El usuario no existe o no está activo')
+    revocar_token(refresco)
+    return emitir_tokens(usuario)
+
+
+class AutenticacionJWT(JWTStatelessUserAuthentication):
+    """
+    Autenticación por cabecera `Authorization: Bearer <token>` sin consultas.
+
+    Valida la firma y la expiración del token, comprueba la lista de
+    revocación en caché y devuelve un `UsuarioToken`.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if token_revocado(token):
+            raise InvalidToken({'detail': 'El token ha sido revocado', 'code': 'token_revoked'})
+        return token
@@ -0,0 +1,95 @@
+"""
+Cachés en memoria de proceso para la aplicación 'core'.
+
+`CacheLRU` guarda respuestas ya serializadas junto con las filas de las que
+dependen; las señales de core.signals expulsan las entradas afectadas cuando
+esas filas se escriben. Como cada worker de gunicorn tiene su propia copia,
+las entradas caducan además tras un TTL corto para acotar la desactualización
+entre procesos. Los aciertos y fallos de cada caché se cuentan en las
+métricas de core.metricas con el nombre de la caché.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from .metricas import registrar_cache
+
+
+class CacheLRU:
+    """
+    Caché LRU con TTL y expulsión por dependencias, segura entre hilos.
+
+    Cada entrada declara las filas de las que depende como pares
+    (etiqueta_modelo, pk); `invalidar` expulsa todas las entradas que
+    dependen de una fila concreta.
+    """
+
+    def __init__(self, max_entradas=512, ttl=10, nombre='lru'):
+        self.nombre = nombre
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._entradas = OrderedDict()
+        self._dependientes = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        """Devuelve el valor de `clave` o None si no existe o ha caducado."""
+        valor = self._leer(clave)
+        registrar_cache(self.nombre, valor is not None)
+        return valor
+
+    def guardar(self, clave, valor, dependencias=()):
+        """Guarda `valor` bajo `clave`, registrando las filas de las que depende."""
+        with self._lock:
+            if clave in self._entradas:
+                self._expulsar(clave)
+            dependencias = frozenset(dependencias)
+            self._entradas[clave] = (valor, time.monotonic() + self.ttl, dependencias)
+            for dependencia in dependencias:
+                self._dependientes.setdefault(dependencia, set()).add(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._expulsar(next(iter(self._entradas)))
+
+    def invalidar(self, etiqueta, pk):
+        """Expulsa todas las entradas que dependen de la fila (etiqueta, pk)."""
+        with self._lock:
+            for clave in self._dependientes.pop((etiqueta, pk), set()):
+                self._expulsar(clave)
+
+    def limpiar(self):
+        """Vacía la caché por completo."""
+        with self._lock:
+            self._entradas.clear()
+            self._dependientes.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def _leer(self, clave):
+        """Lectura sin contar en las métricas."""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            valor, expira, _ = entrada
+            if expira < time.monotonic():
+                self._expulsar(clave)
+                return None
+            self._entradas.move_to_end(clave)
+            return valor
+
+    def _expulsar(self, clave):
+        """Elimina una entrada y sus referencias de dependencia (requiere el lock)."""
+        entrada = self._entradas.pop(clave, None)
+        if entrada is None:
+            return
+        for dependencia in entrada[2]:
+            claves = self._dependientes.get(dependencia)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._dependientes[dependencia]
+
+
+# Resultados de ContenedorViewSet.buscar, por código de barras o número de contenedor
+busqueda_contenedores = CacheLRU(max_entradas=512, ttl=10, nombre='busqueda_contenedores')
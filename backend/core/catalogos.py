@@ -0,0 +1,86 @@
+"""
+Caché de lectura de los catálogos (Rol, NivelAcceso, Zona, Buque).
+
+Las respuestas de listado y detalle se guardan ya renderizadas en la caché de
+Django (memoria local o Redis, según settings.CACHES), bajo una clave que
+incluye el ETag de core.versiones y, por tanto, la versión de cada tabla.
+Una escritura incrementa esa versión, así que ningún worker puede servir una
+respuesta antigua; además, las señales purgan las claves de la tabla escrita
+para liberar espacio. Los workers precalientan la caché al arrancar.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from .metricas import registrar_cache
+
+
+def _clave_indice(modelo):
+    return f'catalogo:claves:{modelo._meta.db_table}'
+
+
+def purgar_catalogo(modelo):
+    """Elimina de la caché todas las respuestas guardadas del catálogo `modelo`."""
+    indice = _clave_indice(modelo)
+    claves = cache.get(indice) or set()
+    cache.delete_many([*claves, indice])
+
+
+class CacheCatalogoMixin:
+    """
+    Sirve `list` y `retrieve` desde respuestas JSON pre-renderizadas.
+
+    Debe combinarse con RespuestaCondicionalMixin, que calcula el ETag usado
+    como clave. Solo se cachean respuestas 200 en formato JSON.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """Listado servido desde la caché cuando existe."""
+        return self._desde_cache(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Detalle servido desde la caché cuando existe."""
+        return self._desde_cache(super().retrieve, request, *args, **kwargs)
+
+    def _desde_cache(self, generar, request, *args, **kwargs):
+        validadores = getattr(self, '_validadores', None)
+        if validadores is None or request.accepted_renderer.format != 'json':
+            return generar(request, *args, **kwargs)
+
+        modelo = self.get_queryset().model
+        clave = f"catalogo:{modelo._meta.db_table}:{validadores['ETag'].strip(chr(34))}"
+        guardado = cache.get(clave)
+        registrar_cache('catalogos', guardado is not None)
+        if guardado is not None:
+            contenido, tipo = guardado
+            return HttpResponse(contenido, content_type=tipo)
+
+        response = generar(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        response = self.finalize_response(request, response, *args, **kwargs)
+        response.render()
+        timeout = settings.CATALOGOS_CACHE_TIMEOUT
+        cache.set(clave, (response.content, response['Content-Type']), timeout)
+        indice = _clave_indice(modelo)
+        cache.set(indice, (cache.get(indice) or set()) | {clave}, timeout)
+        return response
+
+
+def calentar_catalogos():
+    """
+    Renderiza y guarda el listado de cada catálogo.
+
+    Se invoca desde el hook post_worker_init de gunicorn (gunicorn.conf.py).
+    """
+    from . import views  # pylint: disable=import-outside-toplevel
+    fabrica = RequestFactory()
+    catalogos = [
+        (views.RolViewSet, 'rol-list'), (views.NivelAccesoViewSet, 'nivelacceso-list'),
+        (views.ZonaViewSet, 'zona-list'), (views.BuqueViewSet, 'buque-list'),
+    ]
+    for viewset, ruta in catalogos:
+        request = fabrica.get(reverse(ruta), HTTP_ACCEPT='application/json')
+        viewset.as_view({'get': 'list'})(request).render()
@@ -0,0 +1,83 @@
+"""
+Estadísticas agregadas del sistema calculadas en SQL.
+
+Los conteos que antes se obtenían descargando tablas completas en el
+navegador se resuelven aquí con una sola consulta agregada (UNION ALL de
+tres GROUP BY), cuyo costo no depende del volumen transferido.
+"""
+from django.db.models import CharField, Count, F, IntegerField, Value
+
+from .cache import CacheLRU
+from .models import ESTADOS_TICKET_ACTIVOS, Usuario, UbicacionSlot, Ticket
+
+# Una sola entrada; se vacía desde core.signals al escribir tickets, usuarios o slots
+estadisticas_dashboard = CacheLRU(max_entradas=1, ttl=5, nombre='estadisticas_dashboard')
+
+
+def _sin_zona(queryset, grupo, clave):
+    """Proyección agrupada de `queryset` por `clave`, sin columnas de zona."""
+    return queryset.order_by().values(
+        grupo=Value(grupo), clave=F(clave),
+        zona_id=Value(None, output_field=IntegerField()),
+        zona=Value(None, output_field=CharField()),
+    ).annotate(total=Count('id'))
+
+
+def calcular_estadisticas_dashboard():
+    """
+    Devuelve los conteos del panel de administración en una única consulta.
+
+    Incluye tickets por estado, usuarios por rol y slots por zona y estado.
+    """
+    slots = UbicacionSlot.objects.order_by().values(
+        grupo=Value('slots'), clave=F('estado'),
+        zona_id=F('id_zona'), zona=F('id_zona__nombre'),
+    ).annotate(total=Count('id'))
+    filas = _sin_zona(Ticket.objects, 'tickets', 'estado').union(
+        _sin_zona(Usuario.objects, 'usuarios', 'id_rol__rol'), slots, all=True
+    )
+
+    tickets_por_estado = {}
+    usuarios_por_rol = {}
+    zonas = {}
+    for fila in filas:
+        if fila['grupo'] == 'tickets':
+            tickets_por_estado[fila['clave']] = fila['total']
+        elif fila['grupo'] == 'usuarios':
+            usuarios_por_rol[fila['clave']] = fila['total']
+        else:
+            zona = zonas.setdefault(fila['zona_id'], {
+                'zona_id': fila['zona_id'], 'zona_nombre': fila['zona'],
+                'por_estado': {}, 'disponibles': 0, 'total': 0,
+            })
+            zona['por_estado'][fila['clave']] = fila['total']
+            zona['total'] += fila['total']
+            if fila['clave'].lower() == 'disponible':
+                zona['disponibles'] += fila['total']
+
+    por_zona = sorted(zonas.values(), key=lambda z: z['zona_id'])
+    return {
+        'tickets': {
+            'por_estado': tickets_por_estado,
+            'activos': sum(tickets_por_estado.get(e, 0) for e in ESTADOS_TICKET_ACTIVOS),
+            'total': sum(tickets_por_estado.values()),
+        },
+        'usuarios': {
+            'por_rol': usuarios_por_rol,
+            'total': sum(usuarios_por_rol.values()),
+        },
+        'slots': {
+            'por_zona': por_zona,
+            'disponibles': sum(z['disponibles'] for z in por_zona),
+            'total': sum(z['total'] for z in por_zona),
+        },
+    }
+
+
+def obtener_estadisticas_dashboard():
+    """Devuelve las estadísticas desde la caché, calculándolas si hace falta."""
+    datos = estadisticas_dashboard.obtener('dashboard')
+    if datos is None:
+        datos = calcular_estadisticas_dashboard()
+        estadisticas_dashboard.guardar('dashboard', datos)
+    return datos
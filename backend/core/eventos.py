@@ -0,0 +1,132 @@
+"""
+Difusión de eventos de estado (tickets y slots) hacia las pantallas conectadas.
+
+Las señales de core.signals publican un evento por cada transición de estado
+y el endpoint SSE (`/api/eventos/`) lo reparte a todos los suscriptores del
+proceso. Así, 50 monitores conectados cuestan un único emisor en lugar de 50
+bucles de sondeo contra la base de datos.
+
+Hay dos brokers:
+- `BrokerMemoria`: reparto dentro del proceso; suficiente con un solo worker
+  ASGI y el que usan las pruebas.
+- `BrokerRedis`: publica en un canal de Redis y mantiene un único oyente por
+  proceso que reenvía al reparto local; necesario con varios workers.
+"""
+import asyncio
+import itertools
+import json
+import threading
+
+from django.conf import settings
+
+CANAL_REDIS = 'enapu:eventos'
+
+
+class Suscripcion:
+    """Cola de eventos de un cliente conectado, ligada a su bucle de eventos."""
+
+    def __init__(self, loop, max_pendientes):
+        self.loop = loop
+        self.cola = asyncio.Queue(maxsize=max_pendientes)
+
+    def entregar(self, evento):
+        """Encola el evento; si el cliente va retrasado, descarta el más antiguo."""
+        if self.cola.full():
+            self.cola.get_nowait()
+        self.cola.put_nowait(evento)
+
+
+class BrokerMemoria:
+    """Reparto de eventos en memoria entre los suscriptores del proceso."""
+
+    def __init__(self, max_pendientes=100):
+        self.max_pendientes = max_pendientes
+        self._suscripciones = set()
+        self._lock = threading.Lock()
+        self._secuencia = itertools.count(1)
+
+    def suscribir(self):
+        """Registra un suscriptor en el bucle de eventos actual."""
+        suscripcion = Suscripcion(asyncio.get_running_loop(), self.max_pendientes)
+        with self._lock:
+            self._suscripciones.add(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion):
+        """Da de baja a un suscriptor (cliente desconectado)."""
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+
+    def publicar(self, evento):
+        """Entrega el evento a todos los suscriptores; se puede llamar desde cualquier hilo."""
+        self._repartir(dict(evento, id=next(self._secuencia)))
+
+    def _repartir(self, evento):
+        with self._lock:
+            suscripciones = list(self._suscripciones)
+        for suscripcion in suscripciones:
+            if suscripcion.loop.is_closed():
+                self.cancelar(suscripcion)
+                continue
+            suscripcion.loop.call_soon_threadsafe(suscripcion.entregar, evento)
+
+    @property
+    def suscriptores(self):
+        """Número de clientes conectados a este proceso."""
+        return len(self._suscripciones)
+
+
+class BrokerRedis(BrokerMemoria):
+    """
+    Broker que publica en Redis y reparte localmente con un único oyente.
+
+    El hilo oyente se arranca con el primer suscriptor del proceso.
+    """
+
+    def __init__(self, url, max_pendientes=100, cliente=None):
+        super().__init__(max_pendientes)
+        if cliente is None:
+            import redis  # pylint: disable=import-outside-toplevel
+            cliente = redis.Redis.from_url(url)
+        self._redis = cliente
+        self._oyente = None
+
+    def suscribir(self):
+        self._iniciar_oyente()
+        return super().suscribir()
+
+    def publicar(self, evento):
+        self._redis.publish(CANAL_REDIS, json.dumps(evento, default=str))
+
+    def _iniciar_oyente(self):
+        with self._lock:
+            if self._oyente is not None:
+                return
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{CANAL_REDIS: self._recibir})
+            self._oyente = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def _recibir(self, mensaje):
+        BrokerMemoria.publicar(self, json.loads(mensaje['data']))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def obtener_broker():
+    """Devuelve el broker del proceso según `EVENTOS_BROKER` ('memoria' o 'redis')."""
+    global _broker  # pylint: disable=global-statement
+    with _broker_lock:
+        if _broker is None:
+            if getattr(settings, 'EVENTOS_BROKER', 'memoria') == 'redis':
+                _broker = BrokerRedis(settings.EVENTOS_REDIS_URL)
+            else:
+                _broker = BrokerMemoria()
+        return _broker
+
+
+def formatear_sse(evento):
+    """Serializa un evento en el formato de texto de Server-Sent Events."""
+    datos = json.dumps(evento, default=str)
+    return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {datos}\n\n"
@@ -0,0 +1,142 @@
+"""
+Exportación en streaming (CSV / NDJSON) de los listados de la API.
+
+`ExportacionMixin` añade a un ViewSet la acción `exportar`, que aplica los
+mismos filtros que el listado y envía las filas con StreamingHttpResponse a
+medida que las lee de la base de datos por bloques (`QuerySet.iterator`).
+Exportar un año de tickets ocupa así memoria constante y el cliente empieza
+a recibir bytes en cuanto se lee el primer bloque.
+
+Bajo ASGI (el despliegue con gunicorn y workers de uvicorn) el generador se
+recorre fragmento a fragmento con `sync_to_async`: Django consumiría un
+iterador síncrono entero con `list()` antes de enviar el primer byte.
+"""
+import csv
+import io
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+# Filas leídas por viaje a la base de datos y por fragmento enviado
+TAMANO_BLOQUE = 2000
+FORMATOS_EXPORTACION = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def _aplanar(fila, prefijo=''):
+    """Convierte los objetos anidados en columnas `padre.hijo` para el CSV."""
+    plana = {}
+    for clave, valor in fila.items():
+        if isinstance(valor, dict):
+            plana.update(_aplanar(valor, f'{prefijo}{clave}.'))
+        else:
+            plana[f'{prefijo}{clave}'] = valor
+    return plana
+
+
+def columnas_csv(serializador, prefijo=''):
+    """
+    Columnas del CSV según los campos declarados del serializador.
+
+    Los serializadores anidados se expanden a sus campos y los
+    SerializerMethodField que devuelven un objeto, a las claves fijas que
+    declara `campos_anidados` en el serializador. Así la cabecera no depende
+    de que la primera fila tenga sus objetos anidados a None.
+    """
+    anidados = getattr(serializador, 'campos_anidados', {})
+    columnas = []
+    for nombre, campo in serializador.fields.items():
+        if campo.write_only:
+            continue
+        if isinstance(campo, serializers.Serializer):
+            columnas.extend(columnas_csv(campo, f'{prefijo}{nombre}.'))
+        elif nombre in anidados:
+            columnas.extend(f'{prefijo}{nombre}.{clave}' for clave in anidados[nombre])
+        else:
+            columnas.append(f'{prefijo}{nombre}')
+    return columnas
+
+
+def _filas_csv(filas, columnas):
+    """Genera fragmentos CSV con las `columnas` dadas; sin filas no envía nada."""
+    buffer = io.StringIO()
+    escritor = None
+    for indice, fila in enumerate(filas, start=1):
+        fila = _aplanar(fila)
+        if escritor is None:
+            escritor = csv.DictWriter(buffer, fieldnames=columnas, extrasaction='ignore')
+            escritor.writeheader()
+        escritor.writerow(fila)
+        if indice % TAMANO_BLOQUE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _filas_ndjson(filas):
+    """Genera fragmentos NDJSON (un objeto JSON por línea)."""
+    lineas = []
+    for fila in filas:
+        lineas.append(json.dumps(fila, ensure_ascii=False, default=str))
+        if len(lineas) == TAMANO_BLOQUE:
+            yield '\n'.join(lineas) + '\n'
+            lineas = []
+    if lineas:
+        yield '\n'.join(lineas) + '\n'
+
+
+async def _iterar_async(generador):
+    """Entrega los fragmentos de `generador` sin sacarlo del hilo síncrono de la petición."""
+    siguiente = sync_to_async(next)
+    try:
+        while (fragmento := await siguiente(generador, None)) is not None:
+            yield fragmento
+    finally:
+        # Cierra el cursor de QuerySet.iterator si el cliente corta la descarga
+        await sync_to_async(generador.close)()
+
+
+class ExportacionMixin:
+    """Acción `exportar` (`?formato=csv|ndjson`) con los filtros del listado."""
+
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """
+        Exporta en streaming las filas filtradas, ordenadas por id.
+
+        Admite los mismos parámetros de filtro que el listado; el formato se
+        elige con `?formato=` (csv por defecto).
+        """
+        formato = request.query_params.get('formato', 'csv')
+        if formato not in FORMATOS_EXPORTACION:
+            return Response(
+                {'error': f"Formato no soportado: {formato}. Use csv o ndjson"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.filter_queryset(self.get_queryset()).order_by('pk')
+        serializador = self.get_serializer()
+        filas = (
+            serializador.to_representation(objeto)
+            for objeto in queryset.iterator(chunk_size=TAMANO_BLOQUE)
+        )
+        if formato == 'csv':
+            generador = _filas_csv(filas, columnas_csv(serializador))
+        else:
+            generador = _filas_ndjson(filas)
+
+        if isinstance(request._request, ASGIRequest):  # pylint: disable=protected-access
+            generador = _iterar_async(generador)
+        respuesta = StreamingHttpResponse(generador, content_type=FORMATOS_EXPORTACION[formato])
+        nombre = getattr(self, 'basename', None) or 'exportacion'
+        respuesta['Content-Disposition'] = f'attachment; filename="{nombre}.{formato}"'
+        return respuesta
@@ -0,0 +1,106 @@
+"""
+FilterSets de django-filter para los ViewSets de la aplicación 'core'.
+
+Cada filtro se declara sobre una columna con índice en la base de datos
+(clave primaria, clave foránea, `unique` o `db_index`), de manera que filtrar
+en el servidor cueste un recorrido de índice y no la descarga de toda la tabla.
+Los catálogos pequeños (Rol, NivelAcceso, Zona, Buque) no necesitan filtros.
+"""
+import django_filters
+
+from .models import (
+    Usuario, UbicacionSlot, CitaRecojo, Contenedor, Ticket, Factura, Pago
+)
+
+
+class UsuarioFilter(django_filters.FilterSet):
+    """Filtros de usuarios por rol (id o nombre) y estado de actividad."""
+    rol = django_filters.CharFilter(field_name='id_rol__rol')
+
+    class Meta:
+        """Clase Meta para UsuarioFilter."""
+        model = Usuario
+        fields = ['id_rol', 'id_nivel_acceso', 'activo', 'email']
+
+
+class UbicacionSlotFilter(django_filters.FilterSet):
+    """Filtros de slots por zona y estado de ocupación."""
+    class Meta:
+        """Clase Meta para UbicacionSlotFilter."""
+        model = UbicacionSlot
+        fields = {
+            'id_zona': ['exact'],
+            'estado': ['exact', 'in'],
+        }
+
+
+class CitaRecojoFilter(django_filters.FilterSet):
+    """Filtros de citas por cliente, estado y rango de fecha de recojo."""
+    recojo_desde = django_filters.DateFilter(field_name='fecha_recojo', lookup_expr='gte')
+    recojo_hasta = django_filters.DateFilter(field_name='fecha_recojo', lookup_expr='lte')
+
+    class Meta:
+        """Clase Meta para CitaRecojoFilter."""
+        model = CitaRecojo
+        fields = {
+            'id_cliente': ['exact'],
+            'estado': ['exact', 'in'],
+        }
+
+
+class ContenedorFilter(django_filters.FilterSet):
+    """Filtros de contenedores por buque, cita, cliente de la cita y códigos."""
+    id_cliente = django_filters.NumberFilter(field_name='id_cita_recojo__id_cliente')
+
+    class Meta:
+        """Clase Meta para ContenedorFilter."""
+        model = Contenedor
+        fields = ['id_buque', 'id_cita_recojo', 'codigo_barras', 'numero_contenedor']
+
+
+class TicketFilter(django_filters.FilterSet):
+    """Filtros de tickets por estado, usuario, zona, buque, cita y fecha de entrada."""
+    zona = django_filters.NumberFilter(field_name='id_ubicacion__id_zona')
+    buque = django_filters.NumberFilter(field_name='id_contenedor__id_buque')
+    cita = django_filters.NumberFilter(field_name='id_contenedor__id_cita_recojo')
+    entrada_desde = django_filters.IsoDateTimeFilter(
+        field_name='fecha_hora_entrada', lookup_expr='gte'
+    )
+    entrada_hasta = django_filters.IsoDateTimeFilter(
+        field_name='fecha_hora_entrada', lookup_expr='lte'
+    )
+
+    class Meta:
+        """Clase Meta para TicketFilter."""
+        model = Ticket
+        fields = {
+            'estado': ['exact', 'in'],
+            'id_usuario': ['exact'],
+            'id_ubicacion': ['exact'],
+            'id_contenedor': ['exact'],
+        }
+
+
+class FacturaFilter(django_filters.FilterSet):
+    """Filtros de facturas por ticket, estado y rango de fecha de emisión."""
+    emision_desde = django_filters.DateFilter(field_name='fecha_emision', lookup_expr='gte')
+    emision_hasta = django_filters.DateFilter(field_name='fecha_emision', lookup_expr='lte')
+
+    class Meta:
+        """Clase Meta para FacturaFilter."""
+        model = Factura
+        fields = {
+            'id_ticket': ['exact'],
+            'estado': ['exact', 'in'],
+        }
+
+
+class PagoFilter(django_filters.FilterSet):
+    """Filtros de pagos por factura y rango de fecha de pago."""
+    pago_desde = django_filters.DateFilter(field_name='fecha_pago', lookup_expr='gte')
+    pago_hasta = django_filters.DateFilter(field_name='fecha_pago', lookup_expr='lte')
+
+    class Meta:
+        """Clase Meta para PagoFilter."""
+        model = Pago
+        fields = ['id_factura']
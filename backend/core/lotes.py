@@ -0,0 +1,415 @@
+"""
+Escrituras por lotes (alta, modificación y cambio de estado) para los ViewSets.
+
+Acciones que reciben una lista de elementos:
+- `LoteMixin`:
+  - `POST   <recurso>/lote/`: alta con `bulk_create`.
+  - `PATCH  <recurso>/lote/`: modificación parcial con `bulk_update` (cada
+    elemento lleva su `id`). No admite `estado`: las transiciones tienen sus
+    propias reglas y eventos y van por `cambiar-estado-lote`.
+- `CambioEstadoLoteMixin`, solo para los modelos con `estado` (Ticket y
+  UbicacionSlot):
+  - `PATCH  <recurso>/cambiar-estado-lote/`: muchas transiciones de estado
+    (`[{id, estado}]`) en un único UPDATE.
+
+La validación es por conjuntos: las claves foráneas de todo el lote se
+resuelven con una consulta por modelo relacionado y la unicidad (p. ej.
+`Contenedor.codigo_barras`) con una única consulta, en lugar de una por fila.
+Los elementos inválidos no se escriben y se informan con su índice.
+
+Estas escrituras no pasan por save(), así que no disparan las señales de
+core.signals: `notificar_escritura_masiva` hace su trabajo tras el commit y
+`seguimiento_lote` permite envolver cada escritura (p. ej. para mantener
+core.resumenes).
+"""
+from collections import defaultdict
+from functools import lru_cache
+
+from django.db import transaction
+from django.db.models import Case, CharField, F, Q, Value, When
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
+
+from .asignacion import slots_libres
+from .cache import busqueda_contenedores
+from .estadisticas import estadisticas_dashboard
+from .eventos import obtener_broker
+from .models import UbicacionSlot
+from .versiones import incrementar_version
+
+# Máximo de elementos por petición y filas por sentencia INSERT/UPDATE
+MAX_ELEMENTOS_LOTE = 10000
+TAMANO_LOTE = 1000
+
+
+class RelacionPrecargada(serializers.PrimaryKeyRelatedField):
+    """
+    Clave foránea que se resuelve contra las filas precargadas del lote
+    (`context['relaciones_precargadas'][campo]`) en lugar de con un get() por fila.
+    """
+
+    def to_internal_value(self, data):
+        precargadas = self.context.get('relaciones_precargadas')
+        if precargadas is None:
+            return super().to_internal_value(data)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        objeto = precargadas.get(self.field_name, {}).get(pk)
+        if objeto is None:
+            self.fail('does_not_exist', pk_value=data)
+        return objeto
+
+
+@lru_cache(maxsize=None)
+def serializador_lote(clase):
+    """
+    Variante de `clase` para validar lotes: claves foráneas precargadas y sin
+    validadores de unicidad por fila (se comprueban por conjuntos).
+    """
+    class SerializadorLote(clase):
+        """`clase` con claves foráneas precargadas y sin unicidad por fila."""
+        serializer_related_field = RelacionPrecargada
+
+        def build_standard_field(self, field_name, model_field):
+            """Campo estándar sin UniqueValidator: la unicidad se valida por conjuntos."""
+            field_class, kwargs = super().build_standard_field(field_name, model_field)
+            kwargs['validators'] = [
+                v for v in kwargs.get('validators', []) if not isinstance(v, UniqueValidator)
+            ]
+            return field_class, kwargs
+
+        def get_validators(self):
+            """Sin validadores de unicidad entre campos (UniqueTogether) por fila."""
+            return []
+
+    SerializadorLote.__name__ = f'{clase.__name__}Lote'
+    return SerializadorLote
+
+
+def _precargar_relaciones(serializador, elementos):
+    """Resuelve las claves foráneas de todo el lote con una consulta por campo."""
+    precargadas = {}
+    for nombre, campo in serializador.fields.items():
+        if not isinstance(campo, RelacionPrecargada) or campo.read_only:
+            continue
+        ids = set()
+        for elemento in elementos:
+            try:
+                ids.add(int(elemento.get(nombre)))
+            except (AttributeError, TypeError, ValueError):
+                continue
+        precargadas[nombre] = campo.get_queryset().in_bulk(ids) if ids else {}
+    return precargadas
+
+
+def _campos_unicos(modelo):
+    """Campos con unique=True de `modelo`, sin la clave primaria."""
+    return [
+        campo.name for campo in modelo._meta.concrete_fields
+        if campo.unique and not campo.primary_key
+    ]
+
+
+def _validar_unicidad(modelo, validos):
+    """
+    Comprueba la unicidad de los elementos válidos con una sola consulta.
+
+    `validos` es una lista de (indice, datos, pk); devuelve los que pasan y
+    los errores de los que chocan con una fila existente o con otro del lote.
+    """
+    campos = [c for c in _campos_unicos(modelo) if any(c in d for _, d, _ in validos)]
+    if not campos:
+        return validos, []
+
+    filtro = Q()
+    for campo in campos:
+        valores = {d[campo] for _, d, _ in validos if d.get(campo) is not None}
+        if valores:
+            filtro |= Q(**{f'{campo}__in': valores})
+    existentes = {campo: {} for campo in campos}
+    if filtro:
+        for fila in modelo.objects.filter(filtro).values('pk', *campos):
+            for campo in campos:
+                existentes[campo][fila[campo]] = fila['pk']
+
+    vistos = {campo: {} for campo in campos}
+    aceptados, errores = [], []
+    for indice, datos, pk in validos:
+        conflictos = {}
+        for campo in campos:
+            valor = datos.get(campo)
+            if valor is None:
+                continue
+            duenio = existentes[campo].get(valor)
+            ajeno = duenio is not None and duenio != pk
+            if ajeno or vistos[campo].setdefault(valor, indice) != indice:
+                conflictos[campo] = [f'Ya existe un registro con este {campo}.']
+        if conflictos:
+            errores.append({'indice': indice, 'errores': conflictos})
+        else:
+            aceptados.append((indice, datos, pk))
+    return aceptados, errores
+
+
+def notificar_escritura_masiva(modelo, eventos=()):
+    """
+    Tras el commit, hace lo que las señales harían fila a fila: versión de la
+    tabla, cachés derivadas y eventos de transición de estado.
+    """
+    def notificar():
+        incrementar_version(modelo)
+        estadisticas_dashboard.limpiar()
+        busqueda_contenedores.limpiar()
+        if modelo is UbicacionSlot:
+            slots_libres.descartar()
+        broker = obtener_broker() if eventos else None
+        for evento in eventos:
+            broker.publicar(evento)
+    transaction.on_commit(notificar)
+
+
+class SeguimientoLote:
+    """
+    Contexto que envuelve una escritura masiva sobre las filas `ids`.
+
+    No hace nada; las subclases lo usan para reaccionar a la escritura dentro
+    de su transacción.
+    """
+
+    def __init__(self, ids=()):
+        self.ids = list(ids)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        return False
+
+
+class EscrituraLoteBase:
+    """
+    Lectura de la lista de elementos y respuesta comunes a las acciones por lotes.
+
+    `seguimiento_lote` es la clase de contexto (SeguimientoLote) que envuelve
+    cada escritura.
+    """
+    seguimiento_lote = SeguimientoLote
+
+    def _elementos_lote(self, request):
+        """Devuelve la lista de elementos o una respuesta de error."""
+        elementos = request.data
+        if not isinstance(elementos, list) or not elementos:
+            return None, Response(
+                {'error': 'Se esperaba una lista no vacía de elementos'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(elementos) > MAX_ELEMENTOS_LOTE:
+            return None, Response(
+                {'error': f'El lote no puede superar {MAX_ELEMENTOS_LOTE} elementos'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return elementos, None
+
+    @staticmethod
+    def _respuesta_lote(clave, ids, errores, codigo_exito):
+        """Totales, ids escritos y errores por índice; 400 si no se escribió nada."""
+        errores.sort(key=lambda error: error['indice'])
+        return Response(
+            {clave: len(ids), 'ids': ids, 'errores': errores},
+            status=codigo_exito if ids else status.HTTP_400_BAD_REQUEST
+        )
+
+
+class LoteMixin(EscrituraLoteBase):
+    """Alta y modificación por lotes para un ModelViewSet."""
+
+    def _validar_lote(self, elementos, parcial):
+        """Valida el lote completo; devuelve (validos, errores) con validos=(indice, datos, pk)."""
+        contexto = self.get_serializer_context()
+        serializador = serializador_lote(self.get_serializer_class())(
+            context=contexto, partial=parcial
+        )
+        contexto['relaciones_precargadas'] = _precargar_relaciones(serializador, elementos)
+
+        validos, errores = [], []
+        for indice, elemento in enumerate(elementos):
+            pk = None
+            if parcial:
+                try:
+                    pk = int(elemento.get('id'))
+                except (AttributeError, TypeError, ValueError):
+                    errores.append({'indice': indice, 'errores': {'id': ['Id no válido.']}})
+                    continue
+                if 'estado' in elemento:
+                    errores.append({'indice': indice, 'errores': {'estado': [
+                        'El estado se cambia con cambiar-estado-lote.'
+                    ]}})
+                    continue
+            try:
+                validos.append((indice, serializador.run_validation(elemento), pk))
+            except serializers.ValidationError as error:
+                errores.append({'indice': indice, 'errores': error.detail})
+
+        validos, conflictos = _validar_unicidad(self.get_queryset().model, validos)
+        return validos, errores + conflictos
+
+    @action(detail=False, methods=['post', 'patch'])
+    def lote(self, request):
+        """
+        Alta (POST) o modificación parcial (PATCH) de una lista de elementos.
+
+        Responde con los ids escritos y los errores de cada elemento rechazado.
+        """
+        elementos, error = self._elementos_lote(request)
+        if error:
+            return error
+        if request.method == 'POST':
+            return self._crear_lote(elementos)
+        return self._actualizar_lote(elementos)
+
+    def _crear_lote(self, elementos):
+        """Inserta los elementos válidos con bulk_create en una transacción."""
+        modelo = self.get_queryset().model
+        validos, errores = self._validar_lote(elementos, parcial=False)
+        with transaction.atomic(), self.seguimiento_lote() as seguimiento:
+            creados = modelo.objects.bulk_create(
+                [modelo(**datos) for _, datos, _ in validos], batch_size=TAMANO_LOTE
+            )
+            seguimiento.ids = [objeto.pk for objeto in creados]
+            if creados:
+                notificar_escritura_masiva(modelo)
+        return self._respuesta_lote(
+            'creados', [objeto.pk for objeto in creados], errores, status.HTTP_201_CREATED
+        )
+
+    def _actualizar_lote(self, elementos):
+        """Actualiza los elementos válidos con un bulk_update por grupo de campos."""
+        modelo = self.get_queryset().model
+        validos, errores = self._validar_lote(elementos, parcial=True)
+        existentes = set(modelo.objects.filter(
+            pk__in=[pk for _, _, pk in validos]
+        ).values_list('pk', flat=True))
+
+        # Se agrupan por campos modificados para no sobrescribir los demás
+        grupos = defaultdict(list)
+        ahora = timezone.now()
+        con_fecha = any(c.name == 'fecha_modificacion' for c in modelo._meta.concrete_fields)
+        for indice, datos, pk in validos:
+            if pk not in existentes:
+                errores.append({'indice': indice, 'errores': {'id': [f'No existe el id {pk}.']}})
+                continue
+            if con_fecha:
+                datos['fecha_modificacion'] = ahora
+            objeto = modelo(pk=pk)
+            for campo, valor in datos.items():
+                setattr(objeto, campo, valor)
+            grupos[tuple(sorted(datos))].append(objeto)
+
+        ids = sorted(o.pk for objetos in grupos.values() for o in objetos)
+        with transaction.atomic(), self.seguimiento_lote(ids):
+            for campos, objetos in grupos.items():
+                if campos:
+                    modelo.objects.bulk_update(objetos, campos, batch_size=TAMANO_LOTE)
+            if grupos:
+                notificar_escritura_masiva(modelo)
+        return self._respuesta_lote('actualizados', ids, errores, status.HTTP_200_OK)
+
+
+class CambioEstadoLoteMixin(EscrituraLoteBase):
+    """
+    Transiciones de estado por lotes para un ModelViewSet cuyo modelo tiene `estado`.
+
+    `tipo_evento` y `campos_evento` describen los eventos que se publican en
+    cada transición de estado (los mismos que publica core.signals).
+    """
+    tipo_evento = None
+    campos_evento = ()
+
+    def campos_transicion(self, estado, ahora):  # pylint: disable=unused-argument
+        """Campos adicionales que se fijan al pasar a `estado`."""
+        return {}
+
+    @action(detail=False, methods=['patch'], url_path='cambiar-estado-lote')
+    def cambiar_estado_lote(self, request):
+        """
+        Aplica una lista de transiciones `[{id, estado}]` con un único UPDATE.
+        """
+        elementos, error = self._elementos_lote(request)
+        if error:
+            return error
+        modelo = self.get_queryset().model
+
+        pedidos, errores = {}, []
+        for indice, elemento in enumerate(elementos):
+            try:
+                pk, estado = int(elemento['id']), elemento['estado']
+            except (KeyError, TypeError, ValueError):
+                errores.append({'indice': indice, 'errores': {
+                    'non_field_errors': ['Cada elemento necesita un id y un estado.']
+                }})
+                continue
+            if not isinstance(estado, str) or not estado:
+                errores.append({'indice': indice, 'errores': {'estado': ['Estado no válido.']}})
+                continue
+            pedidos[pk] = (indice, estado)
+
+        campos = ('pk', 'estado') + tuple(f'{c}_id' for c in self.campos_evento)
+        actuales = {
+            fila['pk']: fila
+            for fila in modelo.objects.filter(pk__in=list(pedidos)).values(*campos)
+        }
+        por_estado = defaultdict(list)
+        for pk, (indice, estado) in pedidos.items():
+            if pk not in actuales:
+                errores.append({'indice': indice, 'errores': {'id': [f'No existe el id {pk}.']}})
+                continue
+            por_estado[estado].append(pk)
+
+        ahora = timezone.now()
+        ids = sorted(pk for pks in por_estado.values() for pk in pks)
+        with transaction.atomic(), self.seguimiento_lote(ids):
+            if ids:
+                modelo.objects.filter(pk__in=ids).update(
+                    **self._asignaciones_transicion(modelo, por_estado, ahora)
+                )
+                notificar_escritura_masiva(modelo, self._eventos_transicion(por_estado, actuales))
+        return self._respuesta_lote('actualizados', ids, errores, status.HTTP_200_OK)
+
+    def _asignaciones_transicion(self, modelo, por_estado, ahora):
+        """Expresiones CASE del UPDATE: el nuevo estado y los campos que implica."""
+        asignaciones = {'estado': Case(
+            *[When(pk__in=pks, then=Value(estado)) for estado, pks in por_estado.items()],
+            output_field=CharField()
+        )}
+        extras = defaultdict(list)
+        for estado, pks in por_estado.items():
+            for campo, valor in self.campos_transicion(estado, ahora).items():
+                extras[campo].append(When(pk__in=pks, then=Value(valor)))
+        for campo, casos in extras.items():
+            asignaciones[campo] = Case(
+                *casos, default=F(campo), output_field=modelo._meta.get_field(campo)
+            )
+        if any(c.name == 'fecha_modificacion' for c in modelo._meta.concrete_fields):
+            asignaciones['fecha_modificacion'] = ahora
+        return asignaciones
+
+    def _eventos_transicion(self, por_estado, actuales):
+        """Eventos de las filas que realmente cambiaron de estado."""
+        if self.tipo_evento is None:
+            return []
+        eventos = []
+        for estado, pks in por_estado.items():
+            for pk in pks:
+                fila = actuales[pk]
+                if fila['estado'] == estado:
+                    continue
+                evento = {'tipo': self.tipo_evento, 'id_fila': pk,
+                          'estado': estado, 'estado_anterior': fila['estado']}
+                evento.update({c: fila[f'{c}_id'] for c in self.campos_evento})
+                eventos.append(evento)
+        return eventos
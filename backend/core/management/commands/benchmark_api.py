@@ -0,0 +1,239 @@
+"""
+Comando de gestión con micro-benchmarks de serializadores, consultas y acciones.
+
+Mide, sobre un conjunto de datos sintético del tamaño pedido (core.sinteticos):
+- el renderizado a JSON de N filas con TicketSerializer, ContenedorSerializer
+  y UsuarioSerializer (las filas se leen antes de cronometrar);
+- las acciones by_estado, by_usuario y by_role, una página completa;
+- el login y cambiar_estado, de extremo a extremo por el cliente de pruebas.
+
+Cada caso registra percentiles de latencia (p50/p95/p99), número de
+consultas y memoria pico. Con `--base` los resultados se comparan con una
+línea base en JSON y las regresiones se muestran como diferencias; si el
+archivo no existe (o con `--actualizar-base`) se guarda como nueva base.
+
+Los datos sintéticos solo se generan sobre una base vacía; con datos previos
+hay que pasar `--reusar`. Una línea base medida con otro motor, otro volumen
+de datos u otras filas / page_size no se compara: el comando se detiene.
+
+Debe ejecutarse contra una base de datos desechable, por ejemplo:
+    DATABASE_URL=postgres://.../enapu_bench python manage.py benchmark_api \\
+        --contenedores 500000 --base benchmarks/api.json
+"""
+import itertools
+import json
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from core.medicion import comparar_con_base, medir
+from core.models import Contenedor, Ticket, Usuario
+from core.serializers import ContenedorSerializer, TicketSerializer, UsuarioSerializer
+from core.sinteticos import OPCIONES_POR_DEFECTO, generar_datos
+from core.views import ContenedorViewSet, TicketViewSet, UsuarioViewSet
+
+PASSWORD = 'benchmark-api'
+# Estados entre los que alterna el ticket de cambiar_estado
+ESTADOS_ALTERNOS = ('Validado', 'En Proceso')
+# Metadatos que deben coincidir con los de la línea base para poder compararla
+METADATOS_COMPARABLES = ('motor', 'tickets', 'contenedores', 'filas', 'page_size')
+
+
+def _comprobar(respuesta):
+    if respuesta.status_code != 200:
+        raise CommandError(f'{respuesta.request["PATH_INFO"]} respondió {respuesta.status_code}')
+
+
+def _renderizar(serializer_class, filas):
+    """Serializa y renderiza a JSON `filas` (ya leídas de la base)."""
+    return lambda: JSONRenderer().render(serializer_class(filas, many=True).data)
+
+
+class Command(BaseCommand):
+    """
+    Micro-benchmarks de la API con línea base para detectar regresiones.
+    """
+    help = 'Mide serializadores, acciones de listado, login y cambiar_estado frente a una base'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contenedores', type=int, default=20_000,
+                            help='Tamaño del conjunto de datos sintético (contenedores)')
+        parser.add_argument('--semilla', type=int, default=OPCIONES_POR_DEFECTO['semilla'])
+        parser.add_argument('--reusar', action='store_true',
+                            help='No generar datos: usar los que ya existen en la base')
+        parser.add_argument('--password', default=PASSWORD,
+                            help='Contraseña de los usuarios (la de los datos generados)')
+        parser.add_argument('--filas', type=int, default=1000,
+                            help='Filas que se renderizan en los casos de serializador')
+        parser.add_argument('--page-size', type=int, default=50,
+                            help='Tamaño de página de las acciones de listado')
+        parser.add_argument('--repeticiones', type=int, default=30)
+        parser.add_argument('--repeticiones-login', type=int, default=10,
+                            help='Repeticiones del login (el hash de contraseña es lento)')
+        parser.add_argument('--base', help='Archivo JSON de línea base con el que comparar')
+        parser.add_argument('--actualizar-base', action='store_true',
+                            help='Guardar los resultados como nueva línea base')
+        parser.add_argument('--tolerancia', type=float, default=0.2,
+                            help='Empeoramiento relativo admitido en latencia y memoria')
+        parser.add_argument('--estricto', action='store_true',
+                            help='Terminar con error si hay alguna regresión')
+        parser.add_argument('--salida', help='Ruta de un archivo JSON con los resultados')
+
+    def handle(self, *args, **options):
+        if not options['reusar']:
+            if Ticket.objects.exists():
+                raise CommandError(
+                    'La base ya tiene datos: use --reusar o una base vacía '
+                    '(generar de nuevo añadiría filas y cambiaría el volumen medido)'
+                )
+            generar_datos({
+                'semilla': options['semilla'], 'contenedores': options['contenedores'],
+                'password': options['password'],
+            }, procesos=min(4, os.cpu_count() or 1))
+        if not Ticket.objects.exists():
+            raise CommandError('No hay datos: ejecute sin --reusar o genere datos antes')
+        metadatos = {
+            'fecha': timezone.now().isoformat(),
+            'motor': connection.vendor,
+            'tickets': Ticket.objects.count(),
+            'contenedores': Contenedor.objects.count(),
+            'usuarios': Usuario.objects.count(),
+            'filas': options['filas'],
+            'page_size': options['page_size'],
+        }
+        base = self._leer_base(options, metadatos)
+
+        cache.clear()
+        # El cliente de pruebas se presenta como 'testserver'
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            casos = self._medir_casos(options)
+
+        resultados = {'metadatos': metadatos, 'casos': casos}
+        for nombre, medicion in casos.items():
+            self.stdout.write(
+                f"  {nombre}: p50 {medicion['p50_ms']:.2f} ms, p95 {medicion['p95_ms']:.2f} ms, "
+                f"p99 {medicion['p99_ms']:.2f} ms, {medicion['consultas']} consultas, "
+                f"{medicion['memoria_pico_kb']:.0f} KB"
+            )
+
+        regresiones = self._comparar(resultados, base, options)
+        if options['salida']:
+            self._guardar(options['salida'], resultados)
+        if regresiones and options['estricto']:
+            raise CommandError(f'{regresiones} métricas empeoran respecto de la línea base')
+
+    def _medir_casos(self, options):
+        """Prepara los parámetros de cada caso y lo mide."""
+        repeticiones, filas, pagina = (
+            options['repeticiones'], options['filas'], options['page_size']
+        )
+        cliente = Client()
+        usuario_id = Ticket.objects.values('id_usuario').annotate(
+            n=Count('id')).order_by('-n').values_list('id_usuario', flat=True).first()
+        email = Usuario.objects.filter(
+            activo=True, id_rol__rol='OPERARIO').values_list('email', flat=True).first()
+        ticket_id = Ticket.objects.filter(estado__in=ESTADOS_ALTERNOS).values_list(
+            'id', flat=True).first() or Ticket.objects.values_list('id', flat=True).first()
+        alterno = itertools.cycle(ESTADOS_ALTERNOS)
+
+        def get(url, **params):
+            def peticion():
+                _comprobar(cliente.get(url, {'page_size': pagina, **params}))
+            return peticion
+
+        def login():
+            _comprobar(cliente.post(reverse('usuario-login'),
+                                    {'email': email, 'password': options['password']},
+                                    content_type='application/json'))
+
+        def cambiar_estado():
+            _comprobar(cliente.patch(
+                reverse('ticket-cambiar-estado', args=[ticket_id]),
+                {'estado': next(alterno)}, content_type='application/json'
+            ))
+
+        casos = {
+            'serializar_tickets': (_renderizar(
+                TicketSerializer, list(TicketViewSet.queryset.order_by('-id')[:filas])),
+                repeticiones),
+            'serializar_contenedores': (_renderizar(
+                ContenedorSerializer, list(ContenedorViewSet.queryset.order_by('-id')[:filas])),
+                repeticiones),
+            'serializar_usuarios': (_renderizar(
+                UsuarioSerializer, list(UsuarioViewSet.queryset.order_by('id')[:filas])),
+                repeticiones),
+            'tickets_by_estado': (get(reverse('ticket-by-estado'), estado='Completado'),
+                                  repeticiones),
+            'tickets_by_usuario': (get(reverse('ticket-by-usuario'), usuario_id=usuario_id),
+                                   repeticiones),
+            'usuarios_by_role': (get(reverse('usuario-by-role'), role='CLIENTE'), repeticiones),
+            'login': (login, options['repeticiones_login']),
+            'cambiar_estado': (cambiar_estado, repeticiones),
+        }
+        resultados = {}
+        for nombre, (funcion, veces) in casos.items():
+            self.stdout.write(f'  midiendo {nombre}...', ending='\r')
+            resultados[nombre] = medir(funcion, veces)
+        return resultados
+
+    @staticmethod
+    def _leer_base(options, metadatos):
+        """
+        Línea base con la que comparar, o None si se va a crear.
+
+        Antes de medir comprueba que se midió en las mismas condiciones.
+        """
+        ruta = options['base']
+        if not ruta or options['actualizar_base'] or not os.path.exists(ruta):
+            return None
+        with open(ruta, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        distintos = [
+            f"{clave}: {base.get('metadatos', {}).get(clave)} en la base, {metadatos[clave]} ahora"
+            for clave in METADATOS_COMPARABLES
+            if base.get('metadatos', {}).get(clave) != metadatos[clave]
+        ]
+        if distintos:
+            raise CommandError(
+                f'La línea base {ruta} no es comparable ({"; ".join(distintos)}). '
+                'Use los mismos datos y opciones o --actualizar-base'
+            )
+        return base
+
+    def _comparar(self, resultados, base, options):
+        """Compara con la línea base (o la crea) y devuelve el número de regresiones."""
+        ruta = options['base']
+        if not ruta:
+            return 0
+        if base is None:
+            self._guardar(ruta, resultados)
+            return 0
+        diferencias = comparar_con_base(resultados['casos'], base.get('casos', {}),
+                                        options['tolerancia'])
+        resultados['comparacion'] = {'base': ruta, 'diferencias': diferencias}
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\nComparación con {ruta}'))
+        for diferencia in diferencias:
+            linea = (f"  {diferencia['caso']}.{diferencia['metrica']}: "
+                     f"{diferencia['base']:.2f} -> {diferencia['actual']:.2f} "
+                     f"({diferencia['variacion']:+.1%})")
+            self.stdout.write(self.style.ERROR(linea) if diferencia['regresion'] else linea)
+        regresiones = sum(diferencia['regresion'] for diferencia in diferencias)
+        if regresiones:
+            self.stdout.write(self.style.WARNING(f'{regresiones} métricas empeoran'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Sin regresiones respecto de la línea base'))
+        return regresiones
+
+    def _guardar(self, ruta, resultados):
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f'Resultados guardados en {ruta}'))
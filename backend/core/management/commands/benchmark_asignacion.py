@@ -0,0 +1,121 @@
+"""
+Comando de gestión que mide la asignación concurrente de slots.
+
+Crea una zona con una rejilla de slots libres y lanza muchos hilos que
+asignan a la vez con core.asignacion.asignar_slot. Informa del rendimiento,
+de la latencia por asignación y comprueba que ningún slot se entregó dos
+veces. Con `--sin-mapa` se omite el prefiltro en memoria para comparar.
+
+Debe ejecutarse contra una base de datos desechable, por ejemplo:
+    DATABASE_URL=postgres://.../enapu_bench python manage.py benchmark_asignacion
+"""
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from core.asignacion import asignar_slot
+from core.models import ESTADOS_SLOT_LIBRE, UbicacionSlot, Zona
+
+TAMANO_LOTE = 10000
+
+
+class Command(BaseCommand):
+    """
+    Benchmark de asignación: muchos asignadores simultáneos sobre una zona.
+    """
+    help = 'Mide la asignación concurrente de slots y verifica que no haya duplicados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=20)
+        parser.add_argument('--columnas', type=int, default=50)
+        parser.add_argument('--niveles', type=int, default=4)
+        parser.add_argument('--hilos', type=int, default=32,
+                            help='Asignadores simultáneos')
+        parser.add_argument('--asignaciones', type=int,
+                            help='Total de asignaciones (por defecto, todos los slots)')
+        parser.add_argument('--sin-mapa', action='store_true',
+                            help='No usar el mapa de slots libres en memoria')
+        parser.add_argument('--salida', help='Ruta de un archivo JSON con los resultados')
+
+    def handle(self, *args, **options):
+        total_slots = options['filas'] * options['columnas'] * options['niveles']
+        asignaciones = options['asignaciones'] or total_slots
+        zona = self._generar_zona(options)
+
+        usar_mapa = not options['sin_mapa']
+        pendientes = iter(range(asignaciones))
+        lock = threading.Lock()
+        asignados, tiempos, errores = [], [], []
+
+        def asignador():
+            try:
+                while True:
+                    with lock:
+                        if next(pendientes, None) is None:
+                            return
+                    inicio = time.perf_counter()
+                    try:
+                        slot = asignar_slot(zona.id, usar_mapa=usar_mapa)
+                    except DatabaseError as error:
+                        with lock:
+                            errores.append(str(error))
+                        continue
+                    transcurrido = (time.perf_counter() - inicio) * 1000
+                    with lock:
+                        tiempos.append(transcurrido)
+                        if slot is not None:
+                            asignados.append(slot.id)
+            finally:
+                connection.close()
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['hilos']) as pool:
+            for _ in range(options['hilos']):
+                pool.submit(asignador)
+        duracion = time.perf_counter() - inicio
+
+        ocupados = UbicacionSlot.objects.filter(id_zona=zona).exclude(
+            estado__in=ESTADOS_SLOT_LIBRE).count()
+        ordenados = sorted(tiempos) or [0.0]
+        resultados = {
+            'slots': total_slots,
+            'hilos': options['hilos'],
+            'usar_mapa': usar_mapa,
+            'asignados': len(asignados),
+            'duplicados': len(asignados) - len(set(asignados)),
+            'ocupados_en_bd': ocupados,
+            'errores': len(errores),
+            'asignaciones_por_segundo': len(asignados) / duracion if duracion else 0.0,
+            'mediana_ms': statistics.median(ordenados),
+            'p95_ms': ordenados[max(0, int(len(ordenados) * 0.95) - 1)],
+            'p99_ms': ordenados[max(0, int(len(ordenados) * 0.99) - 1)],
+        }
+
+        for clave, valor in resultados.items():
+            self.stdout.write(f'  {clave}: {valor:.3f}' if isinstance(valor, float)
+                              else f'  {clave}: {valor}')
+        if resultados['duplicados'] or ocupados != len(asignados):
+            self.stdout.write(self.style.ERROR('✘ Se asignó algún slot más de una vez'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✔ Ningún slot se asignó dos veces'))
+
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['salida']}"))
+
+    @staticmethod
+    def _generar_zona(options):
+        """Crea una zona con una rejilla completa de slots libres."""
+        zona = Zona.objects.create(nombre=f'Bench asignación {time.time_ns()}', capacidad=0)
+        UbicacionSlot.objects.bulk_create((
+            UbicacionSlot(fila=f, columna=c, nivel=n, estado='disponible', id_zona=zona)
+            for f in range(1, options['filas'] + 1)
+            for c in range(1, options['columnas'] + 1)
+            for n in range(1, options['niveles'] + 1)
+        ), batch_size=TAMANO_LOTE)
+        return zona
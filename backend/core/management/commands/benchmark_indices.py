@@ -0,0 +1,207 @@
+"""
+Comando de gestión que mide el efecto de los índices compuestos y parciales
+declarados en `Meta.indexes` sobre las consultas reales de la API.
+
+Genera un conjunto de datos sintético (por defecto dos millones de tickets),
+ejecuta cada consulta representativa sin los índices y luego con ellos, y
+muestra el plan de ejecución y la latencia mediana de ambos escenarios.
+
+Elimina temporalmente los índices, así que debe ejecutarse contra una base de
+datos desechable y pide `--confirmar`, por ejemplo:
+    DATABASE_URL=postgres://.../enapu_bench python manage.py benchmark_indices --confirmar
+"""
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from core.models import (
+    ESTADOS_TICKET_ACTIVOS, Rol, NivelAcceso, Usuario, Zona, UbicacionSlot,
+    Buque, CitaRecojo, Contenedor, Ticket
+)
+
+MODELOS_CON_INDICES = [Usuario, UbicacionSlot, CitaRecojo, Ticket]
+TAMANO_LOTE = 10000
+
+
+def _querysets(muestra):
+    """Consultas representativas de las vistas y del frontend, con parámetros de muestra."""
+    return {
+        'tickets_by_estado': Ticket.objects.filter(
+            estado='Pendiente').order_by('-fecha_hora_entrada')[:50],
+        'tickets_usuario_activos': Ticket.objects.filter(
+            id_usuario=muestra['usuario'], estado__in=ESTADOS_TICKET_ACTIVOS),
+        'monitor_tickets_activos': Ticket.objects.filter(
+            estado__in=ESTADOS_TICKET_ACTIVOS).order_by('fecha_hora_entrada')[:100],
+        'ticket_activo_contenedor': Ticket.objects.filter(
+            id_contenedor=muestra['contenedor'], estado__in=ESTADOS_TICKET_ACTIVOS),
+        'slot_libre_zona': UbicacionSlot.objects.filter(
+            id_zona=muestra['zona'], estado='disponible')[:1],
+        'citas_cliente_estado': CitaRecojo.objects.filter(
+            id_cliente=muestra['usuario'], estado='reservada'),
+        'usuarios_by_role': Usuario.objects.filter(id_rol=muestra['rol'], activo=True)[:50],
+    }
+
+
+class Command(BaseCommand):
+    """
+    Benchmark de índices: compara planes y latencias con y sin `Meta.indexes`.
+    """
+    help = 'Mide planes y latencias de las consultas principales con y sin índices compuestos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tickets', type=int, default=2_000_000,
+                            help='Número de tickets sintéticos a generar')
+        parser.add_argument('--repeticiones', type=int, default=20,
+                            help='Ejecuciones por consulta para calcular la mediana')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--reusar', action='store_true',
+                            help='No generar datos: usar los que ya existen en la base')
+        parser.add_argument('--salida', help='Ruta de un archivo JSON con los resultados')
+        parser.add_argument('--confirmar', action='store_true',
+                            help='Confirma que la base es desechable: se borran sus índices')
+
+    def handle(self, *args, **options):
+        if not options['confirmar']:
+            raise CommandError(
+                f"benchmark_indices elimina los índices de {connection.settings_dict['NAME']}: "
+                'ejecútalo solo contra una base desechable y con --confirmar'
+            )
+        rng = random.Random(options['semilla'])
+        if not options['reusar']:
+            self._generar_datos(options['tickets'], rng)
+
+        muestra = {
+            'usuario': Usuario.objects.order_by('?').values_list('id', flat=True).first(),
+            'contenedor': Ticket.objects.filter(
+                estado__in=ESTADOS_TICKET_ACTIVOS
+            ).values_list('id_contenedor', flat=True).first(),
+            'zona': Zona.objects.values_list('id', flat=True).first(),
+            'rol': Rol.objects.values_list('id', flat=True).first(),
+        }
+
+        eliminados = []
+        try:
+            self._eliminar_indices(eliminados)
+            antes = self._medir(muestra, options['repeticiones'])
+        finally:
+            # Aunque la medición falle, la base no se queda sin sus índices
+            self._crear_indices(eliminados)
+        despues = self._medir(muestra, options['repeticiones'])
+
+        resultados = {}
+        for nombre, medicion in antes.items():
+            resultados[nombre] = {'sin_indices': medicion, 'con_indices': despues[nombre]}
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n{nombre}'))
+            self.stdout.write(f"  sin índices: {medicion['mediana_ms']:.3f} ms")
+            self.stdout.write(f"    {medicion['plan']}")
+            self.stdout.write(f"  con índices: {despues[nombre]['mediana_ms']:.3f} ms")
+            self.stdout.write(f"    {despues[nombre]['plan']}")
+
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['salida']}"))
+
+    @staticmethod
+    def _eliminar_indices(eliminados):
+        """Elimina los índices de `Meta.indexes` anotando en `eliminados` cada uno."""
+        for model in MODELOS_CON_INDICES:
+            for index in model._meta.indexes:
+                with connection.schema_editor() as editor:
+                    editor.remove_index(model, index)
+                eliminados.append((model, index))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    @staticmethod
+    def _crear_indices(eliminados):
+        """Vuelve a crear los índices eliminados y refresca las estadísticas."""
+        with connection.schema_editor() as editor:
+            for model, index in eliminados:
+                editor.add_index(model, index)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    @staticmethod
+    def _medir(muestra, repeticiones):
+        """Ejecuta cada consulta varias veces y devuelve su mediana y su plan."""
+        analizar = connection.vendor == 'postgresql'
+        resultados = {}
+        for nombre, queryset in _querysets(muestra).items():
+            list(queryset.all())  # calentamiento de caché
+            tiempos = []
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                list(queryset.all())
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            plan = queryset.explain(analyze=True) if analizar else queryset.explain()
+            resultados[nombre] = {
+                'mediana_ms': statistics.median(tiempos),
+                'p95_ms': sorted(tiempos)[int(len(tiempos) * 0.95) - 1],
+                'plan': ' | '.join(linea.strip() for linea in plan.splitlines()),
+            }
+        return resultados
+
+    def _generar_datos(self, total_tickets, rng):
+        """Inserta en lotes un patio sintético proporcional al número de tickets."""
+        rol = Rol.objects.create(rol='CLIENTE')
+        nivel = NivelAcceso.objects.create(nivel='Básico')
+        usuarios = Usuario.objects.bulk_create(
+            Usuario(nombre=f'Bench {i}', email=f'bench{i}@bench.local', password='!',
+                    id_rol=rol, id_nivel_acceso=nivel, activo=rng.random() > 0.1)
+            for i in range(max(100, total_tickets // 1000))
+        )
+        usuario_ids = [u.id for u in usuarios]
+
+        zonas = Zona.objects.bulk_create(
+            Zona(nombre=f'Bench {i}', capacidad=0) for i in range(20)
+        )
+        slot_ids = []
+        slots_por_zona = max(10, total_tickets // 200)
+        for zona in zonas:
+            slots = UbicacionSlot.objects.bulk_create((
+                UbicacionSlot(
+                    fila=i // 100, columna=i % 100, nivel=1, id_zona=zona,
+                    estado='disponible' if rng.random() < 0.05 else 'ocupado'
+                ) for i in range(slots_por_zona)
+            ), batch_size=TAMANO_LOTE)
+            slot_ids.extend(s.id for s in slots)
+        buque = Buque.objects.create(nombre='Bench', linea_naviera='Bench')
+
+        ahora = timezone.now()
+        creados = 0
+        while creados < total_tickets:
+            lote = min(TAMANO_LOTE, total_tickets - creados)
+            citas = CitaRecojo.objects.bulk_create(
+                CitaRecojo(id_cliente_id=rng.choice(usuario_ids),
+                           estado=rng.choice(('reservada', 'activa', 'completada')))
+                for _ in range(lote)
+            )
+            contenedores = Contenedor.objects.bulk_create(
+                Contenedor(codigo_barras=f'BENCH-{creados + i}',
+                           numero_contenedor=f'BNCH{creados + i:07d}',
+                           dimensiones='40', tipo='Dry', peso=1000,
+                           id_buque=buque, id_cita_recojo=cita)
+                for i, cita in enumerate(citas)
+            )
+            Ticket.objects.bulk_create(
+                Ticket(
+                    fecha_hora_entrada=ahora - timedelta(minutes=creados + i),
+                    estado=(rng.choice(ESTADOS_TICKET_ACTIVOS) if rng.random() < 0.05
+                            else 'Completado'),
+                    id_ubicacion_id=rng.choice(slot_ids),
+                    id_usuario_id=rng.choice(usuario_ids),
+                    id_contenedor=contenedor,
+                )
+                for i, contenedor in enumerate(contenedores)
+            )
+            creados += lote
+            self.stdout.write(f'  {creados}/{total_tickets} tickets generados', ending='\r')
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✔ {total_tickets} tickets sintéticos generados'
+        ))
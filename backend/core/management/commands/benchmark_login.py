@@ -0,0 +1,228 @@
+"""
+Comando de gestión que mide el login bajo concurrencia (cambio de turno).
+
+Lanza `--intentos` logins con `--concurrencia` peticiones simultáneas contra
+la vista asíncrona de login y compara dos modos:
+- `pool`: el hash se verifica en el pool acotado de core.acceso;
+- `en_linea`: el hash se verifica en el propio hilo del bucle de eventos,
+  como hacía la vista síncrona original.
+Además del rendimiento (logins/s y latencias), mide el retraso del bucle de
+eventos: cuánto tarda en atender una tarea trivial mientras llueven logins.
+Ese retraso es el que sufren las demás peticiones del worker.
+
+Esos dos modos corren la vista en este proceso con el AsyncClient. Con
+`--url` se mide en cambio el servidor desplegado (`gunicorn backend.asgi`,
+workers de uvicorn): los logins viajan por HTTP y, en paralelo, un sondeo
+envía peticiones triviales (un login sin cuerpo, 400 sin tocar la base ni el
+hasher) cuya latencia es el retraso que el login impone al resto del worker.
+El servidor debe usar la misma base de datos, donde se crean los usuarios.
+
+Debe ejecutarse contra una base de datos desechable, por ejemplo:
+    DATABASE_URL=postgres://.../enapu_bench python manage.py benchmark_login
+    DATABASE_URL=postgres://.../enapu_bench python manage.py benchmark_login \\
+        --url http://127.0.0.1:8000
+"""
+import asyncio
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from core.acceso import PoolHash
+from core.management.commands.prueba_carga import ClienteHttp, Recolector
+from core.medicion import percentil
+from core.models import NivelAcceso, Rol, Usuario
+
+PASSWORD = 'turno-bench'
+# Periodo del sondeo que mide el retraso del bucle de eventos
+PERIODO_SONDEO = 0.005
+# Periodo del sondeo HTTP contra el servidor (--url)
+PERIODO_SONDEO_SERVIDOR = 0.05
+
+
+class _EnLinea:
+    """Sustituto de pool_hash que verifica en el hilo que llama (bloqueando el bucle)."""
+
+    @staticmethod
+    def enviar(funcion, *args):
+        futuro = Future()
+        futuro.set_result(funcion(*args))
+        return futuro
+
+
+class Command(BaseCommand):
+    """
+    Benchmark de login: logins por segundo, latencias y retraso del bucle de eventos.
+    """
+    help = 'Mide el login concurrente con el hash en el pool frente al hash en línea'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=50,
+                            help='Usuarios distintos que inician sesión')
+        parser.add_argument('--intentos', type=int, default=100, help='Logins por modo')
+        parser.add_argument('--concurrencia', type=int, default=25,
+                            help='Logins simultáneos')
+        parser.add_argument('--hilos', type=int, default=None,
+                            help='Hilos del pool de hash (por defecto, LOGIN_HILOS_HASH)')
+        parser.add_argument('--solo-pool', action='store_true',
+                            help='No medir el modo en línea')
+        parser.add_argument('--url',
+                            help='URL base de un servidor en marcha (p. ej. '
+                                 'http://127.0.0.1:8000): mide el login desplegado')
+        parser.add_argument('--salida', help='Ruta de un archivo JSON con los resultados')
+
+    def handle(self, *args, **options):
+        marca = time.time_ns()
+        rol = Rol.objects.create(rol='OPERARIO')
+        nivel = NivelAcceso.objects.create(nivel='Operativo')
+        # Un único hash para todos: crear los usuarios no cuesta N hashes
+        codificado = make_password(PASSWORD)
+        usuarios = Usuario.objects.bulk_create([
+            Usuario(nombre=f'Bench login {i}', email=f'login{i}-{marca}@bench.local',
+                    password=codificado, id_rol=rol, id_nivel_acceso=nivel)
+            for i in range(options['usuarios'])
+        ])
+        emails = [usuario.email for usuario in usuarios]
+
+        modos = {}
+        if not options['url']:
+            modos['pool'] = PoolHash(hilos=options['hilos'],
+                                     max_pendientes=options['concurrencia'])
+            if not options['solo_pool']:
+                modos['en_linea'] = _EnLinea()
+        resultados = {}
+        try:
+            if options['url']:
+                resultados['servidor'] = self._medir_servidor(
+                    options['url'], emails, options['intentos'], options['concurrencia']
+                )
+            for nombre, pool in modos.items():
+                cache.clear()
+                # El cliente de pruebas se presenta como 'testserver'
+                with mock.patch('core.views.pool_hash', pool), override_settings(
+                        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                    resultados[nombre] = asyncio.run(
+                        self._medir(emails, options['intentos'], options['concurrencia'])
+                    )
+        finally:
+            Usuario.objects.filter(pk__in=[u.pk for u in usuarios]).delete()
+            rol.delete()
+            nivel.delete()
+
+        for nombre, medicion in resultados.items():
+            retraso = (f"retraso máx. del bucle {medicion['retraso_bucle_max_ms']:.0f} ms"
+                       if 'retraso_bucle_max_ms' in medicion else
+                       f"sondeo p95 {medicion['sondeo_p95_ms']:.0f} ms, "
+                       f"máx. {medicion['sondeo_max_ms']:.0f} ms")
+            self.stdout.write(
+                f"  {nombre}: {medicion['exitosos']}/{medicion['intentos']} logins, "
+                f"{medicion['logins_por_segundo']:.1f} logins/s, "
+                f"p50 {medicion['latencia_p50_ms']:.0f} ms, "
+                f"p95 {medicion['latencia_p95_ms']:.0f} ms, {retraso}"
+            )
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['salida']}"))
+
+    async def _medir(self, emails, intentos, concurrencia):
+        """Lanza los logins con la concurrencia pedida mientras sondea el bucle."""
+        cliente = AsyncClient()
+        url = reverse('usuario-login')
+        limite = asyncio.Semaphore(concurrencia)
+        latencias, codigos, retrasos = [], [], []
+        terminado = asyncio.Event()
+
+        async def sondear():
+            while not terminado.is_set():
+                previsto = time.perf_counter() + PERIODO_SONDEO
+                await asyncio.sleep(PERIODO_SONDEO)
+                retrasos.append(max(time.perf_counter() - previsto, 0.0))
+
+        async def login(indice):
+            async with limite:
+                inicio = time.perf_counter()
+                respuesta = await cliente.post(
+                    url, {'email': emails[indice % len(emails)], 'password': PASSWORD},
+                    content_type='application/json'
+                )
+                latencias.append(time.perf_counter() - inicio)
+                codigos.append(respuesta.status_code)
+
+        sondeo = asyncio.create_task(sondear())
+        inicio = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(intentos)))
+        duracion = time.perf_counter() - inicio
+        terminado.set()
+        await sondeo
+
+        return {
+            'intentos': intentos,
+            'exitosos': codigos.count(200),
+            'codigos': {str(c): codigos.count(c) for c in sorted(set(codigos))},
+            'segundos': duracion,
+            'logins_por_segundo': intentos / duracion if duracion else 0.0,
+            'latencia_p50_ms': percentil(latencias, 50) * 1000,
+            'latencia_p95_ms': percentil(latencias, 95) * 1000,
+            'retraso_bucle_medio_ms': statistics.fmean(retrasos) * 1000 if retrasos else 0.0,
+            'retraso_bucle_max_ms': max(retrasos, default=0.0) * 1000,
+        }
+
+    def _medir_servidor(self, url, emails, intentos, concurrencia):
+        """Logins por HTTP contra `url` mientras un sondeo mide a las demás peticiones."""
+        recolector, sondas = Recolector(), Recolector()
+        locales = threading.local()
+        clientes = []
+        terminado = threading.Event()
+
+        def cliente():
+            if not hasattr(locales, 'cliente'):
+                locales.cliente = ClienteHttp(url, recolector, timeout=60)
+                clientes.append(locales.cliente)
+            return locales.cliente
+
+        def login(indice):
+            cliente().pedir('POST', '/usuarios/login/', datos={
+                'email': emails[indice % len(emails)], 'password': PASSWORD
+            })
+
+        def sondear():
+            sonda = ClienteHttp(url, sondas, timeout=60)
+            while not terminado.is_set():
+                sonda.pedir('POST', '/usuarios/login/', datos={})
+                terminado.wait(PERIODO_SONDEO_SERVIDOR)
+            sonda.cerrar()
+
+        sondeo = threading.Thread(target=sondear)
+        sondeo.start()
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(concurrencia) as ejecutor:
+            list(ejecutor.map(login, range(intentos)))
+        duracion = time.perf_counter() - inicio
+        terminado.set()
+        sondeo.join()
+        for abierto in clientes:
+            abierto.cerrar()
+
+        logins = recolector.informe(duracion)['total']
+        retrasos = sondas.informe(duracion)['total']
+        return {
+            'intentos': intentos,
+            'exitosos': logins['codigos'].get('200', 0),
+            'codigos': logins['codigos'],
+            'segundos': duracion,
+            'logins_por_segundo': intentos / duracion if duracion else 0.0,
+            'latencia_p50_ms': logins['p50_ms'],
+            'latencia_p95_ms': logins['p95_ms'],
+            'sondeo_p95_ms': retrasos['p95_ms'],
+            'sondeo_max_ms': retrasos['max_ms'],
+        }
@@ -0,0 +1,112 @@
+"""
+Comando de gestión que mide el rendimiento de las escrituras por lotes.
+
+Compara el alta fila a fila por la API (una petición por contenedor, con la
+validación de unicidad por fila de DRF) con los endpoints de core.lotes:
+alta de contenedores, slots y tickets y cambio de estado de tickets, por
+defecto con 10 000 filas por llamada.
+
+Debe ejecutarse contra una base de datos desechable, por ejemplo:
+    DATABASE_URL=postgres://.../enapu_bench python manage.py benchmark_lotes
+"""
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from core.models import Rol, NivelAcceso, Usuario, Zona, Buque
+from core.views import ContenedorViewSet, TicketViewSet, UbicacionSlotViewSet
+
+
+class Command(BaseCommand):
+    """
+    Benchmark de lotes: filas por segundo y consultas por llamada.
+    """
+    help = 'Mide el alta y el cambio de estado por lotes frente al alta fila a fila'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=10000,
+                            help='Filas por llamada a los endpoints de lote')
+        parser.add_argument('--muestra-individual', type=int, default=200,
+                            help='Altas fila a fila medidas para la comparación')
+        parser.add_argument('--salida', help='Ruta de un archivo JSON con los resultados')
+
+    def handle(self, *args, **options):
+        filas = options['filas']
+        self.fabrica = APIRequestFactory()
+        marca = time.time_ns()
+        buque = Buque.objects.create(nombre=f'Bench lotes {marca}', linea_naviera='Bench')
+        zona = Zona.objects.create(nombre=f'Bench lotes {marca}', capacidad=filas)
+        usuario = Usuario.objects.create(
+            nombre='Bench lotes', email=f'lotes{marca}@bench.local', password='!',
+            id_rol=Rol.objects.create(rol='OPERARIO'),
+            id_nivel_acceso=NivelAcceso.objects.create(nivel='Operativo'),
+        )
+
+        def contenedor(i, prefijo):
+            return {'codigo_barras': f'{prefijo}-{marca}-{i}', 'dimensiones': '40',
+                    'tipo': 'Dry', 'peso': 1000, 'id_buque': buque.id}
+
+        resultados = {}
+        muestra = options['muestra_individual']
+        if muestra:
+            crear = ContenedorViewSet.as_view({'post': 'create'})
+            inicio = time.perf_counter()
+            with CaptureQueriesContext(connection) as consultas:
+                for i in range(muestra):
+                    crear(self.fabrica.post('/', contenedor(i, 'UNO'), format='json'))
+            resultados['contenedores_fila_a_fila'] = self._resultado(
+                muestra, time.perf_counter() - inicio, len(consultas))
+
+        contenedores, resultados['contenedores_lote'] = self._llamar(
+            ContenedorViewSet, 'post', [contenedor(i, 'LOTE') for i in range(filas)])
+        slots, resultados['slots_lote'] = self._llamar(UbicacionSlotViewSet, 'post', [
+            {'fila': i // 100, 'columna': i % 100, 'nivel': 1,
+             'estado': 'ocupado', 'id_zona': zona.id}
+            for i in range(filas)
+        ])
+        tickets, resultados['tickets_lote'] = self._llamar(TicketViewSet, 'post', [
+            {'fecha_hora_entrada': '2025-01-01T08:00:00Z', 'estado': 'Pendiente',
+             'id_ubicacion': slot, 'id_usuario': usuario.id, 'id_contenedor': cont}
+            for slot, cont in zip(slots, contenedores)
+        ])
+        _, resultados['tickets_cambiar_estado_lote'] = self._llamar(
+            TicketViewSet, 'patch', [{'id': t, 'estado': 'Completado'} for t in tickets],
+            accion='cambiar_estado_lote')
+
+        for nombre, medicion in resultados.items():
+            self.stdout.write(
+                f"  {nombre}: {medicion['filas']} filas, {medicion['segundos']:.3f} s, "
+                f"{medicion['filas_por_segundo']:.0f} filas/s, {medicion['consultas']} consultas"
+            )
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['salida']}"))
+
+    def _llamar(self, viewset, metodo, elementos, accion='lote'):
+        """Llama a una acción de lote y devuelve (ids escritos, medición)."""
+        vista = viewset.as_view({metodo: accion})
+        peticion = getattr(self.fabrica, metodo)('/', elementos, format='json')
+        inicio = time.perf_counter()
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = vista(peticion)
+        duracion = time.perf_counter() - inicio
+        if respuesta.data.get('errores'):
+            rechazados = len(respuesta.data['errores'])
+            self.stdout.write(self.style.WARNING(
+                f"  {viewset.__name__}.{accion}: {rechazados} elementos rechazados"
+            ))
+        return respuesta.data.get('ids', []), self._resultado(
+            len(respuesta.data.get('ids', [])), duracion, len(consultas))
+
+    @staticmethod
+    def _resultado(filas, segundos, consultas):
+        return {
+            'filas': filas,
+            'segundos': segundos,
+            'filas_por_segundo': filas / segundos if segundos else 0.0,
+            'consultas': consultas,
+        }
@@ -0,0 +1,80 @@
+"""
+Comando de gestión que genera un patio sintético del tamaño de producción.
+
+Sustituye a los scripts de datos de prueba (add_clients.py,
+create_more_citas.py, create_containers_with_citas.py...) cuando hacen falta
+millones de filas: inserta por lotes, hashea la contraseña una sola vez y
+genera los lotes en un pool de procesos. Con la misma semilla (y la misma
+base de partida) produce exactamente las mismas filas.
+
+Ejemplo (un millón de contenedores, cuatro procesos):
+    DATABASE_URL=postgres://.../enapu_bench python manage.py generar_datos_sinteticos \\
+        --contenedores 1000000 --procesos 4
+"""
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.sinteticos import OPCIONES_POR_DEFECTO, TAMANO_LOTE, generar_datos
+
+
+class Command(BaseCommand):
+    """
+    Genera zonas, slots, buques, usuarios, citas, contenedores, tickets, facturas y pagos.
+    """
+    help = 'Genera datos sintéticos coherentes y reproducibles a partir de una semilla'
+
+    def add_arguments(self, parser):
+        por_defecto = OPCIONES_POR_DEFECTO
+        parser.add_argument('--semilla', type=int, default=por_defecto['semilla'])
+        parser.add_argument('--contenedores', type=int, default=por_defecto['contenedores'],
+                            help='Contenedores (y tickets) a generar')
+        parser.add_argument('--clientes', type=int, default=None,
+                            help='Clientes a generar (por defecto, uno por cada 50 contenedores)')
+        parser.add_argument('--operarios', type=int, default=por_defecto['operarios'])
+        parser.add_argument('--zonas', type=int, default=por_defecto['zonas'])
+        parser.add_argument('--filas', type=int, default=por_defecto['filas'],
+                            help='Filas de la rejilla de slots de cada zona')
+        parser.add_argument('--columnas', type=int, default=por_defecto['columnas'])
+        parser.add_argument('--niveles', type=int, default=por_defecto['niveles'])
+        parser.add_argument('--buques', type=int, default=por_defecto['buques'])
+        parser.add_argument('--dias', type=int, default=por_defecto['dias'],
+                            help='Días de histórico, hasta la hora actual')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE,
+                            help='Filas de cada lote generado e insertado')
+        parser.add_argument('--procesos', type=int, default=min(4, os.cpu_count() or 1),
+                            help='Procesos que generan los lotes (1: sin pool)')
+        parser.add_argument('--password', default=por_defecto['password'],
+                            help='Contraseña de todos los usuarios generados')
+        parser.add_argument('--sin-resumen', action='store_true',
+                            help='No reconstruir el resumen horario al terminar')
+
+    def handle(self, *args, **options):
+        for opcion in ('contenedores', 'operarios', 'zonas', 'filas', 'columnas', 'niveles',
+                       'buques', 'dias', 'lote', 'procesos'):
+            minimo = 0 if opcion in ('contenedores', 'operarios') else 1
+            if options[opcion] < minimo:
+                raise CommandError(f'--{opcion} debe ser al menos {minimo}')
+        opciones = {clave: options[clave] for clave in OPCIONES_POR_DEFECTO if clave != 'resumen'}
+        opciones['resumen'] = not options['sin_resumen']
+
+        generadas = {}
+
+        def al_avanzar(entidad, filas):
+            generadas[entidad] = generadas.get(entidad, 0) + filas
+            avance = ', '.join(f'{nombre}: {total}' for nombre, total in generadas.items())
+            self.stdout.write(f'  {avance}', ending='\r')
+
+        inicio = time.perf_counter()
+        insertadas = generar_datos(opciones, procesos=options['procesos'],
+                                   al_avanzar=al_avanzar)
+        segundos = time.perf_counter() - inicio
+
+        self.stdout.write('')
+        for tabla, cantidad in insertadas.items():
+            self.stdout.write(f'  {tabla}: {cantidad}')
+        total = sum(insertadas.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'✔ {total} filas sintéticas en {segundos:.1f} s ({total / segundos:.0f} filas/s)'
+        ))
@@ -0,0 +1,68 @@
+"""
+Comando de gestión que importa el manifiesto CSV o JSONL de un buque.
+
+Ejemplo:
+    python manage.py importar_manifiesto manifiesto.csv --buque 3 --rechazos rechazos.jsonl
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from core.manifiestos import (
+    FORMATOS, TAMANO_BLOQUE, ManifiestoIlegible, detectar_formato, importar_manifiesto,
+    leer_manifiesto
+)
+from core.models import Buque
+
+
+class Command(BaseCommand):
+    """
+    Importación en streaming de contenedores (y sus citas) desde un manifiesto.
+    """
+    help = 'Importa en bloques el manifiesto CSV/JSONL de contenedores de un buque'
+
+    def add_arguments(self, parser):
+        parser.add_argument('ruta', help='Archivo del manifiesto')
+        parser.add_argument('--buque', type=int, required=True, help='Id del buque que atraca')
+        parser.add_argument('--formato', choices=FORMATOS,
+                            help='Formato del archivo (por defecto, según la extensión)')
+        parser.add_argument('--bloque', type=int, default=TAMANO_BLOQUE,
+                            help='Filas validadas y cargadas por transacción')
+        parser.add_argument('--rechazos', help='Ruta de un archivo JSON con las filas rechazadas')
+
+    def handle(self, *args, **options):
+        if options['bloque'] < 1:
+            raise CommandError('--bloque debe ser al menos 1')
+        buque = Buque.objects.filter(pk=options['buque']).first()
+        if buque is None:
+            raise CommandError(f"No existe el buque {options['buque']}")
+        formato = detectar_formato(options['ruta'], options['formato'])
+
+        def al_avanzar(resultado):
+            self.stdout.write(
+                f'  {resultado.leidas} filas leídas, {resultado.cargadas} cargadas, '
+                f'{resultado.rechazadas} rechazadas', ending='\r'
+            )
+
+        with open(options['ruta'], 'rb') as archivo:
+            try:
+                resultado = importar_manifiesto(
+                    leer_manifiesto(archivo, formato), buque,
+                    tamano_bloque=options['bloque'], al_avanzar=al_avanzar
+                )
+            except ManifiestoIlegible as error:
+                raise CommandError(
+                    f'\n{error}; ya se cargaron {error.resultado.cargadas} contenedores'
+                ) from error
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✔ {resultado.cargadas} contenedores y {resultado.citas} citas cargados '
+            f'en {resultado.bloques} bloques; {resultado.rechazadas} filas rechazadas'
+        ))
+        for rechazo in resultado.rechazos[:10]:
+            self.stdout.write(self.style.WARNING(
+                f"  línea {rechazo['linea']}: {json.dumps(rechazo['errores'], ensure_ascii=False)}"
+            ))
+        if options['rechazos']:
+            with open(options['rechazos'], 'w', encoding='utf-8') as salida:
+                json.dump(resultado.como_dict(), salida, indent=2, ensure_ascii=False, default=str)
+            self.stdout.write(self.style.SUCCESS(f"Informe guardado en {options['rechazos']}"))
@@ -0,0 +1,384 @@
+"""
+Comando de gestión que reproduce el tráfico real del puerto contra un servidor.
+
+Cada usuario virtual es una pantalla o una persona que repite su flujo, con
+sus pausas, durante `--duracion` segundos:
+- `monitor`: TurnMonitor, que pide la lista de tickets cada 8 segundos;
+- `puerta`: un operario de puerta que escanea un contenedor (búsqueda por
+  código de barras) y, si aún no tiene ticket, hace el check-in en una zona;
+- `cliente`: un cliente que inicia sesión y consulta MyTickets e History
+  (tickets por usuario).
+`--mezcla` reparte `--usuarios` entre los flujos (p. ej. monitor=60,puerta=15,
+cliente=25) y `--escala-pausas` acorta o alarga las pausas (0 satura el
+servidor sin pausas).
+
+Antes de empezar se prepara la llegada de `--llegadas` contenedores con cita
+(un manifiesto subido por la API) para que los check-in tengan qué procesar.
+Solo usa la API HTTP y la biblioteca estándar, así que sirve contra cualquier
+despliegue. Al terminar informa, por endpoint, del rendimiento (peticiones/s),
+los percentiles p50/p95/p99 de latencia y la tasa de errores.
+
+Ejemplo, con el servidor levantado (gunicorn o runserver) y datos generados
+con generar_datos_sinteticos:
+    python manage.py prueba_carga --url http://127.0.0.1:8000 --usuarios 60 --duracion 120
+"""
+import http.client
+import json
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.medicion import resumen_latencias
+from core.sinteticos import PASSWORD_POR_DEFECTO
+
+PREFIJO_API = '/api'
+# Pausa (segundos) entre dos iteraciones de cada flujo, como en el frontend
+PAUSAS = {'monitor': 8.0, 'puerta': 20.0, 'cliente': 5.0}
+MEZCLA_POR_DEFECTO = 'monitor=60,puerta=15,cliente=25'
+
+
+def _mezcla(valor):
+    """Convierte 'monitor=60,puerta=15' en {flujo: peso}."""
+    pesos = {}
+    for parte in valor.split(','):
+        nombre, _, peso = parte.partition('=')
+        nombre = nombre.strip()
+        if nombre not in PAUSAS:
+            raise CommandError(f"Flujo desconocido en --mezcla: {nombre} ({', '.join(PAUSAS)})")
+        try:
+            pesos[nombre] = float(peso)
+        except ValueError as error:
+            raise CommandError(f'Peso no válido en --mezcla: {parte}') from error
+    if sum(pesos.values()) <= 0:
+        raise CommandError('La mezcla necesita algún peso positivo')
+    return pesos
+
+
+def repartir_usuarios(pesos, usuarios):
+    """Reparte `usuarios` entre los flujos en proporción a su peso (mayor resto)."""
+    total = sum(pesos.values())
+    exactos = {nombre: usuarios * peso / total for nombre, peso in pesos.items()}
+    reparto = {nombre: int(exacto) for nombre, exacto in exactos.items()}
+    restantes = usuarios - sum(reparto.values())
+    por_resto = sorted(exactos, key=lambda nombre: exactos[nombre] - reparto[nombre],
+                       reverse=True)
+    for nombre in por_resto[:restantes]:
+        reparto[nombre] += 1
+    return reparto
+
+
+def _filas(datos):
+    """Filas de una respuesta de listado, paginada ({results}) o no."""
+    return datos.get('results', []) if isinstance(datos, dict) else (datos or [])
+
+
+class Recolector:
+    """Latencias y códigos de respuesta por endpoint, compartidos entre hilos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = defaultdict(list)
+        self.codigos = defaultdict(lambda: defaultdict(int))
+
+    def registrar(self, endpoint, segundos, codigo):
+        """Anota una petición (código 0: error de conexión)."""
+        with self._lock:
+            self.latencias[endpoint].append(segundos)
+            self.codigos[endpoint][codigo] += 1
+
+    def informe(self, duracion):
+        """Métricas por endpoint y totales."""
+        endpoints = {}
+        for endpoint in sorted(self.latencias):
+            endpoints[endpoint] = self._metricas(
+                self.latencias[endpoint], self.codigos[endpoint], duracion
+            )
+        todas = [valor for valores in self.latencias.values() for valor in valores]
+        codigos = defaultdict(int)
+        for por_codigo in self.codigos.values():
+            for codigo, cantidad in por_codigo.items():
+                codigos[codigo] += cantidad
+        return {'endpoints': endpoints, 'total': self._metricas(todas, codigos, duracion)}
+
+    @staticmethod
+    def _metricas(latencias, codigos, duracion):
+        peticiones = len(latencias)
+        errores = sum(cantidad for codigo, cantidad in codigos.items()
+                      if codigo == 0 or codigo >= 400)
+        return {
+            'peticiones': peticiones,
+            'peticiones_por_segundo': peticiones / duracion if duracion else 0.0,
+            'errores': errores,
+            'tasa_error': errores / peticiones if peticiones else 0.0,
+            **resumen_latencias(latencias),
+            'codigos': {str(codigo): cantidad for codigo, cantidad in sorted(codigos.items())},
+        }
+
+
+class ClienteHttp:
+    """Conexión keep-alive de un usuario virtual; registra cada petición."""
+
+    def __init__(self, url, recolector, timeout):
+        partes = urlsplit(url)
+        clase = (http.client.HTTPSConnection if partes.scheme == 'https'
+                 else http.client.HTTPConnection)
+        self._conexion = clase(partes.hostname, partes.port, timeout=timeout)
+        self._prefijo = partes.path.rstrip('/') + PREFIJO_API
+        self._recolector = recolector
+        # Sesión del usuario virtual (flujo cliente)
+        self.usuario = None
+        self.token = None
+
+    def pedir(self, metodo, endpoint, parametros=None, datos=None, cuerpo=None,
+              tipo='application/json'):
+        """
+        Hace la petición y devuelve (código, JSON). `endpoint` es la ruta sin
+        parámetros, que también agrupa las métricas.
+        """
+        ruta = self._prefijo + endpoint
+        if parametros:
+            ruta += '?' + urlencode(parametros)
+        cabeceras = {'Accept': 'application/json'}
+        if self.token:
+            cabeceras['Authorization'] = f'Bearer {self.token}'
+        if datos is not None:
+            cuerpo = json.dumps(datos).encode()
+        if cuerpo is not None:
+            cabeceras['Content-Type'] = tipo
+        inicio = time.perf_counter()
+        try:
+            self._conexion.request(metodo, ruta, body=cuerpo, headers=cabeceras)
+            respuesta = self._conexion.getresponse()
+            contenido = respuesta.read()
+            codigo = respuesta.status
+        except (OSError, http.client.HTTPException):
+            # La conexión se reabre en la siguiente petición
+            self._conexion.close()
+            codigo, contenido = 0, b''
+        self._recolector.registrar(
+            f'{metodo} {endpoint}', time.perf_counter() - inicio, codigo
+        )
+        try:
+            return codigo, json.loads(contenido) if contenido else None
+        except ValueError:
+            return codigo, None
+
+    def cerrar(self):
+        """Cierra la conexión."""
+        self._conexion.close()
+
+
+class Escenario:
+    """Datos compartidos por los usuarios virtuales: zonas, clientes y llegadas."""
+
+    def __init__(self, zonas, clientes, llegadas, password):
+        self.zonas = zonas
+        self.clientes = clientes
+        self.password = password
+        self._llegadas = list(llegadas)
+        self._escaneados = []
+        self._lock = threading.Lock()
+
+    def siguiente_llegada(self, rng):
+        """Código de un contenedor por procesar, o uno ya procesado si no quedan."""
+        with self._lock:
+            if self._llegadas:
+                codigo = self._llegadas.pop()
+                self._escaneados.append(codigo)
+                return codigo
+            return rng.choice(self._escaneados) if self._escaneados else None
+
+
+def flujo_monitor(cliente, escenario, rng):  # pylint: disable=unused-argument
+    """TurnMonitor: refresca la lista de tickets."""
+    cliente.pedir('GET', '/tickets/')
+
+
+def flujo_puerta(cliente, escenario, rng):
+    """Puerta: escanea un contenedor y hace el check-in si aún no tiene ticket."""
+    codigo = escenario.siguiente_llegada(rng)
+    if codigo is None:
+        return
+    estado, datos = cliente.pedir('GET', '/contenedores/buscar/', {'codigo_barras': codigo})
+    if estado == 200 and datos and not datos.get('ticket') and escenario.zonas:
+        cliente.pedir('POST', '/contenedores/check-in/', datos={
+            'codigo_barras': codigo, 'id_zona': rng.choice(escenario.zonas),
+        })
+
+
+def flujo_cliente(cliente, escenario, rng):
+    """Cliente: MyTickets e History piden los tickets del usuario."""
+    if not escenario.clientes:
+        return
+    if cliente.usuario is None:
+        cliente.usuario = rng.choice(escenario.clientes)
+        if escenario.password:
+            estado, datos = cliente.pedir('POST', '/usuarios/login/', datos={
+                'email': cliente.usuario['email'], 'password': escenario.password,
+            })
+            if estado == 200 and datos:
+                cliente.token = datos.get('access')
+    cliente.pedir('GET', '/tickets/by_usuario/', {'usuario_id': cliente.usuario['id']})
+
+
+FLUJOS = {'monitor': flujo_monitor, 'puerta': flujo_puerta, 'cliente': flujo_cliente}
+
+
+class Command(BaseCommand):
+    """
+    Prueba de carga de extremo a extremo con la mezcla de tráfico de puerta, patio y clientes.
+    """
+    help = 'Reproduce el tráfico de monitores, puerta y clientes contra un servidor en marcha'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000',
+                            help='URL base del servidor (sin /api)')
+        parser.add_argument('--usuarios', type=int, default=40,
+                            help='Usuarios virtuales concurrentes')
+        parser.add_argument('--mezcla', type=_mezcla, default=_mezcla(MEZCLA_POR_DEFECTO),
+                            help=f'Pesos de cada flujo (por defecto {MEZCLA_POR_DEFECTO})')
+        parser.add_argument('--duracion', type=float, default=60.0, help='Segundos de carga')
+        parser.add_argument('--escala-pausas', type=float, default=1.0,
+                            help='Multiplica las pausas de cada flujo (0: sin pausas)')
+        parser.add_argument('--llegadas', type=int, default=200,
+                            help='Contenedores con cita que se preparan para el check-in')
+        parser.add_argument('--password', default=PASSWORD_POR_DEFECTO,
+                            help='Contraseña de los clientes (vacía: sin login)')
+        parser.add_argument('--timeout', type=float, default=30.0,
+                            help='Segundos de espera por respuesta')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--salida', help='Ruta de un archivo JSON con los resultados')
+
+    def handle(self, *args, **options):
+        if options['usuarios'] < 1 or options['duracion'] <= 0:
+            raise CommandError('--usuarios y --duracion deben ser positivos')
+        reparto = repartir_usuarios(options['mezcla'], options['usuarios'])
+        escenario = self._preparar(options)
+        self.stdout.write(
+            f"Carga contra {options['url']}: "
+            + ', '.join(f'{cantidad} {flujo}' for flujo, cantidad in reparto.items())
+            + f" durante {options['duracion']:.0f} s"
+        )
+
+        recolector = Recolector()
+        fin = time.monotonic() + options['duracion']
+        hilos = []
+        indice = 0
+        for flujo, cantidad in reparto.items():
+            for _ in range(cantidad):
+                hilo = threading.Thread(
+                    target=self._usuario_virtual, name=f'carga-{flujo}-{indice}',
+                    args=(flujo, escenario, recolector, fin, options,
+                          random.Random(f"{options['semilla']}:{indice}")),
+                    daemon=True,
+                )
+                hilos.append(hilo)
+                indice += 1
+        inicio = time.monotonic()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.monotonic() - inicio
+
+        informe = recolector.informe(duracion)
+        resultados = {
+            'url': options['url'], 'fecha': timezone.now().isoformat(),
+            'usuarios': reparto, 'duracion_s': duracion,
+            'escala_pausas': options['escala_pausas'], **informe,
+        }
+        self._mostrar(informe)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['salida']}"))
+
+    def _preparar(self, options):
+        """Lee zonas y clientes y sube el manifiesto con las llegadas del día."""
+        cliente = ClienteHttp(options['url'], Recolector(), options['timeout'])
+        try:
+            estado, zonas = cliente.pedir('GET', '/zonas/')
+            if estado != 200:
+                raise CommandError(f"No se pudo contactar con {options['url']} ({estado})")
+            _, clientes = cliente.pedir('GET', '/usuarios/by_role/',
+                                        {'role': 'CLIENTE', 'page_size': 500})
+            clientes = [
+                {'id': fila['id'], 'email': fila['email']}
+                for fila in _filas(clientes) if fila.get('activo', True)
+            ]
+            llegadas = []
+            if options['llegadas'] and clientes:
+                llegadas = self._subir_manifiesto(cliente, clientes, options)
+        finally:
+            cliente.cerrar()
+        return Escenario(
+            [zona['id'] for zona in _filas(zonas)], clientes, llegadas, options['password']
+        )
+
+    def _subir_manifiesto(self, cliente, clientes, options):
+        """Crea un buque y le importa `--llegadas` contenedores con cita de recojo."""
+        marca = uuid.uuid4().hex[:8]
+        estado, buque = cliente.pedir('POST', '/buques/', datos={
+            'nombre': f'Carga {marca}', 'linea_naviera': 'Prueba de carga',
+        })
+        if estado != 201:
+            raise CommandError(f'No se pudo crear el buque de la prueba ({estado})')
+        hoy = timezone.localdate()
+        codigos = [f'CARGA-{marca}-{i:06d}' for i in range(options['llegadas'])]
+        lineas = ['codigo_barras,dimensiones,tipo,peso,cliente_email,fecha_envio,'
+                  'fecha_recojo,duracion_viaje_dias']
+        for i, codigo in enumerate(codigos):
+            lineas.append(
+                f"{codigo},40x8x8,40ft,20000,{clientes[i % len(clientes)]['email']},"
+                f"{hoy.replace(day=1).isoformat()},{hoy.isoformat()},12"
+            )
+        limite = f'----carga{marca}'
+        cuerpo = (
+            f'--{limite}\r\nContent-Disposition: form-data; name="archivo"; '
+            f'filename="llegadas.csv"\r\nContent-Type: text/csv\r\n\r\n'
+            + '\n'.join(lineas) + f'\r\n--{limite}--\r\n'
+        ).encode()
+        estado, resultado = cliente.pedir(
+            'POST', f"/buques/{buque['id']}/manifiesto/", cuerpo=cuerpo,
+            tipo=f'multipart/form-data; boundary={limite}'
+        )
+        if estado != 201:
+            raise CommandError(f'No se pudo importar el manifiesto de llegadas ({estado})')
+        self.stdout.write(f"  {resultado.get('cargadas', len(codigos))} llegadas preparadas")
+        return codigos
+
+    @staticmethod
+    def _usuario_virtual(flujo, escenario, recolector, fin, options, rng):
+        """Repite el flujo hasta el final de la prueba, con pausas aleatorizadas."""
+        cliente = ClienteHttp(options['url'], recolector, options['timeout'])
+        pausa = PAUSAS[flujo] * options['escala_pausas']
+        try:
+            # Arranque escalonado: las pantallas no refrescan todas a la vez
+            time.sleep(min(rng.uniform(0, pausa), max(fin - time.monotonic(), 0)))
+            while time.monotonic() < fin:
+                FLUJOS[flujo](cliente, escenario, rng)
+                espera = rng.uniform(0.5 * pausa, 1.5 * pausa)
+                time.sleep(min(espera, max(fin - time.monotonic(), 0)))
+        finally:
+            cliente.cerrar()
+
+    def _mostrar(self, informe):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\n{'endpoint':<40} {'pet.':>7} {'pet/s':>8} {'p50':>8} {'p95':>8} "
+            f"{'p99':>8} {'errores':>8}"
+        ))
+        filas = list(informe['endpoints'].items()) + [('TOTAL', informe['total'])]
+        for endpoint, metricas in filas:
+            linea = (
+                f"{endpoint:<40} {metricas['peticiones']:>7} "
+                f"{metricas['peticiones_por_segundo']:>8.1f} {metricas['p50_ms']:>6.0f}ms "
+                f"{metricas['p95_ms']:>6.0f}ms {metricas['p99_ms']:>6.0f}ms "
+                f"{metricas['tasa_error']:>7.1%}"
+            )
+            self.stdout.write(self.style.ERROR(linea) if metricas['errores'] else linea)
@@ -0,0 +1,23 @@
+"""
+Comando de gestión que purga las lápidas de tickets eliminados (TicketEliminado).
+
+Conserva SINCRONIZACION_RETENCION_DIAS días; la misma purga se ejecuta a
+diario como tarea periódica de Celery (core.tasks.purgar_tickets_eliminados).
+
+Ejemplo:
+    python manage.py purgar_tickets_eliminados
+"""
+from django.core.management.base import BaseCommand
+
+from core.tasks import purgar_tickets_eliminados
+
+
+class Command(BaseCommand):
+    """
+    Borra las lápidas más antiguas que la ventana de retención.
+    """
+    help = 'Purga las lápidas de tickets eliminados fuera de la retención'
+
+    def handle(self, *args, **options):
+        borrados = purgar_tickets_eliminados()
+        self.stdout.write(self.style.SUCCESS(f'✔ {borrados} lápidas de tickets purgadas'))
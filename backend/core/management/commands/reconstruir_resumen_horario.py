@@ -0,0 +1,46 @@
+"""
+Comando de gestión que reconstruye el resumen horario de tickets desde cero.
+
+Sirve para la carga inicial (backfill) y para corregir el resumen tras
+escrituras que no lo mantienen (QuerySet.update, scripts de datos).
+
+Ejemplo:
+    python manage.py reconstruir_resumen_horario --desde 2025-01-01 --hasta 2025-01-31
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from core.resumenes import reconstruir_resumen
+
+
+def _fecha(valor):
+    try:
+        fecha = parse_date(valor)
+    except ValueError:
+        fecha = None
+    if fecha is None:
+        raise CommandError(f'Fecha no válida: {valor} (AAAA-MM-DD)')
+    return fecha
+
+
+class Command(BaseCommand):
+    """
+    Recalcula las filas de ResumenHorario agregando los tickets en SQL.
+    """
+    help = 'Reconstruye el resumen horario de tickets (todo o un rango de días)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=_fecha,
+                            help='Primer día a reconstruir (AAAA-MM-DD); por defecto, todos')
+        parser.add_argument('--hasta', type=_fecha,
+                            help='Último día a reconstruir (AAAA-MM-DD), inclusive')
+
+    def handle(self, *args, **options):
+        desde, hasta = options['desde'], options['hasta']
+        if desde and hasta and desde > hasta:
+            raise CommandError('--desde no puede ser posterior a --hasta')
+        filas = reconstruir_resumen(desde, hasta)
+        rango = f" entre {desde or 'el inicio'} y {hasta or 'hoy'}" if desde or hasta else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'✔ Resumen horario reconstruido{rango}: {filas} filas'
+        ))
@@ -0,0 +1,374 @@
+"""
+Importación en streaming de manifiestos de buque (contenedores y sus citas).
+
+Cuando atraca un buque se cargan cientos o miles de contenedores desde un
+manifiesto CSV o JSONL. El archivo se lee fila a fila y se procesa en bloques
+de tamaño fijo, de modo que la memoria no depende del tamaño del manifiesto:
+- cada bloque se valida por conjuntos (una consulta para los códigos de barras
+  ya existentes y otra para los clientes de las citas);
+- las filas válidas se cargan con `COPY` en PostgreSQL y con `executemany` en
+  los demás motores, en una transacción por bloque;
+- las filas rechazadas se informan con su número de línea y sus errores;
+- un archivo que no está en UTF-8 o no es un CSV legible detiene la
+  importación con ManifiestoIlegible (los bloques anteriores ya quedan cargados).
+
+Columnas: codigo_barras, numero_contenedor, dimensiones, tipo, peso y,
+opcionalmente, cliente_email, fecha_envio, fecha_recojo y duracion_viaje_dias
+para crear la cita de recojo del contenedor.
+"""
+import csv
+import io
+import json
+import re
+from itertools import islice
+
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .lotes import notificar_escritura_masiva
+from .models import CitaRecojo, Contenedor, Usuario
+
+TAMANO_BLOQUE = 1000
+# Rechazos que se conservan en memoria para el informe (el total siempre se cuenta)
+MAX_RECHAZOS_INFORME = 100
+FORMATOS = ('csv', 'jsonl')
+# Punto de corte tras un '\r' que no va seguido de '\n' (fin de línea de Mac clásico)
+RETORNO_SUELTO = re.compile(r'(?<=\r)(?!\n)')
+
+CAMPOS_CONTENEDOR = (
+    'codigo_barras', 'numero_contenedor', 'dimensiones', 'tipo', 'peso',
+    'id_buque', 'id_cita_recojo',
+)
+CAMPOS_CITA = (
+    'id', 'fecha_envio', 'fecha_recojo', 'duracion_viaje_dias', 'estado',
+    'id_cliente', 'fecha_creacion',
+)
+COLUMNAS_CITA = ('cliente_email', 'fecha_envio', 'fecha_recojo', 'duracion_viaje_dias')
+
+
+class ManifiestoIlegible(ValueError):
+    """
+    El archivo no se puede seguir leyendo en la línea `linea`.
+
+    `resultado` es el ResultadoImportacion de los bloques ya cargados.
+    """
+
+    def __init__(self, linea, mensaje):
+        super().__init__(f'Línea {linea}: {mensaje}')
+        self.linea = linea
+        self.resultado = None
+
+
+class ResultadoImportacion:
+    """Totales de una importación y muestra de las filas rechazadas."""
+
+    def __init__(self):
+        self.leidas = 0
+        self.cargadas = 0
+        self.citas = 0
+        self.rechazadas = 0
+        self.bloques = 0
+        self.rechazos = []
+
+    def rechazar(self, linea, fila, errores):
+        """Cuenta una fila rechazada y la guarda si cabe en el informe."""
+        self.rechazadas += 1
+        if len(self.rechazos) < MAX_RECHAZOS_INFORME:
+            self.rechazos.append({'linea': linea, 'errores': errores, 'fila': fila})
+
+    def como_dict(self):
+        """Representación serializable del resultado."""
+        return {
+            'leidas': self.leidas,
+            'cargadas': self.cargadas,
+            'citas': self.citas,
+            'rechazadas': self.rechazadas,
+            'bloques': self.bloques,
+            'rechazos': self.rechazos,
+        }
+
+
+def detectar_formato(nombre, formato=None):
+    """Devuelve 'csv' o 'jsonl' según el formato pedido o la extensión del archivo."""
+    if formato:
+        return formato
+    return 'jsonl' if str(nombre).lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def _decodificar(binario):
+    """
+    Itera (numero_linea, texto) decodificando cada línea en UTF-8 al leerla.
+
+    Separa las líneas como el modo de nueva línea universal ('\\n', '\\r\\n' o
+    '\\r'), conservando el terminador como necesita el lector CSV.
+    """
+    numero = 0
+    for crudo in binario:
+        try:
+            texto = crudo.decode('utf-8-sig' if numero == 0 else 'utf-8')
+        except UnicodeDecodeError as error:
+            raise ManifiestoIlegible(
+                numero + 1, 'el archivo no está codificado en UTF-8'
+            ) from error
+        for linea in RETORNO_SUELTO.split(texto):
+            if linea:
+                numero += 1
+                yield numero, linea
+
+
+def leer_manifiesto(binario, formato):
+    """
+    Itera (numero_linea, fila) sobre un archivo binario sin cargarlo entero.
+
+    Lanza ManifiestoIlegible al llegar a una línea que no es UTF-8 o que el
+    lector CSV no puede interpretar.
+    """
+    lineas = _decodificar(binario)
+    if formato == 'csv':
+        leida = [0]  # última línea entregada al lector, para situar sus errores
+
+        def textos():
+            for leida[0], texto in lineas:
+                yield texto
+
+        lector = csv.DictReader(textos())
+        try:
+            for fila in lector:
+                yield lector.line_num, fila
+        except csv.Error as error:
+            raise ManifiestoIlegible(leida[0], f'CSV mal formado ({error})') from error
+        return
+    for numero, linea in lineas:
+        if not linea.strip():
+            continue
+        try:
+            fila = json.loads(linea)
+        except ValueError:
+            fila = None
+        yield numero, fila if isinstance(fila, dict) else {'__invalida__': linea.strip()}
+
+
+def _texto(fila, campo):
+    valor = fila.get(campo)
+    return str(valor).strip() if valor not in (None, '') else ''
+
+
+def _limpiar_fila(fila):
+    """Normaliza una fila del manifiesto; devuelve (datos, errores)."""
+    if '__invalida__' in fila:
+        return None, {'fila': ['La línea no es un objeto JSON válido.']}
+    datos, errores = {}, {}
+    for campo, requerido in (('codigo_barras', True), ('numero_contenedor', False),
+                             ('dimensiones', True), ('tipo', True)):
+        valor = _texto(fila, campo)
+        maximo = Contenedor._meta.get_field(campo).max_length
+        if requerido and not valor:
+            errores[campo] = ['Este campo es obligatorio.']
+        elif len(valor) > maximo:
+            errores[campo] = [f'No puede superar {maximo} caracteres.']
+        datos[campo] = valor or None
+    try:
+        datos['peso'] = float(_texto(fila, 'peso'))
+        if datos['peso'] < 0:
+            raise ValueError
+    except ValueError:
+        errores['peso'] = ['Debe ser un número no negativo.']
+
+    if any(_texto(fila, columna) for columna in COLUMNAS_CITA):
+        datos['cliente_email'] = _texto(fila, 'cliente_email')
+        if not datos['cliente_email']:
+            errores['cliente_email'] = ['La cita necesita el email del cliente.']
+        for campo in ('fecha_envio', 'fecha_recojo'):
+            valor = _texto(fila, campo)
+            try:
+                datos[campo] = parse_date(valor) if valor else None
+            except ValueError:
+                datos[campo] = None
+            if valor and datos[campo] is None:
+                errores[campo] = ['Fecha no válida (AAAA-MM-DD).']
+        try:
+            datos['duracion_viaje_dias'] = int(_texto(fila, 'duracion_viaje_dias') or 0)
+        except ValueError:
+            errores['duracion_viaje_dias'] = ['Debe ser un número entero.']
+    return datos, errores
+
+
+def cargar_filas(modelo, campos, filas):
+    """
+    Inserta `filas` (valores ya preparados para la base) con COPY (PostgreSQL) o executemany.
+
+    Cada fila trae un valor por campo de `campos`, en el mismo orden. No pasa
+    por el ORM: ni señales, ni valores por defecto, ni `auto_now`.
+    """
+    if not filas:
+        return
+    quote = connection.ops.quote_name
+    tabla = quote(modelo._meta.db_table)
+    columnas = ', '.join(quote(modelo._meta.get_field(campo).column) for campo in campos)
+    with connection.cursor() as cursor:
+        if connection.vendor != 'postgresql':
+            marcadores = ', '.join(['%s'] * len(campos))
+            cursor.executemany(
+                f'INSERT INTO {tabla} ({columnas}) VALUES ({marcadores})', filas
+            )
+            return
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        for fila in filas:
+            escritor.writerow(['\\N' if valor is None else valor for valor in fila])
+        buffer.seek(0)
+        sql = f"COPY {tabla} ({columnas}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        crudo = cursor.cursor
+        if hasattr(crudo, 'copy_expert'):  # psycopg2
+            crudo.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with crudo.copy(sql) as copia:
+                copia.write(buffer.getvalue())
+
+
+def _cargar_filas(modelo, campos, objetos):
+    """Inserta `objetos` con COPY (PostgreSQL) o executemany, sin pasar por el ORM."""
+    campos_modelo = [modelo._meta.get_field(campo) for campo in campos]
+    cargar_filas(modelo, campos, [
+        [campo.get_db_prep_save(getattr(objeto, campo.attname), connection)
+         for campo in campos_modelo]
+        for objeto in objetos
+    ])
+
+
+def _insertar_citas(citas):
+    """Inserta las citas y les asigna su id (necesario para enlazar los contenedores)."""
+    if not citas:
+        return
+    if connection.vendor != 'postgresql':
+        CitaRecojo.objects.bulk_create(citas)
+        return
+    # Se reservan los ids de la secuencia para poder cargar también con COPY
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+            [connection.ops.quote_name(CitaRecojo._meta.db_table), 'id', len(citas)]
+        )
+        for cita, (pk,) in zip(citas, cursor.fetchall()):
+            cita.id = pk
+    _cargar_filas(CitaRecojo, CAMPOS_CITA, citas)
+
+
+def _preparar_bloque(bloque, buque):
+    """
+    Valida un bloque por conjuntos.
+
+    Devuelve los rechazos [(linea, fila, errores)] y las cargas
+    [(linea, fila, contenedor, cita o None)], sin escribir nada.
+    """
+    rechazos, candidatos = [], []
+    for linea, fila in bloque:
+        datos, errores = _limpiar_fila(fila)
+        if errores:
+            rechazos.append((linea, fila, errores))
+        else:
+            candidatos.append((linea, fila, datos))
+
+    codigos = [datos['codigo_barras'] for _, _, datos in candidatos]
+    existentes = set(Contenedor.objects.filter(
+        codigo_barras__in=codigos).values_list('codigo_barras', flat=True))
+    emails = {datos['cliente_email'] for _, _, datos in candidatos if datos.get('cliente_email')}
+    clientes = dict(Usuario.objects.filter(email__in=emails).values_list('email', 'id')) \
+        if emails else {}
+
+    ahora = timezone.now()
+    cargas = []
+    for linea, fila, datos in candidatos:
+        if datos['codigo_barras'] in existentes:
+            rechazos.append((linea, fila, {'codigo_barras': [
+                'Ya existe un contenedor con este codigo_barras.'
+            ]}))
+            continue
+        contenedor = Contenedor(
+            codigo_barras=datos['codigo_barras'], numero_contenedor=datos['numero_contenedor'],
+            dimensiones=datos['dimensiones'], tipo=datos['tipo'], peso=datos['peso'],
+            id_buque=buque,
+        )
+        cita = None
+        if 'cliente_email' in datos:
+            if datos['cliente_email'] not in clientes:
+                rechazos.append((linea, fila, {'cliente_email': [
+                    f"No existe un usuario con el email {datos['cliente_email']}."
+                ]}))
+                continue
+            cita = CitaRecojo(
+                fecha_envio=datos['fecha_envio'], fecha_recojo=datos['fecha_recojo'],
+                duracion_viaje_dias=datos['duracion_viaje_dias'], estado='reservada',
+                id_cliente_id=clientes[datos['cliente_email']], fecha_creacion=ahora,
+            )
+        existentes.add(datos['codigo_barras'])
+        cargas.append((linea, fila, contenedor, cita))
+    return rechazos, cargas
+
+
+def _cargar_bloque(cargas):
+    """Inserta las citas y los contenedores de un bloque en una transacción."""
+    contenedores = [contenedor for _, _, contenedor, _ in cargas]
+    citas = [cita for _, _, _, cita in cargas if cita is not None]
+    with transaction.atomic():
+        _insertar_citas(citas)
+        for _, _, contenedor, cita in cargas:
+            if cita is not None:
+                contenedor.id_cita_recojo_id = cita.id
+        _cargar_filas(Contenedor, CAMPOS_CONTENEDOR, contenedores)
+        if citas:
+            notificar_escritura_masiva(CitaRecojo)
+        if contenedores:
+            notificar_escritura_masiva(Contenedor)
+
+
+def _procesar_bloque(bloque, buque, resultado):
+    """
+    Valida un bloque por conjuntos y carga sus filas válidas en una transacción.
+
+    Si otra importación o la API insertan el mismo codigo_barras entre la
+    validación y la carga, el bloque se valida y se carga de nuevo; si vuelve
+    a fallar, sus filas se informan como rechazadas.
+    """
+    for intento in range(2):
+        rechazos, cargas = _preparar_bloque(bloque, buque)
+        try:
+            _cargar_bloque(cargas)
+            break
+        except IntegrityError as error:
+            if intento:
+                rechazos += [(linea, fila, {'non_field_errors': [
+                    f'No se pudo cargar el bloque por un conflicto concurrente ({error}).'
+                ]}) for linea, fila, _, _ in cargas]
+                cargas = []
+    for linea, fila, errores in sorted(rechazos, key=lambda rechazo: rechazo[0]):
+        resultado.rechazar(linea, fila, errores)
+    resultado.cargadas += len(cargas)
+    resultado.citas += sum(cita is not None for _, _, _, cita in cargas)
+
+
+def importar_manifiesto(filas, buque, tamano_bloque=TAMANO_BLOQUE, al_avanzar=None):
+    """
+    Importa las filas (iterable de (linea, dict)) del manifiesto de `buque`.
+
+    `al_avanzar(resultado)` se llama tras cada bloque para informar del progreso.
+    Si la lectura falla, ManifiestoIlegible lleva el resultado de los bloques
+    ya cargados; el bloque en curso no se carga.
+    """
+    resultado = ResultadoImportacion()
+    filas = iter(filas)
+    while True:
+        try:
+            bloque = list(islice(filas, tamano_bloque))
+        except ManifiestoIlegible as error:
+            error.resultado = resultado
+            raise
+        if not bloque:
+            break
+        resultado.leidas += len(bloque)
+        resultado.bloques += 1
+        _procesar_bloque(bloque, buque, resultado)
+        if al_avanzar:
+            al_avanzar(resultado)
+    return resultado
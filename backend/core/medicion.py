@@ -0,0 +1,102 @@
+"""
+Utilidades comunes de los comandos de benchmark: percentiles, mediciones
+repetidas y comparación con una línea base guardada en JSON.
+
+Una línea base es un dict {caso: métricas}. Al comparar, cada métrica se
+clasifica como regresión si empeora más de la tolerancia relativa (las
+latencias y la memoria) o en cualquier cantidad (el número de consultas,
+que no tiene ruido).
+"""
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Métricas comparables con la línea base: (nombre, exacta)
+METRICAS_COMPARADAS = (
+    ('p50_ms', False),
+    ('p95_ms', False),
+    ('p99_ms', False),
+    ('consultas', True),
+    ('memoria_pico_kb', False),
+)
+
+
+def percentil(valores, p):
+    """Percentil `p` (0-100) por el método del rango más cercano."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def resumen_latencias(segundos):
+    """p50, p95, p99 y máximo en milisegundos de una lista de duraciones en segundos."""
+    return {
+        'p50_ms': percentil(segundos, 50) * 1000,
+        'p95_ms': percentil(segundos, 95) * 1000,
+        'p99_ms': percentil(segundos, 99) * 1000,
+        'max_ms': max(segundos, default=0.0) * 1000,
+    }
+
+
+def medir(funcion, repeticiones, calentamiento=1):
+    """
+    Mide `funcion()` y devuelve latencias, consultas y memoria pico.
+
+    Las repeticiones cronometradas se ejecutan sin instrumentar; las consultas
+    y la memoria se miden en una ejecución adicional, porque tracemalloc y la
+    captura de SQL distorsionan los tiempos.
+    """
+    for _ in range(calentamiento):
+        funcion()
+    duraciones = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        duraciones.append(time.perf_counter() - inicio)
+
+    ya_trazando = tracemalloc.is_tracing()
+    if not ya_trazando:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    try:
+        with CaptureQueriesContext(connection) as consultas:
+            funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        if not ya_trazando:
+            tracemalloc.stop()
+    return {
+        'repeticiones': repeticiones,
+        **resumen_latencias(duraciones),
+        'consultas': len(consultas.captured_queries),
+        'memoria_pico_kb': round(max(pico - base, 0) / 1024, 1),
+    }
+
+
+def comparar_con_base(actual, base, tolerancia):
+    """
+    Compara las métricas de cada caso con la línea base.
+
+    Devuelve una lista de dicts (caso, métrica, base, actual, variación,
+    regresión) con las métricas presentes en ambos lados.
+    """
+    diferencias = []
+    for caso, metricas in actual.items():
+        anteriores = base.get(caso)
+        if anteriores is None:
+            continue
+        for metrica, exacta in METRICAS_COMPARADAS:
+            if metrica not in metricas or metrica not in anteriores:
+                continue
+            antes, ahora = anteriores[metrica], metricas[metrica]
+            variacion = (ahora - antes) / antes if antes else (1.0 if ahora else 0.0)
+            regresion = ahora > antes if exacta else variacion > tolerancia
+            diferencias.append({
+                'caso': caso, 'metrica': metrica, 'base': antes, 'actual': ahora,
+                'variacion': variacion, 'regresion': regresion,
+            })
+    return diferencias
@@ -0,0 +1,172 @@
+"""
+Métricas de Prometheus de la API, la base de datos, las cachés y el patio.
+
+Se exponen en `/metrics` (core.views.metricas_prometheus):
+- `enapu_http_peticiones_total` y `enapu_http_errores_total` por vista y
+  acción (la acción del ViewSet: list, by_estado, cambiar_estado...);
+- `enapu_http_latencia_segundos`: histograma de latencia por vista y acción;
+- `enapu_db_consultas_por_peticion` (histograma) y
+  `enapu_db_tiempo_segundos_total`;
+- `enapu_cache_aciertos_total` / `enapu_cache_fallos_total` por caché; la
+  tasa de aciertos es aciertos / (aciertos + fallos);
+- indicadores de negocio leídos de la base al consultar las métricas:
+  tickets activos por estado y slots libres y totales por zona.
+
+Los contadores e histogramas los registra MetricasMiddleware (core.middleware)
+en cada worker. Con gunicorn, `PROMETHEUS_MULTIPROC_DIR` (lo fija
+gunicorn.conf.py) hace que cada worker escriba sus valores en ese directorio
+y `/metrics` los agrega, responda el worker que responda. Los indicadores de
+negocio no dependen del worker: se calculan en la petición de métricas y se
+guardan `METRICAS_NEGOCIO_TTL` segundos para no cargar la base con cada scrape.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Count, Q
+from prometheus_client import CollectorRegistry, Counter, Histogram, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from .models import ESTADOS_SLOT_LIBRE, ESTADOS_TICKET_ACTIVOS, Ticket, UbicacionSlot
+
+logger = logging.getLogger('core.metricas')
+
+# Registro propio (no el global): en modo multiproceso no se usa para exponer
+REGISTRO = CollectorRegistry(auto_describe=True)
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+PETICIONES = Counter(
+    'enapu_http_peticiones_total', 'Peticiones HTTP atendidas',
+    ['vista', 'accion', 'metodo', 'codigo'], registry=REGISTRO
+)
+ERRORES = Counter(
+    'enapu_http_errores_total', 'Respuestas HTTP con error (4xx y 5xx)',
+    ['vista', 'accion', 'clase'], registry=REGISTRO
+)
+LATENCIA = Histogram(
+    'enapu_http_latencia_segundos', 'Latencia de las peticiones HTTP',
+    ['vista', 'accion'], buckets=BUCKETS_LATENCIA, registry=REGISTRO
+)
+CONSULTAS = Histogram(
+    'enapu_db_consultas_por_peticion', 'Consultas SQL por petición',
+    ['vista', 'accion'], buckets=BUCKETS_CONSULTAS, registry=REGISTRO
+)
+TIEMPO_SQL = Counter(
+    'enapu_db_tiempo_segundos_total', 'Tiempo de SQL acumulado',
+    ['vista', 'accion'], registry=REGISTRO
+)
+CACHE_ACIERTOS = Counter(
+    'enapu_cache_aciertos_total', 'Lecturas de caché con valor', ['cache'], registry=REGISTRO
+)
+CACHE_FALLOS = Counter(
+    'enapu_cache_fallos_total', 'Lecturas de caché sin valor', ['cache'], registry=REGISTRO
+)
+
+
+def registrar_cache(nombre, acierto):
+    """Cuenta una lectura de la caché `nombre`."""
+    (CACHE_ACIERTOS if acierto else CACHE_FALLOS).labels(nombre).inc()
+
+
+def etiquetas_vista(request):
+    """
+    (vista, acción) de la petición según su ruta, con cardinalidad acotada.
+
+    Para los ViewSets la acción sale del mapeo método -> acción del router; el
+    resto de vistas se identifican por el nombre de su URL.
+    """
+    ruta = getattr(request, 'resolver_match', None)
+    if ruta is None:
+        return 'sin_ruta', ''
+    metodo = request.method.lower()
+    clase = getattr(ruta.func, 'cls', None)
+    if clase is None:
+        return ruta.url_name or ruta.func.__name__, metodo
+    acciones = getattr(ruta.func, 'actions', None) or {}
+    return clase.__name__, acciones.get(metodo, metodo)
+
+
+def registrar_peticion(request, response, medicion, duracion):
+    """Registra latencia, código, errores y consultas de una petición atendida."""
+    vista, accion = etiquetas_vista(request)
+    codigo = response.status_code
+    PETICIONES.labels(vista, accion, request.method, str(codigo)).inc()
+    if codigo >= 400:
+        ERRORES.labels(vista, accion, f'{codigo // 100}xx').inc()
+    LATENCIA.labels(vista, accion).observe(duracion)
+    CONSULTAS.labels(vista, accion).observe(medicion.consultas)
+    TIEMPO_SQL.labels(vista, accion).inc(medicion.sql)
+
+
+class MetricasNegocio(Collector):
+    """Tickets activos por estado y slots por zona, leídos de la base con caché corta."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._familias = []
+        self._expira = 0.0
+
+    def describe(self):
+        # Sin descripción: registrar el colector no debe consultar la base
+        return []
+
+    def collect(self):
+        with self._lock:
+            if time.monotonic() >= self._expira:
+                try:
+                    self._familias = self._calcular()
+                except DatabaseError:
+                    # Sin base de datos /metrics sigue sirviendo el resto de métricas
+                    logger.exception('No se pudieron calcular las métricas de negocio')
+                    self._familias = []
+                self._expira = time.monotonic() + getattr(settings, 'METRICAS_NEGOCIO_TTL', 15)
+            return list(self._familias)
+
+    @staticmethod
+    def _calcular():
+        activos = GaugeMetricFamily(
+            'enapu_tickets_activos', 'Tickets activos por estado', labels=['estado']
+        )
+        por_estado = dict(Ticket.objects.filter(estado__in=ESTADOS_TICKET_ACTIVOS).values(
+            'estado').annotate(n=Count('id')).values_list('estado', 'n'))
+        for estado in ESTADOS_TICKET_ACTIVOS:
+            activos.add_metric([estado], por_estado.get(estado, 0))
+
+        libres = GaugeMetricFamily(
+            'enapu_slots_libres', 'Slots libres por zona', labels=['zona_id', 'zona']
+        )
+        totales = GaugeMetricFamily(
+            'enapu_slots_total', 'Slots por zona', labels=['zona_id', 'zona']
+        )
+        for fila in UbicacionSlot.objects.values('id_zona', 'id_zona__nombre').annotate(
+                total=Count('id'), libres=Count('id', filter=Q(estado__in=ESTADOS_SLOT_LIBRE))
+        ).order_by('id_zona'):
+            etiquetas = [str(fila['id_zona']), fila['id_zona__nombre']]
+            libres.add_metric(etiquetas, fila['libres'])
+            totales.add_metric(etiquetas, fila['total'])
+        return [activos, libres, totales]
+
+
+metricas_negocio = MetricasNegocio()
+REGISTRO.register(metricas_negocio)
+
+
+def registro_exposicion():
+    """
+    Registro que se expone en /metrics.
+
+    En modo multiproceso agrega los archivos de todos los workers; si no, es
+    el registro de este proceso.
+    """
+    if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        return REGISTRO
+    registro = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registro)
+    registro.register(metricas_negocio)
+    return registro
@@ -0,0 +1,210 @@
+"""
+Middleware de tiempos por petición (SQL, serialización, renderizado y total)
+y de métricas de Prometheus.
+
+Con `TIEMPOS_SERVIDOR` activo, cada respuesta lleva:
+- `Server-Timing`: `sql` (tiempo y número de consultas), `ser` (serializer.data),
+  `render` (JSON u otro renderer de DRF) y `total` (toda la petición); las
+  herramientas de desarrollo del navegador lo muestran en la pestaña Network;
+- `X-Query-Count`: número de consultas SQL;
+- `X-Query-Budget-Exceeded`: solo si se supera
+  `TIEMPOS_SERVIDOR_PRESUPUESTO_CONSULTAS`; además se registra un aviso en el
+  logger `core.tiempos`.
+
+Pensado para dejarlo activo en producción: no usa `DEBUG` ni guarda el texto
+de las consultas. La medición vive en una ContextVar (vale para vistas
+síncronas y asíncronas); el contador SQL es un `execute_wrapper` instalado
+una vez por conexión que, fuera de una petición medida, solo lee la
+ContextVar. En las respuestas en streaming el total termina al empezar a
+enviar el cuerpo.
+
+Con `METRICAS` activo, MetricasMiddleware vuelca la misma medición en los
+contadores e histogramas de core.metricas (expuestos en /metrics).
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+
+from .metricas import registrar_peticion
+
+logger = logging.getLogger('core.tiempos')
+
+_medicion_actual = ContextVar('medicion_tiempos', default=None)
+
+
+class MedicionPeticion:
+    """Acumuladores de una petición (segundos)."""
+    __slots__ = ('consultas', 'sql', 'serializacion', 'render', 'anidadas')
+
+    def __init__(self):
+        self.consultas = 0
+        self.sql = 0.0
+        self.serializacion = 0.0
+        self.render = 0.0
+        # Serializadores anidados dentro de otro: su tiempo ya se cuenta fuera
+        self.anidadas = 0
+
+
+def _registrar_consulta(execute, sql, params, many, context):
+    medicion = _medicion_actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.sql += time.perf_counter() - inicio
+        medicion.consultas += 1
+
+
+def _instalar_en_conexion(connection, **kwargs):  # pylint: disable=unused-argument
+    if _registrar_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_registrar_consulta)
+
+
+def _cronometrar(propiedad, acumulador):
+    """Envuelve una propiedad para sumar su tiempo a la medición en curso."""
+    original = propiedad.fget
+
+    def medida(instancia):
+        medicion = _medicion_actual.get()
+        if medicion is None or medicion.anidadas:
+            return original(instancia)
+        medicion.anidadas += 1
+        inicio = time.perf_counter()
+        try:
+            return original(instancia)
+        finally:
+            medicion.anidadas -= 1
+            setattr(medicion, acumulador,
+                    getattr(medicion, acumulador) + time.perf_counter() - inicio)
+
+    medida.medicion_tiempos = True
+    return property(medida, propiedad.fset, propiedad.fdel, propiedad.__doc__)
+
+
+def instalar_medicion():
+    """Conecta el contador SQL y cronometra serializer.data y el renderizado (idempotente)."""
+    connection_created.connect(_instalar_en_conexion, dispatch_uid='core.tiempos')
+    for alias in connections:
+        _instalar_en_conexion(connections[alias])
+    # Serializer.data y ListSerializer.data terminan en BaseSerializer.data
+    for clase, nombre, acumulador in ((BaseSerializer, 'data', 'serializacion'),
+                                      (Response, 'rendered_content', 'render')):
+        propiedad = clase.__dict__[nombre]
+        if not getattr(propiedad.fget, 'medicion_tiempos', False):
+            setattr(clase, nombre, _cronometrar(propiedad, acumulador))
+
+
+@contextmanager
+def medicion_peticion():
+    """
+    Medición de la petición en curso; si no hay ninguna activa la crea.
+
+    Así TiemposServidorMiddleware y MetricasMiddleware comparten los mismos
+    acumuladores estén o no activos los dos.
+    """
+    medicion = _medicion_actual.get()
+    if medicion is not None:
+        yield medicion
+        return
+    medicion = MedicionPeticion()
+    token = _medicion_actual.set(medicion)
+    try:
+        yield medicion
+    finally:
+        _medicion_actual.reset(token)
+
+
+class TiemposServidorMiddleware:
+    """
+    Añade Server-Timing y X-Query-Count a cada respuesta y avisa al superar
+    el presupuesto de consultas.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'TIEMPOS_SERVIDOR', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.presupuesto = getattr(settings, 'TIEMPOS_SERVIDOR_PRESUPUESTO_CONSULTAS', 0)
+        instalar_medicion()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with medicion_peticion() as medicion:
+            inicio = time.perf_counter()
+            response = self.get_response(request)
+        return self._anotar(request, response, medicion, time.perf_counter() - inicio)
+
+    async def __acall__(self, request):
+        with medicion_peticion() as medicion:
+            inicio = time.perf_counter()
+            response = await self.get_response(request)
+        return self._anotar(request, response, medicion, time.perf_counter() - inicio)
+
+    def _anotar(self, request, response, medicion, total):
+        metricas = [
+            f'sql;dur={medicion.sql * 1000:.1f};desc="{medicion.consultas} consultas"',
+            f'ser;dur={medicion.serializacion * 1000:.1f}',
+            f'render;dur={medicion.render * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ]
+        if response.has_header('Server-Timing'):
+            metricas.insert(0, response['Server-Timing'])
+        response['Server-Timing'] = ', '.join(metricas)
+        response['X-Query-Count'] = str(medicion.consultas)
+        if self.presupuesto and medicion.consultas > self.presupuesto:
+            response['X-Query-Budget-Exceeded'] = str(self.presupuesto)
+            logger.warning(
+                '%s %s: %d consultas (presupuesto %d), %.1f ms en SQL de %.1f ms',
+                request.method, request.path, medicion.consultas, self.presupuesto,
+                medicion.sql * 1000, total * 1000
+            )
+        return response
+
+
+class MetricasMiddleware:
+    """
+    Registra en core.metricas la latencia, el código, los errores y las
+    consultas SQL de cada petición, etiquetadas por vista y acción.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICAS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        instalar_medicion()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with medicion_peticion() as medicion:
+            inicio = time.perf_counter()
+            response = self.get_response(request)
+        registrar_peticion(request, response, medicion, time.perf_counter() - inicio)
+        return response
+
+    async def __acall__(self, request):
+        with medicion_peticion() as medicion:
+            inicio = time.perf_counter()
+            response = await self.get_response(request)
+        registrar_peticion(request, response, medicion, time.perf_counter() - inicio)
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_contenedor_numero_contenedor'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ticket',
+            name='fecha_hora_entrada',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_ticket_fecha_hora_entrada_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='citarecojo',
+            name='estado',
+            field=models.CharField(db_index=True, default='reservada', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='citarecojo',
+            name='fecha_recojo',
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='contenedor',
+            name='numero_contenedor',
+            field=models.CharField(blank=True, db_index=True, max_length=50, null=True),
+        ),
+        migrations.AlterField(
+            model_name='factura',
+            name='estado',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='factura',
+            name='fecha_emision',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='pago',
+            name='fecha_pago',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='rol',
+            name='rol',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='ticket',
+            name='estado',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='ubicacionslot',
+            name='estado',
+            field=models.CharField(db_index=True, max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='usuario',
+            name='activo',
+            field=models.BooleanField(db_index=True, default=True),
+        ),
+    ]
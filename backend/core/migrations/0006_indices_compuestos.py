@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_indices_filtros'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ticket',
+            name='estado',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='citarecojo',
+            index=models.Index(fields=['id_cliente', 'estado'], name='cita_cliente_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['estado', '-fecha_hora_entrada'], name='ticket_estado_entrada_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['id_usuario', 'estado'], name='ticket_usuario_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['id_contenedor', 'estado'], name='ticket_cont_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('estado__in', ('Pendiente', 'En Cola', 'Validado', 'En Proceso'))), fields=['fecha_hora_entrada'], name='ticket_activos_entrada_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ubicacionslot',
+            index=models.Index(fields=['id_zona', 'estado'], name='slot_zona_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(fields=['id_rol', 'activo'], name='usuario_rol_activo_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:37
+
+from django.db import migrations, models
+
+
+def rellenar_fecha_modificacion(apps, schema_editor):  # pylint: disable=unused-argument
+    """Los tickets sin fecha de modificación toman su fecha de entrada."""
+    Ticket = apps.get_model('core', 'Ticket')
+    Ticket.objects.filter(fecha_modificacion__isnull=True).update(
+        fecha_modificacion=models.F('fecha_hora_entrada')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_indices_compuestos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketEliminado',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('id_ticket', models.IntegerField()),
+                ('fecha_eliminacion', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'db_table': 'Ticket_eliminado',
+            },
+        ),
+        migrations.AlterField(
+            model_name='ticket',
+            name='fecha_modificacion',
+            field=models.DateTimeField(auto_now=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(rellenar_fecha_modificacion, migrations.RunPython.noop),
+    ]
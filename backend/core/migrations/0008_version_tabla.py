@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:40
+
+from django.db import migrations, models
+
+TABLAS = [
+    'Rol', 'Nivel_acceso', 'Usuario', 'Zona', 'Ubicacion_slot', 'Buque',
+    'Cita_recojo', 'Contenedor', 'Ticket', 'Factura', 'Pago', 'Reporte',
+]
+
+
+def crear_versiones(apps, schema_editor):  # pylint: disable=unused-argument
+    """Crea el contador inicial de cada tabla versionada."""
+    VersionTabla = apps.get_model('core', 'VersionTabla')
+    VersionTabla.objects.bulk_create(
+        [VersionTabla(tabla=tabla) for tabla in TABLAS], ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_sincronizacion_tickets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionTabla',
+            fields=[
+                ('tabla', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+                ('fecha_modificacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'Version_tabla',
+            },
+        ),
+        migrations.RunPython(crear_versiones, migrations.RunPython.noop),
+    ]
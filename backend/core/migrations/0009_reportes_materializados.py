@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_version_tabla'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reporte',
+            name='error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='reporte',
+            name='estado',
+            field=models.CharField(default='pendiente', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='reporte',
+            name='fecha_completado',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reporte',
+            name='huella',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='reporte',
+            name='resultado',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='reporte',
+            name='parametros',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
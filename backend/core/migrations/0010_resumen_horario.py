@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:58
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_reportes_materializados'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenHorario',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('hora', models.DateTimeField()),
+                ('estado', models.CharField(max_length=50)),
+                ('tickets', models.IntegerField(default=0)),
+                ('con_salida', models.IntegerField(default=0)),
+                ('estadia_total', models.DurationField(default=datetime.timedelta)),
+                ('id_zona', models.ForeignKey(db_column='id_zona', on_delete=django.db.models.deletion.CASCADE, to='core.zona')),
+            ],
+            options={
+                'db_table': 'Resumen_horario',
+                'constraints': [models.UniqueConstraint(fields=('hora', 'id_zona', 'estado'), name='resumen_hora_zona_estado_uniq')],
+            },
+        ),
+    ]
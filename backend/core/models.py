@@ -4,8 +4,19 @@ Definición de todos los modelos de la base de datos para la aplicación 'core'.
 Estos modelos representan las entidades centrales del sistema de gestión 
 de contenedores, incluyendo usuarios, roles, citas, contenedores y transacciones.
 """
+from datetime import timedelta
+
 from django.db import models
 
+# Estados en los que un ticket sigue ocupando la cola o el patio. Los monitores
+# y paneles de operación consultan casi siempre este subconjunto.
+ESTADOS_TICKET_ACTIVOS = ('Pendiente', 'En Cola', 'Validado', 'En Proceso')
+
+# Grafías con las que se registra un slot libre (el frontend y los datos
+# iniciales no coinciden en mayúsculas) y estado que se asigna al ocuparlo.
+ESTADOS_SLOT_LIBRE = ('disponible', 'Disponible', 'DISPONIBLE')
+ESTADO_SLOT_OCUPADO = 'ocupado'
+
 
 class Rol(models.Model):
     """Modelo que representa los diferentes roles de usuario en el sistema.
@@ -13,7 +24,7 @@ class Rol(models.Model):
     Incluye roles como Administrador, Operario, Cliente.
     """
     id = models.AutoField(primary_key=True)
-    rol = models.CharField(max_length=50)
+    rol = models.CharField(max_length=50, db_index=True)
 
     class Meta:
         """Metadatos del modelo Rol."""
@@ -56,11 +67,15 @@ class Usuario(models.Model):
     )
     fecha_modificacion = models.DateTimeField(null=True, blank=True, auto_now=True)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
-    activo = models.BooleanField(default=True)
+    activo = models.BooleanField(default=True, db_index=True)
 
     class Meta:
         """Metadatos del modelo Usuario."""
         db_table = 'Usuario'
+        indexes = [
+            # by_role: usuarios activos de un rol
+            models.Index(fields=['id_rol', 'activo'], name='usuario_rol_activo_idx'),
+        ]
 
     def __str__(self):
         return str(self.nombre) # Corregido E0307
@@ -86,13 +101,17 @@ class UbicacionSlot(models.Model):
     fila = models.IntegerField()
     columna = models.IntegerField()
     nivel = models.IntegerField()
-    estado = models.CharField(max_length=20)
+    estado = models.CharField(max_length=20, db_index=True)
     # C0301 Corregido:
     id_zona = models.ForeignKey(Zona, db_column='id_zona', on_delete=models.CASCADE)
 
     class Meta:
         """Metadatos del modelo UbicacionSlot."""
         db_table = 'Ubicacion_slot'
+        indexes = [
+            # Búsqueda de slots libres dentro de una zona
+            models.Index(fields=['id_zona', 'estado'], name='slot_zona_estado_idx'),
+        ]
 
     def __str__(self):
         # Corregido E0307: Aseguramos que la F-string se convierta a str
@@ -117,10 +136,10 @@ class CitaRecojo(models.Model):
     """Modelo central que gestiona la cita o reserva de un cliente para recoger contenedores."""
     id = models.AutoField(primary_key=True)
     fecha_envio = models.DateField(null=True, blank=True)
-    fecha_recojo = models.DateField(null=True, blank=True)
+    fecha_recojo = models.DateField(null=True, blank=True, db_index=True)
     duracion_viaje_dias = models.IntegerField(default=0)
     # C0301 Corregido dividiendo la línea larga:
-    estado = models.CharField(max_length=50, default='reservada')
+    estado = models.CharField(max_length=50, default='reservada', db_index=True)
     id_cliente = models.ForeignKey(
         'Usuario', db_column='id_cliente', on_delete=models.CASCADE,
         related_name='citas_cliente', null=True, blank=True
@@ -134,6 +153,10 @@ class CitaRecojo(models.Model):
     class Meta:
         """Metadatos del modelo CitaRecojo."""
         db_table = 'Cita_recojo'
+        indexes = [
+            # Citas de un cliente filtradas por estado (MyTickets, ReservarCita)
+            models.Index(fields=['id_cliente', 'estado'], name='cita_cliente_estado_idx'),
+        ]
 
     def __str__(self):
         # Corregido E0307
@@ -145,7 +168,9 @@ class Contenedor(models.Model):
     id = models.AutoField(primary_key=True)
     codigo_barras = models.CharField(max_length=50, unique=True, null=True, blank=True)
     # C0301 Corregido:
-    numero_contenedor = models.CharField(max_length=50, null=True, blank=True)
+    numero_contenedor = models.CharField(
+        max_length=50, null=True, blank=True, db_index=True
+    )
     dimensiones = models.CharField(max_length=50)
     tipo = models.CharField(max_length=20)
     peso = models.FloatField()
@@ -174,7 +199,8 @@ class Ticket(models.Model):
     Para un contenedor en un slot específico.
     """
     id = models.AutoField(primary_key=True)
-    fecha_hora_entrada = models.DateTimeField()
+    # Indexado: es la clave de orden de la paginación por cursor
+    fecha_hora_entrada = models.DateTimeField(db_index=True)
     fecha_hora_salida = models.DateTimeField(null=True, blank=True)
     estado = models.CharField(max_length=50)
     # C0301 Corregido dividiendo la línea larga:
@@ -187,23 +213,87 @@ class Ticket(models.Model):
     id_contenedor = models.ForeignKey(
         Contenedor, db_column='id_contenedor', on_delete=models.CASCADE
     )
-    fecha_modificacion = models.DateTimeField(null=True, blank=True)
+    # Se actualiza en cada save(); las escrituras con QuerySet.update() deben
+    # fijarla explícitamente. Es la columna de la sincronización incremental (?since=).
+    fecha_modificacion = models.DateTimeField(
+        null=True, blank=True, auto_now=True, db_index=True
+    )
 
     class Meta:
         """Metadatos del modelo Ticket."""
         db_table = 'Ticket'
+        indexes = [
+            # by_estado y filtros por estado, ordenados por fecha de entrada
+            models.Index(
+                fields=['estado', '-fecha_hora_entrada'], name='ticket_estado_entrada_idx'
+            ),
+            # Tickets de un usuario por estado (by_usuario, MyTickets)
+            models.Index(fields=['id_usuario', 'estado'], name='ticket_usuario_estado_idx'),
+            # Ticket vigente de un contenedor (consulta rápida, escaneo)
+            models.Index(fields=['id_contenedor', 'estado'], name='ticket_cont_estado_idx'),
+            # Índice parcial: solo los tickets activos, en orden de llegada (monitores)
+            models.Index(
+                fields=['fecha_hora_entrada'], name='ticket_activos_entrada_idx',
+                condition=models.Q(estado__in=ESTADOS_TICKET_ACTIVOS)
+            ),
+        ]
 
     def __str__(self):
         # Corregido E0307
         return f"Ticket {self.id} - {self.estado}"
 
 
+class TicketEliminado(models.Model):
+    """Registro (lápida) de un ticket eliminado, para la sincronización incremental."""
+    id = models.AutoField(primary_key=True)
+    id_ticket = models.IntegerField()
+    fecha_eliminacion = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        """Metadatos del modelo TicketEliminado."""
+        db_table = 'Ticket_eliminado'
+
+    def __str__(self):
+        return f"Ticket eliminado {self.id_ticket}"
+
+
+class ResumenHorario(models.Model):
+    """
+    Resumen de tickets por hora, zona y estado, mantenido de forma incremental.
+
+    Cada ticket cuenta una vez, en la fila de su estado actual y de la hora de
+    su último hito (la salida si la tiene; si no, la entrada). Lo mantiene
+    core.resumenes y se reconstruye con `reconstruir_resumen_horario`.
+    """
+    id = models.AutoField(primary_key=True)
+    hora = models.DateTimeField()
+    id_zona = models.ForeignKey(Zona, db_column='id_zona', on_delete=models.CASCADE)
+    estado = models.CharField(max_length=50)
+    tickets = models.IntegerField(default=0)
+    # Tickets con salida registrada y suma de sus estadías (salida - entrada)
+    con_salida = models.IntegerField(default=0)
+    estadia_total = models.DurationField(default=timedelta)
+
+    class Meta:
+        """Metadatos del modelo ResumenHorario."""
+        db_table = 'Resumen_horario'
+        constraints = [
+            # Clave del upsert incremental; su índice sirve también los rangos por hora
+            models.UniqueConstraint(
+                fields=['hora', 'id_zona', 'estado'], name='resumen_hora_zona_estado_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.hora:%Y-%m-%d %H}h zona {self.id_zona_id} {self.estado}: {self.tickets}"
+
+
 class Factura(models.Model):
     """Modelo que gestiona la información de la facturación asociada a un ticket."""
     id = models.AutoField(primary_key=True)
-    fecha_emision = models.DateField()
+    fecha_emision = models.DateField(db_index=True)
     monto = models.FloatField()
-    estado = models.CharField(max_length=50)
+    estado = models.CharField(max_length=50, db_index=True)
     # C0301 Corregido:
     id_ticket = models.ForeignKey(
         Ticket, db_column='id_ticket', on_delete=models.CASCADE
@@ -221,7 +311,7 @@ class Factura(models.Model):
 class Pago(models.Model):
     """Modelo que registra la información de los pagos realizados para una factura."""
     id = models.AutoField(primary_key=True)
-    fecha_pago = models.DateField()
+    fecha_pago = models.DateField(db_index=True)
     medio_pago = models.CharField(max_length=30)
     monto = models.FloatField()
     # C0301 Corregido:
@@ -239,11 +329,23 @@ class Pago(models.Model):
 
 
 class Reporte(models.Model):
-    """Modelo que registra la metadata de los reportes generados por el sistema."""
+    """Modelo que registra los reportes solicitados y su resultado materializado."""
+    ESTADO_PENDIENTE = 'pendiente'
+    ESTADO_PROCESANDO = 'procesando'
+    ESTADO_COMPLETADO = 'completado'
+    ESTADO_ERROR = 'error'
+
     id = models.AutoField(primary_key=True)
     tipo = models.CharField(max_length=50)
     fecha_generacion = models.DateField()
-    parametros = models.CharField(max_length=50)
+    # JSON canónico de los parámetros (core.reportes)
+    parametros = models.TextField(blank=True, default='')
+    # Hash de tipo + parámetros: las peticiones repetidas reutilizan el resultado
+    huella = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    estado = models.CharField(max_length=20, default=ESTADO_PENDIENTE)
+    resultado = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    fecha_completado = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         """Metadatos del modelo Reporte."""
@@ -252,3 +354,21 @@ class Reporte(models.Model):
     def __str__(self):
         # Corregido E0307
         return f"Reporte {self.id} - {self.tipo}"
+
+
+class VersionTabla(models.Model):
+    """
+    Contador de versión por tabla, incrementado tras cada escritura confirmada.
+
+    Permite calcular ETag y Last-Modified de los listados sin serializar nada.
+    """
+    tabla = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    fecha_modificacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """Metadatos del modelo VersionTabla."""
+        db_table = 'Version_tabla'
+
+    def __str__(self):
+        return f"{self.tabla} v{self.version}"
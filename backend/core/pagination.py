@@ -0,0 +1,89 @@
+"""
+Paginación por cursor (keyset) para los ViewSets de la aplicación 'core'.
+
+La paginación es opcional: solo se activa cuando la petición envía
+`page_size` o `cursor`, de modo que los clientes existentes siguen recibiendo
+la lista completa. El total solo se calcula si se pide con `con_total=true`
+y, en PostgreSQL, se estima a partir de las estadísticas del planificador.
+"""
+import json
+
+from django.db import connections
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+# Por debajo de este número de filas estimadas se hace un COUNT(*) exacto:
+# es barato y las estimaciones del planificador son poco fiables en tablas pequeñas.
+UMBRAL_CONTEO_EXACTO = 1000
+
+VALORES_VERDADEROS = ('1', 'true', 'si', 'sí')
+
+
+def estimar_total(queryset):
+    """
+    Devuelve una tupla (total, es_estimado) para el queryset.
+
+    En PostgreSQL lee las filas previstas por el planificador con EXPLAIN, lo
+    que evita recorrer la tabla; en otros motores realiza un COUNT(*) exacto.
+    """
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count(), False
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimado = int(plan[0]['Plan']['Plan Rows'])
+    if estimado < UMBRAL_CONTEO_EXACTO:
+        return queryset.count(), False
+    return estimado, True
+
+
+class CursorPaginacionOpcional(CursorPagination):
+    """
+    Paginación por cursor activada a demanda mediante parámetros de consulta.
+
+    El orden por defecto es `-id`; un ViewSet puede declarar
+    `ordenes_cursor` con otros órdenes permitidos sobre columnas indexadas,
+    que el cliente elige con `?orden=<campo>`.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = '-id'
+    orden_query_param = 'orden'
+    total_query_param = 'con_total'
+    total = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Pagina solo si la petición lo solicita; si no, devuelve None."""
+        params = request.query_params
+        if self.page_size_query_param not in params and self.cursor_query_param not in params:
+            return None
+
+        if params.get(self.total_query_param, '').lower() in VALORES_VERDADEROS:
+            self.total = estimar_total(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        """Aplica el orden pedido en `?orden=` si el ViewSet lo permite."""
+        ordenes = getattr(view, 'ordenes_cursor', {})
+        orden = request.query_params.get(self.orden_query_param)
+        if orden in ordenes:
+            return ordenes[orden]
+        return super().get_ordering(request, queryset, view)
+
+    def get_paginated_response(self, data):
+        """Añade `count` y `count_estimado` a la respuesta cuando se pidió el total."""
+        contenido = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.total is not None:
+            contenido['count'], contenido['count_estimado'] = self.total
+        return Response(contenido)
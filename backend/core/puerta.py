@@ -0,0 +1,78 @@
+"""
+Operaciones de puerta: check-in de un contenedor en una sola transacción.
+
+`registrar_check_in` sustituye a la secuencia de peticiones que hacía la
+pantalla de escaneo (buscar contenedor, tickets y citas, crear el ticket,
+marcar el slot y actualizar la cita). Todo ocurre en una transacción con un
+número fijo de consultas, de modo que no quedan check-ins a medias y la
+latencia de la puerta no depende de los viajes de ida y vuelta del cliente.
+"""
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from rest_framework import status
+
+from .asignacion import asignar_slot
+from .models import Contenedor, Ticket
+
+ESTADO_TICKET_CHECK_IN = 'Validado'
+ESTADO_CITA_CHECK_IN = 'en_proceso'
+
+
+class CheckInRechazado(Exception):
+    """El check-in no puede realizarse; lleva el mensaje y el código HTTP a devolver."""
+
+    def __init__(self, mensaje, codigo=status.HTTP_400_BAD_REQUEST):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.codigo = codigo
+
+
+def registrar_check_in(codigo_barras, zona_id):
+    """
+    Valida el contenedor, le asigna un slot de la zona, crea su ticket y
+    pasa la cita a 'en_proceso'. Devuelve el ticket creado.
+
+    El contenedor se bloquea durante la transacción para que dos lecturas
+    simultáneas del mismo código no generen dos tickets.
+    """
+    with transaction.atomic():
+        contenedor = Contenedor.objects.select_related(
+            'id_buque', 'id_cita_recojo__id_cliente'
+        ).annotate(
+            procesado=Exists(Ticket.objects.filter(id_contenedor=OuterRef('pk')))
+        ).select_for_update(of=('self',)).filter(codigo_barras=codigo_barras).first()
+
+        if contenedor is None:
+            raise CheckInRechazado('Contenedor no encontrado', status.HTTP_404_NOT_FOUND)
+        cita = contenedor.id_cita_recojo
+        if cita is None or cita.id_cliente is None:
+            raise CheckInRechazado(
+                'El contenedor no tiene una cita de recojo con cliente asociada'
+            )
+        if contenedor.procesado:
+            raise CheckInRechazado(
+                'El contenedor ya fue procesado: tiene un ticket creado',
+                status.HTTP_409_CONFLICT
+            )
+        if cita.fecha_envio and timezone.localdate() < cita.fecha_envio:
+            raise CheckInRechazado(
+                f'La fecha de envío es {cita.fecha_envio}: aún no se puede recibir el contenedor'
+            )
+
+        slot = asignar_slot(zona_id)
+        if slot is None:
+            raise CheckInRechazado(
+                'No hay slots disponibles en la zona', status.HTTP_409_CONFLICT
+            )
+
+        ticket = Ticket.objects.create(
+            fecha_hora_entrada=timezone.now(),
+            estado=ESTADO_TICKET_CHECK_IN,
+            id_ubicacion=slot,
+            id_usuario=cita.id_cliente,
+            id_contenedor=contenedor,
+        )
+        cita.estado = ESTADO_CITA_CHECK_IN
+        cita.save(update_fields=['estado'])
+    return ticket
@@ -0,0 +1,255 @@
+"""
+Motor de reportes: cálculo en segundo plano y resultado materializado en Reporte.
+
+Solicitar un reporte (`solicitar_reporte`) crea o reutiliza la fila de
+Reporte identificada por la huella de su tipo y sus parámetros y, si aún no
+tiene resultado, encola la tarea Celery `core.tasks.generar_reporte`. Las
+peticiones repetidas con los mismos parámetros se sirven del resultado ya
+guardado sin volver a calcular, salvo que el reporte siga abierto (estado
+actual o rango que llega a hoy) y su resultado tenga más de
+`REPORTES_VIGENCIA_ABIERTOS` segundos.
+
+Cada tipo de reporte se calcula con agregaciones SQL (GROUP BY, AVG, COUNT)
+sobre los índices existentes, sin recorrer filas en Python. Los reportes por
+zona pueden repartir sus zonas entre un pool de procesos (`REPORTES_PROCESOS`).
+"""
+import hashlib
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import django
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Min, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Factura, Pago, Reporte, Ticket, UbicacionSlot, Zona, ESTADOS_SLOT_LIBRE
+
+# Ventana por defecto de los reportes con rango de fechas
+DIAS_POR_DEFECTO = 30
+
+
+class ReporteInvalido(Exception):
+    """El tipo o los parámetros del reporte no son válidos."""
+
+
+def _fecha(parametros, campo):
+    valor = parametros.get(campo)
+    try:
+        fecha = parse_date(str(valor)) if valor else None
+    except ValueError:
+        fecha = None
+    if valor and fecha is None:
+        raise ReporteInvalido(f'Fecha no válida en {campo} (AAAA-MM-DD)')
+    return fecha
+
+
+def _rango(parametros):
+    """Normaliza `desde`/`hasta` (AAAA-MM-DD) con una ventana por defecto."""
+    hasta = _fecha(parametros, 'hasta') or timezone.localdate()
+    desde = _fecha(parametros, 'desde') or hasta - timedelta(days=DIAS_POR_DEFECTO)
+    if desde > hasta:
+        raise ReporteInvalido('La fecha desde no puede ser posterior a hasta')
+    return {'desde': desde.isoformat(), 'hasta': hasta.isoformat()}
+
+
+def _tickets_en_rango(parametros):
+    desde = date.fromisoformat(parametros['desde'])
+    hasta = date.fromisoformat(parametros['hasta'])
+    return Ticket.objects.filter(
+        fecha_hora_entrada__date__gte=desde, fecha_hora_entrada__date__lte=hasta
+    )
+
+
+def _ocupacion_zonas(parametros):  # pylint: disable=unused-argument
+    """Slots totales, libres y ocupados de cada zona en una sola consulta."""
+    filas = UbicacionSlot.objects.values('id_zona', 'id_zona__nombre').annotate(
+        total=Count('id'), libres=Count('id', filter=Q(estado__in=ESTADOS_SLOT_LIBRE))
+    ).order_by('id_zona')
+    return [{
+        'zona_id': fila['id_zona'],
+        'zona_nombre': fila['id_zona__nombre'],
+        'total': fila['total'],
+        'libres': fila['libres'],
+        'ocupados': fila['total'] - fila['libres'],
+    } for fila in filas]
+
+
+def _volumen_diario(parametros):
+    """Tickets de entrada por día y estado dentro del rango."""
+    filas = _tickets_en_rango(parametros).annotate(
+        dia=TruncDate('fecha_hora_entrada')
+    ).values('dia', 'estado').annotate(cantidad=Count('id')).order_by('dia', 'estado')
+    por_dia = {}
+    for fila in filas:
+        dia = por_dia.setdefault(fila['dia'].isoformat(), {'fecha': fila['dia'].isoformat(),
+                                                           'cantidad': 0, 'por_estado': {}})
+        dia['cantidad'] += fila['cantidad']
+        dia['por_estado'][fila['estado']] = fila['cantidad']
+    return list(por_dia.values())
+
+
+def _facturacion(parametros):
+    """Facturado por mes y estado, y cobrado por medio de pago, dentro del rango."""
+    facturas = Factura.objects.filter(
+        fecha_emision__gte=parametros['desde'], fecha_emision__lte=parametros['hasta']
+    ).annotate(mes=TruncMonth('fecha_emision')).values('mes', 'estado').annotate(
+        cantidad=Count('id'), monto=Sum('monto')
+    ).order_by('mes', 'estado')
+    pagos = Pago.objects.filter(
+        fecha_pago__gte=parametros['desde'], fecha_pago__lte=parametros['hasta']
+    ).values('medio_pago').annotate(cantidad=Count('id'), monto=Sum('monto')).order_by('medio_pago')
+    return {
+        'facturas': [dict(fila, mes=fila['mes'].strftime('%Y-%m')) for fila in facturas],
+        'pagos': list(pagos),
+    }
+
+
+def estadia_zona(zona_id, parametros):
+    """
+    Estadía (salida - entrada) de los tickets cerrados de una zona.
+
+    Se ejecuta por zona, en el proceso actual o en un proceso del pool.
+    """
+    duracion = ExpressionWrapper(
+        F('fecha_hora_salida') - F('fecha_hora_entrada'), output_field=DurationField()
+    )
+    tickets = _tickets_en_rango(parametros).filter(
+        id_ubicacion__id_zona=zona_id, fecha_hora_salida__isnull=False
+    ).annotate(duracion=duracion)
+    agregado = tickets.aggregate(
+        cantidad=Count('id'), promedio=Avg('duracion'), minimo=Min('duracion'),
+        maximo=Max('duracion')
+    )
+    mediana = None
+    if agregado['cantidad']:
+        # Percentil 50 con ORDER BY + OFFSET en la base de datos
+        mediana = tickets.order_by('duracion').values_list(
+            'duracion', flat=True)[(agregado['cantidad'] - 1) // 2]
+
+    def minutos(valor):
+        return round(valor.total_seconds() / 60, 2) if valor is not None else None
+
+    return {
+        'zona_id': zona_id,
+        'tickets': agregado['cantidad'],
+        'promedio_min': minutos(agregado['promedio']),
+        'mediana_min': minutos(mediana),
+        'minimo_min': minutos(agregado['minimo']),
+        'maximo_min': minutos(agregado['maximo']),
+    }
+
+
+def _por_zona(funcion, parametros):
+    """Aplica `funcion(zona_id, parametros)` a cada zona, en paralelo si está configurado."""
+    zonas = dict(Zona.objects.order_by('id').values_list('id', 'nombre'))
+    procesos = min(getattr(settings, 'REPORTES_PROCESOS', 0), len(zonas))
+    if procesos > 1:
+        # 'spawn': cada proceso abre sus propias conexiones en lugar de heredar las del padre.
+        # El inicializador es django.setup y no una función de este módulo: importar
+        # core.reportes en el proceso hijo exige que las aplicaciones ya estén cargadas.
+        with ProcessPoolExecutor(
+            max_workers=procesos, mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup
+        ) as pool:
+            filas = list(pool.map(funcion, zonas, [parametros] * len(zonas)))
+    else:
+        filas = [funcion(zona_id, parametros) for zona_id in zonas]
+    for fila in filas:
+        fila['zona_nombre'] = zonas[fila['zona_id']]
+    return filas
+
+
+def _estadia_por_zona(parametros):
+    return _por_zona(estadia_zona, parametros)
+
+
+# tipo -> (normalizador de parámetros, cálculo)
+TIPOS_REPORTE = {
+    'ocupacion_zonas': (lambda parametros: {}, _ocupacion_zonas),
+    'volumen_diario': (_rango, _volumen_diario),
+    'facturacion': (_rango, _facturacion),
+    'estadia_por_zona': (_rango, _estadia_por_zona),
+}
+
+
+def huella_reporte(tipo, parametros):
+    """Hash estable del tipo y los parámetros normalizados."""
+    canonico = json.dumps({'tipo': tipo, 'parametros': parametros}, sort_keys=True)
+    return hashlib.sha256(canonico.encode()).hexdigest()
+
+
+def reporte_caducado(reporte):
+    """
+    True si el resultado de `reporte` puede haber cambiado desde que se calculó.
+
+    Un reporte sin rango describe el estado actual y uno cuyo rango llegaba a la
+    fecha del cálculo no incluía el resto de ese día: ambos caducan a los
+    `REPORTES_VIGENCIA_ABIERTOS` segundos. Un rango ya cerrado no caduca.
+    """
+    if reporte.estado != Reporte.ESTADO_COMPLETADO or reporte.fecha_completado is None:
+        return False
+    hasta = json.loads(reporte.parametros or '{}').get('hasta')
+    calculado = timezone.localdate(reporte.fecha_completado)
+    if hasta is not None and date.fromisoformat(hasta) < calculado:
+        return False
+    vigencia = timedelta(seconds=getattr(settings, 'REPORTES_VIGENCIA_ABIERTOS', 60))
+    return timezone.now() - reporte.fecha_completado >= vigencia
+
+
+def solicitar_reporte(tipo, parametros=None, regenerar=False):
+    """
+    Devuelve el Reporte de `tipo` y `parametros`, encolando su cálculo si hace falta.
+
+    Con `regenerar=True`, si el cálculo anterior falló o si el resultado ha
+    caducado (`reporte_caducado`) se vuelve a calcular.
+    """
+    if tipo not in TIPOS_REPORTE:
+        raise ReporteInvalido(f'Tipo de reporte desconocido: {tipo}')
+    if parametros is not None and not isinstance(parametros, dict):
+        raise ReporteInvalido('Los parámetros deben ser un objeto')
+    normalizar, _ = TIPOS_REPORTE[tipo]
+    parametros = normalizar(parametros or {})
+    huella = huella_reporte(tipo, parametros)
+
+    with transaction.atomic():
+        reporte, creado = Reporte.objects.select_for_update().get_or_create(
+            huella=huella, defaults={
+                'tipo': tipo, 'parametros': json.dumps(parametros, sort_keys=True),
+                'fecha_generacion': timezone.localdate(),
+            }
+        )
+        if (creado or regenerar or reporte.estado == Reporte.ESTADO_ERROR
+                or reporte_caducado(reporte)):
+            if not creado:
+                reporte.estado = Reporte.ESTADO_PENDIENTE
+                reporte.error = ''
+                reporte.fecha_generacion = timezone.localdate()
+                reporte.save(update_fields=['estado', 'error', 'fecha_generacion'])
+            # Import diferido: core.tasks importa este módulo
+            from .tasks import generar_reporte  # pylint: disable=import-outside-toplevel
+            transaction.on_commit(lambda: generar_reporte.delay(reporte.id))
+    return reporte
+
+
+def calcular_reporte(reporte):
+    """Calcula y guarda el resultado de `reporte` (lo ejecuta la tarea Celery)."""
+    _, calcular = TIPOS_REPORTE[reporte.tipo]
+    reporte.estado = Reporte.ESTADO_PROCESANDO
+    reporte.save(update_fields=['estado'])
+    try:
+        resultado = calcular(json.loads(reporte.parametros or '{}'))
+    except Exception as error:  # pylint: disable=broad-except
+        reporte.estado = Reporte.ESTADO_ERROR
+        reporte.error = str(error)
+        reporte.save(update_fields=['estado', 'error'])
+        return reporte
+    reporte.resultado = resultado
+    reporte.estado = Reporte.ESTADO_COMPLETADO
+    reporte.fecha_completado = timezone.now()
+    reporte.save(update_fields=['resultado', 'estado', 'fecha_completado'])
+    return reporte
@@ -0,0 +1,262 @@
+"""
+Resumen horario de tickets (ResumenHorario) mantenido de forma incremental.
+
+Las preguntas de rendimiento del patio (tickets por zona y hora, estadía
+media, completados hoy) se responden leyendo unas cientos de filas
+preagregadas por (hora, zona, estado) en lugar de recorrer el histórico de
+tickets. Cada ticket cuenta una vez, en la fila de su estado actual y de la
+hora de su último hito (`fecha_hora_salida` o, si no la tiene,
+`fecha_hora_entrada`).
+
+El resumen se mantiene con deltas:
+- las escrituras individuales (save/delete) restan la aportación anterior
+  del ticket y suman la nueva desde core.signals;
+- las escrituras masivas de core.lotes usan `CambioResumen`, que agrega en SQL
+  las filas afectadas antes y después de escribirlas.
+Los deltas se aplican tras el commit con un upsert por fila de resumen, fuera
+de la transacción del ticket, para no serializar todas las escrituras de una
+misma hora sobre la misma fila. Las escrituras que no pasan por ninguno de
+los dos caminos (QuerySet.update, scripts) se corrigen con
+`reconstruir_resumen` (comando `reconstruir_resumen_horario`).
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Sum
+from django.db.models.functions import Coalesce, TruncHour
+from django.utils import timezone
+
+from .lotes import SeguimientoLote
+from .models import ResumenHorario, Ticket, UbicacionSlot
+
+TAMANO_LOTE = 1000
+
+
+def _instante(valor):
+    """Normaliza un valor asignado a un DateTimeField (texto o datetime sin zona)."""
+    valor = Ticket._meta.get_field('fecha_hora_entrada').to_python(valor)
+    if valor is not None and timezone.is_naive(valor):
+        # Como hace el campo al guardarlo (con aviso de Django)
+        valor = timezone.make_aware(valor)
+    return valor
+
+
+def hora_resumen(entrada, salida):
+    """Hora (truncada, en la zona horaria actual) en la que se resume un ticket."""
+    return timezone.localtime(salida or entrada).replace(minute=0, second=0, microsecond=0)
+
+
+def valores_resumen(ticket):
+    """
+    Campos del ticket que determinan su aportación al resumen.
+
+    Se leen de __dict__ para no disparar consultas con campos diferidos.
+    """
+    return tuple(ticket.__dict__.get(campo) for campo in (
+        'estado', 'fecha_hora_entrada', 'fecha_hora_salida', 'id_ubicacion_id'
+    ))
+
+
+class Deltas:
+    """Variaciones de (tickets, con_salida, estadia_total) por clave de resumen."""
+
+    def __init__(self):
+        self.filas = defaultdict(lambda: [0, 0, timedelta(0)])
+
+    def sumar(self, clave, tickets, con_salida, estadia, signo=1):
+        """Acumula una aportación (signo=-1 para restarla)."""
+        fila = self.filas[clave]
+        fila[0] += signo * tickets
+        fila[1] += signo * con_salida
+        fila[2] += signo * estadia
+
+    def sumar_ticket(self, valores, signo=1):
+        """Acumula la aportación de un ticket con clave (hora, ubicación, estado)."""
+        estado, entrada, salida, ubicacion = valores
+        entrada, salida = _instante(entrada), _instante(salida)
+        if estado is None or entrada is None or ubicacion is None:
+            return
+        self.sumar((hora_resumen(entrada, salida), ubicacion, estado), 1,
+                   1 if salida else 0, salida - entrada if salida else timedelta(0), signo)
+
+    def restar(self, otros):
+        """Resta otro conjunto de deltas con las mismas claves."""
+        for clave, (tickets, con_salida, estadia) in otros.filas.items():
+            self.sumar(clave, tickets, con_salida, estadia, signo=-1)
+        return self
+
+    def no_nulas(self):
+        """Filas con alguna variación."""
+        return {clave: fila for clave, fila in self.filas.items() if any(fila)}
+
+
+def cambio_ticket(anterior, actual):
+    """Deltas (por ubicación) de un ticket que pasa de `anterior` a `actual`."""
+    deltas = Deltas()
+    if anterior is not None:
+        deltas.sumar_ticket(anterior, signo=-1)
+    if actual is not None:
+        deltas.sumar_ticket(actual)
+    return deltas
+
+
+def aplicar_cambio_ticket(deltas, zonas=None):
+    """
+    Aplica deltas con clave (hora, ubicación, estado) traduciendo ubicaciones a zonas.
+
+    `zonas` ({ubicación: zona}) evita la consulta si la zona ya se conoce.
+    """
+    filas = deltas.no_nulas()
+    if not filas:
+        return
+    zonas = dict(zonas or {})
+    faltan = {ubicacion for _, ubicacion, _ in filas} - zonas.keys()
+    if faltan:
+        zonas.update(UbicacionSlot.objects.filter(pk__in=faltan).values_list('id', 'id_zona'))
+    por_zona = Deltas()
+    for (hora, ubicacion, estado), fila in filas.items():
+        if ubicacion in zonas:
+            por_zona.sumar((hora, zonas[ubicacion], estado), *fila)
+    aplicar_deltas(por_zona)
+
+
+def aplicar_deltas(deltas):
+    """Suma los deltas (clave (hora, zona, estado)) al resumen con un upsert por fila."""
+    filas = deltas.no_nulas()
+    if not filas:
+        return
+    tabla = connection.ops.quote_name(ResumenHorario._meta.db_table)
+    campo_hora = ResumenHorario._meta.get_field('hora')
+    campo_estadia = ResumenHorario._meta.get_field('estadia_total')
+    parametros = [
+        (campo_hora.get_db_prep_value(hora, connection), zona, estado, tickets, con_salida,
+         campo_estadia.get_db_prep_value(estadia, connection))
+        for (hora, zona, estado), (tickets, con_salida, estadia) in filas.items()
+    ]
+    with transaction.atomic(), connection.cursor() as cursor:
+        # ON CONFLICT ... DO UPDATE: PostgreSQL y SQLite >= 3.24
+        cursor.executemany(
+            f'INSERT INTO {tabla} (hora, id_zona, estado, tickets, con_salida, estadia_total) '
+            'VALUES (%s, %s, %s, %s, %s, %s) '
+            'ON CONFLICT (hora, id_zona, estado) DO UPDATE SET '
+            f'tickets = {tabla}.tickets + excluded.tickets, '
+            f'con_salida = {tabla}.con_salida + excluded.con_salida, '
+            f'estadia_total = {tabla}.estadia_total + excluded.estadia_total',
+            parametros
+        )
+        if any(fila[0] < 0 for fila in filas.values()):
+            ResumenHorario.objects.filter(
+                hora__in={hora for hora, _, _ in filas}, tickets__lte=0
+            ).delete()
+
+
+def aportes_tickets(queryset):
+    """Aportación agregada en SQL de los tickets de `queryset`, por (hora, zona, estado)."""
+    estadia = ExpressionWrapper(
+        F('fecha_hora_salida') - F('fecha_hora_entrada'), output_field=DurationField()
+    )
+    filas = queryset.order_by().values(
+        'estado', hora=TruncHour(Coalesce('fecha_hora_salida', 'fecha_hora_entrada')),
+        zona=F('id_ubicacion__id_zona'),
+    ).annotate(
+        n_tickets=Count('id'), n_salida=Count('fecha_hora_salida'), suma_estadia=Sum(estadia)
+    )
+    deltas = Deltas()
+    for fila in filas:
+        deltas.sumar((fila['hora'], fila['zona'], fila['estado']), fila['n_tickets'],
+                     fila['n_salida'], fila['suma_estadia'] or timedelta(0))
+    return deltas
+
+
+class CambioResumen(SeguimientoLote):
+    """
+    Refleja en el resumen una escritura masiva sobre los tickets `ids`.
+
+    Agrega las filas afectadas al entrar y al salir del bloque (dentro de la
+    misma transacción) y aplica la diferencia tras el commit. En las altas,
+    `ids` se asigna dentro del bloque, una vez creadas las filas.
+    """
+
+    def __enter__(self):
+        self._antes = self._aportes()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            deltas = self._aportes().restar(self._antes)
+            transaction.on_commit(lambda: aplicar_deltas(deltas))
+        return False
+
+    def _aportes(self):
+        if not self.ids:
+            return Deltas()
+        return aportes_tickets(Ticket.objects.filter(pk__in=self.ids))
+
+
+def _inicio_de_dia(fecha):
+    return timezone.make_aware(datetime.combine(fecha, time.min))
+
+
+def reconstruir_resumen(desde=None, hasta=None):
+    """
+    Recalcula el resumen desde los tickets, entre las fechas `desde` y `hasta` (inclusive).
+
+    Sin fechas reconstruye la tabla completa. Devuelve el número de filas escritas.
+    """
+    referencia = Coalesce('fecha_hora_salida', 'fecha_hora_entrada')
+    tickets = Ticket.objects.annotate(referencia=referencia)
+    resumen = ResumenHorario.objects.all()
+    if desde is not None:
+        tickets = tickets.filter(referencia__gte=_inicio_de_dia(desde))
+        resumen = resumen.filter(hora__gte=_inicio_de_dia(desde))
+    if hasta is not None:
+        limite = _inicio_de_dia(hasta + timedelta(days=1))
+        tickets = tickets.filter(referencia__lt=limite)
+        resumen = resumen.filter(hora__lt=limite)
+
+    with transaction.atomic():
+        resumen.delete()
+        filas = [
+            ResumenHorario(hora=hora, id_zona_id=zona, estado=estado, tickets=n_tickets,
+                           con_salida=con_salida, estadia_total=estadia)
+            for (hora, zona, estado), (n_tickets, con_salida, estadia)
+            in aportes_tickets(tickets).no_nulas().items()
+        ]
+        ResumenHorario.objects.bulk_create(filas, batch_size=TAMANO_LOTE)
+    return len(filas)
+
+
+def rendimiento(desde, hasta, zona=None):
+    """
+    Lee el resumen entre `desde` y `hasta` (datetimes) para los paneles.
+
+    Devuelve las filas por hora y los totales por estado, con la estadía media.
+    """
+    filas = ResumenHorario.objects.filter(hora__gte=desde, hora__lt=hasta)
+    if zona is not None:
+        filas = filas.filter(id_zona=zona)
+    por_hora, por_estado = [], defaultdict(int)
+    con_salida, estadia = 0, timedelta(0)
+    for fila in filas.order_by('hora', 'id_zona', 'estado').values(
+            'hora', 'id_zona', 'estado', 'tickets', 'con_salida', 'estadia_total'):
+        por_hora.append({
+            'hora': fila['hora'], 'zona_id': fila['id_zona'], 'estado': fila['estado'],
+            'tickets': fila['tickets'],
+            'estadia_promedio_min': _promedio_minutos(fila['estadia_total'], fila['con_salida']),
+        })
+        por_estado[fila['estado']] += fila['tickets']
+        con_salida += fila['con_salida']
+        estadia += fila['estadia_total']
+    return {
+        'desde': desde,
+        'hasta': hasta,
+        'por_estado': dict(por_estado),
+        'total': sum(por_estado.values()),
+        'estadia_promedio_min': _promedio_minutos(estadia, con_salida),
+        'por_hora': por_hora,
+    }
+
+
+def _promedio_minutos(estadia, cantidad):
+    return round(estadia.total_seconds() / 60 / cantidad, 2) if cantidad else None
@@ -107,6 +107,8 @@ class ContenedorSerializer(serializers.ModelSerializer):
     """Serializador para el modelo Contenedor, incluyendo información de la cita y el buque."""
     cita_info = serializers.SerializerMethodField()
     buque_nombre = serializers.CharField(source='id_buque.nombre', read_only=True)
+    # Claves de los objetos que devuelven los SerializerMethodField (columnas del CSV)
+    campos_anidados = {'cita_info': ('fecha_envio', 'fecha_recojo', 'cliente', 'estado')}
     class Meta:
         """Clase Meta para ContenedorSerializer."""
         model = Contenedor
@@ -140,13 +142,17 @@ class TicketSerializer(serializers.ModelSerializer):
     usuario_nombre = serializers.CharField(source='id_usuario.nombre', read_only=True)
     contenedor_info = serializers.SerializerMethodField()
     ubicacion_info = serializers.SerializerMethodField()
+    # Claves de los objetos que devuelven los SerializerMethodField (columnas del CSV)
+    campos_anidados = {
+        'contenedor_info': ('codigo_barras', 'numero_contenedor', 'tipo', 'dimensiones', 'peso'),
+        'ubicacion_info': ('fila', 'columna', 'nivel', 'zona_nombre', 'zona_id'),
+    }
     class Meta:
         """Clase Meta para TicketSerializer."""
         model = Ticket
         # C0301 Corregido: Se divide la lista de campos en múltiples líneas
         fields = [
             'id', 'fecha_hora_entrada', 'fecha_hora_salida', 'estado',
-                  'id_ubicacion', 'ubicacion_info', 'id_usuario', 'usuario_nombre', 
             'id_ubicacion', 'ubicacion_info', 'id_usuario', 'usuario_nombre',
             'id_contenedor', 'contenedor_info', 'fecha_modificacion'
         ]
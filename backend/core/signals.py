@@ -0,0 +1,219 @@
+"""
+Receptores de señales de la aplicación 'core'.
+
+Mantienen coherentes las cachés en memoria cuando se escriben las filas de
+las que dependen y publican las transiciones de estado en el broker de
+eventos. Se conectan en CoreConfig.ready().
+"""
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from .asignacion import slots_libres
+from .autenticacion import revocar_tokens_usuario
+from .cache import busqueda_contenedores
+from .catalogos import purgar_catalogo
+from .eventos import obtener_broker
+from .estadisticas import estadisticas_dashboard
+from .resumenes import aplicar_cambio_ticket, cambio_ticket, valores_resumen
+from .versiones import MODELOS_VERSIONADOS, incrementar_version
+from .models import (
+    Rol, NivelAcceso, Buque, Usuario, Zona, Contenedor, Ticket, TicketEliminado,
+    CitaRecojo, UbicacionSlot
+)
+
+
+def _invalidar_busqueda(*dependencias):
+    """
+    Expulsa de la caché de búsquedas las entradas que dependen de las filas
+    (etiqueta, pk) indicadas, ahora y de nuevo tras el commit.
+
+    La segunda vez descarta lo que una búsqueda concurrente haya guardado
+    leyendo todavía la fila confirmada anterior.
+    """
+    def invalidar():
+        for etiqueta, pk in dependencias:
+            busqueda_contenedores.invalidar(etiqueta, pk)
+    invalidar()
+    transaction.on_commit(invalidar)
+
+
+def _limpiar_estadisticas():
+    """
+    Descarta las estadísticas del panel ahora y de nuevo tras el commit.
+
+    Como en `_invalidar_busqueda`, la segunda vez descarta los conteos que
+    una petición concurrente haya guardado antes de ver la escritura.
+    """
+    estadisticas_dashboard.limpiar()
+    transaction.on_commit(estadisticas_dashboard.limpiar)
+
+
+@receiver([post_save, post_delete], sender=Contenedor)
+def invalidar_busqueda_por_contenedor(sender, instance,  # pylint: disable=unused-argument
+                                      **kwargs):
+    """Un contenedor escrito invalida sus búsquedas en caché."""
+    _invalidar_busqueda(('contenedor', instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Ticket)
+def invalidar_busqueda_por_ticket(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Un ticket nuevo o modificado cambia el ticket activo de su contenedor."""
+    _invalidar_busqueda(('ticket', instance.pk), ('contenedor', instance.id_contenedor_id))
+
+
+@receiver([post_save, post_delete], sender=CitaRecojo)
+def invalidar_busqueda_por_cita(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Una cita escrita invalida las búsquedas de sus contenedores."""
+    _invalidar_busqueda(('cita', instance.pk))
+
+
+@receiver([post_save, post_delete], sender=UbicacionSlot)
+def invalidar_busqueda_por_slot(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Un slot escrito invalida las búsquedas que lo muestran."""
+    _invalidar_busqueda(('slot', instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Ticket)
+@receiver([post_save, post_delete], sender=Usuario)
+@receiver([post_save, post_delete], sender=UbicacionSlot)
+@receiver([post_save, post_delete], sender=Zona)
+@receiver([post_save, post_delete], sender=Rol)
+def invalidar_estadisticas_dashboard(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Cualquier escritura en las tablas contadas descarta las estadísticas en caché."""
+    _limpiar_estadisticas()
+
+
+@receiver(post_delete, sender=Ticket)
+def registrar_ticket_eliminado(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Deja constancia del borrado para que la sincronización incremental lo informe."""
+    TicketEliminado.objects.create(id_ticket=instance.pk)
+
+
+@receiver(post_init, sender=Ticket)
+@receiver(post_init, sender=UbicacionSlot)
+def recordar_estado_inicial(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Guarda el estado cargado para detectar transiciones al guardar."""
+    # Se lee de __dict__ para no disparar una consulta si 'estado' está diferido
+    instance._estado_inicial = instance.__dict__.get('estado')  # pylint: disable=protected-access
+
+
+def _publicar_transicion(instance, created, evento):
+    """Publica `evento` tras el commit si la fila es nueva o cambió de estado."""
+    anterior = None if created else instance._estado_inicial  # pylint: disable=protected-access
+    if not created and anterior == instance.estado:
+        return
+    instance._estado_inicial = instance.estado  # pylint: disable=protected-access
+    evento.update(id_fila=instance.pk, estado=instance.estado, estado_anterior=anterior)
+    transaction.on_commit(lambda: obtener_broker().publicar(evento))
+
+
+@receiver(post_save, sender=Ticket)
+def publicar_transicion_ticket(sender, instance, created,  # pylint: disable=unused-argument
+                               **kwargs):
+    """Notifica a los monitores la creación o el cambio de estado de un ticket."""
+    _publicar_transicion(instance, created, {
+        'tipo': 'ticket',
+        'id_ubicacion': instance.id_ubicacion_id,
+        'id_contenedor': instance.id_contenedor_id,
+        'id_usuario': instance.id_usuario_id,
+    })
+
+
+@receiver(post_save, sender=UbicacionSlot)
+def publicar_transicion_slot(sender, instance, created,  # pylint: disable=unused-argument
+                             **kwargs):
+    """Notifica a los monitores la ocupación o liberación de un slot."""
+    _publicar_transicion(instance, created, {'tipo': 'slot', 'id_zona': instance.id_zona_id})
+
+
+def incrementar_version_tabla(sender, **kwargs):
+    """Incrementa la versión de la tabla escrita una vez confirmada la transacción."""
+    transaction.on_commit(lambda: incrementar_version(sender))
+
+
+for _modelo in MODELOS_VERSIONADOS:
+    post_save.connect(incrementar_version_tabla, sender=_modelo,
+                      dispatch_uid=f'version_{_modelo.__name__}_save')
+    post_delete.connect(incrementar_version_tabla, sender=_modelo,
+                        dispatch_uid=f'version_{_modelo.__name__}_delete')
+
+
+@receiver([post_save, post_delete], sender=Rol)
+@receiver([post_save, post_delete], sender=NivelAcceso)
+@receiver([post_save, post_delete], sender=Zona)
+@receiver([post_save, post_delete], sender=Buque)
+def purgar_cache_catalogo(sender, **kwargs):
+    """Purga las respuestas cacheadas del catálogo escrito, en todos los workers."""
+    transaction.on_commit(lambda: purgar_catalogo(sender))
+
+
+@receiver(post_save, sender=UbicacionSlot)
+def actualizar_mapa_slots_libres(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Refleja en el mapa de slots libres el estado confirmado del slot."""
+    transaction.on_commit(lambda: slots_libres.actualizar(instance))
+
+
+@receiver(post_delete, sender=UbicacionSlot)
+def descartar_mapa_slots_libres(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Un slot borrado deja la rejilla de su zona desactualizada."""
+    transaction.on_commit(lambda: slots_libres.descartar(instance.id_zona_id))
+
+
+@receiver(post_init, sender=Ticket)
+def recordar_resumen_inicial(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Guarda los campos cargados que determinan la fila del ticket en el resumen horario."""
+    instance._resumen_inicial = valores_resumen(instance)  # pylint: disable=protected-access
+
+
+def _actualizar_resumen(instance, anterior, actual):
+    """Aplica tras el commit el cambio del ticket en el resumen horario."""
+    deltas = cambio_ticket(anterior, actual)
+    if not deltas.no_nulas():
+        return
+    zonas = {}
+    if Ticket.id_ubicacion.is_cached(instance):
+        zonas[instance.id_ubicacion_id] = instance.id_ubicacion.id_zona_id
+    transaction.on_commit(lambda: aplicar_cambio_ticket(deltas, zonas))
+
+
+@receiver(post_save, sender=Ticket)
+def actualizar_resumen_horario(sender, instance, created,  # pylint: disable=unused-argument
+                               **kwargs):
+    """Mueve el ticket de su fila anterior del resumen horario a la actual."""
+    anterior = None if created else instance._resumen_inicial  # pylint: disable=protected-access
+    actual = valores_resumen(instance)
+    instance._resumen_inicial = actual  # pylint: disable=protected-access
+    _actualizar_resumen(instance, anterior, actual)
+
+
+@receiver(post_delete, sender=Ticket)
+def descontar_resumen_horario(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Un ticket borrado deja de contar en el resumen horario."""
+    _actualizar_resumen(instance, valores_resumen(instance), None)
+
+
+@receiver(post_init, sender=Usuario)
+def recordar_password_inicial(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Guarda el hash cargado para detectar cambios de contraseña al guardar."""
+    password = instance.__dict__.get('password')
+    instance._password_inicial = password  # pylint: disable=protected-access
+
+
+@receiver(post_save, sender=Usuario)
+def revocar_tokens_por_cambio(sender, instance, created,  # pylint: disable=unused-argument
+                              **kwargs):
+    """Desactivar a un usuario o cambiar su contraseña invalida los tokens ya emitidos."""
+    anterior = instance._password_inicial  # pylint: disable=protected-access
+    actual = instance.__dict__.get('password')
+    instance._password_inicial = actual  # pylint: disable=protected-access
+    if created:
+        return
+    if not instance.__dict__.get('activo', True) or anterior not in (None, actual):
+        transaction.on_commit(lambda: revocar_tokens_usuario(instance.pk))
+
+
+@receiver(post_delete, sender=Usuario)
+def revocar_tokens_por_borrado(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Un usuario eliminado no puede seguir usando sus tokens."""
+    transaction.on_commit(lambda: revocar_tokens_usuario(instance.pk))
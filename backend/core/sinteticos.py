@@ -0,0 +1,365 @@
+"""
+Generador determinista de datos sintéticos a escala de puerto.
+
+Reproduce en local tablas del tamaño de producción (millones de filas) con
+datos coherentes entre sí: zonas con su rejilla de slots, buques, clientes y
+operarios, citas, contenedores, tickets, facturas y pagos.
+
+- Todo se deriva de la semilla: cada lote usa su propio `random.Random`
+  sembrado con (semilla, entidad, inicio del lote), así que el resultado no
+  depende del número de procesos ni del orden en que terminan los lotes.
+- Los ids se asignan de antemano a partir del máximo existente (id base +
+  índice) y las claves foráneas se calculan con aritmética, sin consultar lo
+  que ya se insertó.
+- Los lotes se generan en un pool de procesos; cada proceso devuelve filas
+  ya preparadas para la base y el proceso principal solo las escribe con
+  `cargar_filas` (COPY en PostgreSQL, executemany en el resto), un lote por
+  transacción.
+- La contraseña de todos los usuarios se hashea una sola vez.
+
+Reglas de coherencia:
+- el ~3 % de los tickets más recientes siguen activos (sin salida), cada uno
+  en un slot distinto que queda 'ocupado'; el resto de slots queda libre;
+- los tickets completados tienen una estadía de entre 30 minutos y 72 horas,
+  una factura y, el 85 %, un pago por el mismo monto;
+- cuatro de cada cinco contenedores llegan con cita y su ticket pertenece al
+  cliente de la cita.
+"""
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from math import gcd
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .lotes import notificar_escritura_masiva
+from .manifiestos import cargar_filas
+from .models import (
+    ESTADO_SLOT_OCUPADO, ESTADOS_TICKET_ACTIVOS, Buque, CitaRecojo, Contenedor, Factura,
+    NivelAcceso, Pago, Rol, Ticket, UbicacionSlot, Usuario, Zona
+)
+from .resumenes import reconstruir_resumen
+
+TAMANO_LOTE = 10000
+PORCENTAJE_ACTIVOS = 0.03
+PORCENTAJE_PAGADAS = 0.85
+PASSWORD_POR_DEFECTO = 'sintetico'
+
+TIPOS_CONTENEDOR = {
+    # tipo: (dimensiones, tarifa base)
+    '20ft': ('20x8x8', 150.0),
+    '40ft': ('40x8x8', 250.0),
+    '40ft HC': ('40x8x9', 280.0),
+}
+TARIFA_DIA = 35.0
+MEDIOS_PAGO = ('Tarjeta', 'Transferencia', 'Efectivo')
+LINEAS_NAVIERAS = ('Maersk', 'MSC', 'CMA CGM', 'Hapag-Lloyd', 'COSCO', 'Evergreen')
+
+CAMPOS = {
+    Usuario: ('id', 'nombre', 'email', 'password', 'telefono', 'empresa', 'id_rol',
+              'id_nivel_acceso', 'fecha_creacion', 'fecha_modificacion', 'activo'),
+    UbicacionSlot: ('id', 'fila', 'columna', 'nivel', 'estado', 'id_zona'),
+    CitaRecojo: ('id', 'fecha_envio', 'fecha_recojo', 'duracion_viaje_dias', 'estado',
+                 'id_cliente', 'fecha_creacion', 'fecha_inicio_horario',
+                 'fecha_salida_horario'),
+    Contenedor: ('id', 'codigo_barras', 'numero_contenedor', 'dimensiones', 'tipo', 'peso',
+                 'id_buque', 'id_cita_recojo'),
+    Ticket: ('id', 'fecha_hora_entrada', 'fecha_hora_salida', 'estado', 'id_ubicacion',
+             'id_usuario', 'id_contenedor', 'fecha_modificacion'),
+    Factura: ('id', 'fecha_emision', 'monto', 'estado', 'id_ticket'),
+    Pago: ('id', 'fecha_pago', 'medio_pago', 'monto', 'id_factura'),
+}
+# Orden de carga (las claves foráneas apuntan siempre a modelos anteriores)
+MODELOS_PATIO = (CitaRecojo, Contenedor, Ticket, Factura, Pago)
+
+OPCIONES_POR_DEFECTO = {
+    'semilla': 42,
+    'contenedores': 100_000,
+    'clientes': None,  # por defecto, uno por cada 50 contenedores
+    'operarios': 20,
+    'zonas': 8,
+    'filas': 20,
+    'columnas': 25,
+    'niveles': 4,
+    'buques': 50,
+    'dias': 90,
+    'lote': TAMANO_LOTE,
+    'password': PASSWORD_POR_DEFECTO,
+    'resumen': True,
+}
+
+
+def _rng(plan, entidad, inicio):
+    return random.Random(f"{plan['semilla']}:{entidad}:{inicio}")
+
+
+# Tipos de campo cuyo valor de Python no acepta directamente el driver
+CAMPOS_A_ADAPTAR = ('DateField', 'DateTimeField', 'DurationField')
+
+
+def _preparar(modelo, filas):
+    """Convierte los valores de Python de `filas` al formato de la base de datos."""
+    conexion = connections[DEFAULT_DB_ALIAS]
+    adaptar = [
+        i for i, campo in enumerate(CAMPOS[modelo])
+        if modelo._meta.get_field(campo).get_internal_type() in CAMPOS_A_ADAPTAR
+    ]
+    if not adaptar:
+        return filas
+    campos = {i: modelo._meta.get_field(CAMPOS[modelo][i]) for i in adaptar}
+    preparadas = []
+    for fila in filas:
+        fila = list(fila)
+        # Enteros, textos, reales y booleanos ya son valores nativos del driver
+        for i, campo in campos.items():
+            fila[i] = campo.get_db_prep_save(fila[i], conexion)
+        preparadas.append(fila)
+    return preparadas
+
+
+def lote_usuarios(plan, inicio, fin):
+    """Usuarios [inicio, fin): primero los operarios y después los clientes."""
+    rng = _rng(plan, 'usuarios', inicio)
+    filas = []
+    for i in range(inicio, fin):
+        pk = plan['base']['usuario'] + i
+        operario = i < plan['operarios']
+        alta = plan['fin'] - timedelta(days=plan['dias'] + rng.randint(1, 365))
+        filas.append((
+            pk, f"{'Operario' if operario else 'Cliente'} {pk}",
+            f"{'operario' if operario else 'cliente'}{pk}@sintetico.local",
+            plan['password'], f'9{rng.randint(10_000_000, 99_999_999)}',
+            'ENAPU' if operario else f'Empresa {rng.randint(1, 500)}',
+            plan['rol_operario'] if operario else plan['rol_cliente'],
+            plan['nivel_operario'] if operario else plan['nivel_cliente'],
+            alta, alta, operario or rng.random() > 0.05,
+        ))
+    return {Usuario: _preparar(Usuario, filas)}
+
+
+def slot_ocupado(plan, indice):
+    """Indica si el slot `indice` (global) lo ocupa un ticket activo."""
+    # El ticket activo k ocupa el slot k * paso % total: se invierte la permutación
+    return indice * plan['paso_inverso'] % plan['total_slots'] < plan['activos']
+
+
+def lote_slots(plan, zona):
+    """Rejilla completa de slots de la zona número `zona`."""
+    por_zona = plan['filas'] * plan['columnas'] * plan['niveles']
+    por_fila = plan['columnas'] * plan['niveles']
+    filas = []
+    for k in range(por_zona):
+        indice = zona * por_zona + k
+        filas.append((
+            plan['base']['slot'] + indice, k // por_fila + 1,
+            k // plan['niveles'] % plan['columnas'] + 1, k % plan['niveles'] + 1,
+            ESTADO_SLOT_OCUPADO if slot_ocupado(plan, indice) else 'disponible',
+            plan['zonas'][zona],
+        ))
+    return {UbicacionSlot: _preparar(UbicacionSlot, filas)}
+
+
+def _cliente(plan, rng):
+    return plan['base']['usuario'] + plan['operarios'] + rng.randrange(plan['clientes'])
+
+
+def lote_patio(plan, inicio, fin):  # pylint: disable=too-many-locals
+    """Contenedores [inicio, fin) con su cita, su ticket, su factura y su pago."""
+    rng = _rng(plan, 'patio', inicio)
+    base = plan['base']
+    total = plan['contenedores']
+    ventana = timedelta(days=plan['dias'])
+    filas = {modelo: [] for modelo in MODELOS_PATIO}
+    for i in range(inicio, fin):
+        # Entradas repartidas en la ventana y ordenadas por índice
+        entrada = plan['fin'] - ventana + ventana * ((i + rng.random()) / total)
+        k_activo = i - (total - plan['activos'])
+        tipo = rng.choice(tuple(TIPOS_CONTENEDOR))
+        dimensiones, tarifa = TIPOS_CONTENEDOR[tipo]
+        usuario = _cliente(plan, rng)
+
+        cita = None
+        if i % 5:
+            cita = base['cita'] + i
+            viaje = rng.randint(8, 25)
+            recojo = entrada.date() + timedelta(days=rng.randint(0, 3))
+            envio = entrada - timedelta(days=viaje)
+            filas[CitaRecojo].append((
+                cita, envio.date(), recojo, viaje,
+                'confirmada' if k_activo >= 0 else 'completada', usuario, envio,
+                recojo, recojo + timedelta(days=2),
+            ))
+        contenedor = base['contenedor'] + i
+        filas[Contenedor].append((
+            contenedor, f'SIM-{contenedor:010d}', f'SIMU{contenedor % 10_000_000:07d}',
+            dimensiones, tipo, float(rng.randint(15000, 30000)),
+            plan['buques'][rng.randrange(len(plan['buques']))], cita,
+        ))
+
+        ticket = base['ticket'] + i
+        if k_activo >= 0:
+            slot = k_activo * plan['paso'] % plan['total_slots']
+            filas[Ticket].append((
+                ticket, entrada, None, rng.choice(ESTADOS_TICKET_ACTIVOS),
+                base['slot'] + slot, usuario, contenedor, entrada,
+            ))
+            continue
+        estadia = timedelta(minutes=rng.randint(30, 72 * 60))
+        # Sin salidas en el futuro: la estadía se recorta al final de la ventana
+        salida = entrada + max(min(estadia, plan['fin'] - entrada), timedelta(minutes=1))
+        filas[Ticket].append((
+            ticket, entrada, salida, 'Completado',
+            base['slot'] + rng.randrange(plan['total_slots']), usuario, contenedor, salida,
+        ))
+        factura = base['factura'] + i
+        monto = round(tarifa + TARIFA_DIA * (estadia.days + 1), 2)
+        pagada = rng.random() < PORCENTAJE_PAGADAS
+        filas[Factura].append((
+            factura, salida.date(), monto, 'Pagada' if pagada else 'Pendiente', ticket
+        ))
+        if pagada:
+            fecha_pago = min(salida.date() + timedelta(days=rng.randint(0, 3)),
+                             plan['fin'].date())
+            filas[Pago].append((
+                base['pago'] + i, fecha_pago, rng.choice(MEDIOS_PAGO), monto, factura
+            ))
+    return {modelo: _preparar(modelo, valores) for modelo, valores in filas.items()}
+
+
+def _siguiente_id(modelo):
+    return (modelo.objects.aggregate(maximo=Max('id'))['maximo'] or 0) + 1
+
+
+def _paso(total):
+    """Un paso coprimo con `total`, para repartir los tickets activos entre zonas."""
+    paso = 7919  # primo
+    while gcd(paso, total) != 1:
+        paso += 2
+    return paso % total or 1
+
+
+def _referencia(nombre, modelo, campo):
+    objeto = modelo.objects.filter(**{campo: nombre}).order_by('id').first()
+    return objeto.id if objeto else modelo.objects.create(**{campo: nombre}).id
+
+
+def planificar(opciones, fin=None):
+    """
+    Crea las filas pequeñas (roles, niveles, zonas, buques) y calcula el plan.
+
+    El plan es un dict serializable que reciben los procesos del pool.
+    """
+    plan = dict(OPCIONES_POR_DEFECTO, **opciones)
+    rng = random.Random(f"{plan['semilla']}:plan")
+    contenedores = plan['contenedores']
+    plan['clientes'] = max(1, plan['clientes'] or contenedores // 50)
+    # Final de la ventana: la hora en punto actual (fija para repetir una generación)
+    plan['fin'] = fin or timezone.now().replace(minute=0, second=0, microsecond=0)
+    plan['password'] = make_password(plan['password'])
+
+    plan['rol_cliente'] = _referencia('CLIENTE', Rol, 'rol')
+    plan['rol_operario'] = _referencia('OPERARIO', Rol, 'rol')
+    plan['nivel_cliente'] = _referencia('Básico', NivelAcceso, 'nivel')
+    plan['nivel_operario'] = _referencia('Operativo', NivelAcceso, 'nivel')
+
+    por_zona = plan['filas'] * plan['columnas'] * plan['niveles']
+    with transaction.atomic():
+        base_zona = _siguiente_id(Zona)
+        zonas = Zona.objects.bulk_create(
+            Zona(id=base_zona + z, nombre=f'Sintética {base_zona + z}', capacidad=por_zona)
+            for z in range(plan['zonas'])
+        )
+        base_buque = _siguiente_id(Buque)
+        buques = Buque.objects.bulk_create(
+            Buque(id=base_buque + b, nombre=f'Buque {base_buque + b}',
+                  linea_naviera=rng.choice(LINEAS_NAVIERAS))
+            for b in range(plan['buques'])
+        )
+    plan['zonas'] = [zona.id for zona in zonas]
+    plan['buques'] = [buque.id for buque in buques]
+
+    plan['total_slots'] = por_zona * len(plan['zonas'])
+    plan['activos'] = min(round(contenedores * PORCENTAJE_ACTIVOS), plan['total_slots'])
+    plan['paso'] = _paso(plan['total_slots'])
+    plan['paso_inverso'] = pow(plan['paso'], -1, plan['total_slots'])
+    plan['base'] = {
+        'usuario': _siguiente_id(Usuario), 'slot': _siguiente_id(UbicacionSlot),
+        'cita': _siguiente_id(CitaRecojo), 'contenedor': _siguiente_id(Contenedor),
+        'ticket': _siguiente_id(Ticket), 'factura': _siguiente_id(Factura),
+        'pago': _siguiente_id(Pago),
+    }
+    return plan
+
+
+def _tareas(plan):
+    """(entidad, función, argumentos) de cada lote, en orden de carga."""
+    usuarios = plan['operarios'] + plan['clientes']
+    for inicio in range(0, usuarios, plan['lote']):
+        yield 'usuarios', lote_usuarios, (plan, inicio, min(inicio + plan['lote'], usuarios))
+    for zona in range(len(plan['zonas'])):
+        yield 'slots', lote_slots, (plan, zona)
+    total = plan['contenedores']
+    for inicio in range(0, total, plan['lote']):
+        yield 'patio', lote_patio, (plan, inicio, min(inicio + plan['lote'], total))
+
+
+def _cargar(lote):
+    with transaction.atomic():
+        for modelo, filas in lote.items():
+            cargar_filas(modelo, CAMPOS[modelo], filas)
+    return {modelo: len(filas) for modelo, filas in lote.items()}
+
+
+def _resultados(tareas, procesos):
+    """Ejecuta las tareas en orden, en el proceso actual o en un pool de procesos."""
+    if procesos <= 1:
+        for entidad, funcion, argumentos in tareas:
+            yield entidad, funcion(*argumentos)
+        return
+    # 'spawn' con django.setup como inicializador (igual que core.reportes); como
+    # mucho 2 lotes por proceso en vuelo para acotar la memoria del padre
+    with ProcessPoolExecutor(
+        max_workers=procesos, mp_context=multiprocessing.get_context('spawn'),
+        initializer=django.setup
+    ) as pool:
+        pendientes = []
+        for entidad, funcion, argumentos in tareas:
+            pendientes.append((entidad, pool.submit(funcion, *argumentos)))
+            if len(pendientes) >= 2 * procesos:
+                entidad_lista, futuro = pendientes.pop(0)
+                yield entidad_lista, futuro.result()
+        for entidad, futuro in pendientes:
+            yield entidad, futuro.result()
+
+
+def generar_datos(opciones, procesos=1, fin=None, al_avanzar=None):
+    """
+    Genera e inserta el conjunto de datos descrito por `opciones`.
+
+    `al_avanzar(entidad, filas)` se llama tras cargar cada lote. Devuelve
+    el número de filas insertadas por tabla.
+    """
+    plan = planificar(opciones, fin)
+    insertadas = {Zona: len(plan['zonas']), Buque: len(plan['buques'])}
+    for entidad, lote in _resultados(_tareas(plan), procesos):
+        for modelo, cantidad in _cargar(lote).items():
+            insertadas[modelo] = insertadas.get(modelo, 0) + cantidad
+        if al_avanzar:
+            al_avanzar(entidad, sum(len(filas) for filas in lote.values()))
+
+    with transaction.atomic():
+        # Las secuencias de PostgreSQL no se enteran de los ids explícitos
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), list(insertadas)):
+                cursor.execute(sql)
+        for modelo in insertadas:
+            notificar_escritura_masiva(modelo)
+    if plan['resumen']:
+        reconstruir_resumen()
+    return {modelo._meta.db_table: cantidad for modelo, cantidad in insertadas.items()}
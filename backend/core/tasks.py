@@ -0,0 +1,33 @@
+"""
+Tareas Celery de la aplicación 'core'.
+"""
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Reporte, TicketEliminado
+from .reportes import calcular_reporte
+
+
+@shared_task
+def generar_reporte(reporte_id):
+    """Calcula el reporte `reporte_id` y guarda su resultado en la fila."""
+    reporte = Reporte.objects.filter(pk=reporte_id).first()
+    if reporte is not None:
+        calcular_reporte(reporte)
+
+
+def limite_retencion_eliminados():
+    """Instante a partir del cual se conservan las lápidas de tickets eliminados."""
+    return timezone.now() - timedelta(days=settings.SINCRONIZACION_RETENCION_DIAS)
+
+
+@shared_task
+def purgar_tickets_eliminados():
+    """Borra las lápidas más antiguas que la retención; devuelve cuántas."""
+    borrados, _ = TicketEliminado.objects.filter(
+        fecha_eliminacion__lt=limite_retencion_eliminados()
+    ).delete()
+    return borrados
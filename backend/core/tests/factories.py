@@ -0,0 +1,102 @@
+"""
+Constructores de datos compartidos por las pruebas de 'core'.
+
+Cada función crea sus propias filas relacionadas (rol, nivel, buque, zona...)
+con nombres únicos, de modo que pueden llamarse varias veces en una prueba.
+"""
+import uuid
+from datetime import date
+
+from django.contrib.auth.hashers import make_password
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import (
+    Rol, NivelAcceso, Usuario, Zona, UbicacionSlot,
+    Buque, CitaRecojo, Contenedor, Ticket
+)
+
+# Lectura de versiones para el ETag (core.versiones) + consulta principal con JOIN
+CONSULTAS_LECTURA = 2
+
+
+def crear_operador():
+    """Crea un usuario operador con rol y nivel de acceso propios."""
+    rol = Rol.objects.create(rol="Operador")
+    nivel = NivelAcceso.objects.create(nivel="Basico")
+    return Usuario.objects.create(
+        nombre="Operador",
+        email=f"op_{uuid.uuid4().hex[:8]}@test.com",
+        id_rol=rol,
+        id_nivel_acceso=nivel
+    )
+
+
+def crear_cliente():
+    """Crea un usuario cliente con rol y nivel de acceso propios."""
+    rol = Rol.objects.create(rol="CLIENTE")
+    nivel = NivelAcceso.objects.create(nivel="Basico")
+    return Usuario.objects.create(
+        nombre="Cliente Test",
+        email=f"cli_{uuid.uuid4().hex[:8]}@test.com",
+        id_rol=rol,
+        id_nivel_acceso=nivel
+    )
+
+
+def crear_usuario(email='cliente@test.com', password='clave123', hasher='default',
+                  nombre='Cliente', rol='Cliente'):
+    """Crea un usuario con contraseña, listo para iniciar sesión."""
+    return Usuario.objects.create(
+        nombre=nombre, email=email, password=make_password(password, hasher=hasher),
+        id_rol=Rol.objects.create(rol=rol),
+        id_nivel_acceso=NivelAcceso.objects.create(nivel='Basico'),
+    )
+
+
+def login(client, email='cliente@test.com', password='clave123', ip='10.0.0.1', **extra):
+    """POST al login con el cliente de pruebas; devuelve la respuesta."""
+    return client.post(reverse('usuario-login'), {'email': email, 'password': password},
+                       content_type='application/json', REMOTE_ADDR=ip, **extra)
+
+
+def crear_tickets(cantidad, usuario=None, estado="PENDIENTE"):
+    """Crea `cantidad` tickets, cada uno con su propia zona, slot y contenedor."""
+    usuario = usuario or crear_operador()
+    buque = Buque.objects.create(nombre="Buque Test", linea_naviera="Linea X")
+    tickets = []
+    for _ in range(cantidad):
+        zona = Zona.objects.create(nombre=f"Z{uuid.uuid4().hex[:4]}", capacidad=10)
+        slot = UbicacionSlot.objects.create(
+            fila=1, columna=1, nivel=1, estado="ocupado", id_zona=zona
+        )
+        contenedor = Contenedor.objects.create(
+            codigo_barras=f"CONT-{uuid.uuid4().hex}",
+            dimensiones="20", tipo="Dry", peso=100, id_buque=buque
+        )
+        tickets.append(Ticket.objects.create(
+            fecha_hora_entrada=timezone.now(),
+            estado=estado,
+            id_ubicacion=slot,
+            id_usuario=usuario,
+            id_contenedor=contenedor
+        ))
+    return tickets
+
+
+def crear_contenedores(cantidad):
+    """Crea `cantidad` contenedores, cada uno con su buque, cita y cliente."""
+    contenedores = []
+    for _ in range(cantidad):
+        buque = Buque.objects.create(nombre=f"B{uuid.uuid4().hex[:4]}", linea_naviera="L")
+        cita = CitaRecojo.objects.create(
+            fecha_envio=date(2025, 1, 1),
+            fecha_recojo=date(2025, 1, 10),
+            id_cliente=crear_cliente()
+        )
+        contenedores.append(Contenedor.objects.create(
+            codigo_barras=f"CONT-{uuid.uuid4().hex}",
+            dimensiones="40", tipo="Dry", peso=1000,
+            id_buque=buque, id_cita_recojo=cita
+        ))
+    return contenedores
@@ -0,0 +1,141 @@
+"""
+Pruebas del login asíncrono: pool de hash, límites de intentos y rehash (core.acceso).
+"""
+import threading
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from core.acceso import PoolHash
+from core.tests.factories import crear_usuario, login
+
+# Hash rápido para que los intentos fallidos no dominen la duración de las pruebas
+HASHERS_RAPIDOS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+@pytest.fixture(autouse=True)
+def _cache_vacia():
+    """Los contadores de intentos viven en la caché: cada prueba empieza vacía."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+@override_settings(PASSWORD_HASHERS=HASHERS_RAPIDOS, LOGIN_MAX_FALLOS_EMAIL=3)
+def test_fallos_por_email_bloquean_sin_tocar_base_ni_hasher(client, django_assert_num_queries):
+    """Superado el límite, el login responde 429 antes de consultar o hashear."""
+    crear_usuario()
+    for _ in range(3):
+        assert login(client, password='mala').status_code == status.HTTP_401_UNAUTHORIZED
+
+    with django_assert_num_queries(0), mock.patch('core.views.pool_hash') as pool:
+        respuesta = login(client)
+
+    pool.enviar.assert_not_called()
+    assert respuesta.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert respuesta['Retry-After']
+    # Otro email desde la misma IP sigue pudiendo entrar
+    crear_usuario(email='otro@test.com')
+    assert login(client, email='otro@test.com').status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+@override_settings(PASSWORD_HASHERS=HASHERS_RAPIDOS, LOGIN_MAX_FALLOS_IP=2)
+def test_fallos_por_ip_cuentan_emails_distintos(client):
+    """Probar emails distintos desde una IP también agota su límite."""
+    crear_usuario()
+    login(client, email='nadie1@test.com')
+    login(client, email='nadie2@test.com')
+
+    assert login(client).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert login(client, ip='10.0.0.2').status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+@override_settings(PASSWORD_HASHERS=HASHERS_RAPIDOS, LOGIN_MAX_FALLOS_IP=2,
+                   PROXIES_CONFIABLES=['10.0.0.0/8'])
+def test_detras_de_un_proxy_confiable_cuenta_la_ip_reenviada(client):
+    """Los clientes que llegan por el mismo proxy no comparten el límite de IP."""
+    crear_usuario()
+    for email in ('nadie1@test.com', 'nadie2@test.com'):
+        login(client, email=email, HTTP_X_FORWARDED_FOR='203.0.113.7, 10.1.2.3')
+
+    assert login(client, HTTP_X_FORWARDED_FOR='203.0.113.7').status_code == \
+        status.HTTP_429_TOO_MANY_REQUESTS
+    assert login(client, HTTP_X_FORWARDED_FOR='198.51.100.4').status_code == status.HTTP_200_OK
+    # Desde fuera de los proxies confiables la cabecera no se tiene en cuenta
+    assert login(client, ip='203.0.113.7', HTTP_X_FORWARDED_FOR='198.51.100.4').status_code == \
+        status.HTTP_429_TOO_MANY_REQUESTS
+
+
+@pytest.mark.django_db
+@override_settings(PASSWORD_HASHERS=HASHERS_RAPIDOS, LOGIN_MAX_FALLOS_IP=2,
+                   PROXIES_CONFIABLES=[])
+def test_detras_de_un_proxy_no_configurado_no_limita_por_ip(client):
+    """Sin PROXIES_CONFIABLES la IP del proxy no bloquea a todos sus clientes."""
+    crear_usuario()
+    for email in ('nadie1@test.com', 'nadie2@test.com', 'nadie3@test.com'):
+        login(client, email=email, HTTP_X_FORWARDED_FOR='203.0.113.7')
+
+    assert login(client, HTTP_X_FORWARDED_FOR='198.51.100.4').status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+@override_settings(PASSWORD_HASHERS=HASHERS_RAPIDOS, LOGIN_MAX_FALLOS_EMAIL=2)
+def test_login_correcto_reinicia_el_contador_del_email(client):
+    """Un acierto entre fallos evita el bloqueo del email."""
+    crear_usuario()
+    login(client, password='mala')
+    assert login(client).status_code == status.HTTP_200_OK
+    login(client, password='mala')
+
+    assert login(client).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_rehash_transparente_sin_revocar_tokens(client):
+    """Un hash con parámetros antiguos se recalcula y los tokens emitidos siguen valiendo."""
+    with override_settings(PASSWORD_HASHERS=HASHERS_RAPIDOS):
+        usuario = crear_usuario()
+    assert usuario.password.startswith('md5$')
+
+    with override_settings(PASSWORD_HASHERS=[
+            'django.contrib.auth.hashers.PBKDF2PasswordHasher', *HASHERS_RAPIDOS]):
+        respuesta = login(client)
+
+    assert respuesta.status_code == status.HTTP_200_OK
+    usuario.refresh_from_db()
+    assert usuario.password.startswith('pbkdf2_sha256$')
+    yo = client.get(reverse('auth-yo'), HTTP_AUTHORIZATION=f"Bearer {respuesta.data['access']}")
+    assert yo.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+@override_settings(PASSWORD_HASHERS=HASHERS_RAPIDOS)
+def test_pool_saturado_responde_503(client):
+    """Sin cupo en el pool el login se rechaza en lugar de encolar sin límite."""
+    crear_usuario()
+    with mock.patch('core.views.pool_hash.enviar', return_value=None):
+        respuesta = login(client)
+
+    assert respuesta.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert respuesta['Retry-After'] == '1'
+
+
+def test_pool_hash_limita_las_verificaciones_pendientes():
+    """El pool acepta como mucho `max_pendientes` tareas a la vez."""
+    pool = PoolHash(hilos=1, max_pendientes=2)
+    liberar = threading.Event()
+
+    primeras = [pool.enviar(liberar.wait, 5) for _ in range(2)]
+    assert pool.enviar(liberar.wait, 5) is None
+
+    liberar.set()
+    for futuro in primeras:
+        futuro.result(timeout=5)
+    assert pool.enviar(lambda: 'ok').result(timeout=5) == 'ok'
@@ -0,0 +1,118 @@
+"""
+Pruebas de la asignación atómica de slots (core.asignacion).
+"""
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from core.asignacion import MapaSlotsLibres, asignar_slot, slots_libres
+from core.models import UbicacionSlot, Zona
+
+
+@pytest.fixture(autouse=True)
+def _mapas_vacios():
+    """Los mapas de proceso no deben arrastrar zonas de otras pruebas."""
+    slots_libres.descartar()
+    yield
+    slots_libres.descartar()
+
+
+def _crear_zona(filas=2, columnas=2, niveles=1, estado='disponible'):
+    """Crea una zona con una rejilla completa de slots en `estado`."""
+    zona = Zona.objects.create(nombre="Zona A", capacidad=filas * columnas * niveles)
+    UbicacionSlot.objects.bulk_create(
+        UbicacionSlot(fila=f, columna=c, nivel=n, estado=estado, id_zona=zona)
+        for f in range(1, filas + 1)
+        for c in range(1, columnas + 1)
+        for n in range(1, niveles + 1)
+    )
+    return zona
+
+
+def test_mapa_devuelve_candidatos_en_orden_de_rejilla():
+    """Los candidatos salen por fila, columna y nivel, sin los ocupados ni excluidos."""
+    mapa = MapaSlotsLibres([
+        (10, 2, 1, 1, True), (11, 1, 2, 1, True), (12, 1, 1, 1, False), (13, 1, 1, 2, True),
+    ])
+
+    assert mapa.candidatos(10) == [13, 11, 10]
+    assert mapa.candidatos(10, excluir={11}) == [13, 10]
+    assert mapa.candidatos(1) == [13]
+    assert mapa.libres == 3
+
+    mapa.marcar(13, 1, 1, 2, False)
+    mapa.marcar(12, 1, 1, 1, True)
+    assert mapa.candidatos(10) == [12, 11, 10]
+
+
+def test_mapa_detecta_posiciones_fuera_de_rejilla_y_compartidas():
+    """Una posición nueva pide reconstruir; una repetida se guarda aparte."""
+    mapa = MapaSlotsLibres([(1, 1, 1, 1, False)])
+
+    assert mapa.marcar(2, 5, 1, 1, True) is False
+    assert mapa.marcar(3, 1, 1, 1, True) is True
+    assert mapa.candidatos(5) == [3]
+
+
+@pytest.mark.django_db
+def test_asignar_ocupa_el_primer_slot_libre(client):
+    """El endpoint marca el slot como ocupado y lo devuelve."""
+    zona = _crear_zona()
+
+    response = client.post(reverse('ubicacionslot-asignar'), {'id_zona': zona.id},
+                           content_type='application/json')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert (response.data['fila'], response.data['columna']) == (1, 1)
+    assert UbicacionSlot.objects.get(pk=response.data['id']).estado == 'ocupado'
+
+
+@pytest.mark.django_db
+def test_asignar_nunca_repite_y_agota_la_zona(client):
+    """Cada asignación entrega un slot distinto hasta agotar la zona."""
+    zona = _crear_zona()
+    url = reverse('ubicacionslot-asignar')
+
+    ids = [client.post(url, {'id_zona': zona.id}, content_type='application/json').data['id']
+           for _ in range(4)]
+    agotada = client.post(url, {'id_zona': zona.id}, content_type='application/json')
+
+    assert len(set(ids)) == 4
+    assert agotada.status_code == status.HTTP_409_CONFLICT
+
+
+@pytest.mark.django_db
+def test_asignar_valida_la_zona(client):
+    """Sin un id_zona numérico se responde 400."""
+    response = client.post(reverse('ubicacionslot-asignar'), {}, content_type='application/json')
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_asignar_tolera_un_mapa_desactualizado():
+    """Si otro proceso ocupó o liberó slots, la base de datos manda."""
+    zona = _crear_zona(estado='Disponible')
+    slots_libres.obtener(zona.id)
+    # Escrituras que el mapa de este proceso no ve (sin señales)
+    UbicacionSlot.objects.filter(id_zona=zona).update(estado='ocupado')
+    libre = UbicacionSlot.objects.filter(id_zona=zona).order_by('-id').first()
+    UbicacionSlot.objects.filter(pk=libre.pk).update(estado='disponible')
+
+    assert asignar_slot(zona.id).pk == libre.pk
+    assert asignar_slot(zona.id) is None
+
+
+@pytest.mark.django_db
+def test_slot_liberado_vuelve_al_mapa(django_capture_on_commit_callbacks):
+    """Liberar un slot con save() lo devuelve al mapa tras el commit."""
+    zona = _crear_zona(filas=1, columnas=1)
+    with django_capture_on_commit_callbacks(execute=True):
+        slot = asignar_slot(zona.id)
+    assert slots_libres.obtener(zona.id).libres == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        slot.estado = 'disponible'
+        slot.save()
+
+    assert slots_libres.obtener(zona.id).candidatos(5) == [slot.pk]
@@ -0,0 +1,106 @@
+"""
+Pruebas de la autenticación JWT sin estado (core.autenticacion).
+"""
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+
+from core.tests.factories import crear_usuario, login
+
+
+@pytest.fixture(autouse=True)
+def _cache_vacia():
+    """La lista de revocación vive en la caché: cada prueba empieza vacía."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _crear_usuario(email='operario@test.com', password='clave123'):
+    return crear_usuario(email, password, nombre='Operario Uno', rol='Operario')
+
+
+def _login(client, email='operario@test.com', password='clave123'):
+    respuesta = login(client, email, password)
+    assert respuesta.status_code == status.HTTP_200_OK
+    return respuesta.data
+
+
+def _yo(client, access):
+    return client.get(reverse('auth-yo'), HTTP_AUTHORIZATION=f'Bearer {access}')
+
+
+def _refrescar(client, refresh):
+    return client.post(reverse('auth-refrescar'), {'refresh': refresh},
+                       content_type='application/json')
+
+
+@pytest.mark.django_db
+def test_login_emite_tokens_y_la_identidad_no_consulta_la_base(client, django_assert_num_queries):
+    """El token lleva rol y nivel de acceso; autenticar no lee sesión ni Usuario."""
+    usuario = _crear_usuario()
+    tokens = _login(client)
+
+    with django_assert_num_queries(0):
+        respuesta = _yo(client, tokens['access'])
+
+    assert respuesta.status_code == status.HTTP_200_OK
+    assert respuesta.data == {'id': usuario.id, 'email': 'operario@test.com',
+                              'nombre': 'Operario Uno', 'rol': 'Operario',
+                              'nivel_acceso': 'Basico'}
+
+
+@pytest.mark.django_db
+def test_sin_token_o_con_token_alterado_responde_401(client):
+    """La identidad requiere un token válido."""
+    _crear_usuario()
+    access = _login(client)['access']
+
+    assert client.get(reverse('auth-yo')).status_code in (401, 403)
+    assert _yo(client, access[:-2] + 'xx').status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_refresco_rota_el_token(client):
+    """Un token de refresco solo se puede canjear una vez."""
+    _crear_usuario()
+    tokens = _login(client)
+
+    nuevos = _refrescar(client, tokens['refresh'])
+    assert nuevos.status_code == status.HTTP_200_OK
+    assert _yo(client, nuevos.data['access']).status_code == status.HTTP_200_OK
+
+    assert _refrescar(client, tokens['refresh']).status_code == status.HTTP_401_UNAUTHORIZED
+    assert _refrescar(client, nuevos.data['refresh']).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_revocar_invalida_acceso_y_refresco(client):
+    """El cierre de sesión deja inservibles ambos tokens."""
+    _crear_usuario()
+    tokens = _login(client)
+
+    respuesta = client.post(reverse('auth-revocar'), {'refresh': tokens['refresh']},
+                            content_type='application/json',
+                            HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+    assert respuesta.status_code == status.HTTP_204_NO_CONTENT
+    assert _yo(client, tokens['access']).status_code == status.HTTP_401_UNAUTHORIZED
+    assert _refrescar(client, tokens['refresh']).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_desactivar_o_cambiar_password_revoca_los_tokens(client,
+                                                         django_capture_on_commit_callbacks):
+    """Los tokens emitidos antes de desactivar al usuario dejan de valer."""
+    usuario = _crear_usuario()
+    tokens = _login(client)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        usuario.password = make_password('otra-clave')
+        usuario.save()
+
+    assert _yo(client, tokens['access']).status_code == status.HTTP_401_UNAUTHORIZED
+    assert _refrescar(client, tokens['refresh']).status_code == status.HTTP_401_UNAUTHORIZED
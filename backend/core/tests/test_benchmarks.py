@@ -0,0 +1,183 @@
+"""
+Pruebas de humo de los comandos de benchmark.
+
+Ejecutan cada comando con un conjunto de datos mínimo para asegurar que sigue
+funcionando; las cifras reales se obtienen en una base desechable de tamaño real.
+"""
+import json
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import override_settings
+
+from core.management.commands.benchmark_indices import Command
+from core.models import Ticket, Usuario
+from core.sinteticos import generar_datos
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_indices_compara_planes(tmp_path):
+    """benchmark_indices mide cada consulta con y sin índices y restaura los índices."""
+    salida = tmp_path / 'indices.json'
+
+    call_command('benchmark_indices', tickets=50, repeticiones=1, salida=str(salida),
+                 confirmar=True)
+
+    resultados = json.loads(salida.read_text(encoding='utf-8'))
+    assert Ticket.objects.count() == 50
+    assert 'ticket_activo_contenedor' in resultados
+    assert set(resultados['tickets_by_estado']) == {'sin_indices', 'con_indices'}
+    assert 'ticket_activos_entrada_idx' in _indices_ticket()
+
+
+def _indices_ticket():
+    with connection.cursor() as cursor:
+        return connection.introspection.get_constraints(cursor, Ticket._meta.db_table)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_indices_exige_confirmacion():
+    """Sin --confirmar no genera datos ni toca los índices."""
+    with pytest.raises(CommandError, match='--confirmar'):
+        call_command('benchmark_indices', tickets=50, repeticiones=1)
+
+    assert not Ticket.objects.exists()
+    assert 'ticket_activos_entrada_idx' in _indices_ticket()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_indices_restaura_los_indices_si_la_medicion_falla():
+    """Un error midiendo sin índices no deja la base sin ellos."""
+    with mock.patch.object(Command, '_medir', side_effect=RuntimeError('medición')):
+        with pytest.raises(RuntimeError):
+            call_command('benchmark_indices', tickets=50, repeticiones=1, confirmar=True)
+
+    assert 'ticket_activos_entrada_idx' in _indices_ticket()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('sin_mapa', [False, True])
+def test_benchmark_asignacion_no_duplica_slots(tmp_path, sin_mapa):
+    """benchmark_asignacion agota la zona con varios hilos sin repetir ningún slot."""
+    salida = tmp_path / 'asignacion.json'
+
+    call_command('benchmark_asignacion', filas=3, columnas=5, niveles=2, hilos=4,
+                 asignaciones=40, sin_mapa=sin_mapa, salida=str(salida))
+
+    resultados = json.loads(salida.read_text(encoding='utf-8'))
+    assert resultados['asignados'] == 30
+    assert resultados['duplicados'] == 0
+    assert resultados['ocupados_en_bd'] == 30
+    assert resultados['errores'] == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_lotes_escribe_todas_las_filas(tmp_path):
+    """benchmark_lotes crea y transiciona todas las filas pedidas."""
+    salida = tmp_path / 'lotes.json'
+
+    call_command('benchmark_lotes', filas=30, muestra_individual=3, salida=str(salida))
+
+    resultados = json.loads(salida.read_text(encoding='utf-8'))
+    assert resultados['contenedores_fila_a_fila']['filas'] == 3
+    for nombre in ('contenedores_lote', 'slots_lote', 'tickets_lote',
+                   'tickets_cambiar_estado_lote'):
+        assert resultados[nombre]['filas'] == 30
+    assert Ticket.objects.filter(estado='Completado').count() == 30
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+def test_benchmark_login_mide_ambos_modos(tmp_path):
+    """benchmark_login completa todos los logins en ambos modos y borra sus usuarios."""
+    salida = tmp_path / 'login.json'
+
+    call_command('benchmark_login', usuarios=3, intentos=6, concurrencia=3, salida=str(salida))
+
+    resultados = json.loads(salida.read_text(encoding='utf-8'))
+    assert set(resultados) == {'pool', 'en_linea'}
+    assert all(medicion['exitosos'] == 6 for medicion in resultados.values())
+    assert not Usuario.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+def test_benchmark_login_contra_servidor(live_server, tmp_path):
+    """Con --url los logins y el sondeo viajan por HTTP al servidor en marcha."""
+    salida = tmp_path / 'login.json'
+
+    call_command('benchmark_login', usuarios=3, intentos=6, concurrencia=3,
+                 url=live_server.url, salida=str(salida))
+
+    resultados = json.loads(salida.read_text(encoding='utf-8'))
+    assert set(resultados) == {'servidor'}
+    assert resultados['servidor']['exitosos'] == 6
+    assert resultados['servidor']['sondeo_max_ms'] > 0
+    assert not Usuario.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_api_crea_y_compara_la_linea_base(tmp_path):
+    """benchmark_api guarda la línea base en la primera ejecución y compara en la segunda."""
+    base = tmp_path / 'base.json'
+    salida = tmp_path / 'api.json'
+    opciones = {'filas': 20, 'repeticiones': 2, 'repeticiones_login': 1, 'base': str(base)}
+
+    with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+        call_command('benchmark_api', contenedores=60, **opciones)
+        call_command('benchmark_api', reusar=True, salida=str(salida), **opciones)
+
+    primera = json.loads(base.read_text(encoding='utf-8'))
+    segunda = json.loads(salida.read_text(encoding='utf-8'))
+    assert set(primera['casos']) == {
+        'serializar_tickets', 'serializar_contenedores', 'serializar_usuarios',
+        'tickets_by_estado', 'tickets_by_usuario', 'usuarios_by_role', 'login',
+        'cambiar_estado',
+    }
+    # Serializar filas ya leídas no consulta la base
+    assert primera['casos']['serializar_tickets']['consultas'] == 0
+    diferencias = segunda['comparacion']['diferencias']
+    assert {d['caso'] for d in diferencias} == set(primera['casos'])
+    assert not [d for d in diferencias if d['metrica'] == 'consultas' and d['regresion']]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_api_no_mezcla_datos_ni_bases_distintas(tmp_path):
+    """Sin --reusar no se añaden datos a una base con filas; otra configuración no se compara."""
+    base = tmp_path / 'base.json'
+    opciones = {'filas': 20, 'repeticiones': 1, 'repeticiones_login': 1, 'base': str(base)}
+    with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+        call_command('benchmark_api', contenedores=40, **opciones)
+        tickets = Ticket.objects.count()
+
+        with pytest.raises(CommandError, match='ya tiene datos'):
+            call_command('benchmark_api', contenedores=40, **opciones)
+        with pytest.raises(CommandError, match='filas: 20 en la base, 10 ahora'):
+            call_command('benchmark_api', reusar=True, **{**opciones, 'filas': 10})
+
+    assert Ticket.objects.count() == tickets
+
+
+@pytest.mark.django_db(transaction=True)
+def test_prueba_carga_informa_por_endpoint(live_server, tmp_path):
+    """prueba_carga recorre los tres flujos contra un servidor real y agrega sus métricas."""
+    salida = tmp_path / 'carga.json'
+    with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+        generar_datos({'contenedores': 30, 'clientes': 3, 'zonas': 1, 'filas': 2,
+                       'columnas': 5, 'niveles': 2, 'buques': 1, 'password': 'carga'})
+        call_command('prueba_carga', '--mezcla=monitor=1,puerta=1,cliente=1',
+                     url=live_server.url, usuarios=3, duracion=1.5,
+                     escala_pausas=0.01, llegadas=4, password='carga', salida=str(salida))
+
+    resultados = json.loads(salida.read_text(encoding='utf-8'))
+    assert resultados['usuarios'] == {'monitor': 1, 'puerta': 1, 'cliente': 1}
+    endpoints = resultados['endpoints']
+    assert {'GET /tickets/', 'GET /contenedores/buscar/', 'POST /contenedores/check-in/',
+            'POST /usuarios/login/', 'GET /tickets/by_usuario/'} <= set(endpoints)
+    assert endpoints['POST /usuarios/login/']['errores'] == 0
+    assert endpoints['GET /tickets/']['peticiones'] > 0
+    # Las cuatro llegadas se procesan una sola vez
+    assert Ticket.objects.filter(id_contenedor__codigo_barras__startswith='CARGA-').count() == 4
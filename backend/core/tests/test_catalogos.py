@@ -0,0 +1,96 @@
+"""
+Pruebas de la caché de lectura de catálogos (core.catalogos).
+"""
+import os
+from unittest import mock
+
+import pytest
+from django.core.cache import cache, caches
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from core.catalogos import calentar_catalogos
+from core.models import Buque, Rol
+from core.serializers import RolSerializer
+
+
+@pytest.fixture(autouse=True)
+def _cache_vacia():
+    """Cada prueba empieza con la caché de Django vacía."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_segunda_lectura_sale_de_cache(client, django_assert_num_queries):
+    """La respuesta repetida se sirve pre-renderizada: sin consultar Rol ni serializar."""
+    Rol.objects.create(rol="ADMINISTRADOR")
+    url = reverse('rol-list')
+    primera = client.get(url)
+
+    with mock.patch.object(RolSerializer, 'to_representation') as serializar:
+        with django_assert_num_queries(1):  # solo la lectura de versiones
+            segunda = client.get(url)
+
+    serializar.assert_not_called()
+    assert segunda.status_code == status.HTTP_200_OK
+    assert segunda.content == primera.content
+    assert segunda['ETag'] == primera['ETag']
+    assert segunda['Content-Type'] == 'application/json'
+
+
+@pytest.mark.django_db
+def test_escritura_invalida_el_catalogo(client, django_capture_on_commit_callbacks):
+    """Tras escribir en la tabla se sirve el contenido nuevo."""
+    url = reverse('buque-list')
+    assert client.get(url).json() == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Buque.objects.create(nombre="Nuevo", linea_naviera="L")
+
+    assert [b['nombre'] for b in client.get(url).json()] == ["Nuevo"]
+
+
+@pytest.mark.django_db
+def test_detalle_cacheado(client):
+    """El detalle también se cachea y conserva el 404 sin cachear."""
+    rol = Rol.objects.create(rol="CLIENTE")
+
+    assert client.get(reverse('rol-detail', args=[rol.id])).json()['rol'] == "CLIENTE"
+    assert client.get(reverse('rol-detail', args=[rol.id + 1])).status_code == \
+        status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_calentar_catalogos_precarga_los_listados(client):
+    """Tras el precalentamiento la primera petición ya no serializa."""
+    Rol.objects.create(rol="OPERARIO")
+    calentar_catalogos()
+
+    with mock.patch.object(RolSerializer, 'to_representation') as serializar:
+        response = client.get(reverse('rol-list'))
+
+    serializar.assert_not_called()
+    assert response.json() == [{'id': Rol.objects.get().id, 'rol': 'OPERARIO'}]
+
+
+@pytest.mark.skipif(not os.environ.get('REDIS_URL'), reason='Requiere un Redis local (REDIS_URL)')
+@pytest.mark.django_db
+def test_cache_compartida_en_redis(client):
+    """Con el backend Redis, la entrada guardada es visible para cualquier worker."""
+    redis = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+    with override_settings(CACHES=redis):
+        caches['default'].clear()
+        Rol.objects.create(rol="ADMINISTRADOR")
+        client.get(reverse('rol-list'))
+
+        with mock.patch.object(RolSerializer, 'to_representation') as serializar:
+            client.get(reverse('rol-list'))
+        serializar.assert_not_called()
@@ -0,0 +1,130 @@
+"""
+Pruebas del check-in de puerta en una sola transacción (core.puerta).
+"""
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from core.asignacion import slots_libres
+from core.models import (
+    Rol, NivelAcceso, Usuario, Zona, UbicacionSlot, Buque, CitaRecojo, Contenedor, Ticket
+)
+
+# Contenedor (con cita, cliente y ticket existente), mapa de la zona, slot
+# bloqueado, UPDATE del slot, INSERT del ticket y UPDATE de la cita, más los
+# SAVEPOINT/RELEASE de las dos transacciones anidadas en la de la prueba.
+CONSULTAS_CHECK_IN = 10
+
+
+@pytest.fixture(autouse=True)
+def _mapas_vacios():
+    """Los mapas de slots libres no deben arrastrar zonas de otras pruebas."""
+    slots_libres.descartar()
+    yield
+    slots_libres.descartar()
+
+
+def _crear_contenedor(fecha_envio=None, con_cita=True):
+    """Crea un contenedor con código único y, opcionalmente, su cita de recojo."""
+    cita = None
+    if con_cita:
+        cliente = Usuario.objects.create(
+            nombre="Cliente", email=f"cli_{uuid.uuid4().hex[:8]}@test.com",
+            id_rol=Rol.objects.create(rol="CLIENTE"),
+            id_nivel_acceso=NivelAcceso.objects.create(nivel="Básico")
+        )
+        cita = CitaRecojo.objects.create(
+            id_cliente=cliente, fecha_envio=fecha_envio,
+            fecha_recojo=timezone.localdate() + timedelta(days=3)
+        )
+    return Contenedor.objects.create(
+        codigo_barras=f"CONT-{uuid.uuid4().hex}", dimensiones="40", tipo="Dry", peso=100,
+        id_buque=Buque.objects.create(nombre="Buque", linea_naviera="L"), id_cita_recojo=cita
+    )
+
+
+def _crear_zona(slots=2):
+    """Crea una zona con `slots` slots libres en una fila."""
+    zona = Zona.objects.create(nombre="Zona A", capacidad=slots)
+    for columna in range(1, slots + 1):
+        UbicacionSlot.objects.create(
+            fila=1, columna=columna, nivel=1, estado='disponible', id_zona=zona
+        )
+    return zona
+
+
+def _check_in(client, codigo_barras, zona):
+    return client.post(reverse('contenedor-check-in'),
+                       {'codigo_barras': codigo_barras, 'id_zona': zona.id},
+                       content_type='application/json')
+
+
+@pytest.mark.django_db
+def test_check_in_crea_ticket_ocupa_slot_y_actualiza_cita(client, django_assert_num_queries):
+    """Un único POST deja ticket, slot y cita en su estado final."""
+    contenedor = _crear_contenedor(fecha_envio=timezone.localdate())
+    zona = _crear_zona()
+
+    with django_assert_num_queries(CONSULTAS_CHECK_IN):
+        response = _check_in(client, contenedor.codigo_barras, zona)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    ticket = Ticket.objects.get(pk=response.data['ticket']['id'])
+    assert ticket.estado == 'Validado'
+    assert ticket.id_usuario_id == contenedor.id_cita_recojo.id_cliente_id
+    assert ticket.id_ubicacion.estado == 'ocupado'
+    assert response.data['ticket']['ubicacion_info']['zona_id'] == zona.id
+    assert response.data['cita']['estado'] == 'en_proceso'
+    assert response.data['retrasado'] is False
+
+
+@pytest.mark.django_db
+def test_check_in_rechaza_contenedor_ya_procesado(client):
+    """Un segundo check-in del mismo contenedor responde 409 y no ocupa otro slot."""
+    contenedor = _crear_contenedor()
+    zona = _crear_zona()
+    _check_in(client, contenedor.codigo_barras, zona)
+
+    response = _check_in(client, contenedor.codigo_barras, zona)
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert Ticket.objects.count() == 1
+    assert UbicacionSlot.objects.filter(estado='disponible').count() == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('caso, codigo', [
+    ('inexistente', status.HTTP_404_NOT_FOUND),
+    ('sin_cita', status.HTTP_400_BAD_REQUEST),
+    ('antes_del_envio', status.HTTP_400_BAD_REQUEST),
+    ('zona_llena', status.HTTP_409_CONFLICT),
+])
+def test_check_in_rechazado_no_deja_cambios(client, caso, codigo):
+    """Cualquier rechazo deja intactos slots, tickets y citas."""
+    contenedor = _crear_contenedor(
+        con_cita=caso != 'sin_cita',
+        fecha_envio=timezone.localdate() + timedelta(days=2) if caso == 'antes_del_envio' else None
+    )
+    zona = _crear_zona(slots=0 if caso == 'zona_llena' else 1)
+    codigo_barras = 'NO-EXISTE' if caso == 'inexistente' else contenedor.codigo_barras
+
+    response = _check_in(client, codigo_barras, zona)
+
+    assert response.status_code == codigo
+    assert 'error' in response.data
+    assert not Ticket.objects.exists()
+    assert not UbicacionSlot.objects.exclude(estado='disponible').exists()
+    assert not CitaRecojo.objects.filter(estado='en_proceso').exists()
+
+
+@pytest.mark.django_db
+def test_check_in_exige_codigo_y_zona(client):
+    """Sin código de barras o zona se responde 400."""
+    response = client.post(reverse('contenedor-check-in'), {'codigo_barras': 'X'},
+                           content_type='application/json')
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,129 @@
+"""
+Pruebas de las peticiones condicionales (ETag / Last-Modified) de los ViewSets.
+"""
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+
+from core.models import Rol, VersionTabla, Zona
+from core.serializers import ZonaSerializer
+from core.tests.factories import crear_tickets
+
+
+def _crear_zona(nombre, django_capture_on_commit_callbacks):
+    """Crea una zona ejecutando los callbacks on_commit (incremento de versión)."""
+    with django_capture_on_commit_callbacks(execute=True):
+        return Zona.objects.create(nombre=nombre, capacidad=10)
+
+
+def _envejecer_versiones(segundos=5):
+    """Lleva la última escritura al pasado, como si hubiera ocurrido hace `segundos`."""
+    VersionTabla.objects.update(fecha_modificacion=timezone.now() - timedelta(seconds=segundos))
+
+
+@pytest.mark.django_db
+def test_sondeo_repetido_no_serializa(client, django_assert_num_queries,
+                                      django_capture_on_commit_callbacks):
+    """Con If-None-Match vigente se responde 304 sin consultar la tabla ni serializar."""
+    _crear_zona("Z1", django_capture_on_commit_callbacks)
+    _envejecer_versiones()
+    url = reverse('zona-list')
+    primera = client.get(url)
+    etag = primera['ETag']
+
+    with mock.patch.object(ZonaSerializer, 'to_representation') as serializar:
+        with django_assert_num_queries(1):  # solo la lectura de versiones
+            segunda = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert primera.status_code == status.HTTP_200_OK
+    assert 'Last-Modified' in primera
+    assert segunda.status_code == status.HTTP_304_NOT_MODIFIED
+    assert segunda['ETag'] == etag
+    assert segunda.content == b''
+    serializar.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_escritura_cambia_el_etag(client, django_capture_on_commit_callbacks):
+    """Tras una escritura confirmada el ETag anterior deja de ser válido."""
+    _crear_zona("Z1", django_capture_on_commit_callbacks)
+    url = reverse('zona-list')
+    etag = client.get(url)['ETag']
+
+    _crear_zona("Z2", django_capture_on_commit_callbacks)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+    assert len(response.data) == 2
+
+
+@pytest.mark.django_db
+def test_etag_depende_de_los_parametros(client):
+    """Cada combinación de parámetros tiene su propio ETag."""
+    url = reverse('ticket-list')
+
+    assert client.get(url)['ETag'] != client.get(url, {'estado': 'Pendiente'})['ETag']
+
+
+@pytest.mark.django_db
+def test_tablas_relacionadas_invalidan_el_listado(client, django_capture_on_commit_callbacks):
+    """Cambiar una tabla que lee el serializer (Usuario) invalida el ETag de tickets."""
+    ticket = crear_tickets(1)[0]
+    url = reverse('ticket-list')
+    etag = client.get(url)['ETag']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ticket.id_usuario.nombre = "Otro nombre"
+        ticket.id_usuario.save()
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_if_modified_since(client, django_capture_on_commit_callbacks):
+    """If-Modified-Since con la fecha devuelta responde 304."""
+    with django_capture_on_commit_callbacks(execute=True):
+        rol = Rol.objects.create(rol="Admin")
+    _envejecer_versiones()
+    url = reverse('rol-detail', args=[rol.id])
+    ultima = client.get(url)['Last-Modified']
+
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=ultima)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_escritura_en_el_mismo_segundo_no_da_304(client, django_capture_on_commit_callbacks):
+    """Sin ETag, una escritura en el segundo en curso no queda oculta tras un 304."""
+    with django_capture_on_commit_callbacks(execute=True):
+        rol = Rol.objects.create(rol="Admin")
+    url = reverse('rol-detail', args=[rol.id])
+    # Última lectura dentro del mismo segundo que la escritura
+    desde = client.get(url).get('Last-Modified') or http_date(timezone.now().timestamp())
+
+    with django_capture_on_commit_callbacks(execute=True):
+        rol.rol = "Administrador"
+        rol.save()
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=desde)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['rol'] == "Administrador"
+    assert 'Last-Modified' not in response
+
+
+@pytest.mark.django_db
+def test_escrituras_no_llevan_validadores(client):
+    """Las peticiones que no son GET no calculan validadores."""
+    response = client.post(
+        reverse('zona-list'), {'nombre': 'Z', 'capacidad': 1}, content_type='application/json'
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert 'ETag' not in response
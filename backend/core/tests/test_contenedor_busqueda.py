@@ -0,0 +1,178 @@
+"""
+Pruebas de la acción ContenedorViewSet.buscar y de su caché LRU.
+"""
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from core.cache import CacheLRU, busqueda_contenedores
+from core.models import Ticket
+from core.tests.factories import crear_contenedores, crear_tickets
+
+
+@pytest.fixture(autouse=True)
+def _cache_vacia():
+    """Cada prueba empieza con la caché de búsquedas vacía."""
+    busqueda_contenedores.limpiar()
+    yield
+    busqueda_contenedores.limpiar()
+
+
+@pytest.mark.django_db
+def test_buscar_por_codigo_devuelve_todo_en_una_consulta(client, django_assert_num_queries):
+    """Contenedor, ticket activo, cita y slot se resuelven en una única consulta."""
+    contenedor = crear_contenedores(1)[0]
+    ticket = crear_tickets(1, estado="Validado")[0]
+    ticket.id_contenedor = contenedor
+    ticket.save()
+
+    with django_assert_num_queries(1):
+        response = client.get(
+            reverse('contenedor-buscar'), {'codigo_barras': contenedor.codigo_barras}
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['contenedor']['id'] == contenedor.id
+    assert response.data['ticket']['id'] == ticket.id
+    assert response.data['cita']['id'] == contenedor.id_cita_recojo_id
+    assert response.data['ubicacion']['id'] == ticket.id_ubicacion_id
+
+
+@pytest.mark.django_db
+def test_buscar_ignora_tickets_no_activos(client):
+    """Un ticket completado no se considera el ticket activo del contenedor."""
+    ticket = crear_tickets(1, estado="Completado")[0]
+
+    response = client.get(
+        reverse('contenedor-buscar'),
+        {'codigo_barras': ticket.id_contenedor.codigo_barras}
+    )
+
+    assert response.data['ticket'] is None
+    assert response.data['ubicacion'] is None
+
+
+@pytest.mark.django_db
+def test_buscar_por_numero_de_contenedor(client):
+    """También se puede buscar por numero_contenedor."""
+    contenedor = crear_contenedores(1)[0]
+    contenedor.numero_contenedor = "MSCU1234567"
+    contenedor.save()
+
+    response = client.get(reverse('contenedor-buscar'), {'numero_contenedor': "MSCU1234567"})
+
+    assert response.data['contenedor']['id'] == contenedor.id
+
+
+@pytest.mark.django_db
+def test_numero_repetido_prefiere_el_contenedor_con_ticket_activo(client):
+    """Con varios contenedores del mismo número gana el del ticket activo y luego el último."""
+    con_ticket, sin_ticket, ultimo = crear_contenedores(3)
+    for contenedor in (con_ticket, sin_ticket, ultimo):
+        contenedor.numero_contenedor = "MSCU7654321"
+        contenedor.save()
+    ticket = crear_tickets(1, estado="Validado")[0]
+    ticket.id_contenedor = con_ticket
+    ticket.save()
+    url = reverse('contenedor-buscar')
+
+    assert client.get(url, {'numero_contenedor': "MSCU7654321"}).data['ticket']['id'] == \
+        ticket.id
+    ticket.estado = "Completado"
+    ticket.save()
+    assert client.get(url, {'numero_contenedor': "MSCU7654321"}).data['contenedor']['id'] == \
+        ultimo.id
+
+
+@pytest.mark.django_db
+def test_segunda_busqueda_sale_de_cache(client, django_assert_num_queries):
+    """Una búsqueda repetida no toca la base de datos."""
+    contenedor = crear_contenedores(1)[0]
+    url = reverse('contenedor-buscar')
+    client.get(url, {'codigo_barras': contenedor.codigo_barras})
+
+    with django_assert_num_queries(0):
+        response = client.get(url, {'codigo_barras': contenedor.codigo_barras})
+
+    assert response.data['contenedor']['id'] == contenedor.id
+
+
+@pytest.mark.django_db
+def test_crear_ticket_invalida_la_cache(client):
+    """Al crear un ticket para el contenedor, la búsqueda refleja el nuevo ticket."""
+    contenedor = crear_contenedores(1)[0]
+    url = reverse('contenedor-buscar')
+    assert client.get(url, {'codigo_barras': contenedor.codigo_barras}).data['ticket'] is None
+
+    plantilla = crear_tickets(1)[0]
+    nuevo = Ticket.objects.create(
+        fecha_hora_entrada=timezone.now(), estado="Pendiente",
+        id_ubicacion=plantilla.id_ubicacion, id_usuario=plantilla.id_usuario,
+        id_contenedor=contenedor
+    )
+
+    assert client.get(url, {'codigo_barras': contenedor.codigo_barras}).data['ticket']['id'] \
+        == nuevo.id
+
+
+@pytest.mark.django_db
+def test_busqueda_cacheada_antes_del_commit_se_expulsa(django_capture_on_commit_callbacks):
+    """
+    Una búsqueda concurrente que guarda la fila anterior mientras la
+    transacción sigue abierta no sobrevive al commit.
+    """
+    contenedor = crear_contenedores(1)[0]
+    clave = ('codigo_barras', contenedor.codigo_barras)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        plantilla = crear_tickets(1)[0]
+        Ticket.objects.create(
+            fecha_hora_entrada=timezone.now(), estado="Pendiente",
+            id_ubicacion=plantilla.id_ubicacion, id_usuario=plantilla.id_usuario,
+            id_contenedor=contenedor
+        )
+        # Otro hilo del worker aún ve el contenedor sin ticket y lo guarda
+        busqueda_contenedores.guardar(clave, {'ticket': None}, {('contenedor', contenedor.pk)})
+
+    assert busqueda_contenedores.obtener(clave) is None
+
+
+@pytest.mark.django_db
+def test_cambiar_cita_invalida_la_cache(client):
+    """Actualizar la cita del contenedor expulsa la entrada en caché."""
+    contenedor = crear_contenedores(1)[0]
+    url = reverse('contenedor-buscar')
+    client.get(url, {'codigo_barras': contenedor.codigo_barras})
+
+    cita = contenedor.id_cita_recojo
+    cita.estado = 'completada'
+    cita.save()
+
+    response = client.get(url, {'codigo_barras': contenedor.codigo_barras})
+    assert response.data['cita']['estado'] == 'completada'
+
+
+@pytest.mark.django_db
+def test_buscar_errores(client):
+    """Sin parámetros responde 400 y con un código inexistente 404."""
+    url = reverse('contenedor-buscar')
+
+    assert client.get(url).status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get(url, {'codigo_barras': 'NO-EXISTE'}).status_code == \
+        status.HTTP_404_NOT_FOUND
+
+
+def test_cache_lru_expulsa_la_entrada_menos_usada():
+    """Al superar el máximo se expulsa la entrada usada hace más tiempo."""
+    cache = CacheLRU(max_entradas=2, ttl=60)
+    cache.guardar('a', 1, {('contenedor', 1)})
+    cache.guardar('b', 2)
+    cache.obtener('a')
+    cache.guardar('c', 3)
+
+    assert cache.obtener('b') is None
+    assert cache.obtener('a') == 1
+    cache.invalidar('contenedor', 1)
+    assert cache.obtener('a') is None
+    assert len(cache) == 1
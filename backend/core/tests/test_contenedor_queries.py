@@ -0,0 +1,56 @@
+"""
+Pruebas de presupuesto de consultas para ContenedorViewSet y CitaRecojoViewSet.
+
+Cada campo anidado (buque, cita y cliente) debe resolverse en una sola consulta
+con JOIN, sin importar cuántas filas devuelva el endpoint.
+"""
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from core.models import Buque, Contenedor
+from core.tests.factories import CONSULTAS_LECTURA, crear_contenedores
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cantidad', [1, 10])
+def test_listado_contenedores_tiene_presupuesto_constante(client, django_assert_num_queries,
+                                                          cantidad):
+    """El listado de contenedores debe resolver buque, cita y cliente con JOIN."""
+    crear_contenedores(cantidad)
+
+    with django_assert_num_queries(CONSULTAS_LECTURA):
+        response = client.get(reverse('contenedor-list'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data) == cantidad
+    assert response.data[0]['buque_nombre'].startswith('B')
+    assert response.data[0]['cita_info']['cliente'] == "Cliente Test"
+
+
+@pytest.mark.django_db
+def test_contenedor_sin_cita_no_consulta_de_mas(client, django_assert_num_queries):
+    """Un contenedor sin cita debe serializarse con cita_info nulo y sin consultas extra."""
+    buque = Buque.objects.create(nombre="Solo", linea_naviera="L")
+    contenedor = Contenedor.objects.create(
+        codigo_barras="SIN-CITA", dimensiones="20", tipo="Dry", peso=10, id_buque=buque
+    )
+
+    with django_assert_num_queries(CONSULTAS_LECTURA):
+        response = client.get(reverse('contenedor-detail', args=[contenedor.id]))
+
+    assert response.data['cita_info'] is None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cantidad', [1, 10])
+def test_listado_citas_tiene_presupuesto_constante(client, django_assert_num_queries, cantidad):
+    """El listado de citas debe resolver los datos del cliente con JOIN."""
+    crear_contenedores(cantidad)
+
+    with django_assert_num_queries(CONSULTAS_LECTURA):
+        response = client.get(reverse('citarecojo-list'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data) == cantidad
+    assert response.data[0]['cliente_email'].endswith('@test.com')
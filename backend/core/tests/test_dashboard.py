@@ -0,0 +1,78 @@
+"""
+Pruebas del endpoint de estadísticas del panel de administración.
+"""
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from core.estadisticas import estadisticas_dashboard
+from core.models import UbicacionSlot
+from core.tests.factories import crear_tickets
+
+
+@pytest.fixture(autouse=True)
+def _cache_vacia():
+    """Cada prueba empieza sin estadísticas en caché."""
+    estadisticas_dashboard.limpiar()
+    yield
+    estadisticas_dashboard.limpiar()
+
+
+@pytest.mark.django_db
+def test_estadisticas_agregadas(client):
+    """Los conteos por estado, rol y zona coinciden con los datos."""
+    tickets = crear_tickets(2, estado="Pendiente") + crear_tickets(1, estado="Completado")
+    zona = tickets[0].id_ubicacion.id_zona
+    UbicacionSlot.objects.create(fila=2, columna=1, nivel=1, estado="Disponible", id_zona=zona)
+
+    response = client.get(reverse('dashboard-estadisticas'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['tickets'] == {
+        'por_estado': {'Pendiente': 2, 'Completado': 1}, 'activos': 2, 'total': 3
+    }
+    assert response.data['usuarios']['por_rol'] == {'Operador': 2}
+    assert response.data['slots']['disponibles'] == 1
+    assert response.data['slots']['total'] == 4
+    por_zona = {z['zona_id']: z for z in response.data['slots']['por_zona']}
+    assert por_zona[zona.id]['por_estado'] == {'ocupado': 1, 'Disponible': 1}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cantidad', [1, 10])
+def test_estadisticas_usan_una_consulta(client, django_assert_num_queries, cantidad):
+    """El cálculo es una única consulta y la repetición sale de caché."""
+    crear_tickets(cantidad)
+    url = reverse('dashboard-estadisticas')
+
+    with django_assert_num_queries(1):
+        client.get(url)
+    with django_assert_num_queries(0):
+        client.get(url)
+
+
+@pytest.mark.django_db
+def test_escribir_ticket_invalida_estadisticas(client):
+    """Un cambio de estado se refleja de inmediato pese a la caché."""
+    ticket = crear_tickets(1, estado="Pendiente")[0]
+    url = reverse('dashboard-estadisticas')
+    assert client.get(url).data['tickets']['activos'] == 1
+
+    ticket.estado = "Completado"
+    ticket.save()
+
+    assert client.get(url).data['tickets']['activos'] == 0
+
+
+@pytest.mark.django_db
+def test_estadisticas_cacheadas_antes_del_commit_se_descartan(client,
+                                                              django_capture_on_commit_callbacks):
+    """Los conteos que otra petición guarde con la transacción abierta no sobreviven al commit."""
+    url = reverse('dashboard-estadisticas')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        crear_tickets(1, estado="Pendiente")
+        # Otro hilo del worker calcula aún sin ver el ticket y lo guarda
+        estadisticas_dashboard.guardar('dashboard', {'tickets': {'activos': 0}})
+
+    assert client.get(url).data['tickets']['activos'] == 1
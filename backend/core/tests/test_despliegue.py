@@ -0,0 +1,85 @@
+"""
+Pruebas del punto de entrada desplegado: gunicorn con workers ASGI (backend.asgi).
+
+Arrancan el servidor real con gunicorn.conf.py y comprueban que el stream SSE
+empieza a emitir y que, con el stream abierto, el mismo worker sigue
+atendiendo otras peticiones. También fijan la configuración que depende del
+despliegue, como el broker de eventos cuando hay Redis.
+"""
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+from django.conf import settings
+
+
+def _puerto_libre():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    """gunicorn con un único worker, como en producción; devuelve el puerto."""
+    pytest.importorskip('uvicorn_worker')
+    puerto = _puerto_libre()
+    entorno = {
+        **os.environ,
+        'DATABASE_URL': f"sqlite:///{tmp_path / 'db.sqlite3'}",
+        'PROMETHEUS_MULTIPROC_DIR': str(tmp_path / 'metricas'),
+    }
+    with subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'backend.asgi',
+         '--bind', f'127.0.0.1:{puerto}', '--workers', '1'],
+        cwd=settings.BASE_DIR, env=entorno,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    ) as proceso:
+        try:
+            limite = time.monotonic() + 30
+            while True:
+                try:
+                    socket.create_connection(('127.0.0.1', puerto), timeout=1).close()
+                    break
+                except OSError:
+                    if proceso.poll() is not None or time.monotonic() > limite:
+                        pytest.fail('gunicorn no llegó a escuchar')
+                    time.sleep(0.2)
+            yield puerto
+        finally:
+            proceso.terminate()
+            proceso.wait(timeout=30)
+
+
+def test_stream_emite_y_no_bloquea_el_worker(servidor):
+    """Con un SSE abierto, el único worker responde al login sin esperar."""
+    stream = http.client.HTTPConnection('127.0.0.1', servidor, timeout=10)
+    stream.request('GET', '/api/eventos/')
+    respuesta = stream.getresponse()
+    assert respuesta.status == 200
+    assert respuesta.getheader('Content-Type') == 'text/event-stream'
+    assert respuesta.readline() == b'retry: 3000\n'
+
+    otra = http.client.HTTPConnection('127.0.0.1', servidor, timeout=10)
+    otra.request('POST', '/api/usuarios/login/', body='{}',
+                 headers={'Content-Type': 'application/json'})
+    assert otra.getresponse().status == 400
+    otra.close()
+    stream.close()
+
+
+def test_con_redis_url_el_broker_de_eventos_es_redis():
+    """Con varios workers y Celery el broker en memoria perdería eventos."""
+    entorno = {k: v for k, v in os.environ.items() if k != 'EVENTOS_BROKER'}
+    entorno['REDIS_URL'] = 'redis://localhost:6379/0'
+    resultado = subprocess.run(
+        [sys.executable, '-c', 'from django.conf import settings; print(settings.EVENTOS_BROKER)'],
+        cwd=settings.BASE_DIR, env={**entorno, 'DJANGO_SETTINGS_MODULE': 'backend.settings'},
+        capture_output=True, text=True, check=True,
+    )
+
+    assert resultado.stdout.strip() == 'redis'
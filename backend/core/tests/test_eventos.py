@@ -0,0 +1,126 @@
+"""
+Pruebas del stream SSE de transiciones de estado y del broker en memoria.
+
+El stream se consume con el AsyncClient de Django; los cambios se hacen con el
+ORM en el hilo principal y se publican al confirmar la transacción.
+"""
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient
+from django.urls import reverse
+
+from core import eventos
+from core.tests.factories import crear_tickets
+
+
+@pytest.fixture(autouse=True)
+def broker():
+    """Cada prueba usa un broker en memoria nuevo."""
+    eventos._broker = eventos.BrokerMemoria()  # pylint: disable=protected-access
+    yield eventos._broker  # pylint: disable=protected-access
+    eventos._broker = None  # pylint: disable=protected-access
+
+
+def _leer_stream(url, accion, cantidad):
+    """Abre el stream, ejecuta `accion` y devuelve los `cantidad` fragmentos siguientes."""
+    async def _leer():
+        response = await AsyncClient().get(url)
+        contenido = aiter(response.streaming_content)
+        assert await anext(contenido) == b'retry: 3000\n\n'
+        await sync_to_async(accion)()
+        fragmentos = [
+            (await asyncio.wait_for(anext(contenido), timeout=5)).decode()
+            for _ in range(cantidad)
+        ]
+        await contenido.aclose()
+        return response, fragmentos
+    return async_to_sync(_leer)()
+
+
+@pytest.mark.django_db
+def test_stream_recibe_transicion_de_ticket(django_capture_on_commit_callbacks):
+    """Un cambio de estado de ticket llega al stream como evento 'ticket'."""
+    ticket = crear_tickets(1, estado="Pendiente")[0]
+
+    def cambiar_estado():
+        with django_capture_on_commit_callbacks(execute=True):
+            ticket.estado = "En Proceso"
+            ticket.save()
+
+    response, (fragmento,) = _leer_stream(reverse('eventos-stream'), cambiar_estado, 1)
+
+    assert response['Content-Type'] == 'text/event-stream'
+    assert 'event: ticket' in fragmento
+    assert f'"id_fila": {ticket.id}' in fragmento
+    assert '"estado": "En Proceso"' in fragmento
+    assert '"estado_anterior": "Pendiente"' in fragmento
+    assert eventos.obtener_broker().suscriptores == 0
+
+
+@pytest.mark.django_db
+def test_stream_filtra_por_tipo(django_capture_on_commit_callbacks):
+    """Con ?tipos=slot solo se reciben eventos de slots."""
+    ticket = crear_tickets(1, estado="Pendiente")[0]
+    slot = ticket.id_ubicacion
+
+    def cambiar_ticket_y_slot():
+        with django_capture_on_commit_callbacks(execute=True):
+            ticket.estado = "Completado"
+            ticket.save()
+            slot.estado = "disponible"
+            slot.save()
+
+    _, (fragmento,) = _leer_stream(
+        reverse('eventos-stream') + '?tipos=slot', cambiar_ticket_y_slot, 1
+    )
+
+    assert 'event: slot' in fragmento
+    assert '"estado": "disponible"' in fragmento
+
+
+@pytest.mark.django_db
+def test_guardar_sin_cambiar_estado_no_publica(broker, django_capture_on_commit_callbacks):
+    """Solo las transiciones de estado generan eventos."""
+    ticket = crear_tickets(1, estado="Pendiente")[0]
+    publicados = []
+    broker.publicar = publicados.append
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ticket.fecha_hora_salida = None
+        ticket.save()
+    with django_capture_on_commit_callbacks(execute=True):
+        ticket.estado = "Validado"
+        ticket.save()
+
+    assert [e['estado'] for e in publicados] == ["Validado"]
+
+
+def test_stream_bajo_wsgi_responde_503(client):
+    """Servido por WSGI el stream no podría emitir: se rechaza sin ocupar el worker."""
+    response = client.get(reverse('eventos-stream'))
+
+    assert response.status_code == 503
+    assert eventos.obtener_broker().suscriptores == 0
+
+
+def test_broker_reparte_a_todos_y_descarta_lo_antiguo():
+    """Cada suscriptor recibe los eventos; una cola llena descarta el más antiguo."""
+    broker = eventos.BrokerMemoria(max_pendientes=2)
+
+    async def _probar():
+        a, b = broker.suscribir(), broker.suscribir()
+        for estado in ('uno', 'dos', 'tres'):
+            broker.publicar({'tipo': 'ticket', 'estado': estado})
+        await asyncio.sleep(0)
+        recibidos = [a.cola.get_nowait()['estado'], a.cola.get_nowait()['estado']]
+        broker.cancelar(a)
+        broker.cancelar(b)
+        return recibidos, b.cola.qsize()
+
+    recibidos, pendientes_b = async_to_sync(_probar)()
+
+    assert recibidos == ['dos', 'tres']
+    assert pendientes_b == 2
+    assert broker.suscriptores == 0
@@ -0,0 +1,150 @@
+"""
+Pruebas de la exportación en streaming (core.exportacion).
+"""
+import asyncio
+import csv
+import io
+import json
+import warnings
+from datetime import date
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.handlers.asgi import ASGIHandler
+from django.urls import reverse
+from rest_framework import status
+
+from core import exportacion
+from core.models import Buque, Contenedor, Factura, Pago
+from core.tests.factories import crear_contenedores, crear_tickets
+
+
+def _contenido(response):
+    assert response.streaming
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+@pytest.mark.django_db
+def test_exportar_tickets_csv_aplica_filtros_y_aplana(client, monkeypatch):
+    """El CSV respeta los filtros del listado y aplana los objetos anidados."""
+    monkeypatch.setattr(exportacion, 'TAMANO_BLOQUE', 2)
+    pendientes = crear_tickets(5, estado='Pendiente')
+    crear_tickets(2, estado='Completado')
+
+    response = client.get(reverse('ticket-exportar'), {'estado': 'Pendiente'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'].startswith('text/csv')
+    assert 'ticket.csv' in response['Content-Disposition']
+    filas = list(csv.DictReader(io.StringIO(_contenido(response))))
+    assert [int(f['id']) for f in filas] == [t.id for t in pendientes]
+    assert filas[0]['contenedor_info.codigo_barras'].startswith('CONT-')
+    assert filas[0]['ubicacion_info.zona_nombre']
+
+
+@pytest.mark.django_db
+def test_exportar_ndjson_sin_consultas_por_fila(client, monkeypatch, django_assert_num_queries):
+    """Una sola consulta recorrida por bloques; las relaciones llegan en el mismo JOIN."""
+    monkeypatch.setattr(exportacion, 'TAMANO_BLOQUE', 3)
+    crear_tickets(7)
+
+    response = client.get(reverse('ticket-exportar'), {'formato': 'ndjson'})
+    with django_assert_num_queries(1):
+        lineas = _contenido(response).splitlines()
+
+    assert len(lineas) == 7
+    assert json.loads(lineas[0])['usuario_nombre'] == 'Operador'
+
+
+@pytest.mark.django_db
+def test_exportar_facturas_y_pagos(client):
+    """Facturas y pagos se exportan con sus filtros de fecha."""
+    ticket = crear_tickets(1)[0]
+    factura = Factura.objects.create(fecha_emision=date(2025, 1, 5), monto=100,
+                                     estado='Pendiente', id_ticket=ticket)
+    Factura.objects.create(fecha_emision=date(2024, 1, 5), monto=50,
+                           estado='Pagada', id_ticket=ticket)
+    Pago.objects.create(fecha_pago=date(2025, 1, 6), medio_pago='Efectivo',
+                        monto=100, id_factura=factura)
+
+    facturas = _contenido(client.get(reverse('factura-exportar'),
+                                     {'emision_desde': '2025-01-01'})).splitlines()
+    pagos = _contenido(client.get(reverse('pago-exportar'), {'formato': 'ndjson'}))
+
+    assert len(facturas) == 2 and facturas[1].startswith(f'{factura.id},')
+    assert json.loads(pagos)['medio_pago'] == 'Efectivo'
+
+
+@pytest.mark.django_db
+def test_exportar_contenedores_vacio_y_formato_invalido(client):
+    """Sin filas no se envía nada; un formato desconocido responde 400."""
+    assert _contenido(client.get(reverse('contenedor-exportar'))) == ''
+    response = client.get(reverse('contenedor-exportar'), {'formato': 'xml'})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_exportar_csv_con_anidado_nulo_en_la_primera_fila(client):
+    """Un contenedor sin cita al principio no hace perder las columnas de la cita."""
+    buque = Buque.objects.create(nombre="Sin cita", linea_naviera="L")
+    Contenedor.objects.create(codigo_barras="CONT-SIN-CITA", dimensiones="20",
+                              tipo="Dry", peso=10, id_buque=buque)
+    con_cita = crear_contenedores(1)[0]
+
+    filas = list(csv.DictReader(io.StringIO(_contenido(
+        client.get(reverse('contenedor-exportar'))))))
+
+    assert filas[0]['cita_info.cliente'] == ''
+    assert filas[1]['cita_info.cliente'] == con_cita.id_cita_recojo.id_cliente.nombre
+    assert filas[1]['cita_info.fecha_recojo'] == '2025-01-10'
+
+
+def _get_asgi(ruta, consulta='', traza=None):
+    """GET por ASGIHandler, como lo sirve uvicorn; devuelve los mensajes enviados."""
+    mensajes = []
+    peticion = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def recibir():
+        if peticion:
+            return peticion.pop()
+        await asyncio.Event().wait()  # el cliente no se desconecta
+
+    async def enviar(mensaje):
+        mensajes.append(mensaje)
+        if traza is not None and mensaje.get('body'):
+            traza.append('enviado')
+
+    alcance = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': ruta, 'raw_path': ruta.encode(), 'root_path': '',
+        'query_string': consulta.encode(), 'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 5000), 'server': ('testserver', 80),
+    }
+    async_to_sync(ASGIHandler())(alcance, recibir, enviar)
+    return mensajes
+
+
+@pytest.mark.django_db(transaction=True)
+def test_exportar_bajo_asgi_envia_por_bloques(monkeypatch):
+    """Bajo ASGI cada bloque se envía antes de leer el siguiente, sin reunir el archivo."""
+    monkeypatch.setattr(exportacion, 'TAMANO_BLOQUE', 2)
+    crear_tickets(5)
+    traza = []
+    original = exportacion._filas_ndjson
+
+    def filas_ndjson(filas):
+        for fragmento in original(filas):
+            traza.append('leido')
+            yield fragmento
+
+    monkeypatch.setattr(exportacion, '_filas_ndjson', filas_ndjson)
+    with warnings.catch_warnings(record=True) as avisos:
+        warnings.simplefilter('always')
+        mensajes = _get_asgi(reverse('ticket-exportar'), 'formato=ndjson', traza)
+
+    assert mensajes[0]['status'] == 200
+    cuerpos = [m['body'] for m in mensajes[1:] if m.get('body')]
+    assert [c.count(b'\n') for c in cuerpos] == [2, 2, 1]
+    assert traza == ['leido', 'enviado'] * 3
+    assert not [a for a in avisos if 'synchronous iterators' in str(a.message)]
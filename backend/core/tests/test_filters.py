@@ -0,0 +1,146 @@
+"""
+Pruebas de los filtros declarativos (core.filters) de los ViewSets.
+
+Además del comportamiento, se comprueba que cada filtro recae sobre columnas
+que encabezan algún índice, para que filtrar sea un recorrido de índice.
+"""
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from core import filters
+from core.models import CitaRecojo, UbicacionSlot, Zona
+from core.tests.factories import crear_contenedores, crear_tickets
+
+FILTERSETS = [
+    filters.UsuarioFilter, filters.UbicacionSlotFilter, filters.CitaRecojoFilter,
+    filters.ContenedorFilter, filters.TicketFilter, filters.FacturaFilter,
+    filters.PagoFilter,
+]
+
+
+def _columnas_indexadas(model):
+    """Devuelve las columnas que encabezan un índice (o PK/unique) de la tabla."""
+    with connection.cursor() as cursor:
+        restricciones = connection.introspection.get_constraints(
+            cursor, model._meta.db_table
+        )
+    return {
+        r['columns'][0] for r in restricciones.values()
+        if r['columns'] and (r['index'] or r['primary_key'] or r['unique'])
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('filterset', FILTERSETS, ids=lambda f: f.__name__)
+def test_cada_filtro_tiene_indice(filterset):
+    """Cada salto de la ruta de un filtro debe recaer sobre una columna indexada."""
+    for nombre, filtro in filterset.base_filters.items():
+        model = filterset._meta.model
+        for parte in filtro.field_name.split('__'):
+            campo = model._meta.get_field(parte)
+            assert campo.column in _columnas_indexadas(model), (
+                f"{filterset.__name__}.{nombre}: {model.__name__}.{campo.column} sin índice"
+            )
+            model = campo.related_model or model
+
+
+@pytest.mark.django_db
+def test_tickets_por_estado_y_zona(client):
+    """Los filtros de ticket se combinan entre sí."""
+    pendientes = crear_tickets(2, estado="PENDIENTE")
+    crear_tickets(1, estado="COMPLETADO")
+    zona = pendientes[0].id_ubicacion.id_zona
+
+    response = client.get(reverse('ticket-list'), {'estado': 'PENDIENTE', 'zona': zona.id})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [t['id'] for t in response.data] == [pendientes[0].id]
+
+
+@pytest.mark.django_db
+def test_tickets_por_varios_estados(client):
+    """`estado__in` acepta una lista separada por comas."""
+    crear_tickets(1, estado="PENDIENTE")
+    crear_tickets(1, estado="EN_PROCESO")
+    crear_tickets(1, estado="COMPLETADO")
+
+    response = client.get(reverse('ticket-list'), {'estado__in': 'PENDIENTE,EN_PROCESO'})
+
+    assert sorted(t['estado'] for t in response.data) == ['EN_PROCESO', 'PENDIENTE']
+
+
+@pytest.mark.django_db
+def test_tickets_por_rango_de_entrada(client):
+    """entrada_desde/entrada_hasta acotan fecha_hora_entrada."""
+    antiguo, reciente = crear_tickets(2)
+    antiguo.fecha_hora_entrada = timezone.now() - timedelta(days=10)
+    antiguo.save()
+
+    desde = (timezone.now() - timedelta(days=1)).isoformat()
+    response = client.get(reverse('ticket-list'), {'entrada_desde': desde})
+
+    assert [t['id'] for t in response.data] == [reciente.id]
+
+
+@pytest.mark.django_db
+def test_by_estado_combina_filtros(client):
+    """Las acciones personalizadas también aplican los filtros declarativos."""
+    tickets = crear_tickets(2, estado="PENDIENTE")
+    usuario_id = tickets[0].id_usuario_id
+    otros = crear_tickets(1, estado="PENDIENTE")
+
+    response = client.get(
+        reverse('ticket-by-estado'),
+        {'estado': 'PENDIENTE', 'id_usuario': otros[0].id_usuario_id}
+    )
+
+    assert usuario_id != otros[0].id_usuario_id
+    assert [t['id'] for t in response.data] == [otros[0].id]
+
+
+@pytest.mark.django_db
+def test_contenedores_por_buque_y_cliente(client):
+    """Los contenedores se filtran por buque y por el cliente de su cita."""
+    primero, _ = crear_contenedores(2)
+
+    por_buque = client.get(reverse('contenedor-list'), {'id_buque': primero.id_buque_id})
+    por_cliente = client.get(
+        reverse('contenedor-list'), {'id_cliente': primero.id_cita_recojo.id_cliente_id}
+    )
+
+    assert [c['id'] for c in por_buque.data] == [primero.id]
+    assert [c['id'] for c in por_cliente.data] == [primero.id]
+
+
+@pytest.mark.django_db
+def test_citas_por_rango_de_recojo(client):
+    """recojo_desde/recojo_hasta acotan fecha_recojo."""
+    dentro = CitaRecojo.objects.create(fecha_recojo=date(2025, 3, 10))
+    CitaRecojo.objects.create(fecha_recojo=date(2025, 5, 1))
+
+    response = client.get(
+        reverse('citarecojo-list'),
+        {'recojo_desde': '2025-03-01', 'recojo_hasta': '2025-03-31'}
+    )
+
+    assert [c['id'] for c in response.data] == [dentro.id]
+
+
+@pytest.mark.django_db
+def test_slots_por_zona_y_estado(client):
+    """Los slots se filtran por zona y estado."""
+    zona = Zona.objects.create(nombre="Z1", capacidad=2)
+    libre = UbicacionSlot.objects.create(fila=1, columna=1, nivel=1, estado="disponible",
+                                         id_zona=zona)
+    UbicacionSlot.objects.create(fila=1, columna=2, nivel=1, estado="ocupado", id_zona=zona)
+
+    response = client.get(
+        reverse('ubicacionslot-list'), {'id_zona': zona.id, 'estado': 'disponible'}
+    )
+
+    assert [s['id'] for s in response.data] == [libre.id]
@@ -0,0 +1,175 @@
+"""
+Pruebas de las escrituras por lotes (core.lotes).
+"""
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from core.models import Buque, Contenedor, Ticket, UbicacionSlot, VersionTabla, Zona
+from core.tests.factories import crear_tickets
+
+
+def _contenedores(cantidad, buque, prefijo='LOTE'):
+    return [
+        {'codigo_barras': f'{prefijo}-{i}', 'dimensiones': '20', 'tipo': 'Dry',
+         'peso': 100 + i, 'id_buque': buque.id}
+        for i in range(cantidad)
+    ]
+
+
+def _post_lote(client, url, elementos):
+    return client.post(url, elementos, content_type='application/json')
+
+
+@pytest.mark.django_db
+def test_alta_en_lote_informa_errores_por_elemento(client):
+    """Los elementos válidos se insertan; los demás se informan con su índice."""
+    buque = Buque.objects.create(nombre="Buque", linea_naviera="L")
+    Contenedor.objects.create(codigo_barras='EXISTE', dimensiones='20', tipo='Dry',
+                              peso=1, id_buque=buque)
+    elementos = _contenedores(3, buque)
+    elementos[1]['codigo_barras'] = 'EXISTE'                  # choca con la base
+    elementos.append(dict(elementos[0], peso=5))              # repetido en el lote
+    elementos.append(dict(elementos[2], codigo_barras='X', id_buque=9999))
+    elementos.append(dict(elementos[2], codigo_barras='Y', peso='pesado'))
+
+    response = _post_lote(client, reverse('contenedor-lote'), elementos)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['creados'] == 2
+    assert [e['indice'] for e in response.data['errores']] == [1, 3, 4, 5]
+    assert 'codigo_barras' in response.data['errores'][0]['errores']
+    assert 'id_buque' in response.data['errores'][2]['errores']
+    assert set(Contenedor.objects.filter(pk__in=response.data['ids']).values_list(
+        'codigo_barras', flat=True)) == {'LOTE-0', 'LOTE-2'}
+
+
+@pytest.mark.django_db
+def test_alta_en_lote_valida_por_conjuntos(client):
+    """El número de consultas no depende del tamaño del lote (dentro de un INSERT)."""
+    buque = Buque.objects.create(nombre="Buque", linea_naviera="L")
+    consultas = []
+    # SQLite admite 999 parámetros por sentencia: 120 contenedores caben en un INSERT
+    for cantidad, prefijo in ((5, 'A'), (120, 'B')):
+        with CaptureQueriesContext(connection) as capturadas:
+            response = _post_lote(client, reverse('contenedor-lote'),
+                                  _contenedores(cantidad, buque, prefijo))
+        assert response.data['creados'] == cantidad
+        consultas.append(len(capturadas))
+
+    assert consultas[0] == consultas[1]
+
+
+@pytest.mark.django_db
+def test_lote_vacio_o_sin_lista_responde_400(client):
+    """El cuerpo debe ser una lista no vacía."""
+    url = reverse('ubicacionslot-lote')
+
+    assert _post_lote(client, url, []).status_code == status.HTTP_400_BAD_REQUEST
+    assert _post_lote(client, url, {'fila': 1}).status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_modificacion_en_lote_solo_escribe_los_campos_enviados(client):
+    """PATCH lote actualiza cada fila con sus campos y respeta la unicidad."""
+    buque = Buque.objects.create(nombre="Buque", linea_naviera="L")
+    ids = _post_lote(client, reverse('contenedor-lote'), _contenedores(3, buque)).data['ids']
+
+    response = client.patch(reverse('contenedor-lote'), [
+        {'id': ids[0], 'peso': 999},
+        {'id': ids[1], 'codigo_barras': 'LOTE-2'},
+        {'id': 123456, 'peso': 1},
+    ], content_type='application/json')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['ids'] == [ids[0]]
+    assert [e['indice'] for e in response.data['errores']] == [1, 2]
+    contenedor = Contenedor.objects.get(pk=ids[0])
+    assert (contenedor.peso, contenedor.codigo_barras) == (999, 'LOTE-0')
+
+
+@pytest.mark.django_db
+def test_modificacion_en_lote_no_cambia_el_estado(client):
+    """El estado no se escribe con PATCH lote: se remite a cambiar-estado-lote."""
+    ticket = crear_tickets(1, estado='Pendiente')[0]
+
+    response = client.patch(reverse('ticket-lote'), [{'id': ticket.id, 'estado': 'Completado'}],
+                            content_type='application/json')
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'cambiar-estado-lote' in str(response.data['errores'][0]['errores']['estado'][0])
+    assert Ticket.objects.get(pk=ticket.pk).estado == 'Pendiente'
+
+
+@pytest.mark.django_db
+def test_alta_de_slots_en_lote_descarta_el_mapa_de_la_zona(client,
+                                                            django_capture_on_commit_callbacks):
+    """Los slots insertados en bloque invalidan el mapa de slots libres."""
+    zona = Zona.objects.create(nombre="Zona", capacidad=2)
+    with mock.patch('core.lotes.slots_libres') as mapas:
+        with django_capture_on_commit_callbacks(execute=True):
+            response = _post_lote(client, reverse('ubicacionslot-lote'), [
+                {'fila': 1, 'columna': c, 'nivel': 1, 'estado': 'disponible', 'id_zona': zona.id}
+                for c in (1, 2)
+            ])
+
+    assert response.data['creados'] == 2
+    assert UbicacionSlot.objects.filter(id_zona=zona).count() == 2
+    mapas.descartar.assert_called_once_with()
+
+
+@pytest.mark.django_db
+def test_cambio_de_estado_en_lote_es_un_solo_update(client, django_capture_on_commit_callbacks):
+    """Las transiciones se aplican con un UPDATE y se notifican como las individuales."""
+    tickets = crear_tickets(3, estado='Pendiente')
+    antes = VersionTabla.objects.get(tabla='Ticket').version
+    elementos = [
+        {'id': tickets[0].id, 'estado': 'Completado'},
+        {'id': tickets[1].id, 'estado': 'En Cola'},
+        {'id': tickets[2].id, 'estado': 'Pendiente'},
+        {'id': 987654, 'estado': 'Completado'},
+        {'estado': 'Completado'},
+    ]
+
+    with mock.patch('core.lotes.obtener_broker') as broker:
+        with django_capture_on_commit_callbacks(execute=True):
+            with CaptureQueriesContext(connection) as capturadas:
+                response = client.patch(reverse('ticket-cambiar-estado-lote'), elementos,
+                                        content_type='application/json')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['actualizados'] == 3
+    assert [e['indice'] for e in response.data['errores']] == [3, 4]
+    assert sum(q['sql'].startswith('UPDATE "Ticket"') for q in capturadas) == 1
+
+    completado, en_cola, sin_cambio = (Ticket.objects.get(pk=t.pk) for t in tickets)
+    assert completado.estado == 'Completado' and completado.fecha_hora_salida is not None
+    assert en_cola.estado == 'En Cola' and en_cola.fecha_hora_salida is None
+    assert sin_cambio.estado == 'Pendiente' and sin_cambio.fecha_hora_salida is None
+    assert completado.fecha_modificacion > tickets[0].fecha_modificacion
+    assert VersionTabla.objects.get(tabla='Ticket').version == antes + 1
+
+    publicados = [c.args[0] for c in broker.return_value.publicar.call_args_list]
+    assert {(e['id_fila'], e['estado_anterior'], e['estado']) for e in publicados} == {
+        (tickets[0].id, 'Pendiente', 'Completado'), (tickets[1].id, 'Pendiente', 'En Cola'),
+    }
+    assert publicados[0]['id_ubicacion'] is not None
+
+
+@pytest.mark.django_db
+def test_contenedores_no_tienen_cambio_de_estado_en_lote(client):
+    """Contenedor no tiene estado: la ruta solo existe para tickets y slots."""
+    elementos = [{'id': 1, 'estado': 'x'}]
+
+    contenedores = client.patch('/api/contenedores/cambiar-estado-lote/', elementos,
+                                content_type='application/json')
+    slots = client.patch(reverse('ubicacionslot-cambiar-estado-lote'), elementos,
+                         content_type='application/json')
+
+    assert contenedores.status_code == status.HTTP_404_NOT_FOUND
+    assert slots.status_code == status.HTTP_400_BAD_REQUEST
+    assert slots.data['errores'][0]['errores']['id'] == ['No existe el id 1.']
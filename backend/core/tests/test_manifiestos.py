@@ -0,0 +1,165 @@
+"""
+Pruebas de la importación en streaming de manifiestos (core.manifiestos).
+"""
+import csv
+import json
+from unittest import mock
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from rest_framework import status
+
+from core import manifiestos
+from core.models import Rol, NivelAcceso, Usuario, Buque, CitaRecojo, Contenedor
+
+CABECERA = ('codigo_barras,numero_contenedor,dimensiones,tipo,peso,'
+            'cliente_email,fecha_envio,fecha_recojo\n')
+
+
+@pytest.fixture
+def buque():
+    return Buque.objects.create(nombre="Atracado", linea_naviera="L")
+
+
+@pytest.fixture
+def cliente():
+    return Usuario.objects.create(
+        nombre="Cliente", email="cliente@test.com",
+        id_rol=Rol.objects.create(rol="CLIENTE"),
+        id_nivel_acceso=NivelAcceso.objects.create(nivel="Básico")
+    )
+
+
+@pytest.mark.django_db
+def test_comando_importa_csv_por_bloques(tmp_path, buque, cliente):
+    """Carga las filas válidas en varios bloques e informa de las rechazadas."""
+    Contenedor.objects.create(codigo_barras='EXISTE', dimensiones='20', tipo='Dry',
+                              peso=1, id_buque=buque)
+    manifiesto = tmp_path / 'manifiesto.csv'
+    manifiesto.write_text(CABECERA + (
+        'M-1,N1,20x8x8,20ft,1000,cliente@test.com,2025-01-01,2025-01-10\n'
+        'M-2,,40x8x8,40ft,2000,,,\n'
+        'EXISTE,,20x8x8,20ft,1000,,,\n'
+        'M-3,,40x8x8,40ft,pesado,,,\n'
+        'M-1,,40x8x8,40ft,2000,,,\n'
+        'M-4,,40x8x8,40ft,2000,nadie@test.com,,\n'
+        'M-5,,40x8x8,40ft,2000,cliente@test.com,2025-13-01,\n'
+    ), encoding='utf-8')
+    informe = tmp_path / 'rechazos.json'
+
+    call_command('importar_manifiesto', str(manifiesto), buque=buque.id, bloque=2,
+                 rechazos=str(informe))
+
+    resultado = json.loads(informe.read_text(encoding='utf-8'))
+    assert (resultado['leidas'], resultado['cargadas'], resultado['rechazadas']) == (7, 2, 5)
+    assert resultado['bloques'] == 4
+    errores = {r['linea']: r['errores'] for r in resultado['rechazos']}
+    assert sorted(errores) == [4, 5, 6, 7, 8]
+    assert 'codigo_barras' in errores[4] and 'codigo_barras' in errores[6]
+    assert 'peso' in errores[5]
+    assert 'cliente_email' in errores[7] and 'fecha_envio' in errores[8]
+
+    con_cita = Contenedor.objects.select_related('id_cita_recojo').get(codigo_barras='M-1')
+    assert con_cita.id_buque_id == buque.id
+    assert con_cita.id_cita_recojo.id_cliente_id == cliente.id
+    assert str(con_cita.id_cita_recojo.fecha_recojo) == '2025-01-10'
+    assert Contenedor.objects.get(codigo_barras='M-2').id_cita_recojo is None
+    assert CitaRecojo.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_endpoint_importa_jsonl(client, buque, cliente):
+    """El endpoint acepta un JSONL subido y responde con el resumen."""
+    lineas = [
+        {'codigo_barras': 'J-1', 'dimensiones': '20', 'tipo': 'Dry', 'peso': 10,
+         'cliente_email': cliente.email, 'duracion_viaje_dias': 12},
+        {'codigo_barras': 'J-2', 'dimensiones': '20', 'tipo': 'Dry', 'peso': 10},
+    ]
+    contenido = '\n'.join(json.dumps(linea) for linea in lineas) + '\nno es json\n'
+    archivo = SimpleUploadedFile('manifiesto.jsonl', contenido.encode('utf-8'))
+
+    response = client.post(reverse('buque-manifiesto', args=[buque.id]), {'archivo': archivo})
+
+    assert response.status_code == status.HTTP_201_CREATED
+    datos = response.data
+    assert (datos['cargadas'], datos['citas'], datos['rechazadas']) == (2, 1, 1)
+    assert response.data['rechazos'][0]['linea'] == 3
+    assert Contenedor.objects.get(codigo_barras='J-1').id_cita_recojo.duracion_viaje_dias == 12
+
+
+@pytest.mark.django_db
+def test_endpoint_exige_archivo(client, buque):
+    """Sin archivo adjunto se responde 400."""
+    response = client.post(reverse('buque-manifiesto', args=[buque.id]), {})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_endpoint_rechaza_archivo_que_no_es_utf8(client, buque):
+    """Un manifiesto en Latin-1 responde 400 con la línea que no se puede decodificar."""
+    contenido = (CABECERA + 'U-1,,20,Dry,100,,,\n').encode('utf-8') + \
+        'U-2,,20,Dry,100,,,\nU-3,,20,Refrigerado ñ,100,,,\n'.encode('latin-1')
+    archivo = SimpleUploadedFile('manifiesto.csv', contenido)
+
+    response = client.post(reverse('buque-manifiesto', args=[buque.id]), {'archivo': archivo})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['linea'] == 4
+    assert 'UTF-8' in response.data['error']
+    assert response.data['cargadas'] == 0
+
+
+@pytest.mark.django_db
+def test_comando_informa_csv_mal_formado(tmp_path, buque):
+    """Una comilla sin cerrar se come las líneas siguientes: error con la línea, no un 500."""
+    ruta = tmp_path / 'manifiesto.csv'
+    ruta.write_text(CABECERA + 'M-1,,20,Dry,100,,,\n"M-2,,20,Dry,100,,,\n' +
+                    'x' * (csv.field_size_limit() + 1) + '\n', encoding='utf-8')
+
+    with pytest.raises(CommandError, match='Línea 4: CSV mal formado'):
+        call_command('importar_manifiesto', str(ruta), buque=buque.id)
+
+
+@pytest.mark.django_db
+def test_codigo_insertado_durante_la_carga_se_rechaza(tmp_path, buque):
+    """Si otro proceso inserta el mismo codigo_barras tras validar, el bloque se repite."""
+    ruta = tmp_path / 'manifiesto.csv'
+    ruta.write_text(CABECERA + 'C-1,,20,Dry,100,,,\nC-2,,20,Dry,100,,,\n', encoding='utf-8')
+    ajeno = Contenedor.objects.create(codigo_barras='OCULTO', dimensiones='40', tipo='Dry',
+                                      peso=1, id_buque=buque)
+    original = manifiestos._preparar_bloque
+    llamadas = []
+
+    def preparar(bloque, destino):
+        validado = original(bloque, destino)
+        if not llamadas:
+            # La fila ajena toma el código entre la primera validación y la carga
+            Contenedor.objects.filter(pk=ajeno.pk).update(codigo_barras='C-2')
+        llamadas.append(bloque)
+        return validado
+
+    informe = tmp_path / 'rechazos.json'
+    with mock.patch.object(manifiestos, '_preparar_bloque', preparar):
+        call_command('importar_manifiesto', str(ruta), buque=buque.id, rechazos=str(informe))
+
+    resultado = json.loads(informe.read_text(encoding='utf-8'))
+    assert (resultado['cargadas'], resultado['rechazadas']) == (1, 1)
+    assert resultado['rechazos'][0]['linea'] == 3
+    assert Contenedor.objects.get(codigo_barras='C-2').pk == ajeno.pk
+    assert len(llamadas) == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('bloque', [0, -1])
+def test_comando_exige_bloque_positivo(tmp_path, buque, bloque):
+    """--bloque 0 no importaría nada y uno negativo fallaría: se rechazan."""
+    ruta = tmp_path / 'manifiesto.csv'
+    ruta.write_text(CABECERA + 'B-1,,20,Dry,100,,,\n', encoding='utf-8')
+
+    with pytest.raises(CommandError, match='--bloque'):
+        call_command('importar_manifiesto', str(ruta), buque=buque.id, bloque=bloque)
+    assert not Contenedor.objects.filter(codigo_barras='B-1').exists()
@@ -0,0 +1,148 @@
+"""
+Pruebas del endpoint /metrics y de las métricas de Prometheus (core.metricas).
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+from prometheus_client import generate_latest
+from prometheus_client.parser import text_string_to_metric_families
+
+from core.cache import busqueda_contenedores
+from core.metricas import registro_exposicion
+from core.models import UbicacionSlot, Zona
+from core.tests.factories import crear_contenedores, crear_tickets
+
+# Cada proceso hijo cuenta peticiones y lecturas de caché como lo haría un worker
+WORKER = '''
+import django
+django.setup()
+from core.metricas import PETICIONES, registrar_cache
+PETICIONES.labels('TicketViewSet', 'list', 'GET', '200').inc(3)
+registrar_cache('catalogos', True)
+'''
+
+
+TOKEN = 'token-de-pruebas'
+
+
+@pytest.fixture(autouse=True)
+def _negocio_sin_cache(settings):
+    """Los indicadores de negocio se recalculan en cada consulta; /metrics pide TOKEN."""
+    settings.METRICAS_NEGOCIO_TTL = 0
+    settings.METRICAS_TOKEN = TOKEN
+    busqueda_contenedores.limpiar()
+    yield
+    busqueda_contenedores.limpiar()
+
+
+def _metricas(client):
+    return client.get(reverse('metricas'), HTTP_AUTHORIZATION=f'Bearer {TOKEN}')
+
+
+def _muestras(client, nombre, **etiquetas):
+    """Valor de la muestra `nombre` con `etiquetas` en /metrics (0 si no existe)."""
+    respuesta = _metricas(client)
+    assert respuesta.status_code == 200
+    return _valor(respuesta.content.decode(), nombre, **etiquetas)
+
+
+def _valor(texto, nombre, **etiquetas):
+    for familia in text_string_to_metric_families(texto):
+        for muestra in familia.samples:
+            if muestra.name == nombre and all(
+                    muestra.labels.get(clave) == valor for clave, valor in etiquetas.items()):
+                return muestra.value
+    return 0
+
+
+@pytest.mark.django_db
+def test_peticiones_latencia_y_consultas_por_vista_y_accion(client):
+    """Cada petición suma en el contador, el histograma de latencia y el de consultas."""
+    crear_tickets(2)
+    etiquetas = {'vista': 'TicketViewSet', 'accion': 'by_estado'}
+    antes = _muestras(client, 'enapu_http_latencia_segundos_count', **etiquetas)
+
+    client.get(reverse('ticket-by-estado'), {'estado': 'PENDIENTE'})
+    client.get(reverse('ticket-by-estado'))  # sin estado: 400
+
+    texto = _metricas(client).content.decode()
+    assert _valor(texto, 'enapu_http_latencia_segundos_count', **etiquetas) == antes + 2
+    assert _valor(texto, 'enapu_http_peticiones_total', codigo='200', **etiquetas) >= 1
+    assert _valor(texto, 'enapu_http_errores_total', clase='4xx', **etiquetas) >= 1
+    assert _valor(texto, 'enapu_db_consultas_por_peticion_sum', **etiquetas) >= 1
+
+
+@pytest.mark.django_db
+def test_indicadores_de_negocio(client):
+    """Tickets activos por estado y slots libres y totales por zona."""
+    crear_tickets(2, estado='Pendiente')
+    zona = Zona.objects.create(nombre='Zona Metricas', capacidad=10)
+    for estado in ('disponible', 'Disponible', 'ocupado'):
+        UbicacionSlot.objects.create(fila=1, columna=1, nivel=1, estado=estado, id_zona=zona)
+
+    texto = _metricas(client).content.decode()
+
+    assert _valor(texto, 'enapu_tickets_activos', estado='Pendiente') == 2
+    assert _valor(texto, 'enapu_tickets_activos', estado='En Cola') == 0
+    assert _valor(texto, 'enapu_slots_libres', zona='Zona Metricas') == 2
+    assert _valor(texto, 'enapu_slots_total', zona='Zona Metricas') == 3
+
+
+@pytest.mark.django_db
+def test_aciertos_y_fallos_de_cache(client):
+    """La segunda búsqueda del mismo contenedor es un acierto de la caché LRU."""
+    contenedor = crear_contenedores(1)[0]
+    aciertos = _muestras(client, 'enapu_cache_aciertos_total', cache='busqueda_contenedores')
+    fallos = _muestras(client, 'enapu_cache_fallos_total', cache='busqueda_contenedores')
+
+    for _ in range(2):
+        client.get(reverse('contenedor-buscar'), {'codigo_barras': contenedor.codigo_barras})
+
+    assert _muestras(client, 'enapu_cache_aciertos_total',
+                     cache='busqueda_contenedores') == aciertos + 1
+    assert _muestras(client, 'enapu_cache_fallos_total',
+                     cache='busqueda_contenedores') == fallos + 1
+
+
+@pytest.mark.django_db
+@override_settings(METRICAS_TOKEN='secreto')
+def test_token_de_metricas(client):
+    """Con METRICAS_TOKEN solo responde a quien presenta el token."""
+    assert client.get(reverse('metricas')).status_code == 401
+    assert client.get(reverse('metricas'), HTTP_AUTHORIZATION='Bearer otro').status_code == 401
+    assert client.get(reverse('metricas'),
+                      HTTP_AUTHORIZATION='Bearer secreto').status_code == 200
+
+
+@pytest.mark.django_db
+@override_settings(METRICAS_TOKEN='')
+def test_sin_token_solo_en_debug(client):
+    """Sin METRICAS_TOKEN /metrics está cerrado salvo con DEBUG activo."""
+    with override_settings(DEBUG=False):
+        assert client.get(reverse('metricas')).status_code == 403
+    with override_settings(DEBUG=True):
+        assert client.get(reverse('metricas')).status_code == 200
+
+
+@pytest.mark.django_db
+def test_agregacion_entre_procesos(tmp_path, monkeypatch):
+    """Con PROMETHEUS_MULTIPROC_DIR se suman los valores de todos los procesos."""
+    entorno = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': str(tmp_path),
+               'DJANGO_SETTINGS_MODULE': 'backend.settings'}
+    for _ in range(2):
+        subprocess.run([sys.executable, '-c', WORKER], env=entorno, cwd=settings.BASE_DIR,
+                       check=True, timeout=120)
+
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    texto = generate_latest(registro_exposicion()).decode()
+
+    assert _valor(texto, 'enapu_http_peticiones_total', vista='TicketViewSet',
+                  accion='list', codigo='200') == 6
+    assert _valor(texto, 'enapu_cache_aciertos_total', cache='catalogos') == 2
+    # Los indicadores de negocio se añaden también en modo multiproceso
+    assert 'enapu_tickets_activos{estado="Pendiente"} 0.0' in texto
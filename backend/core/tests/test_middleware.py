@@ -0,0 +1,83 @@
+"""
+Pruebas del middleware de tiempos por petición (core.middleware).
+"""
+import logging
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.serializers import TicketSerializer
+from core.tests.factories import crear_tickets, crear_usuario, login
+
+
+def _metricas(respuesta):
+    """{nombre: parámetros} de la cabecera Server-Timing."""
+    metricas = {}
+    for metrica in respuesta['Server-Timing'].split(','):
+        nombre, *parametros = metrica.strip().split(';')
+        metricas[nombre] = dict(parametro.split('=', 1) for parametro in parametros)
+    return metricas
+
+
+@pytest.mark.django_db
+def test_cabeceras_con_consultas_y_tiempos(client):
+    """Cada respuesta informa de sus consultas y del tiempo de SQL, serializador y total."""
+    crear_tickets(3)
+
+    with CaptureQueriesContext(connection) as consultas:
+        respuesta = client.get(reverse('ticket-list'))
+
+    assert respuesta.status_code == 200
+    assert int(respuesta['X-Query-Count']) == len(consultas.captured_queries)
+    metricas = _metricas(respuesta)
+    assert set(metricas) == {'sql', 'ser', 'render', 'total'}
+    assert metricas['sql']['desc'] == f'"{len(consultas.captured_queries)} consultas"'
+    assert float(metricas['ser']['dur']) > 0
+    assert float(metricas['total']['dur']) >= float(metricas['sql']['dur'])
+    assert 'X-Query-Budget-Exceeded' not in respuesta
+
+
+@pytest.mark.django_db
+def test_vista_asincrona_cuenta_sus_consultas(client):
+    """El login asíncrono también se mide (la ContextVar llega a sus consultas)."""
+    crear_usuario()
+
+    respuesta = login(client)
+
+    assert respuesta.status_code == 200
+    assert int(respuesta['X-Query-Count']) >= 1
+
+
+@pytest.mark.django_db
+@override_settings(TIEMPOS_SERVIDOR_PRESUPUESTO_CONSULTAS=1)
+def test_presupuesto_de_consultas_excedido(client, caplog):
+    """Superar el presupuesto marca la respuesta y deja un aviso en el log."""
+    crear_tickets(1)
+
+    with caplog.at_level(logging.WARNING, logger='core.tiempos'):
+        respuesta = client.get(reverse('ticket-list'))
+
+    assert respuesta['X-Query-Budget-Exceeded'] == '1'
+    assert 'presupuesto 1' in caplog.text
+
+
+@pytest.mark.django_db
+@override_settings(TIEMPOS_SERVIDOR=False)
+def test_desactivado_desde_settings(client):
+    """Con TIEMPOS_SERVIDOR=False el middleware no se carga."""
+    respuesta = client.get(reverse('ticket-list'))
+
+    assert 'Server-Timing' not in respuesta
+    assert 'X-Query-Count' not in respuesta
+
+
+@pytest.mark.django_db
+def test_fuera_de_una_peticion_no_se_mide(client):
+    """Los serializadores y las consultas fuera de una petición funcionan igual."""
+    client.get(reverse('ticket-list'))  # instala la medición
+    ticket = crear_tickets(1)[0]
+
+    assert TicketSerializer(ticket).data['id'] == ticket.id
@@ -0,0 +1,107 @@
+"""
+Pruebas de la paginación opcional por cursor de los ViewSets de 'core'.
+
+Sin parámetros de paginación la respuesta debe seguir siendo la lista completa;
+con `page_size`/`cursor` se recorren páginas estables ordenadas por columnas indexadas.
+"""
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from core.models import Zona
+from core.pagination import estimar_total
+from core.tests.factories import CONSULTAS_LECTURA, crear_tickets
+
+
+@pytest.mark.django_db
+def test_sin_parametros_devuelve_lista_completa(client):
+    """Los clientes existentes siguen recibiendo una lista sin envolver."""
+    for i in range(3):
+        Zona.objects.create(nombre=f"Z{i}", capacidad=10)
+
+    response = client.get(reverse('zona-list'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert isinstance(response.data, list)
+    assert len(response.data) == 3
+
+
+@pytest.mark.django_db
+def test_recorre_todas_las_paginas_sin_repetir(client):
+    """Siguiendo `next` se obtienen todas las filas una sola vez, de mayor a menor id."""
+    zonas = [Zona.objects.create(nombre=f"Z{i}", capacidad=10) for i in range(7)]
+
+    vistos = []
+    url = reverse('zona-list') + '?page_size=3'
+    while url:
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) <= 3
+        vistos.extend(z['id'] for z in response.data['results'])
+        url = response.data['next']
+
+    assert vistos == sorted((z.id for z in zonas), reverse=True)
+
+
+@pytest.mark.django_db
+def test_tickets_ordenados_por_fecha_de_entrada(client):
+    """`?orden=fecha_hora_entrada` ordena por la columna indexada de entrada."""
+    tickets = crear_tickets(3)
+    base = timezone.now()
+    for desfase, ticket in zip((2, 0, 1), tickets):
+        ticket.fecha_hora_entrada = base + timedelta(hours=desfase)
+        ticket.save()
+
+    response = client.get(
+        reverse('ticket-list'), {'page_size': 10, 'orden': 'fecha_hora_entrada'}
+    )
+
+    ids = [t['id'] for t in response.data['results']]
+    assert ids == [tickets[1].id, tickets[2].id, tickets[0].id]
+
+
+@pytest.mark.django_db
+def test_pagina_de_tickets_tiene_presupuesto_constante(client, django_assert_num_queries):
+    """Una página de tickets mantiene el presupuesto de una sola consulta."""
+    crear_tickets(5)
+
+    with django_assert_num_queries(CONSULTAS_LECTURA):
+        response = client.get(reverse('ticket-list'), {'page_size': 2})
+
+    assert len(response.data['results']) == 2
+    assert response.data['next'] is not None
+    assert 'count' not in response.data
+
+
+@pytest.mark.django_db
+def test_con_total_incluye_conteo(client):
+    """Con `con_total=true` se añade el total (exacto fuera de PostgreSQL)."""
+    for i in range(4):
+        Zona.objects.create(nombre=f"Z{i}", capacidad=10)
+
+    response = client.get(reverse('zona-list'), {'page_size': 2, 'con_total': 'true'})
+
+    assert response.data['count'] == 4
+    assert response.data['count_estimado'] is False
+
+
+@pytest.mark.django_db
+def test_acciones_personalizadas_respetan_la_paginacion(client):
+    """by_estado pagina igual que el listado cuando se pide `page_size`."""
+    crear_tickets(3, estado="PENDIENTE")
+
+    response = client.get(reverse('ticket-by-estado'), {'estado': 'PENDIENTE', 'page_size': 2})
+
+    assert len(response.data['results']) == 2
+    assert response.data['next'] is not None
+
+
+@pytest.mark.django_db
+def test_estimar_total_en_sqlite_es_exacto():
+    """Fuera de PostgreSQL la estimación recurre a COUNT(*)."""
+    Zona.objects.create(nombre="A", capacidad=1)
+
+    assert estimar_total(Zona.objects.filter(nombre="A")) == (1, False)
@@ -0,0 +1,182 @@
+"""
+Pruebas del motor de reportes materializados (core.reportes, core.tasks).
+"""
+from datetime import date, timedelta
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from core import reportes
+from core.models import Factura, Pago, Reporte, Ticket, UbicacionSlot
+from core.tests.factories import crear_tickets
+
+
+def _solicitar(client, tipo, parametros=None, **extra):
+    return client.post(reverse('reporte-solicitar'),
+                       {'tipo': tipo, 'parametros': parametros or {}, **extra},
+                       content_type='application/json')
+
+
+@pytest.mark.django_db
+def test_solicitud_encola_y_la_repeticion_sale_del_resultado_guardado(
+        client, django_capture_on_commit_callbacks):
+    """La primera petición calcula en segundo plano; la segunda no recalcula."""
+    crear_tickets(2)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        primera = _solicitar(client, 'ocupacion_zonas')
+    assert primera.status_code == status.HTTP_202_ACCEPTED
+
+    reporte = Reporte.objects.get(pk=primera.data['id'])
+    assert reporte.estado == Reporte.ESTADO_COMPLETADO
+    assert sum(z['ocupados'] for z in reporte.resultado) == 2
+
+    with mock.patch('core.tasks.generar_reporte.delay') as encolar:
+        with django_capture_on_commit_callbacks(execute=True):
+            segunda = _solicitar(client, 'ocupacion_zonas')
+
+    encolar.assert_not_called()
+    assert segunda.status_code == status.HTTP_200_OK
+    assert segunda.data['id'] == reporte.id
+    assert segunda.data['resultado'] == reporte.resultado
+
+
+@pytest.mark.django_db
+def test_regenerar_vuelve_a_calcular(client, django_capture_on_commit_callbacks):
+    """Con regenerar=true el resultado refleja los datos actuales."""
+    with django_capture_on_commit_callbacks(execute=True):
+        _solicitar(client, 'ocupacion_zonas')
+    crear_tickets(1)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        respuesta = _solicitar(client, 'ocupacion_zonas', regenerar=True)
+
+    reporte = Reporte.objects.get(pk=respuesta.data['id'])
+    assert Reporte.objects.count() == 1
+    assert reporte.resultado[0]['ocupados'] == 1
+
+
+@pytest.mark.django_db
+def test_reportes_abiertos_caducan_y_los_cerrados_no(client, django_capture_on_commit_callbacks):
+    """El estado actual y los rangos que llegan a hoy se recalculan pasada la vigencia."""
+    ayer = timezone.localdate() - timedelta(days=1)
+    cerrado = {'desde': (ayer - timedelta(days=7)).isoformat(), 'hasta': ayer.isoformat()}
+    with django_capture_on_commit_callbacks(execute=True):
+        _solicitar(client, 'ocupacion_zonas')
+        _solicitar(client, 'volumen_diario')
+        _solicitar(client, 'volumen_diario', cerrado)
+    crear_tickets(1)
+    Reporte.objects.update(fecha_completado=timezone.now() - timedelta(minutes=5))
+
+    with override_settings(REPORTES_VIGENCIA_ABIERTOS=60), \
+            django_capture_on_commit_callbacks(execute=True):
+        ocupacion = _solicitar(client, 'ocupacion_zonas')
+        hoy = _solicitar(client, 'volumen_diario')
+        pasado = _solicitar(client, 'volumen_diario', cerrado)
+
+    assert ocupacion.status_code == hoy.status_code == status.HTTP_202_ACCEPTED
+    assert Reporte.objects.get(pk=ocupacion.data['id']).resultado[0]['ocupados'] == 1
+    assert Reporte.objects.get(pk=hoy.data['id']).resultado[0]['cantidad'] == 1
+    assert pasado.status_code == status.HTTP_200_OK
+
+
+def test_rango_calculado_el_mismo_dia_caduca_al_dia_siguiente():
+    """Un rango hasta ayer calculado ayer no incluía todo el día: se recalcula."""
+    ayer = timezone.localdate() - timedelta(days=1)
+    reporte = Reporte(tipo='volumen_diario', fecha_generacion=ayer,
+                      parametros=f'{{"desde": "{ayer}", "hasta": "{ayer}"}}',
+                      estado=Reporte.ESTADO_COMPLETADO)
+
+    reporte.fecha_completado = timezone.now() - timedelta(days=1)
+    assert reportes.reporte_caducado(reporte)
+    reporte.fecha_completado = timezone.now()
+    assert not reportes.reporte_caducado(reporte)
+
+
+@pytest.mark.django_db
+def test_estadia_volumen_y_facturacion():
+    """Los reportes con rango agregan en SQL los tickets, facturas y pagos."""
+    ahora = timezone.now()
+    tickets = crear_tickets(3, estado='Completado')
+    for minutos, ticket in zip((30, 60, 120), tickets):
+        Ticket.objects.filter(pk=ticket.pk).update(
+            fecha_hora_entrada=ahora - timedelta(minutes=minutos), fecha_hora_salida=ahora)
+    factura = Factura.objects.create(fecha_emision=date.today(), monto=100,
+                                     estado='Pagada', id_ticket=tickets[0])
+    Pago.objects.create(fecha_pago=date.today(), medio_pago='Tarjeta', monto=100,
+                        id_factura=factura)
+    parametros = reportes._rango({})
+
+    estadia = reportes._estadia_por_zona(parametros)
+    volumen = reportes._volumen_diario(parametros)
+    facturacion = reportes._facturacion(parametros)
+
+    assert sorted(z['promedio_min'] for z in estadia) == [30, 60, 120]
+    assert all(z['tickets'] == 1 and z['zona_nombre'] for z in estadia)
+    assert sum(d['cantidad'] for d in volumen) == 3
+    assert facturacion['facturas'][0]['monto'] == 100
+    assert facturacion['pagos'] == [{'medio_pago': 'Tarjeta', 'cantidad': 1, 'monto': 100}]
+
+
+@pytest.mark.django_db
+def test_estadia_reparte_las_zonas_en_el_pool():
+    """Con REPORTES_PROCESOS > 1 cada zona se calcula en el pool de procesos."""
+    crear_tickets(3)
+
+    class PoolEnLinea:
+        """Sustituto del pool: ejecuta en el proceso (la base de pruebas es en memoria)."""
+        creados = []
+
+        def __init__(self, **kwargs):
+            self.creados.append(kwargs['max_workers'])
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return False
+
+        @staticmethod
+        def map(funcion, *iterables):
+            return map(funcion, *iterables)
+
+    with override_settings(REPORTES_PROCESOS=2), \
+            mock.patch.object(reportes, 'ProcessPoolExecutor', PoolEnLinea):
+        filas = reportes._estadia_por_zona(reportes._rango({}))
+
+    assert PoolEnLinea.creados == [2]
+    assert len(filas) == 3
+
+
+@pytest.mark.django_db
+def test_error_de_calculo_queda_registrado_y_se_reintenta(client,
+                                                          django_capture_on_commit_callbacks):
+    """Un cálculo fallido deja estado 'error'; la siguiente petición lo reintenta."""
+    falla = mock.Mock(side_effect=ValueError('x'))
+    with mock.patch.dict(reportes.TIPOS_REPORTE, {'ocupacion_zonas': (lambda p: {}, falla)}):
+        with django_capture_on_commit_callbacks(execute=True):
+            fallido = _solicitar(client, 'ocupacion_zonas')
+        assert Reporte.objects.get(pk=fallido.data['id']).estado == Reporte.ESTADO_ERROR
+
+    UbicacionSlot.objects.all().delete()
+    with django_capture_on_commit_callbacks(execute=True):
+        reintento = _solicitar(client, 'ocupacion_zonas')
+
+    reporte = Reporte.objects.get(pk=reintento.data['id'])
+    assert (reporte.estado, reporte.error, reporte.resultado) == (Reporte.ESTADO_COMPLETADO, '', [])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('tipo, parametros', [
+    ('inexistente', {}),
+    ('volumen_diario', {'desde': '2025-13-01'}),
+    ('volumen_diario', {'desde': '2025-02-01', 'hasta': '2025-01-01'}),
+])
+def test_solicitud_invalida_responde_400(client, tipo, parametros):
+    """Tipos desconocidos y fechas inválidas se rechazan sin crear la fila."""
+    assert _solicitar(client, tipo, parametros).status_code == status.HTTP_400_BAD_REQUEST
+    assert not Reporte.objects.exists()
@@ -0,0 +1,126 @@
+"""
+Pruebas del resumen horario de tickets (core.resumenes).
+
+El resumen mantenido de forma incremental debe coincidir siempre con el que
+se reconstruye desde cero a partir de los tickets.
+"""
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from core.models import ResumenHorario, Ticket
+from core.resumenes import reconstruir_resumen
+from core.tests.factories import crear_tickets
+
+
+def _resumen():
+    return sorted(ResumenHorario.objects.values_list(
+        'hora', 'id_zona', 'estado', 'tickets', 'con_salida', 'estadia_total'
+    ))
+
+
+def _coincide_con_reconstruccion():
+    incremental = _resumen()
+    reconstruir_resumen()
+    return incremental == _resumen()
+
+
+@pytest.mark.django_db
+def test_transiciones_individuales_mueven_el_ticket_de_fila(
+        client, django_capture_on_commit_callbacks):
+    """Crear y completar un ticket lo cuenta una sola vez, en su estado actual."""
+    with django_capture_on_commit_callbacks(execute=True):
+        ticket = crear_tickets(1, estado='Pendiente')[0]
+    fila = ResumenHorario.objects.get()
+    assert (fila.estado, fila.tickets, fila.con_salida) == ('Pendiente', 1, 0)
+
+    Ticket.objects.filter(pk=ticket.pk).update(
+        fecha_hora_entrada=timezone.now() - timedelta(minutes=90))
+    reconstruir_resumen()
+    with django_capture_on_commit_callbacks(execute=True):
+        respuesta = client.patch(reverse('ticket-cambiar-estado', args=[ticket.id]),
+                                 {'estado': 'Completado'}, content_type='application/json')
+
+    assert respuesta.status_code == status.HTTP_200_OK
+    fila = ResumenHorario.objects.get()
+    assert (fila.estado, fila.tickets, fila.con_salida) == ('Completado', 1, 1)
+    assert 89 <= fila.estadia_total.total_seconds() / 60 <= 91
+    assert fila.id_zona_id == ticket.id_ubicacion.id_zona_id
+    assert _coincide_con_reconstruccion()
+
+
+@pytest.mark.django_db
+def test_borrar_ticket_lo_descuenta(django_capture_on_commit_callbacks):
+    """Al borrar el último ticket de una fila, la fila desaparece."""
+    with django_capture_on_commit_callbacks(execute=True):
+        tickets = crear_tickets(2)
+    with django_capture_on_commit_callbacks(execute=True):
+        tickets[0].delete()
+
+    assert ResumenHorario.objects.count() == 1
+    assert _coincide_con_reconstruccion()
+
+
+@pytest.mark.django_db
+def test_cambio_de_estado_por_lote_actualiza_el_resumen(
+        client, django_capture_on_commit_callbacks):
+    """Las transiciones masivas se reflejan con la diferencia agregada en SQL."""
+    with django_capture_on_commit_callbacks(execute=True):
+        tickets = crear_tickets(4, estado='En Cola')
+    elementos = [{'id': t.id, 'estado': 'Completado'} for t in tickets[:3]]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        respuesta = client.patch(reverse('ticket-cambiar-estado-lote'), elementos,
+                                 content_type='application/json')
+
+    assert respuesta.data['actualizados'] == 3
+    assert ResumenHorario.objects.filter(estado='Completado').count() == 3
+    assert ResumenHorario.objects.filter(estado='En Cola').count() == 1
+    assert _coincide_con_reconstruccion()
+
+
+@pytest.mark.django_db
+def test_rendimiento_lee_solo_el_resumen(client, django_assert_num_queries,
+                                         django_capture_on_commit_callbacks):
+    """El panel obtiene los totales del día con una sola consulta al resumen."""
+    with django_capture_on_commit_callbacks(execute=True):
+        crear_tickets(2, estado='Completado')
+        crear_tickets(1, estado='Pendiente')
+
+    with django_assert_num_queries(1):
+        respuesta = client.get(reverse('dashboard-rendimiento'))
+
+    assert respuesta.status_code == status.HTTP_200_OK
+    assert respuesta.data['por_estado'] == {'Completado': 2, 'Pendiente': 1}
+    assert len(respuesta.data['por_hora']) == 3
+    ayer = (timezone.localdate() - timedelta(days=1)).isoformat()
+    vacio = client.get(reverse('dashboard-rendimiento'), {'desde': ayer, 'hasta': ayer})
+    assert vacio.data['total'] == 0
+
+
+@pytest.mark.django_db
+def test_rendimiento_rechaza_parametros_invalidos(client):
+    """Fechas o zona mal formadas responden 400."""
+    respuesta = client.get(reverse('dashboard-rendimiento'), {'desde': '2025-13-40'})
+    assert respuesta.status_code == status.HTTP_400_BAD_REQUEST
+    respuesta = client.get(reverse('dashboard-rendimiento'), {'zona': 'x'})
+    assert respuesta.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_comando_reconstruye_solo_el_rango_pedido():
+    """El backfill por rango no toca las filas de otros días."""
+    crear_tickets(2)
+    hoy = timezone.localdate()
+    ResumenHorario.objects.all().delete()
+
+    call_command('reconstruir_resumen_horario', '--desde', str(hoy - timedelta(days=3)),
+                 '--hasta', str(hoy - timedelta(days=1)))
+    assert not ResumenHorario.objects.exists()
+
+    call_command('reconstruir_resumen_horario', '--desde', str(hoy))
+    assert sum(ResumenHorario.objects.values_list('tickets', flat=True)) == 2
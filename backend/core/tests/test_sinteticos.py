@@ -0,0 +1,93 @@
+"""
+Pruebas del generador de datos sintéticos (core.sinteticos).
+
+El generador debe ser reproducible (misma semilla, mismas filas, con o sin
+pool de procesos) y producir datos coherentes entre tablas.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.core.management import call_command
+from django.db.models import F
+
+from core.models import (
+    ESTADOS_TICKET_ACTIVOS, Buque, CitaRecojo, Contenedor, Factura, Pago, ResumenHorario,
+    Ticket, UbicacionSlot, Usuario, Zona
+)
+from core.sinteticos import generar_datos
+
+FIN = datetime(2025, 6, 1, 12, tzinfo=dt_timezone.utc)
+OPCIONES = {
+    'semilla': 7, 'contenedores': 200, 'clientes': 15, 'operarios': 3, 'zonas': 2,
+    'filas': 2, 'columnas': 3, 'niveles': 2, 'buques': 4, 'dias': 10, 'lote': 64,
+    'password': 'x', 'resumen': False,
+}
+
+
+def _instantanea():
+    filas = {
+        modelo.__name__: list(modelo.objects.order_by('id').values())
+        for modelo in (Zona, Buque, UbicacionSlot, CitaRecojo, Contenedor, Ticket,
+                       Factura, Pago)
+    }
+    # Sin la contraseña: se hashea con una sal nueva en cada generación
+    filas['Usuario'] = list(Usuario.objects.order_by('id').values_list(
+        'id', 'nombre', 'email', 'telefono', 'empresa', 'activo', 'fecha_creacion'))
+    return filas
+
+
+@pytest.mark.django_db
+def test_genera_datos_coherentes():
+    """Tickets activos en slots distintos y ocupados, facturas y pagos cuadrados."""
+    insertadas = generar_datos(OPCIONES, fin=FIN)
+
+    assert insertadas['Ticket'] == Ticket.objects.count() == 200
+    assert Contenedor.objects.count() == 200
+    assert CitaRecojo.objects.count() == 160
+    assert UbicacionSlot.objects.count() == 24
+    assert Usuario.objects.count() == 18
+
+    activos = Ticket.objects.filter(estado__in=ESTADOS_TICKET_ACTIVOS)
+    slots_activos = list(activos.values_list('id_ubicacion', flat=True))
+    assert len(slots_activos) == len(set(slots_activos)) == 6
+    assert not activos.filter(fecha_hora_salida__isnull=False).exists()
+    assert set(UbicacionSlot.objects.filter(estado='ocupado').values_list('id', flat=True)) \
+        == set(slots_activos)
+
+    completados = Ticket.objects.filter(estado='Completado')
+    assert completados.count() == Factura.objects.count() == 194
+    for entrada, salida in completados.values_list('fecha_hora_entrada', 'fecha_hora_salida'):
+        assert timedelta(minutes=1) <= salida - entrada <= timedelta(hours=72)
+        assert salida <= FIN
+    assert not Pago.objects.exclude(monto=F('id_factura__monto')).exists()
+    assert Pago.objects.count() == Factura.objects.filter(estado='Pagada').count()
+    # El ticket de un contenedor con cita es del cliente de la cita
+    assert not Ticket.objects.filter(id_contenedor__id_cita_recojo__isnull=False).exclude(
+        id_usuario=F('id_contenedor__id_cita_recojo__id_cliente')
+    ).exists()
+    assert len(set(Usuario.objects.values_list('password', flat=True))) == 1
+
+
+@pytest.mark.django_db
+def test_misma_semilla_mismas_filas_con_pool_de_procesos():
+    """Los lotes generados en procesos separados coinciden con los generados en línea."""
+    generar_datos(OPCIONES, fin=FIN)
+    en_linea = _instantanea()
+    for modelo in (Pago, Factura, Ticket, Contenedor, CitaRecojo, UbicacionSlot, Zona, Buque,
+                   Usuario):
+        modelo.objects.all().delete()
+
+    generar_datos(OPCIONES, procesos=2, fin=FIN)
+
+    con_pool = _instantanea()
+    assert con_pool == en_linea
+
+
+@pytest.mark.django_db
+def test_comando_genera_y_reconstruye_el_resumen():
+    """El comando inserta los datos y deja el resumen horario al día."""
+    call_command('generar_datos_sinteticos', contenedores=50, zonas=1, filas=2, columnas=2,
+                 niveles=2, buques=2, procesos=1)
+
+    assert Ticket.objects.count() == 50
+    assert sum(ResumenHorario.objects.values_list('tickets', flat=True)) == 50
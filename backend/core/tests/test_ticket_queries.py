@@ -0,0 +1,78 @@
+"""
+Pruebas de presupuesto de consultas para el TicketViewSet.
+
+Verifican que el listado, el detalle y las acciones personalizadas ejecuten
+un número constante de consultas SQL (CONSULTAS_LECTURA), sin importar
+cuántos tickets existan.
+"""
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from core.tests.factories import CONSULTAS_LECTURA, crear_operador, crear_tickets
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cantidad', [1, 10])
+def test_listado_tickets_tiene_presupuesto_constante(client, django_assert_num_queries, cantidad):
+    """El listado debe resolver todas las relaciones en la consulta principal."""
+    crear_tickets(cantidad)
+
+    with django_assert_num_queries(CONSULTAS_LECTURA):
+        response = client.get(reverse('ticket-list'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data) == cantidad
+    assert response.data[0]['ubicacion_info']['zona_nombre'] is not None
+    assert response.data[0]['contenedor_info']['codigo_barras'].startswith('CONT-')
+
+
+@pytest.mark.django_db
+def test_detalle_ticket_tiene_presupuesto_constante(client, django_assert_num_queries):
+    """El detalle de un ticket no debe cargar relaciones de forma perezosa."""
+    ticket = crear_tickets(1)[0]
+
+    with django_assert_num_queries(CONSULTAS_LECTURA):
+        response = client.get(reverse('ticket-detail', args=[ticket.id]))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['usuario_nombre'] == "Operador"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cantidad', [1, 10])
+def test_by_estado_tiene_presupuesto_constante(client, django_assert_num_queries, cantidad):
+    """La acción by_estado debe mantener el mismo presupuesto que el listado."""
+    crear_tickets(cantidad, estado="PENDIENTE")
+    crear_tickets(2, estado="COMPLETADO")
+
+    with django_assert_num_queries(CONSULTAS_LECTURA):
+        response = client.get(reverse('ticket-by-estado'), {'estado': 'PENDIENTE'})
+
+    assert len(response.data) == cantidad
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cantidad', [1, 10])
+def test_by_usuario_tiene_presupuesto_constante(client, django_assert_num_queries, cantidad):
+    """La acción by_usuario debe mantener el mismo presupuesto que el listado."""
+    usuario = crear_operador()
+    crear_tickets(cantidad, usuario=usuario)
+    crear_tickets(2)
+
+    with django_assert_num_queries(CONSULTAS_LECTURA):
+        response = client.get(reverse('ticket-by-usuario'), {'usuario_id': usuario.id})
+
+    assert len(response.data) == cantidad
+
+
+@pytest.mark.django_db
+def test_cambiar_estado_no_recarga_relaciones(client, django_assert_num_queries):
+    """cambiar_estado solo debe leer el ticket (con JOIN) y actualizarlo."""
+    ticket = crear_tickets(1)[0]
+    url = reverse('ticket-cambiar-estado', args=[ticket.id])
+
+    with django_assert_num_queries(2):
+        response = client.patch(url, {'estado': 'Completado'}, content_type='application/json')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['ubicacion_info']['zona_id'] == ticket.id_ubicacion.id_zona.id
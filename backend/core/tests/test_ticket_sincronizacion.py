@@ -0,0 +1,121 @@
+"""
+Pruebas de la sincronización incremental de tickets (`?since=<cursor>`).
+"""
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from core.models import Ticket, TicketEliminado
+from core.tests.factories import crear_tickets
+
+
+def _envejecer(*tickets, minutos=10):
+    """Lleva la fecha de modificación de los tickets al pasado, sin pasar por save()."""
+    Ticket.objects.filter(id__in=[t.id for t in tickets]).update(
+        fecha_modificacion=timezone.now() - timedelta(minutes=minutos)
+    )
+
+
+@pytest.mark.django_db
+def test_since_vacio_devuelve_todo_con_cursor(client):
+    """Una sincronización completa devuelve todos los tickets y un cursor."""
+    crear_tickets(3)
+
+    response = client.get(reverse('ticket-list'), {'since': ''})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['tickets']) == 3
+    assert response.data['eliminados'] == []
+    assert response.data['cursor']
+
+
+@pytest.mark.django_db
+def test_since_solo_devuelve_cambios(client):
+    """Tras el cursor solo viajan los tickets modificados y los eliminados."""
+    sin_cambios, modificado, eliminado = crear_tickets(3)
+    _envejecer(sin_cambios, modificado, eliminado)
+    cursor = (timezone.now() - timedelta(minutes=5)).isoformat()
+
+    url = reverse('ticket-cambiar-estado', args=[modificado.id])
+    client.patch(url, {'estado': 'Completado'}, content_type='application/json')
+    eliminado_id = eliminado.id
+    eliminado.delete()
+
+    response = client.get(reverse('ticket-list'), {'since': cursor})
+
+    assert [t['id'] for t in response.data['tickets']] == [modificado.id]
+    assert response.data['eliminados'] == [eliminado_id]
+
+
+@pytest.mark.django_db
+def test_sondeo_sin_cambios_no_devuelve_filas(client, django_assert_num_queries):
+    """Un sondeo estable cuesta las versiones y dos consultas indexadas, sin filas."""
+    tickets = crear_tickets(5)
+    _envejecer(*tickets)
+    cursor = (timezone.now() - timedelta(minutes=5)).isoformat()
+
+    with django_assert_num_queries(3):
+        response = client.get(reverse('ticket-list'), {'since': cursor})
+
+    assert response.data['tickets'] == []
+    assert response.data['cursor'] > cursor
+
+
+@pytest.mark.django_db
+def test_cursor_no_retrocede(client):
+    """El cursor nuevo nunca es anterior al recibido."""
+    futuro = (timezone.now() + timedelta(minutes=1)).isoformat()
+
+    response = client.get(reverse('ticket-list'), {'since': futuro})
+
+    assert response.data['cursor'] == futuro
+
+
+@pytest.mark.django_db
+def test_cursor_invalido(client):
+    """Un cursor que no es una fecha ISO responde 400."""
+    response = client.get(reverse('ticket-list'), {'since': 'ayer'})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_save_mantiene_fecha_modificacion():
+    """Cualquier save() actualiza fecha_modificacion."""
+    ticket = crear_tickets(1)[0]
+    _envejecer(ticket)
+    ticket.refresh_from_db()
+    anterior = ticket.fecha_modificacion
+
+    ticket.estado = "En Proceso"
+    ticket.save()
+
+    assert ticket.fecha_modificacion > anterior
+
+
+@pytest.mark.django_db
+@override_settings(SINCRONIZACION_RETENCION_DIAS=7)
+def test_purga_de_lapidas_y_cursor_caducado(client):
+    """Las lápidas fuera de la retención se purgan y su cursor exige resincronizar."""
+    antiguo, reciente = (ticket.id for ticket in crear_tickets(2))
+    Ticket.objects.get(pk=antiguo).delete()
+    Ticket.objects.get(pk=reciente).delete()
+    TicketEliminado.objects.filter(id_ticket=antiguo).update(
+        fecha_eliminacion=timezone.now() - timedelta(days=8)
+    )
+
+    call_command('purgar_tickets_eliminados')
+
+    assert list(TicketEliminado.objects.values_list('id_ticket', flat=True)) == [reciente]
+    caducado = (timezone.now() - timedelta(days=8)).isoformat()
+    response = client.get(reverse('ticket-list'), {'since': caducado})
+    assert response.status_code == status.HTTP_410_GONE
+    assert response.data['resincronizar'] is True
+    vigente = (timezone.now() - timedelta(days=6)).isoformat()
+    assert client.get(reverse('ticket-list'), {'since': vigente}).data['eliminados'] \
+        == [reciente]
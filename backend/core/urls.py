@@ -23,5 +23,19 @@ router.register(r'pagos', views.PagoViewSet)
 router.register(r'reportes', views.ReporteViewSet)
 
 urlpatterns = [
+    path(
+        'dashboard/estadisticas/', views.EstadisticasDashboardView.as_view(),
+        name='dashboard-estadisticas'
+    ),
+    path(
+        'dashboard/rendimiento/', views.RendimientoPatioView.as_view(),
+        name='dashboard-rendimiento'
+    ),
+    # Antes del router: el login es una vista asíncrona fuera del UsuarioViewSet
+    path('usuarios/login/', views.login_usuario, name='usuario-login'),
+    path('auth/refrescar/', views.RefrescarTokenView.as_view(), name='auth-refrescar'),
+    path('auth/yo/', views.UsuarioActualView.as_view(), name='auth-yo'),
+    path('auth/revocar/', views.RevocarTokenView.as_view(), name='auth-revocar'),
+    path('eventos/', views.stream_eventos, name='eventos-stream'),
     path('', include(router.urls)),
 ]
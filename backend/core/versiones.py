@@ -0,0 +1,138 @@
+"""
+Validadores HTTP (ETag / Last-Modified) basados en contadores de versión por tabla.
+
+Cada escritura confirmada en una tabla versionada incrementa su fila en
+VersionTabla (ver core.signals). Los ViewSets con `RespuestaCondicionalMixin`
+derivan sus validadores de esos contadores con una sola consulta por clave
+primaria y, si el cliente ya tiene la representación vigente, responden 304
+sin ejecutar la consulta principal ni serializar.
+
+Las escrituras que no pasan por save()/delete() (QuerySet.update, bulk_create)
+deben llamar a `incrementar_version` explícitamente.
+"""
+import hashlib
+import math
+
+from django.db.models import F
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.exceptions import APIException
+
+from .models import (
+    Rol, NivelAcceso, Usuario, Zona, UbicacionSlot, Buque,
+    CitaRecojo, Contenedor, Ticket, Factura, Pago, Reporte, VersionTabla
+)
+
+MODELOS_VERSIONADOS = [
+    Rol, NivelAcceso, Usuario, Zona, UbicacionSlot, Buque,
+    CitaRecojo, Contenedor, Ticket, Factura, Pago, Reporte
+]
+
+
+def incrementar_version(*modelos):
+    """Incrementa el contador de versión de las tablas de `modelos`."""
+    tablas = {modelo._meta.db_table for modelo in modelos}
+    actualizadas = VersionTabla.objects.filter(tabla__in=tablas).update(
+        version=F('version') + 1, fecha_modificacion=timezone.now()
+    )
+    if actualizadas < len(tablas):
+        # Tablas sin contador (p. ej. tras vaciar la base): se crean ya incrementadas
+        VersionTabla.objects.bulk_create(
+            [VersionTabla(tabla=tabla, version=1) for tabla in tablas], ignore_conflicts=True
+        )
+
+
+def obtener_versiones(modelos):
+    """Devuelve ({tabla: version}, ultima_modificacion) para las tablas de `modelos`."""
+    tablas = [modelo._meta.db_table for modelo in modelos]
+    filas = VersionTabla.objects.filter(tabla__in=tablas).values_list(
+        'tabla', 'version', 'fecha_modificacion'
+    )
+    versiones = dict.fromkeys(tablas, 0)
+    ultima = None
+    for tabla, version, fecha in filas:
+        versiones[tabla] = version
+        if ultima is None or fecha > ultima:
+            ultima = fecha
+    return versiones, ultima
+
+
+def _ultima_modificacion_http(ultima):
+    """
+    Segundo HTTP para Last-Modified, o None si aún no se puede anunciar.
+
+    Las fechas HTTP tienen resolución de segundos: se redondea hacia arriba
+    y, mientras ese segundo no haya terminado, no se envía. Otra escritura en
+    el mismo segundo tendría la misma fecha y un cliente que solo mande
+    If-Modified-Since recibiría un 304 obsoleto; el ETag sigue validando.
+    """
+    if ultima is None:
+        return None
+    segundo = math.ceil(ultima.timestamp())
+    return segundo if segundo <= timezone.now().timestamp() else None
+
+
+class NoModificado(APIException):
+    """Corta el flujo de la vista cuando la representación del cliente está vigente."""
+    status_code = 304
+
+    def __init__(self, respuesta):
+        super().__init__()
+        self.respuesta = respuesta
+
+
+class RespuestaCondicionalMixin:
+    """
+    Añade ETag y Last-Modified a las lecturas y responde 304 cuando proceden.
+
+    El ETag combina las versiones de `tablas_dependientes` (las tablas que
+    lee el serializer), la ruta completa con sus parámetros y el formato de
+    salida negociado. Solo se aplica a las acciones de `acciones_condicionales`.
+    """
+    tablas_dependientes = ()
+    acciones_condicionales = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        """Tras autenticar, evalúa las precondiciones antes de ejecutar la acción."""
+        super().initial(request, *args, **kwargs)
+        self._validadores = None
+        if request.method not in ('GET', 'HEAD') or self.action not in self.acciones_condicionales:
+            return
+
+        modelos = self.tablas_dependientes or (self.get_queryset().model,)
+        versiones, ultima = obtener_versiones(modelos)
+        ultima = _ultima_modificacion_http(ultima)
+        huella = hashlib.sha1(repr((
+            sorted(versiones.items()), request.get_full_path(),
+            request.accepted_renderer.format,
+        )).encode()).hexdigest()
+        validadores = HttpResponse()
+        validadores['ETag'] = f'"{huella}"'
+        if ultima is not None:
+            validadores['Last-Modified'] = http_date(ultima)
+        self._validadores = validadores
+
+        respuesta = get_conditional_response(
+            request, etag=validadores['ETag'],
+            last_modified=ultima, response=validadores
+        )
+        if respuesta is not validadores:
+            raise NoModificado(respuesta)
+
+    def handle_exception(self, exc):
+        """Devuelve tal cual la respuesta 304/412 calculada en `initial`."""
+        if isinstance(exc, NoModificado):
+            return exc.respuesta
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Copia los validadores a las respuestas exitosas."""
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validadores = getattr(self, '_validadores', None)
+        if validadores is not None and 200 <= response.status_code < 300:
+            for cabecera in ('ETag', 'Last-Modified'):
+                if cabecera in validadores:
+                    response[cabecera] = validadores[cabecera]
+        return response
@@ -5,78 +5,108 @@ Implementa los endpoints CRUD (Crear, Leer, Actualizar, Borrar) y acciones
 personalizadas para la lógica de negocio, incluyendo el manejo de autenticación 
 y la consulta de tickets.
 """
+import asyncio
+import hmac
+import json
+from datetime import datetime, time, timedelta
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from django.contrib.auth.hashers import check_password
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken, Token
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 # C0415 Corregido: Mover importación de django.utils a la parte superior
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.db.models import F, FilteredRelation, Q
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from .acceso import (
+    ip_cliente, limpiar_fallos, login_bloqueado, pool_hash, registrar_fallo,
+    verificar_password
+)
+from .asignacion import asignar_slot
+from .autenticacion import (
+    TokenRevocado, emitir_tokens, refrescar_tokens, revocar_token
+)
+from .cache import busqueda_contenedores
+from .estadisticas import obtener_estadisticas_dashboard
+from .eventos import obtener_broker, formatear_sse
+from .exportacion import ExportacionMixin
+from .lotes import CambioEstadoLoteMixin, LoteMixin
+from .metricas import registro_exposicion
+from .manifiestos import (
+    FORMATOS, ManifiestoIlegible, detectar_formato, importar_manifiesto, leer_manifiesto
+)
+from .puerta import CheckInRechazado, registrar_check_in
+from .reportes import ReporteInvalido, solicitar_reporte
+from .resumenes import CambioResumen, rendimiento
+from .tasks import limite_retencion_eliminados
+from .versiones import RespuestaCondicionalMixin
+from .catalogos import CacheCatalogoMixin
 from .models import (
-    Rol, NivelAcceso, Usuario, Zona, UbicacionSlot, Buque,
-    CitaRecojo, Contenedor, Ticket, Factura, Pago, Reporte
+    ESTADOS_TICKET_ACTIVOS, Rol, NivelAcceso, Usuario, Zona, UbicacionSlot, Buque,
+    CitaRecojo, Contenedor, Ticket, TicketEliminado, Factura, Pago, Reporte
 )
 from .serializers import (
     RolSerializer, NivelAccesoSerializer, UsuarioSerializer, ZonaSerializer,
     UbicacionSlotSerializer, BuqueSerializer, CitaRecojoSerializer, ContenedorSerializer,
     TicketSerializer, FacturaSerializer, PagoSerializer, ReporteSerializer
 )
+from .filters import (
+    UsuarioFilter, UbicacionSlotFilter, CitaRecojoFilter, ContenedorFilter,
+    TicketFilter, FacturaFilter, PagoFilter
+)
+
+# Margen hacia atrás del cursor de sincronización: cubre transacciones que
+# confirman después de leer la hora. Los tickets de ese margen se reenvían.
+MARGEN_SINCRONIZACION = timedelta(seconds=2)
 
+# Segundos sin eventos tras los que el stream SSE envía un comentario de latido
+LATIDO_EVENTOS = 15
+
+
+def _respuesta_listado(vista, queryset):
+    """
+    Serializa un queryset desde una acción personalizada de listado.
+
+    Aplica los filtros del ViewSet y su paginación opcional, igual que `list`.
+    """
+    queryset = vista.filter_queryset(queryset)
+    pagina = vista.paginate_queryset(queryset)
+    if pagina is not None:
+        serializer = vista.get_serializer(pagina, many=True)
+        return vista.get_paginated_response(serializer.data)
+    serializer = vista.get_serializer(queryset, many=True)
+    return Response(serializer.data)
 
-class RolViewSet(viewsets.ModelViewSet):
+
+class RolViewSet(CacheCatalogoMixin, RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para el modelo Rol, permitiendo operaciones CRUD."""
     queryset = Rol.objects.all()
     serializer_class = RolSerializer
 
 
-class NivelAccesoViewSet(viewsets.ModelViewSet):
+class NivelAccesoViewSet(CacheCatalogoMixin, RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para el modelo NivelAcceso, permitiendo operaciones CRUD."""
     queryset = NivelAcceso.objects.all()
     serializer_class = NivelAccesoSerializer
 
 
-class UsuarioViewSet(viewsets.ModelViewSet):
+class UsuarioViewSet(RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para el modelo Usuario, con acción personalizada para el login."""
-    queryset = Usuario.objects.all()
+    queryset = Usuario.objects.select_related('id_rol', 'id_nivel_acceso')
     serializer_class = UsuarioSerializer
-    @action(detail=False, methods=['post'])
-    def login(self, request):
-        """
-        Permite a un usuario autenticarse mediante email y contraseña.
-        
-        Realiza la verificación de hash de contraseña y retorna los datos del usuario.
-        """
-        email = request.data.get('email')
-        password = request.data.get('password')
-
-        if not email or not password:
-            return Response(
-                {'error': 'Email y contraseña son requeridos'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        try:
-            # C0301 Corregido: Línea larga
-            usuario = Usuario.objects.select_related(
-                'id_rol', 'id_nivel_acceso'
-            ).get(email=email, activo=True)
-
-            if check_password(password, usuario.password):
-                serializer = self.get_serializer(usuario)
-                return Response({
-                    'user': serializer.data,
-                    'message': 'Login exitoso'
-                })
-
-            # R1705 Corregido: Eliminado 'else' innecesario
-            return Response(
-                {'error': 'Credenciales inválidas'},
-                status=status.HTTP_401_UNAUTHORIZED
-            )
-        except Usuario.DoesNotExist:
-            return Response(
-                {'error': 'Usuario no encontrado'},
-                status=status.HTTP_404_NOT_FOUND
-            )
+    filterset_class = UsuarioFilter
+    tablas_dependientes = (Usuario, Rol, NivelAcceso)
+    acciones_condicionales = ('list', 'retrieve', 'by_role')
     @action(detail=False, methods=['get'])
     def by_role(self, request):
         """
@@ -84,64 +114,298 @@ class UsuarioViewSet(viewsets.ModelViewSet):
         """
         role = request.query_params.get('role')
         if role:
-            usuarios = self.queryset.filter(id_rol__rol=role, activo=True)
-            serializer = self.get_serializer(usuarios, many=True)
-            return Response(serializer.data)
+            usuarios = self.get_queryset().filter(id_rol__rol=role, activo=True)
+            return _respuesta_listado(self, usuarios)
         return Response({'error': 'Rol no especificado'}, status=status.HTTP_400_BAD_REQUEST)
-class ZonaViewSet(viewsets.ModelViewSet):
+class ZonaViewSet(CacheCatalogoMixin, RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para el modelo Zona."""
     queryset = Zona.objects.all()
     serializer_class = ZonaSerializer
 
 
-class UbicacionSlotViewSet(viewsets.ModelViewSet):
+class UbicacionSlotViewSet(LoteMixin, CambioEstadoLoteMixin, RespuestaCondicionalMixin,
+                           viewsets.ModelViewSet):
     """ViewSet para el modelo UbicacionSlot."""
     queryset = UbicacionSlot.objects.all()
     serializer_class = UbicacionSlotSerializer
+    filterset_class = UbicacionSlotFilter
+    tipo_evento = 'slot'
+    campos_evento = ('id_zona',)
+
+    @action(detail=False, methods=['post'])
+    def asignar(self, request):
+        """
+        Ocupa de forma atómica un slot libre de la zona `id_zona` y lo devuelve.
+
+        Sustituye a descargar todos los slots y marcar uno con PATCH desde el
+        cliente: dos operadores nunca reciben el mismo slot.
+        """
+        zona_id = request.data.get('id_zona')
+        try:
+            zona_id = int(zona_id)
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'Debe indicar un id_zona numérico'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        slot = asignar_slot(zona_id)
+        if slot is None:
+            return Response(
+                {'error': 'No hay slots disponibles en la zona'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(self.get_serializer(slot).data)
 
 
-class BuqueViewSet(viewsets.ModelViewSet):
+class BuqueViewSet(CacheCatalogoMixin, RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para el modelo Buque."""
     queryset = Buque.objects.all()
     serializer_class = BuqueSerializer
 
+    @action(detail=True, methods=['post'])
+    def manifiesto(self, request, pk=None):  # pylint: disable=unused-argument
+        """
+        Importa el manifiesto (CSV o JSONL, campo `archivo`) de contenedores del buque.
 
-class CitaRecojoViewSet(viewsets.ModelViewSet):
-    """ViewSet para el modelo CitaRecojo."""
-    queryset = CitaRecojo.objects.all()
+        El archivo se procesa en streaming por bloques; la respuesta resume las
+        filas cargadas y detalla las rechazadas. Un archivo que no es UTF-8 o un
+        CSV mal formado responde 400 con la línea del problema (los bloques
+        anteriores ya quedaron cargados).
+        """
+        buque = self.get_object()
+        archivo = request.FILES.get('archivo')
+        if archivo is None:
+            return Response(
+                {'error': 'Debe adjuntar el manifiesto en el campo archivo'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        formato = detectar_formato(archivo.name, request.data.get('formato'))
+        if formato not in FORMATOS:
+            return Response(
+                {'error': f"Formato no soportado: {formato}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            resultado = importar_manifiesto(leer_manifiesto(archivo.file, formato), buque)
+        except ManifiestoIlegible as error:
+            return Response(
+                {'error': str(error), 'linea': error.linea, **error.resultado.como_dict()},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(resultado.como_dict(), status=status.HTTP_201_CREATED)
+
+
+class CitaRecojoViewSet(RespuestaCondicionalMixin, viewsets.ModelViewSet):
+    """ViewSet para el modelo CitaRecojo.
+
+    El cliente se resuelve con un JOIN para servir cliente_nombre/cliente_email.
+    """
+    queryset = CitaRecojo.objects.select_related('id_cliente')
     serializer_class = CitaRecojoSerializer
+    filterset_class = CitaRecojoFilter
+    tablas_dependientes = (CitaRecojo, Usuario)
 
 
-class ContenedorViewSet(viewsets.ModelViewSet):
-    """ViewSet para el modelo Contenedor."""
-    queryset = Contenedor.objects.all()
+class ContenedorViewSet(ExportacionMixin, LoteMixin, RespuestaCondicionalMixin,
+                        viewsets.ModelViewSet):
+    """ViewSet para el modelo Contenedor.
+
+    Buque, cita y cliente de la cita se resuelven en la misma consulta.
+    """
+    queryset = Contenedor.objects.select_related(
+        'id_buque', 'id_cita_recojo__id_cliente'
+    )
     serializer_class = ContenedorSerializer
+    filterset_class = ContenedorFilter
+    tablas_dependientes = (Contenedor, Buque, CitaRecojo, Usuario)
+
+    @action(detail=False, methods=['get'])
+    def buscar(self, request):
+        """
+        Busca un contenedor por `codigo_barras` o `numero_contenedor`.
+
+        Devuelve en una sola consulta indexada el contenedor, su ticket activo,
+        su cita y el slot que ocupa. Las respuestas se guardan en una caché LRU
+        que se invalida al escribir cualquiera de esas filas.
+        """
+        for campo in ('codigo_barras', 'numero_contenedor'):
+            valor = request.query_params.get(campo)
+            if valor:
+                break
+        else:
+            return Response(
+                {'error': 'Código de barras o número de contenedor no especificado'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        clave = (campo, valor)
+        datos = busqueda_contenedores.obtener(clave)
+        if datos is not None:
+            return Response(datos)
+
+        contenedor = self.get_queryset().annotate(
+            ticket_activo=FilteredRelation(
+                'ticket', condition=Q(ticket__estado__in=ESTADOS_TICKET_ACTIVOS)
+            )
+        ).select_related(
+            'ticket_activo__id_usuario', 'ticket_activo__id_ubicacion__id_zona'
+        ).filter(**{campo: valor}).order_by(
+            # numero_contenedor no es único: primero el que tiene ticket activo
+            # (PostgreSQL pone los NULL delante en DESC) y luego el más reciente
+            F('ticket_activo__fecha_hora_entrada').desc(nulls_last=True), '-id'
+        ).first()
+        if contenedor is None:
+            return Response(
+                {'error': 'Contenedor no encontrado'}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        # Sin ticket activo, Django no asigna el atributo de la relación filtrada
+        ticket = getattr(contenedor, 'ticket_activo', None)
+        cita = contenedor.id_cita_recojo
+        slot = ticket.id_ubicacion if ticket else None
+        datos = {
+            'contenedor': self.get_serializer(contenedor).data,
+            'ticket': TicketSerializer(ticket).data if ticket else None,
+            'cita': CitaRecojoSerializer(cita).data if cita else None,
+            'ubicacion': UbicacionSlotSerializer(slot).data if slot else None,
+        }
+        dependencias = {('contenedor', contenedor.pk)}
+        if ticket:
+            dependencias |= {('ticket', ticket.pk), ('slot', slot.pk)}
+        if cita:
+            dependencias.add(('cita', cita.pk))
+        busqueda_contenedores.guardar(clave, datos, dependencias)
+        return Response(datos)
+
+    @action(detail=False, methods=['post'], url_path='check-in')
+    def check_in(self, request):
+        """
+        Check-in de puerta por código de barras en una sola transacción.
+
+        Recibe `codigo_barras` e `id_zona`; valida la cita, asigna un slot libre
+        de la zona, crea el ticket y pasa la cita a 'en_proceso'.
+        """
+        codigo_barras = request.data.get('codigo_barras')
+        try:
+            zona_id = int(request.data.get('id_zona'))
+        except (TypeError, ValueError):
+            zona_id = None
+        if not codigo_barras or zona_id is None:
+            return Response(
+                {'error': 'Debe indicar codigo_barras e id_zona'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            ticket = registrar_check_in(codigo_barras, zona_id)
+        except CheckInRechazado as error:
+            return Response({'error': error.mensaje}, status=error.codigo)
+
+        cita = ticket.id_contenedor.id_cita_recojo
+        return Response({
+            'ticket': TicketSerializer(ticket).data,
+            'cita': CitaRecojoSerializer(cita).data,
+            'retrasado': bool(cita.fecha_recojo and timezone.localdate() > cita.fecha_recojo),
+        }, status=status.HTTP_201_CREATED)
 
 
-class TicketViewSet(viewsets.ModelViewSet):
+class TicketViewSet(ExportacionMixin, LoteMixin, CambioEstadoLoteMixin,
+                    RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para el modelo Ticket.
     
     Con acciones personalizadas para filtrado y cambio de estado.
+    El queryset resuelve usuario, contenedor y ubicación (con su zona) en un
+    único JOIN, de modo que el número de consultas no depende de las filas.
     """
-    queryset = Ticket.objects.all()
+    queryset = Ticket.objects.select_related(
+        'id_usuario', 'id_contenedor', 'id_ubicacion__id_zona'
+    )
     serializer_class = TicketSerializer
+    filterset_class = TicketFilter
+    tablas_dependientes = (Ticket, Usuario, Contenedor, UbicacionSlot, Zona)
+    acciones_condicionales = ('list', 'retrieve', 'by_estado', 'by_usuario')
+    # Órdenes admitidos por la paginación por cursor (?orden=), sobre columnas indexadas
+    ordenes_cursor = {
+        'id': ('id',),
+        '-id': ('-id',),
+        'fecha_hora_entrada': ('fecha_hora_entrada', 'id'),
+        '-fecha_hora_entrada': ('-fecha_hora_entrada', '-id'),
+    }
+    tipo_evento = 'ticket'
+    campos_evento = ('id_ubicacion', 'id_contenedor', 'id_usuario')
+    seguimiento_lote = CambioResumen
+
+    def campos_transicion(self, estado, ahora):
+        """Como cambiar_estado: pasar a 'Completado' registra la fecha de salida."""
+        return {'fecha_hora_salida': ahora} if estado == 'Completado' else {}
+
+    def list(self, request, *args, **kwargs):
+        """
+        Lista los tickets; con `?since=<cursor>` devuelve solo los cambios.
+
+        En modo incremental la respuesta incluye los tickets creados o
+        modificados después del cursor, los ids eliminados y un cursor nuevo.
+        Un `since` vacío equivale a una sincronización completa. Un cursor
+        anterior a la retención de borrados (SINCRONIZACION_RETENCION_DIAS)
+        responde 410 con `resincronizar`: el cliente debe empezar de cero.
+        """
+        if 'since' not in request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        ahora = timezone.now()
+        queryset = self.filter_queryset(self.get_queryset())
+        eliminados = []
+        desde = None
+        since = request.query_params['since']
+        if since:
+            # Un '+' sin codificar en la URL llega como espacio
+            desde = parse_datetime(since.replace(' ', '+'))
+            if desde is None:
+                return Response(
+                    {'error': 'Cursor de sincronización inválido'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(desde):
+                desde = timezone.make_aware(desde)
+            if desde < limite_retencion_eliminados():
+                # Los borrados anteriores ya se purgaron: no se pueden informar
+                return Response(
+                    {'error': 'Cursor de sincronización caducado; resincronice con since vacío',
+                     'resincronizar': True},
+                    status=status.HTTP_410_GONE
+                )
+            queryset = queryset.filter(fecha_modificacion__gt=desde)
+            eliminados = list(TicketEliminado.objects.filter(
+                fecha_eliminacion__gt=desde
+            ).values_list('id_ticket', flat=True))
+
+        cursor = ahora - MARGEN_SINCRONIZACION
+        if desde is not None:
+            cursor = max(cursor, desde)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response({
+            'cursor': cursor.isoformat(),
+            'tickets': serializer.data,
+            'eliminados': eliminados,
+        })
+
     @action(detail=False, methods=['get'])
     def by_estado(self, request):
         """Filtra tickets por el estado especificado."""
         estado = request.query_params.get('estado')
         if estado:
-            tickets = self.queryset.filter(estado=estado)
-            serializer = self.get_serializer(tickets, many=True)
-            return Response(serializer.data)
+            tickets = self.get_queryset().filter(estado=estado)
+            return _respuesta_listado(self, tickets)
         return Response({'error': 'Estado no especificado'}, status=status.HTTP_400_BAD_REQUEST)
     @action(detail=False, methods=['get'])
     def by_usuario(self, request):
         """Filtra tickets por el ID de usuario especificado."""
         usuario_id = request.query_params.get('usuario_id')
         if usuario_id:
-            tickets = self.queryset.filter(id_usuario=usuario_id)
-            serializer = self.get_serializer(tickets, many=True)
-            return Response(serializer.data)
+            tickets = self.get_queryset().filter(id_usuario=usuario_id)
+            return _respuesta_listado(self, tickets)
         return Response({'error': 'Usuario no especificado'}, status=status.HTTP_400_BAD_REQUEST)
     @action(detail=True, methods=['patch'])
     def cambiar_estado(self, request, pk=None):  # pylint: disable=unused-argument  # pylint: disable=unused-argument
@@ -164,19 +428,289 @@ class TicketViewSet(viewsets.ModelViewSet):
         return Response({'error': 'Estado no especificado'}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class FacturaViewSet(viewsets.ModelViewSet):
+class FacturaViewSet(ExportacionMixin, RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para el modelo Factura."""
     queryset = Factura.objects.all()
     serializer_class = FacturaSerializer
+    filterset_class = FacturaFilter
 
 
-class PagoViewSet(viewsets.ModelViewSet):
+class PagoViewSet(ExportacionMixin, RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para el modelo Pago."""
     queryset = Pago.objects.all()
     serializer_class = PagoSerializer
+    filterset_class = PagoFilter
 
 
-class ReporteViewSet(viewsets.ModelViewSet):
+class ReporteViewSet(RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para el modelo Reporte."""
     queryset = Reporte.objects.all()
     serializer_class = ReporteSerializer
+
+    @action(detail=False, methods=['post'])
+    def solicitar(self, request):
+        """
+        Solicita un reporte `{tipo, parametros, regenerar}`.
+
+        Si ya existe un resultado para el mismo tipo y parámetros se devuelve
+        (200); si no, se encola su cálculo y se responde 202 con la fila, que
+        el cliente consulta hasta que su estado sea 'completado'.
+        """
+        try:
+            reporte = solicitar_reporte(
+                request.data.get('tipo'), request.data.get('parametros'),
+                regenerar=bool(request.data.get('regenerar'))
+            )
+        except ReporteInvalido as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        reporte.refresh_from_db()
+        codigo = (status.HTTP_200_OK if reporte.estado == Reporte.ESTADO_COMPLETADO
+                  else status.HTTP_202_ACCEPTED)
+        return Response(self.get_serializer(reporte).data, status=codigo)
+
+
+class EstadisticasDashboardView(APIView):
+    """
+    Estadísticas del panel de administración calculadas en SQL.
+
+    Devuelve tickets por estado, usuarios por rol y slots por zona y estado a
+    partir de una consulta agregada, cacheada unos segundos e invalidada al
+    escribir en las tablas implicadas.
+    """
+
+    def get(self, request):  # pylint: disable=unused-argument
+        """Devuelve los conteos agregados del sistema."""
+        return Response(obtener_estadisticas_dashboard())
+
+
+class RefrescarTokenView(APIView):
+    """
+    Canjea un token de refresco por un par nuevo (`access` y `refresh`).
+
+    El token usado queda revocado (rotación), de modo que solo sirve una vez.
+    """
+    authentication_classes = []
+
+    def post(self, request):
+        """Devuelve el nuevo par de tokens o 401 si el de refresco no es válido."""
+        refresco = request.data.get('refresh')
+        if not refresco:
+            return Response({'error': 'Token de refresco requerido'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return Response(refrescar_tokens(refresco))
+        except TokenRevocado as error:
+            return Response({'error': str(error)}, status=status.HTTP_401_UNAUTHORIZED)
+
+
+class RevocarTokenView(APIView):
+    """
+    Cierre de sesión: revoca el token de acceso presentado y el de refresco enviado.
+    """
+
+    def post(self, request):
+        """Revoca los tokens; responde 204 aunque alguno ya no fuera válido."""
+        if isinstance(request.auth, Token):
+            revocar_token(request.auth)
+        refresco = request.data.get('refresh')
+        if refresco:
+            try:
+                revocar_token(RefreshToken(refresco))
+            except TokenError:
+                pass
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UsuarioActualView(APIView):
+    """
+    Identidad del usuario autenticado, leída de los claims del token (sin consultas).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Devuelve id, email, nombre, rol y nivel de acceso del usuario del token."""
+        usuario = request.user
+        return Response({
+            campo: getattr(usuario, campo, None)
+            for campo in ('id', 'email', 'nombre', 'rol', 'nivel_acceso')
+        })
+
+
+class RendimientoPatioView(APIView):
+    """
+    Rendimiento del patio leído del resumen horario (core.resumenes).
+
+    `?desde=` y `?hasta=` (fecha o fecha y hora ISO; por defecto, desde el
+    inicio del día hasta ahora) y `?zona=` acotan las filas. No recorre la
+    tabla de tickets.
+    """
+
+    def get(self, request):
+        """Devuelve las filas por hora y los totales por estado del rango."""
+        ahora = timezone.localtime()
+        try:
+            desde = _instante(request.query_params.get('desde'))
+            hasta = _instante(request.query_params.get('hasta'), fin_de_dia=True)
+            zona = request.query_params.get('zona')
+            zona = int(zona) if zona else None
+        except ValueError:
+            return Response(
+                {'error': 'Parámetros no válidos (fechas ISO 8601, zona numérica)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        desde = desde or ahora.replace(hour=0, minute=0, second=0, microsecond=0)
+        return Response(rendimiento(desde, hasta or ahora, zona))
+
+
+def _instante(valor, fin_de_dia=False):
+    """Convierte una fecha o fecha y hora ISO en un datetime con zona horaria."""
+    if not valor:
+        return None
+    # Un '+' sin codificar en la query llega como espacio
+    instante = parse_datetime(valor.replace(' ', '+'))
+    if instante is None:
+        fecha = parse_date(valor)
+        if fecha is None:
+            raise ValueError(valor)
+        instante = datetime.combine(fecha + timedelta(days=1) if fin_de_dia else fecha, time.min)
+    if timezone.is_naive(instante):
+        instante = timezone.make_aware(instante)
+    return instante
+
+
+def _respuesta_json(datos, estado=status.HTTP_200_OK, cabeceras=None):
+    """Response de DRF (JSON) para las vistas de Django que no son APIView."""
+    respuesta = Response(datos, status=estado, headers=cabeceras)
+    respuesta.accepted_renderer = JSONRenderer()
+    respuesta.accepted_media_type = 'application/json'
+    respuesta.renderer_context = {}
+    return respuesta
+
+
+def _datos_peticion(request):
+    """Cuerpo JSON o de formulario de una petición fuera de DRF."""
+    if request.content_type != 'application/json':
+        return request.POST
+    try:
+        datos = json.loads(request.body or b'{}')
+    except ValueError:
+        return {}
+    return datos if isinstance(datos, dict) else {}
+
+
+@csrf_exempt
+@require_POST
+async def login_usuario(request):
+    """
+    Permite a un usuario autenticarse mediante email y contraseña.
+
+    Vista asíncrona: la verificación del hash se hace en el pool acotado de
+    core.acceso, de modo que el worker sigue atendiendo otras peticiones.
+    Los intentos fallidos se limitan por email y por IP del cliente
+    (core.acceso.ip_cliente) con 429 y, si el hash guardado usa parámetros
+    antiguos, se recalcula tras un login correcto.
+    Retorna los datos del usuario junto con su par de tokens JWT.
+    """
+    datos = _datos_peticion(request)
+    email, password = datos.get('email'), datos.get('password')
+    if not email or not password:
+        return _respuesta_json(
+            {'error': 'Email y contraseña son requeridos'}, status.HTTP_400_BAD_REQUEST
+        )
+
+    ip = ip_cliente(request)
+    if await login_bloqueado(email, ip):
+        return _respuesta_json(
+            {'error': 'Demasiados intentos fallidos; inténtelo más tarde'},
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            {'Retry-After': str(getattr(settings, 'LOGIN_VENTANA_FALLOS', 900))}
+        )
+
+    usuario = await Usuario.objects.select_related('id_rol', 'id_nivel_acceso').filter(
+        email=email, activo=True
+    ).afirst()
+    if usuario is None:
+        await registrar_fallo(email, ip)
+        return _respuesta_json({'error': 'Usuario no encontrado'}, status.HTTP_404_NOT_FOUND)
+
+    futuro = pool_hash.enviar(verificar_password, password, usuario.password)
+    if futuro is None:
+        return _respuesta_json(
+            {'error': 'Servicio de autenticación saturado'},
+            status.HTTP_503_SERVICE_UNAVAILABLE, {'Retry-After': '1'}
+        )
+    valido, hash_nuevo = await asyncio.wrap_future(futuro)
+    if not valido:
+        await registrar_fallo(email, ip)
+        return _respuesta_json({'error': 'Credenciales inválidas'}, status.HTTP_401_UNAUTHORIZED)
+
+    if hash_nuevo:
+        # QuerySet.update: un rehash no es un cambio de contraseña y no debe
+        # revocar los tokens del usuario (core.signals)
+        await Usuario.objects.filter(pk=usuario.pk, password=usuario.password).aupdate(
+            password=hash_nuevo
+        )
+    await limpiar_fallos(email)
+    return _respuesta_json({
+        'user': UsuarioSerializer(usuario).data,
+        'message': 'Login exitoso',
+        **emitir_tokens(usuario),
+    })
+
+
+async def stream_eventos(request):
+    """
+    Stream Server-Sent Events con las transiciones de estado de tickets y slots.
+
+    Cada conexión se suscribe al broker del proceso; no consulta la base de
+    datos. `?tipos=ticket,slot` limita los tipos de evento recibidos. Requiere
+    servir la aplicación por ASGI (backend.asgi): bajo WSGI responde 503, ya
+    que el stream ocuparía un worker entero sin llegar a enviar nada.
+    """
+    if not isinstance(request, ASGIRequest):
+        return _respuesta_json(
+            {'error': 'El stream de eventos requiere un servidor ASGI'},
+            status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    tipos = set(filter(None, request.GET.get('tipos', '').split(',')))
+    broker = obtener_broker()
+    suscripcion = broker.suscribir()
+
+    async def eventos():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    evento = await asyncio.wait_for(
+                        suscripcion.cola.get(), timeout=LATIDO_EVENTOS
+                    )
+                except asyncio.TimeoutError:
+                    yield ': latido\n\n'
+                    continue
+                if not tipos or evento['tipo'] in tipos:
+                    yield formatear_sse(evento)
+        finally:
+            broker.cancelar(suscripcion)
+
+    response = StreamingHttpResponse(eventos(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_GET
+def metricas_prometheus(request):
+    """
+    Métricas en el formato de texto de Prometheus (core.metricas).
+
+    Exige `Authorization: Bearer <METRICAS_TOKEN>`. Sin token configurado solo
+    se sirven con DEBUG activo; en producción responde 403 hasta que se defina.
+    """
+    token = getattr(settings, 'METRICAS_TOKEN', '')
+    if not token and not settings.DEBUG:
+        return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+    if token and not hmac.compare_digest(
+            request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    return HttpResponse(generate_latest(registro_exposicion()), content_type=CONTENT_TYPE_LATEST)
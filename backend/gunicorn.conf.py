@@ -0,0 +1,48 @@
+"""
+Configuración de gunicorn para el backend ENAPU.
+
+gunicorn la carga automáticamente al arrancar desde este directorio
+(`cd backend && gunicorn backend.asgi`).
+
+Los workers son de uvicorn (ASGI): el stream SSE de /api/eventos/ y el login
+asíncrono necesitan un bucle de eventos. Con workers síncronos (WSGI) cada
+conexión SSE bloquearía un worker entero sin llegar a enviar eventos, y el
+hash del login bloquearía el worker aunque se haga en el pool de hilos.
+
+Las métricas de Prometheus (core.metricas) se agregan entre workers a través
+de PROMETHEUS_MULTIPROC_DIR: se fija aquí, antes de que se cargue la
+aplicación, y se vacía al arrancar el master para no heredar valores de una
+ejecución anterior.
+"""
+import os
+import shutil
+import tempfile
+
+os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'enapu-metricas')
+)
+
+worker_class = 'uvicorn_worker.UvicornWorker'
+
+
+def on_starting(server):  # pylint: disable=unused-argument
+    """Vacía el directorio de métricas multiproceso antes de lanzar los workers."""
+    directorio = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directorio, ignore_errors=True)
+    os.makedirs(directorio, exist_ok=True)
+
+
+def post_worker_init(worker):
+    """Precalienta la caché de catálogos en cuanto el worker carga la aplicación."""
+    from core.catalogos import calentar_catalogos  # pylint: disable=import-outside-toplevel
+    try:
+        calentar_catalogos()
+    except Exception:  # pylint: disable=broad-except
+        # Un fallo al precalentar no debe impedir que el worker atienda peticiones
+        worker.log.exception('No se pudo precalentar la caché de catálogos')
+
+
+def child_exit(server, worker):  # pylint: disable=unused-argument
+    """Descarta los indicadores en vivo del worker que termina (los contadores se conservan)."""
+    from prometheus_client import multiprocess  # pylint: disable=import-outside-toplevel
+    multiprocess.mark_process_dead(worker.pid)
@@ -3,6 +3,7 @@ import { useNavigate } from "react-router-dom";
 import { Menu, X, LogOut, User, Bell } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
+import { api } from "@/lib/api";
 
 interface NavbarProps {
   userRole: string;
@@ -21,6 +22,8 @@ const Navbar = ({ userRole, userName, notifications = 0 }: NavbarProps) => {
   });
 
   const handleLogout = () => {
+    // Revoca los tokens en el servidor; la sesión local se cierra igualmente
+    api.usuarios.logout().catch(() => undefined);
     localStorage.removeItem("userRole");
     localStorage.removeItem("userId");
     navigate("/");
@@ -30,14 +30,69 @@ interface BuqueData {
   [key: string]: unknown;
 }
 
-export async function apiFetch(path: string, opts: RequestInit = {}) {
+// Tokens JWT emitidos por /usuarios/login/ y renovados con /auth/refrescar/
+export function guardarTokens(tokens: { access: string; refresh: string }) {
+  localStorage.setItem('accessToken', tokens.access);
+  localStorage.setItem('refreshToken', tokens.refresh);
+}
+
+export function borrarTokens() {
+  localStorage.removeItem('accessToken');
+  localStorage.removeItem('refreshToken');
+}
+
+// Renovación en curso, compartida por todas las peticiones que reciben 401 a la vez
+let refrescoEnCurso: Promise<boolean> | null = null;
+
+// Canjea el token de refresco (de un solo uso) por un par nuevo
+async function canjearRefresh(): Promise<boolean> {
+  const refresh = localStorage.getItem('refreshToken');
+  if (!refresh) return false;
+  const resp = await fetch(`${API_BASE}/auth/refrescar/`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ refresh }),
+  });
+  if (!resp.ok) {
+    borrarTokens();
+    return false;
+  }
+  guardarTokens(await resp.json());
+  return true;
+}
+
+// El backend revoca el refresh al canjearlo: un segundo canje en paralelo fallaría
+// y borraría el par recién emitido, así que todas esperan a la misma renovación
+function refrescarTokens(): Promise<boolean> {
+  if (!refrescoEnCurso) {
+    refrescoEnCurso = canjearRefresh().finally(() => {
+      refrescoEnCurso = null;
+    });
+  }
+  return refrescoEnCurso;
+}
+
+// El access enviado ya fue sustituido por una renovación terminada: basta con repetir
+function renovadoDespuesDe(access: string) {
+  const actual = localStorage.getItem('accessToken');
+  return actual !== null && actual !== access;
+}
+
+export async function apiFetch(path: string, opts: RequestInit = {}, reintento = true) {
   const url = `${API_BASE}${path.startsWith('/') ? path : `/${path}`}`;
   const headers = {
     'Content-Type': 'application/json',
     ...(opts.headers || {}),
   } as Record<string,string>;
+  const access = localStorage.getItem('accessToken');
+  if (access) headers['Authorization'] = `Bearer ${access}`;
 
   const resp = await fetch(url, { ...opts, headers, credentials: 'include' });
+  // Token de acceso caducado: se renueva una vez y se repite la petición
+  if (resp.status === 401 && access && reintento
+      && (renovadoDespuesDe(access) || await refrescarTokens())) {
+    return apiFetch(path, opts, false);
+  }
   if (!resp.ok) {
     const text = await resp.text();
     throw new Error(`${resp.status} ${resp.statusText}: ${text}`);
@@ -48,6 +103,16 @@ export async function apiFetch(path: string, opts: RequestInit = {}) {
   return resp.text();
 }
 
+// URL de descarga en streaming (CSV / NDJSON) de un listado, con sus filtros
+export function exportUrl(
+  recurso: 'tickets' | 'facturas' | 'pagos' | 'contenedores',
+  formato: 'csv' | 'ndjson' = 'csv',
+  filtros: Record<string, string> = {}
+) {
+  const params = new URLSearchParams({ ...filtros, formato });
+  return `${API_BASE}/${recurso}/exportar/?${params.toString()}`;
+}
+
 // API functions for common operations
 export const api = {
   // Usuarios
@@ -59,6 +124,9 @@ export const api = {
     delete: (id: number) => apiFetch(`/usuarios/${id}/`, { method: 'DELETE' }),
     login: (email: string, password: string) => 
       apiFetch('/usuarios/login/', { method: 'POST', body: JSON.stringify({ email, password }) }),
+    logout: () => apiFetch('/auth/revocar/', {
+      method: 'POST', body: JSON.stringify({ refresh: localStorage.getItem('refreshToken') }),
+    }).finally(borrarTokens),
     byRole: (role: string) => apiFetch(`/usuarios/by_role/?role=${role}`),
   },
 
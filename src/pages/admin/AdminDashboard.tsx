@@ -27,19 +27,14 @@ const AdminDashboard = () => {
 
   const loadStats = async () => {
     try {
-      const [tickets, usuarios, slots] = await Promise.all([
-        apiFetch('/tickets/'),
-        apiFetch('/usuarios/'),
-        apiFetch('/ubicaciones-slot/')
-      ]);
-      
+      // Conteos agregados en el servidor: no descarga las tablas completas
+      const data = await apiFetch('/dashboard/estadisticas/');
+
       setStats({
-        totalTickets: tickets.length,
-        activeTickets: tickets.filter((t: Record<string, unknown>) => 
-          ["Pendiente", "En Proceso", "Validado", "En Cola"].includes(t.estado as string)
-        ).length,
-        totalUsers: usuarios.length,
-        availableSlots: slots.filter((s: Record<string, unknown>) => (s.estado as string).toLowerCase() === 'disponible').length
+        totalTickets: data.tickets.total,
+        activeTickets: data.tickets.activos,
+        totalUsers: data.usuarios.total,
+        availableSlots: data.slots.disponibles
       });
     } catch (err) {
       console.error('Error cargando estadísticas:', err);
@@ -2,6 +2,14 @@ import { useState, useEffect } from "react";
 import AdminLayout from "@/components/AdminLayout";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { reportData } from "@/data/mocks";
+import { exportUrl } from "@/lib/api";
+
+const exportaciones = [
+  { recurso: "tickets", titulo: "Tickets" },
+  { recurso: "facturas", titulo: "Facturas" },
+  { recurso: "pagos", titulo: "Pagos" },
+  { recurso: "contenedores", titulo: "Contenedores" },
+] as const;
 
 const ReportsView = () => {
   const [userName, setUserName] = useState("Administrador");
@@ -28,6 +36,22 @@ const ReportsView = () => {
                 </div>
               </CardContent>
             </Card>
+            <Card>
+              <CardHeader><CardTitle>Exportar Datos</CardTitle></CardHeader>
+              <CardContent>
+                <div className="space-y-2">
+                  {exportaciones.map(({ recurso, titulo }) => (
+                    <div key={recurso} className="flex justify-between items-center p-2 bg-muted rounded">
+                      <span>{titulo}</span>
+                      <span className="flex gap-3 font-semibold">
+                        <a href={exportUrl(recurso, "csv")} className="text-primary hover:underline">CSV</a>
+                        <a href={exportUrl(recurso, "ndjson")} className="text-primary hover:underline">NDJSON</a>
+                      </span>
+                    </div>
+                  ))}
+                </div>
+              </CardContent>
+            </Card>
             <Card>
               <CardHeader><CardTitle>Volumen de Contenedores</CardTitle></CardHeader>
               <CardContent>
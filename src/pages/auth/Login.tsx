@@ -4,6 +4,7 @@ import { User, UserCog, ShieldCheck, Ship, ArrowLeft } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { toast } from "sonner";
+import { guardarTokens } from "@/lib/api";
 
 const Login = () => {
   const navigate = useNavigate();
@@ -106,6 +107,7 @@ const Login = () => {
         const roleName = user.rol_nombre || 'OPERARIO';
         
         // Store user info
+        guardarTokens(data);
         localStorage.setItem('userId', String(user.id));
         localStorage.setItem('userRole', roleName);
         localStorage.setItem('userName', user.nombre);
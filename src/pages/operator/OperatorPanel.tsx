@@ -14,11 +14,13 @@ import CardStat from "@/components/CardStat";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { tickets, users } from "@/data/mocks";
+import { apiFetch } from "@/lib/api";
 
 const OperatorPanel = () => {
   const navigate = useNavigate();
   const [userId, setUserId] = useState<string | null>(null);
   const [userName, setUserName] = useState<string>("Operario");
+  const [completedToday, setCompletedToday] = useState<number>(0);
 
   useEffect(() => {
     const storedUserId = localStorage.getItem("userId");
@@ -34,13 +36,17 @@ const OperatorPanel = () => {
     if (storedName) {
       setUserName(storedName);
     }
+
+    // Totales del día desde el resumen horario del servidor (no recorre los tickets)
+    apiFetch('/dashboard/rendimiento/')
+      .then((data) => setCompletedToday(data.por_estado?.Completado ?? 0))
+      .catch((err) => console.error('Error cargando rendimiento:', err));
   }, [navigate]);
 
   if (!userId) return null;
 
   const pendingTickets = tickets.filter(t => t.estado === "Pendiente").length;
   const inProcessTickets = tickets.filter(t => t.estado === "En Proceso").length;
-  const completedToday = tickets.filter(t => t.estado === "Completado" && t.fecha === new Date().toISOString().split('T')[0]).length;
   const inQueueTickets = tickets.filter(t => t.estado === "En Cola").length;
 
   const sidebarItems = [
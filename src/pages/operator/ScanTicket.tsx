@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect } from 'react';
 import OperatorLayout from '../../components/OperatorLayout';
 import { apiFetch } from '../../lib/api';
 import { Scan, Package, Calendar, MapPin, User, CheckCircle, X } from 'lucide-react';
@@ -23,23 +23,11 @@ interface Zona {
   nombre: string;
 }
 
-interface Slot {
-  id: number;
-  fila: string;
-  columna: string;
-  nivel: string;
-  estado: string;
-  id_zona: number;
-  zona_nombre?: string;
-}
-
 const ScanTicket: React.FC = () => {
   const [codigoBarras, setCodigoBarras] = useState('');
   const [contenedorInfo, setContenedorInfo] = useState<ContenedorInfo | null>(null);
   const [zonas, setZonas] = useState<Zona[]>([]);
-  const [slots, setSlots] = useState<Slot[]>([]);
   const [selectedZona, setSelectedZona] = useState<string>('');
-  const [selectedSlot, setSelectedSlot] = useState<string>('');
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string>('');
 
@@ -47,15 +35,6 @@ const ScanTicket: React.FC = () => {
     loadZonas();
   }, []);
 
-  useEffect(() => {
-    if (selectedZona) {
-      loadSlotsByZona(Number(selectedZona));
-    } else {
-      setSlots([]);
-      setSelectedSlot('');
-    }
-  }, [selectedZona, loadSlotsByZona]);
-
   const loadZonas = async () => {
     try {
       const zonasData = await apiFetch('/zonas/');
@@ -65,25 +44,6 @@ const ScanTicket: React.FC = () => {
     }
   };
 
-  const loadSlotsByZona = useCallback(async (zonaId: number) => {
-    try {
-      const slotsData = await apiFetch('/ubicaciones-slot/');
-      const slotsDisponibles = slotsData.filter(
-        (s: Slot) => s.id_zona === zonaId && s.estado.toLowerCase() === 'disponible'
-      );
-      
-      const zona = zonas.find(z => z.id === zonaId);
-      const slotsConZona = slotsDisponibles.map((s: Slot) => ({
-        ...s,
-        zona_nombre: zona?.nombre || ''
-      }));
-      
-      setSlots(slotsConZona);
-    } catch (error) {
-      console.error('Error cargando slots:', error);
-    }
-  }, [zonas]);
-
   const handleScan = async (e: React.FormEvent) => {
     e.preventDefault();
     
@@ -97,28 +57,25 @@ const ScanTicket: React.FC = () => {
     setContenedorInfo(null);
 
     try {
-      // Buscar contenedor por código de barras
-      const contenedores = await apiFetch(`/contenedores/`);
-      const contenedor = contenedores.find(
-        (c: ContenedorInfo) => c.codigo_barras === codigoBarras.trim()
-      );
-
-      if (!contenedor) {
+      // Búsqueda indexada en el servidor (contenedor, cita y ticket activo)
+      let resultado;
+      try {
+        resultado = await apiFetch(
+          `/contenedores/buscar/?codigo_barras=${encodeURIComponent(codigoBarras.trim())}`
+        );
+      } catch {
         setError('❌ Contenedor no encontrado. Verifique el código de barras.');
         return;
       }
+      const contenedor = resultado.contenedor;
 
       if (!contenedor.cita_info) {
         setError('❌ Este contenedor no tiene una cita/reserva asociada. Solo se pueden validar contenedores con reserva confirmada de la empresa transportista.');
         return;
       }
 
-      // Verificar que el contenedor no tenga ticket ya creado
-      const tickets = await apiFetch('/tickets/');
-      const ticketExistente = tickets.find((t: Record<string, unknown>) => t.id_contenedor === contenedor.id);
-      
-      if (ticketExistente) {
-        setError(`❌ Este contenedor ya fue procesado. Ticket #${ticketExistente.id} creado anteriormente (Estado: ${ticketExistente.estado}).`);
+      if (resultado.ticket) {
+        setError(`❌ Este contenedor ya fue procesado. Ticket #${resultado.ticket.id} creado anteriormente (Estado: ${resultado.ticket.estado}).`);
         return;
       }
 
@@ -144,60 +101,30 @@ const ScanTicket: React.FC = () => {
   };
 
   const handleAssignSlot = async () => {
-    if (!contenedorInfo || !selectedSlot) {
-      alert('Por favor seleccione una ubicación (slot)');
+    if (!contenedorInfo || !selectedZona) {
+      alert('Por favor seleccione una zona');
       return;
     }
 
     setLoading(true);
     try {
-      // Buscar el cliente asociado a la cita
-      const citas = await apiFetch('/citas-recojo/');
-      const cita = citas.find((c: Record<string, unknown>) => 
-        c.fecha_envio === contenedorInfo.cita_info?.fecha_envio &&
-        c.fecha_recojo === contenedorInfo.cita_info?.fecha_recojo
-      );
-
-      if (!cita || !cita.id_cliente) {
-        alert('Error: No se encontró el cliente asociado a esta reserva');
-        return;
-      }
-
-      // Crear el ticket
-      const ticketPayload = {
-        fecha_hora_entrada: new Date().toISOString(),
-        estado: 'Validado',
-        id_ubicacion: Number(selectedSlot),
-        id_usuario: cita.id_cliente, // El cliente que hizo la reserva
-        id_contenedor: contenedorInfo.id
-      };
-
-      await apiFetch('/tickets/', {
+      // Check-in atómico: el servidor valida la reserva, asigna el slot,
+      // crea el ticket y actualiza la cita en una sola transacción
+      const resultado = await apiFetch('/contenedores/check-in/', {
         method: 'POST',
-        body: JSON.stringify(ticketPayload)
-      });
-
-      // Actualizar estado del slot a ocupado
-      await apiFetch(`/ubicaciones-slot/${selectedSlot}/`, {
-        method: 'PATCH',
-        body: JSON.stringify({ estado: 'ocupado' })
+        body: JSON.stringify({
+          codigo_barras: contenedorInfo.codigo_barras,
+          id_zona: Number(selectedZona)
+        })
       });
+      const ubicacion = resultado.ticket.ubicacion_info;
 
-      // Actualizar estado de la cita a en_proceso
-      if (cita) {
-        await apiFetch(`/citas-recojo/${cita.id}/`, {
-          method: 'PATCH',
-          body: JSON.stringify({ estado: 'en_proceso' })
-        });
-      }
-
-      alert('✅ Ticket creado exitosamente! El contenedor ha sido asignado.');
+      alert(`✅ Ticket #${resultado.ticket.id} creado exitosamente! Ubicación asignada: Fila ${ubicacion.fila}, Col ${ubicacion.columna}, Nivel ${ubicacion.nivel}.`);
       
       // Reset form
       setCodigoBarras('');
       setContenedorInfo(null);
       setSelectedZona('');
-      setSelectedSlot('');
       setError('');
     } catch (error: unknown) {
       console.error('Error creando ticket:', error);
@@ -212,7 +139,6 @@ const ScanTicket: React.FC = () => {
     setCodigoBarras('');
     setContenedorInfo(null);
     setSelectedZona('');
-    setSelectedSlot('');
     setError('');
   };
 
@@ -340,34 +266,16 @@ const ScanTicket: React.FC = () => {
                     </select>
                   </div>
 
-                  <div>
-                    <label className="block text-sm font-medium mb-2">Slot *</label>
-                    <select
-                      className="w-full p-2 border rounded-lg"
-                      value={selectedSlot}
-                      onChange={(e) => setSelectedSlot(e.target.value)}
-                      disabled={!selectedZona}
-                    >
-                      <option value="">
-                        {selectedZona ? 'Seleccionar slot' : 'Primero seleccione zona'}
-                      </option>
-                      {slots.map((slot) => (
-                        <option key={slot.id} value={slot.id}>
-                          Fila {slot.fila}, Col {slot.columna}, Nivel {slot.nivel}
-                        </option>
-                      ))}
-                    </select>
-                    {selectedZona && (
-                      <p className="text-xs text-gray-500 mt-1">
-                        {slots.length} slots disponibles
-                      </p>
-                    )}
+                  <div className="flex items-end">
+                    <p className="text-xs text-gray-500">
+                      El sistema asignará automáticamente el primer slot libre de la zona.
+                    </p>
                   </div>
                 </div>
 
                 <button
                   onClick={handleAssignSlot}
-                  disabled={!selectedSlot || loading}
+                  disabled={!selectedZona || loading}
                   className="w-full px-6 py-3 bg-green-600 text-white rounded-lg hover:bg-green-700 disabled:opacity-50 disabled:cursor-not-allowed font-medium"
                 >
                   {loading ? 'Creando ticket...' : '✓ Crear Ticket y Asignar Ubicación'}
@@ -384,7 +292,7 @@ const ScanTicket: React.FC = () => {
             <li>Escanee o ingrese el código de barras del contenedor</li>
             <li>El sistema buscará automáticamente la reserva asociada</li>
             <li>Verifique que las fechas sean correctas</li>
-            <li>Seleccione una zona y un slot disponible</li>
+            <li>Seleccione una zona; el slot se asigna automáticamente</li>
             <li>Confirme para crear el ticket y asignar la ubicación</li>
           </ol>
         </div>